@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 from app.models.input.material import process_material_satisfaction_data
 from app.utils.error_handler import (error_handler, safe_operation, CalculationError)
+from app.utils.pattern_index import PatternIndex
 
 """
 자재 만족률 분석
@@ -280,61 +282,26 @@ def map_items_to_materials(material_item_df, demand_df) :
         
         active_materials = material_item_df[material_item_df['Active_OX'] == 'O'].copy()
 
-        for idx, row in demand_df.iterrows() :
-            item = row['Item'] if 'Item' in row else row.name
-            item_to_materials[item] = []
+        items = demand_df['Item'] if 'Item' in demand_df.columns else demand_df.index
+        item_index = PatternIndex(dict.fromkeys(items))
+        item_to_materials = {item : [] for item in item_index.items}
 
-            for mat_idx, mat_row in active_materials.iterrows() :
-                material = mat_row['Material']
+        # 자재마다 Top_Model 패턴에 일치하는 아이템을 자리별 글자 비교로 한 번에 찾음
+        for mat_idx, mat_row in active_materials.iterrows() :
+            material = mat_row['Material']
+            matched = np.zeros(len(item_index), dtype=bool)
 
-                for col in model_columns :
-                    if pd.notnull(mat_row[col]) and mat_row[col] :
-                        if match_pattern(item, mat_row[col]) :
-                            item_to_materials[item].append(material)
-                            break
+            for col in model_columns :
+                if pd.notnull(mat_row[col]) and mat_row[col] :
+                    matched |= item_index.mask(mat_row[col])
+
+            for item in item_index.items[matched] :
+                item_to_materials[item].append(material)
 
         return item_to_materials
     except Exception as e :
         raise CalculationError(f'Error mapping items to materials : {str(e)}')
 
-"""
-와일드카드 패턴 확인
-"""
-@error_handler(
-    show_dialog=False,
-    default_return=False
-)
-def match_pattern(item, pattern) :
-    try :
-        if not isinstance(item, str) or not isinstance(pattern, str) :
-            return False
-        
-        parts = pattern.split('*')
-
-        if not parts :
-            return False
-
-        if not item.startswith(parts[0]) :
-            return False
-        
-        if not item.endswith(parts[-1]) :
-            return False
-        
-        current_pos = len(parts[0])
-
-        for part in parts[1:-1] :
-            if part :
-                pos = item.find(part, current_pos)
-
-                if pos == -1 :
-                    return False
-                
-                current_pos = pos + len(part)
-
-        return True
-    except Exception as e :
-        return False
-
 """
 자재별 On-Hand 추출
 """
@@ -1,5 +1,6 @@
 import pandas as pd
-import fnmatch
+
+from app.utils.pattern_index import PatternSet
 
 """
 당주 출하 만족률 계산
@@ -19,6 +20,8 @@ def calculate_fulfillment_rate(processed_data) :
     result_df['Production_Qty'] = 0
     result_df['Is_Fulfilled'] = False
     result_df['Constraint_Type'] = ''
+    # 자재 Top_Model 패턴은 한 번만 인덱싱해서 아이템마다 일치하는 패턴을 한 번에 찾음
+    model_patterns = PatternSet(material_data['model_to_materials'])
 
     for i, row in result_df.iterrows() :
         item = row['Item']
@@ -38,7 +41,8 @@ def calculate_fulfillment_rate(processed_data) :
 
         material_constraint = check_material_availability(
             item, sop, material_data['model_to_materials'],
-            material_data['availability'], material_data['material_groups']
+            material_data['availability'], material_data['material_groups'],
+            pattern_set=model_patterns
         )
 
         production_constraint = check_production_capacity(
@@ -119,12 +123,14 @@ def get_due_lt(project, tosite_group, due_lt_map) :
 """
 자재 가용성 확인 및 사용 가능 수량 계산
 """
-def check_material_availability(item, required_qty, model_to_materials, material_availability, material_groups) :
+def check_material_availability(item, required_qty, model_to_materials, material_availability, material_groups, pattern_set=None) :
     required_materials = []
 
-    for pattern, materials in model_to_materials.items() :
-        if fnmatch.fnmatch(item, pattern) :
-            required_materials.extend(materials)
+    if pattern_set is None :
+        pattern_set = PatternSet(model_to_materials)
+
+    for pattern in pattern_set.matching(item) :
+        required_materials.extend(model_to_materials[pattern])
 
     required_materials = list(set(required_materials))
 
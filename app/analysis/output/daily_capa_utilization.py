@@ -3,6 +3,7 @@ import numpy as np
 from app.models.common.file_store import FilePaths
 from app.utils.fileHandler import load_file
 from app.utils.item_key_manager import ItemKeyManager
+from app.utils.shift_calendar import horizon_shifts, shift_day
 
 class CapaUtilization:
     """
@@ -46,16 +47,8 @@ class CapaUtilization:
                 return {day: 0 for day in ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']}
             
                 
-            # 근무를 요일에 매핑
-            shift_to_day = {
-                1: 'Mon', 2: 'Mon',
-                3: 'Tue', 4: 'Tue',
-                5: 'Wed', 6: 'Wed',
-                7: 'Thu', 8: 'Thu',
-                9: 'Fri', 10: 'Fri',
-                11: 'Sat', 12: 'Sat',
-                13: 'Sun', 14: 'Sun',
-            }
+            # 근무를 요일에 매핑 (계획 기간이 1주보다 길면 같은 요일끼리 합산)
+            shift_to_day = {shift: shift_day(shift) for shift in horizon_shifts(df_capa_qty, df_demand['Time'])}
 
             # 일별 생산능력 계산
             day_capacity = {}
@@ -131,7 +124,7 @@ class CapaUtilization:
             print(f"요일별 생산 가능량: {day_capacity}")
             
             # 수요 수량에 기반한 일별 생산량 계산
-            df_demand['Day'] = df_demand['Time'].map(shift_to_day)
+            df_demand['Day'] = pd.to_numeric(df_demand['Time']).astype(int).map(shift_day)
             day_production = df_demand.groupby('Day')['Qty'].sum()
       
             # 일별 가동률 계산
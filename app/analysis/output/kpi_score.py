@@ -5,6 +5,7 @@ import numpy as np
 from app.models.common.file_store import FilePaths, DataStore
 from app.models.common.settings_store import SettingsStore
 from app.utils.fileHandler import load_file
+from app.utils.shift_calendar import horizon_shifts, shift_weight
 
 """
 KPI Score 계산
@@ -91,10 +92,13 @@ class KpiScore:
             df = df.copy()
             df['To_site'] = df['Item'].str[7:8]
 
-        # demand_df에서도 To_site 컬럼 확인
+        # demand_df에서도 To_site 컬럼 확인 (최적화 결과의 To_site 는 demand 시트의 To_Site 값)
         demand_copy = self.demand_df.copy()
         if 'To_site' not in demand_copy.columns:
-            demand_copy['To_site'] = demand_copy['Item'].str[7:8]
+            if 'To_Site' in demand_copy.columns:
+                demand_copy['To_site'] = demand_copy['To_Site'].astype(str)
+            else:
+                demand_copy['To_site'] = demand_copy['Item'].str[7:8]
         
         # 전체 모델/To_site 조합 수
         if 'SOP' in demand_copy.columns:
@@ -165,9 +169,12 @@ class KpiScore:
         else:  # 아니면 균등 가중치
             weights = [1.0] * 14  
 
+        # 계획 기간 시프트 (capa_qty 시프트 컬럼, 1주보다 길 수 있음)
+        shifts = horizon_shifts(df_capa_qty, self.df['Time'])
+
         # shift별 best 생산 능력 계산
         shift_capacity = {}
-        for shift in range(1, 15):
+        for shift in shifts:
             if shift not in df_capa_qty.columns:
                 shift_capacity[shift] = 0
                 continue
@@ -247,7 +254,7 @@ class KpiScore:
         best_allocation = {}
         remaining_qty = total_qty
 
-        for shift in range(1, 15):
+        for shift in shifts:
             capacity = shift_capacity.get(shift, 0)
             if remaining_qty > 0 and capacity > 0:
                 allocated = min(capacity, remaining_qty)
@@ -262,14 +269,14 @@ class KpiScore:
         weighted_result_sum = 0
         weighted_best_sum = 0
 
-        for shift in range(1, 15): 
-            if shift <= len(weights):
-                weight = weights[shift - 1]
-                result_qty = result_pivot.get(shift, 0)
-                best_qty = best_allocation.get(shift, 0)
-                
-                weighted_result_sum += result_qty * weight
-                weighted_best_sum += best_qty * weight
+        for shift in shifts: 
+            # weight_day 는 1주(14 시프트) 단위로 반복 적용
+            weight = shift_weight(weights, shift)
+            result_qty = result_pivot.get(shift, 0)
+            best_qty = best_allocation.get(shift, 0)
+            
+            weighted_result_sum += result_qty * weight
+            weighted_best_sum += best_qty * weight
 
                 # print(f"Shift {shift}: Weight={weight}, Result={result_qty}, Best={best_qty}")
         
@@ -5,6 +5,7 @@ import os
 import traceback
 from app.utils.fileHandler import load_file
 from app.models.common.file_store import FilePaths, DataStore
+from app.utils.shift_calendar import shift_columns
 
 """
 자재 부족량 분석 클래스
@@ -90,13 +91,13 @@ class MaterialShortageAnalyzer:
             # Items 컬럼 (아이템 목록)은 마지막 컬럼으로 가정
             items_col = self.material_detail_df.columns[-1]
             
-            # Shift 컬럼 찾기 (1-14) - 숫자 컬럼
+            # Shift 컬럼 찾기 (1 이상) - 숫자 컬럼, 계획 기간이 1주보다 길 수 있음
             shift_cols = []
             for col in self.material_detail_df.columns:
                 # 컬럼 이름이 숫자인 경우
                 if isinstance(col, int) or (isinstance(col, str) and col.isdigit()):
                     col_str = str(col)
-                    if int(col_str) >= 1 and int(col_str) <= 14:
+                    if int(col_str) >= 1:
                         shift_cols.append(col_str)
             
             # 컬럼 매핑 설정
@@ -202,6 +203,9 @@ class MaterialShortageAnalyzer:
                     if pd.notna(item) and pd.notna(time):
                         item_shift_pairs.add((str(item), int(time)))
                 
+                # 자재 시트에 있는 시프트 컬럼들
+                shifts = shift_columns(self.material_detail_df)
+
                 # 각 행(자재)에 대해 순회
                 for idx, row in self.material_detail_df.iterrows():
                     material_code = row.get('index')
@@ -215,14 +219,10 @@ class MaterialShortageAnalyzer:
                     if not items_list:
                         continue
                     
-                    # 시프트 컬럼들(1-14) 확인
-                    for shift in range(1, 15):
+                    # 시프트 컬럼들 확인
+                    for shift in shifts:
                         shift_str = str(shift)
                         
-                        # 해당 Shift 컬럼이 있는지 확인
-                        if shift_str not in self.material_detail_df.columns:
-                            continue
-                        
                         # 부족량 값 가져오기
                         shortage_amt = row.get(shift_str)
                         
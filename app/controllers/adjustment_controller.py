@@ -311,6 +311,51 @@ class AdjustmentController(QObject):
             print("Controller: model이 set_new_dataframe을 지원하지 않음")
             return False
         
+    """
+    수동 조정 주변 재최적화
+    수정한 행과 관련 없는 셀은 고정하고, 수정으로 영향을 받은 (라인, 시프트) 셀만 다시 배치
+
+    Returns:
+        dict: Optimizer.reoptimize_neighborhood 결과. 수정 사항이 없으면 None
+    """
+    def reoptimize_around_edits(self):
+        df_edited, cells = self.model.get_adjustment_neighborhood()
+        if not cells:
+            print("Controller: 재최적화할 수정 사항이 없음")
+            return None
+
+        from app.core.optimizer import Optimizer
+        results = Optimizer().reoptimize_neighborhood({
+            'plan': self.model.get_dataframe(),
+            'edited': df_edited,
+            'cells': cells,
+        })
+
+        if not results.get('error'):
+            self.model.replace_dataframe(results['assignment_result'])
+            print(f"Controller: 재최적화 결과 반영 ({results['neighborhood']})")
+        return results
+
+    """
+    결과 계획 개선(Polish)용 로컬 서치 생성
+    수동으로 수정한 행과 사전할당 아이템의 행은 옮기지 않도록 고정
+
+    Args:
+        pre_assigned_items (iterable): 사전할당 아이템
+        material_analyzer (MaterialShortageAnalyzer): 자재 부족 정보 (자재 점수 계산용)
+
+    Returns:
+        PlanImprover: improve 를 호출해서 실행 (PlanImproveThread)
+    """
+    def create_plan_improver(self, pre_assigned_items=(), material_analyzer=None):
+        from app.core.output.plan_improver import PlanImprover
+        df_plan = self.model.get_dataframe()
+        df_edited, _ = self.model.get_adjustment_neighborhood()
+        df_pinned = pd.concat([df_edited, df_plan[df_plan['Item'].isin(set(pre_assigned_items))]], ignore_index=True)
+        df_pinned = df_pinned.drop_duplicates('_id')
+        print(f"Controller: 계획 개선 시작 (고정 {len(df_pinned)}행)")
+        return PlanImprover(df_plan, material_analyzer=material_analyzer, df_pinned=df_pinned)
+
     """
     데이터 원본 복원
     """
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_array
+from scipy.sparse.csgraph import maximum_flow
+
+"""
+사전할당 요청의 라인/시프트 Capa 충족 여부 확인 (최대 유량)
+
+요청을 (라인, 시프트) Capa 에 나눠 담는 문제는 이분 그래프 수송 문제이므로 LP 없이 최대 유량으로 푼다.
+    source -> 요청 r (용량 Qty_r) -> 요청 r 의 (라인, 시프트) (용량 무한) -> sink (용량 Capacity)
+최대 유량이 요청량 합보다 작으면, 각 요청의 (요청량 - 흘려보낸 양)이 Capa 때문에 배정하지 못한 부족량이다.
+(부족량 합은 LP 로 구한 최소 슬랙 합과 같다)
+
+scipy 의 maximum_flow 는 정수 용량만 받으므로, 수량에 소수가 있으면 SCALE 배 해서 내림한 값으로 푼다.
+Capa 가 없는(NaN 이거나 capa 시트에 없는) (라인, 시프트)는 용량 제한이 없는 것으로 본다.
+"""
+
+# 소수 수량을 정수로 바꿀 때 곱하는 값 (0.001 단위)
+SCALE = 1000
+INT32_MAX = np.iinfo(np.int32).max
+
+
+"""
+수량 배열을 정수 용량으로 바꿀 배수. 모두 정수면 1, 아니면 SCALE (int32 범위를 넘지 않도록 줄임)
+"""
+def _flow_scale(values, total):
+    finite = values[np.isfinite(values)]
+    scale = 1 if np.allclose(finite, np.round(finite)) else SCALE
+    while scale > 1 and (total + 1) * scale >= INT32_MAX:
+        scale //= 10
+    if (total + 1) * scale >= INT32_MAX:
+        raise ValueError(f"요청량 합({total:,.0f})이 너무 커서 최대 유량으로 확인할 수 없습니다")
+    return scale
+
+
+"""
+요청별 Capa 배정 가능량 계산
+
+Args:
+    fx (DataFrame): 'Fixed_Line'(라인 목록), 'Fixed_Time'(시프트 목록), 'Qty' 컬럼을 가진 요청 테이블
+    cap (DataFrame): ['Line', 'Shift', 'Capacity'] (get_capacity_constraints 결과)
+
+Returns:
+    dict: {
+        'shortfalls': 요청별 부족량 Series (fx 인덱스),
+        'assigned': 요청별 (라인, 시프트) 배정량 DataFrame ['Request', 'Line', 'Shift', 'Qty'],
+        'total': 요청량 합,
+        'max_flow': 배정 가능한 최대량
+    }
+"""
+def capacity_flow(fx: pd.DataFrame, cap: pd.DataFrame) -> dict:
+    qty = pd.to_numeric(fx['Qty'], errors='coerce').fillna(0).clip(lower=0).to_numpy(dtype=float)
+    total = float(qty.sum())
+
+    # 요청 x (라인, 시프트) 조합을 펼침
+    combos = pd.DataFrame({'Request': np.arange(len(fx)), 'Line': fx['Fixed_Line'].to_numpy(), 'Shift': fx['Fixed_Time'].to_numpy()})
+    combos = combos.explode('Line').explode('Shift').dropna(subset=['Line', 'Shift']).drop_duplicates()
+    combos['Shift'] = pd.to_numeric(combos['Shift'])
+
+    cells = combos[['Line', 'Shift']].drop_duplicates().reset_index(drop=True)
+    cells = cells.merge(cap[['Line', 'Shift', 'Capacity']], on=['Line', 'Shift'], how='left')
+    cells = cells.drop_duplicates(['Line', 'Shift']).reset_index(drop=True)
+    cell_caps = pd.to_numeric(cells['Capacity'], errors='coerce').to_numpy(dtype=float, copy=True)
+    cell_caps[np.isnan(cell_caps)] = np.inf
+    combos = combos.merge(cells[['Line', 'Shift']].reset_index().rename(columns={'index': 'Cell'}), on=['Line', 'Shift'])
+
+    scale = _flow_scale(np.concatenate([qty, cell_caps]), total)
+    infinite = int((total + 1) * scale)
+
+    # 노드 번호: source 0, 요청 1..R, (라인, 시프트) R+1..R+C, sink R+C+1
+    n_req, n_cell = len(fx), len(cells)
+    source, sink = 0, n_req + n_cell + 1
+    req_nodes = 1 + np.arange(n_req)
+    cell_nodes = 1 + n_req + np.arange(n_cell)
+    combo_req = 1 + combos['Request'].to_numpy(dtype=int)
+    combo_cell = 1 + n_req + combos['Cell'].to_numpy(dtype=int)
+
+    rows = np.concatenate([np.full(n_req, source), combo_req, cell_nodes])
+    cols = np.concatenate([req_nodes, combo_cell, np.full(n_cell, sink)])
+    caps = np.concatenate([
+        np.floor(qty * scale),
+        np.full(len(combos), infinite),
+        np.where(np.isinf(cell_caps), infinite, np.floor(np.minimum(cell_caps, infinite) * scale)),
+    ]).astype(np.int32)
+    graph = csr_array((caps, (rows, cols)), shape=(sink + 1, sink + 1))
+
+    result = maximum_flow(graph, source, sink)
+    flow = result.flow.tocsr()
+
+    sent = np.asarray(flow[np.full(n_req, source), req_nodes]).ravel() / scale if n_req else np.zeros(0)
+    combo_flow = np.asarray(flow[combo_req, combo_cell]).ravel() / scale if len(combos) else np.zeros(0)
+    assigned = combos.assign(Request=fx.index.to_numpy()[combos['Request'].to_numpy(dtype=int)], Qty=combo_flow)
+    assigned = assigned.loc[assigned['Qty'] > 0, ['Request', 'Line', 'Shift', 'Qty']].reset_index(drop=True)
+
+    shortfalls = pd.Series(qty - sent, index=fx.index)
+    # 내림으로 생긴 SCALE 단위 미만 차이는 부족으로 보지 않음
+    shortfalls[shortfalls < 1 / scale] = 0.0
+    return {
+        'shortfalls': shortfalls,
+        'assigned': assigned,
+        'total': total,
+        'max_flow': result.flow_value / scale,
+    }
+
+
+"""
+부족량을 (라인, 시프트)에 나눠 적은 Capa 초과량 {(라인, 시프트): 초과량}
+
+부족한 요청의 (라인, 시프트)는 최대 유량에서 모두 Capa 가 꽉 찬 상태이므로, 요청마다 첫 번째 Capa 제한 조합에
+부족량을 더하면 전량 배정이 가능해진다 (초과량 합 = 부족량 합, LP 의 최소 슬랙 해 중 하나).
+"""
+def capacity_excess(fx: pd.DataFrame, cap: pd.DataFrame, shortfalls: pd.Series) -> dict:
+    limited = set(zip(cap.loc[cap['Capacity'].notna(), 'Line'], cap.loc[cap['Capacity'].notna(), 'Shift']))
+    excess = {}
+    for r, short in shortfalls[shortfalls > 0].items():
+        cell = next(((ln, sh) for ln in fx.at[r, 'Fixed_Line'] for sh in fx.at[r, 'Fixed_Time'] if (ln, sh) in limited), None)
+        if cell is not None:
+            excess[cell] = excess.get(cell, 0) + short
+    return excess
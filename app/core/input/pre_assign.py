@@ -1,7 +1,3 @@
-import fnmatch
-import pulp
-from pulp import PULP_CBC_CMD
-
 from typing import Tuple, List
 
 import pandas as pd
@@ -17,6 +13,11 @@ for k, v in df_opts.items():
     pd.set_option(k, v)
 
 from ...models.input.pre_assign import PreAssignFailures, DataLoader
+from ...utils.pattern_index import PatternIndex
+from ...utils.shift_calendar import DEFAULT_SHIFTS, shift_columns
+from .violation_engine import ViolationEngine
+from .violation_screen import prescreen_report
+from ..model.telemetry import RunTelemetry
 
 """dynamic, demand, master 데이터를 로드"""
 def load_data():
@@ -47,84 +48,109 @@ def load_data():
         capa_qty = pd.DataFrame()
     return fixed_opt, pre_assign, demand, line_avail, capa_qty
 
+# pre_assign 시트의 아이템/수량 칸 수 (Item1~7, Qty1~7)
+PRE_ASSIGN_SLOTS = 7
+# Fixed_Time 이 비어 있을 때 사용하는 전체 시프트 (capa_qty 시프트 컬럼이 없을 때 기본값, 1주)
+ALL_SHIFTS = list(DEFAULT_SHIFTS)
+
+"""
+fixed_option 전처리 파이프라인
+라인 채우기 -> 시프트 채우기 -> 'ALL' 수량 계산 -> pre_assign 통합
+"""
+def prepare_fixed_options(
+    fixed_opt: pd.DataFrame,
+    pre_assign: pd.DataFrame,
+    demand: pd.DataFrame,
+    line_available: pd.DataFrame,
+    shifts: List[int] = None
+) -> pd.DataFrame:
+    fx = fill_missing_lines(fixed_opt, line_available)
+    fx = fill_missing_times(fx, shifts)
+    fx = process_all_qty(fx, demand)
+    return expand_pre_assign(fx, pre_assign)
+
 """pre_assign 데이터 fixed_option 이동"""
 def expand_pre_assign(fixed_opt: pd.DataFrame, pre_assign: pd.DataFrame) -> pd.DataFrame:
     records = []
-    for _, row in pre_assign.iterrows():
-        line  = row['Line']
-        shift = row['Shift']
-        for k in range(1, 8):
-            item, qty = row[f'Item{k}'], row[f'Qty{k}']
-            t = (k - 1) * 2 + shift
-            if pd.isna(item) and pd.isna(qty):
-                continue
-
-            if pd.isna(item) or pd.isna(qty):
-                records.append({
-                    'Fixed_Group': item,
-                    'Fixed_Line' : [row['Line']],
-                    'Fixed_Time' : [t],
-                    'Qty'        : qty
-                })
-                continue
-
-            exact_mask = (
-                fixed_opt['Qty'].notna()
-                & (fixed_opt['Fixed_Group'] == item)
-                & fixed_opt['Fixed_Line'].apply(lambda lst: line in lst)
-                & fixed_opt['Fixed_Time'].apply(lambda lst: t    in lst)
-            )
-            fixed_exact = fixed_opt[exact_mask]['Qty'].sum()
-
-            remaining1 = float(qty) - float(fixed_exact)
-            if remaining1 <= 0:
-                continue
-
-            wc_mask = (
-                fixed_opt['Qty'].notna()
-                & fixed_opt['Fixed_Group'].notna()
-                & fixed_opt['Fixed_Group']
-                    .apply(lambda pat: isinstance(pat, str) and fnmatch.fnmatch(item, pat))
-                & ~exact_mask
-                & fixed_opt['Fixed_Line'].apply(lambda lst: line in lst)
-                & fixed_opt['Fixed_Time'].apply(lambda lst: t    in lst)
+    if not pre_assign.empty:
+        # Item1~7 / Qty1~7 칸을 (행, 칸) 순서의 세로 테이블로 한 번에 변환. 칸 k 의 시프트 = (k - 1) * 2 + Shift
+        n = len(pre_assign)
+        slots = pd.DataFrame({
+            'Line': np.repeat(pre_assign['Line'].to_numpy(), PRE_ASSIGN_SLOTS),
+            'Time': np.tile(np.arange(PRE_ASSIGN_SLOTS) * 2, n) + np.repeat(pre_assign['Shift'].to_numpy(), PRE_ASSIGN_SLOTS),
+            'Item': pre_assign[[f'Item{k}' for k in range(1, PRE_ASSIGN_SLOTS + 1)]].to_numpy(dtype=object).ravel(),
+            'Qty': pre_assign[[f'Qty{k}' for k in range(1, PRE_ASSIGN_SLOTS + 1)]].to_numpy(dtype=object).ravel(),
+        })
+        item_na, qty_na = slots['Item'].isna(), slots['Qty'].isna()
+        # 아이템과 수량이 모두 있는 칸만 이미 고정된 수량을 뺀다
+        full = slots[~item_na & ~qty_na]
+
+        # 수량이 있는 fixed_option 행을 (그룹, 라인, 시프트) 단위로 펼침
+        fx = fixed_opt[fixed_opt['Qty'].notna()] if 'Qty' in fixed_opt.columns else fixed_opt.iloc[0:0]
+        fx = pd.DataFrame({
+            'Fx': np.arange(len(fx)),
+            'Group': fx.get('Fixed_Group'),
+            'Line': fx.get('Fixed_Line'),
+            'Time': fx.get('Fixed_Time'),
+            'FixedQty': fx.get('Qty'),
+        }).explode('Line').explode('Time').dropna(subset=['Line', 'Time'])
+        fx = fx.drop_duplicates(['Fx', 'Line', 'Time'])
+        fx['Time'] = pd.to_numeric(fx['Time'])
+        keys = full[['Item', 'Line', 'Time']].reset_index()
+
+        # 같은 아이템으로 고정된 수량
+        exact = keys.merge(fx, left_on=['Item', 'Line', 'Time'], right_on=['Group', 'Line', 'Time'])
+        fixed_exact = exact.groupby('index')['FixedQty'].sum()
+
+        # 아이템이 일치하는 와일드카드 그룹으로 고정된 수량 (같은 아이템 그룹은 위에서 셌으므로 제외)
+        pairs = PatternIndex(keys['Item'].unique()).pairs(fx['Group'].dropna().unique())
+        pairs = pairs[pairs['Pattern'] != pairs['Item']].rename(columns={'Pattern': 'Group'})
+        wild = keys.merge(pairs, on='Item').merge(fx, on=['Group', 'Line', 'Time'])
+        fixed_wild = wild.groupby('index')['FixedQty'].sum()
+
+        remaining1 = full['Qty'].astype(float) - fixed_exact.reindex(full.index, fill_value=0).astype(float)
+        remaining2 = remaining1 - fixed_wild.reindex(full.index, fill_value=0).astype(float)
+        emit = item_na ^ qty_na
+        emit[full.index] = (remaining1 > 0) & (remaining2 > 0)
+        qty = slots['Qty'].copy()
+        qty[full.index] = remaining2.tolist()
+
+        records = [
+            {'Fixed_Group': item, 'Fixed_Line': [line], 'Fixed_Time': [t], 'Qty': q}
+            for item, line, t, q in zip(
+                slots['Item'][emit], slots['Line'][emit], slots['Time'][emit].tolist(), qty[emit]
             )
-            fixed_wild = fixed_opt[wc_mask]['Qty'].sum()
-
-            remaining2 = remaining1 - float(fixed_wild)
-            if remaining2 <= 0:
-                continue
-
-            records.append({
-                'Fixed_Group': item,
-                'Fixed_Line' : [row['Line']],
-                'Fixed_Time' : [t],
-                'Qty'        : remaining2
-            })
+        ]
     return pd.concat([fixed_opt, pd.DataFrame(records)], ignore_index=True, sort=False)
 
+"""프로젝트별 생산 가능 라인 {프로젝트: [라인, ...]} (프로젝트가 여러 행이면 첫 행 기준)"""
+def available_lines_by_project(line_available: pd.DataFrame) -> dict:
+    if line_available.empty or 'Project' not in line_available.columns:
+        return {}
+    avail = line_available.drop_duplicates('Project').set_index('Project')
+    flags = avail.eq(1).to_numpy()
+    return {proj: list(avail.columns[row]) for proj, row in zip(avail.index, flags)}
+
 """Fixed_Line이 NaN인 경우 사용 가능한 모든 라인으로 대체"""
 def fill_missing_lines(fixed_opt: pd.DataFrame, line_available: pd.DataFrame) -> pd.DataFrame:
-    records = []
-    for _, row in fixed_opt.iterrows():
-        fl = row.get('Fixed_Line')
+    if fixed_opt.empty:
+        return pd.DataFrame(columns=fixed_opt.columns)
+    avail = available_lines_by_project(line_available)
+    projects = fixed_opt['Fixed_Group'].map(lambda g: g[3:7] if isinstance(g, str) else None)
+
+    def lines_of(fl, proj):
         if pd.isna(fl):
-            proj_code = row['Fixed_Group'][3:7]
-            avail = line_available[line_available['Project'] == proj_code]
-            if not avail.empty:
-                cols = [col for col, val in avail.iloc[0].items() if col != 'Project' and val == 1]
-                new_line = cols
-            else:
-                new_line = []
-        else:
-            if isinstance(fl, str) and ',' in fl:
-                new_line = [x.strip() for x in fl.split(',') if x.strip()]
-            else:
-                new_line = [fl]
-        new_row = row.copy()
-        new_row['Fixed_Line'] = new_line
-        records.append(new_row)
-    return pd.DataFrame(records, columns=fixed_opt.columns)
+            return list(avail.get(proj, []))
+        if isinstance(fl, str) and ',' in fl:
+            return [x.strip() for x in fl.split(',') if x.strip()]
+        return [fl]
+
+    fx = fixed_opt.copy()
+    fx['Fixed_Line'] = pd.Series(
+        [lines_of(fl, proj) for fl, proj in zip(fixed_opt['Fixed_Line'], projects)],
+        index=fixed_opt.index, dtype=object
+    )
+    return fx.infer_objects()
 
 """Fixed_Line 검증"""
 def validate_fixed_option_lines(
@@ -157,43 +183,46 @@ def validate_fixed_option_lines(
     invalid_fx = pd.DataFrame(invalid_rows, columns=fixed_opt.columns)
     return valid_fx, invalid_fx
 
-"""Fixed_Time이 NaN인 경우 모든 시프트로 대체"""
-def fill_missing_times(fixed_opt: pd.DataFrame) -> pd.DataFrame:
-    records = []
-    for _, row in fixed_opt.iterrows():
-        ft = row.get('Fixed_Time')
+"""Fixed_Time이 NaN인 경우 계획 기간의 모든 시프트(shifts, 없으면 ALL_SHIFTS)로 대체"""
+def fill_missing_times(fixed_opt: pd.DataFrame, shifts: List[int] = None) -> pd.DataFrame:
+    if fixed_opt.empty:
+        return pd.DataFrame(columns=fixed_opt.columns)
+    shifts = list(shifts) if shifts else ALL_SHIFTS
+
+    def times_of(ft):
         if pd.isna(ft):
-            new_val = list(range(1, 15))
-        elif isinstance(ft, str) and ',' in ft:
-            new_val = [int(x.strip()) for x in ft.split(',') if x.strip().isdigit()]
-        else:
-            try:
-                new_val = [int(ft)]
-            except:
-                new_val = []
-        new_row = row.copy()
-        new_row['Fixed_Time'] = new_val
-        records.append(new_row)
-    return pd.DataFrame(records, columns=fixed_opt.columns)
+            return list(shifts)
+        if isinstance(ft, str) and ',' in ft:
+            return [int(x.strip()) for x in ft.split(',') if x.strip().isdigit()]
+        try:
+            return [int(ft)]
+        except (TypeError, ValueError):
+            return []
+
+    fx = fixed_opt.copy()
+    fx['Fixed_Time'] = pd.Series([times_of(ft) for ft in fixed_opt['Fixed_Time']], index=fixed_opt.index, dtype=object)
+    return fx.infer_objects()
 
 """Qty == 'ALL'일 때 demand 합계로 대체"""
 def process_all_qty(fixed_opt: pd.DataFrame, demand: pd.DataFrame) -> pd.DataFrame:
-    def resolve_qty(qg, fixed_group):
-        if isinstance(qg, str) and qg.strip().lower() == 'all':
-            pat = fixed_group
-            return demand.loc[
-                demand['Item'].apply(lambda s: fnmatch.fnmatch(s, pat)),
-                'MFG'
-            ].sum()
-        return qg
-
-    new_records = []
-    for _, row in fixed_opt.iterrows():
-        qty_resolved = resolve_qty(row['Qty'], row['Fixed_Group'])
-        new_row = row.copy()
-        new_row['Qty'] = qty_resolved
-        new_records.append(new_row)
-    return pd.DataFrame(new_records, columns=fixed_opt.columns)
+    if fixed_opt.empty:
+        return pd.DataFrame(columns=fixed_opt.columns)
+    is_all = fixed_opt['Qty'].map(lambda q: isinstance(q, str) and q.strip().lower() == 'all').astype(bool)
+    fx = fixed_opt.copy()
+    if not is_all.any():
+        return fx.infer_objects()
+
+    # 그룹 패턴별로 한 번만 demand 아이템과 맞춰서 MFG 합계 계산
+    groups = fixed_opt.loc[is_all, 'Fixed_Group']
+    totals = {}
+    if 'Item' in demand.columns:
+        for pat, items in PatternIndex(demand['Item'].unique()).match_all(groups).items():
+            totals[pat] = demand.loc[demand['Item'].isin(items), 'MFG'].sum()
+
+    qty = fixed_opt['Qty'].astype(object)
+    qty[is_all] = [totals.get(pat, 0) for pat in groups]
+    fx['Qty'] = qty
+    return fx.infer_objects()
 
 """1번 제약사항: 라인/시프트별 생산 용량"""
 def get_capacity_constraints(capa_qty: pd.DataFrame) -> pd.DataFrame:
@@ -263,368 +292,50 @@ def extract_error_records(fx: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]
     valid_fx = fx[~mask_error].copy()
     return valid_fx, error_fx
 
-"""1번 제약조건 검사: 요청량(Qty)이 설비용량 합(Capacity)보다 초과하는지 확인"""
+"""1번 제약조건 검사: 요청량(Qty)이 설비용량 합(Capacity)보다 초과하는지 확인 (최대 유량)"""
 def check_capacity_violations(
     fx: pd.DataFrame,
     cap: pd.DataFrame
 ) -> pd.DataFrame:
-    # 요청별로 가능한 모든 (라인, 교대) 조합을 준비합니다.
-    combos = {
-        r: [(ln, sh)
-            for ln in fx.at[r, 'Fixed_Line']
-            for sh in fx.at[r, 'Fixed_Time']]
-        for r in fx.index
-    }
-
-    # 용량 조회를 위한 (라인, 교대) -> 용량 딕셔너리를 만듭니다.
-    cap_dict = cap.set_index(['Line','Shift'])['Capacity'].to_dict()
-
-    # 최적화 문제를 생성하고, 슬랙 최소화를 목표로 설정합니다.
-    prob = pulp.LpProblem("CapacityCheck", pulp.LpMinimize)
-
-    # 각 요청·조합별 할당량 변수와, 요청별 미할당량 슬랙 변수를 선언합니다.
-    x_vars = {
-        (r, ln, sh): pulp.LpVariable(f"x_{r}_{ln}_{sh}", lowBound=0)
-        for r, cmb in combos.items()
-        for ln, sh in cmb
-    }
-    slack = {
-        r: pulp.LpVariable(f"s_req_{r}", lowBound=0)
-        for r in fx.index
-    }
-
-    # 모든 요청의 미할당량 합을 최소화하도록 목적식을 추가합니다.
-    prob += pulp.lpSum(slack[r] for r in fx.index)
-
-    # 각 요청이 요구량만큼 할당되거나 슬랙으로 보완되도록 제약을 설정합니다.
-    for r, cmb in combos.items():
-        prob += (
-            pulp.lpSum(x_vars[(r, ln, sh)] for ln, sh in cmb)
-            + slack[r]
-            == fx.at[r, 'Qty']
-        )
-
-    # 각 설비(라인,교대)에 대한 총 할당량이 용량을 넘지 않도록 제약을 설정합니다.
-    for (ln, sh), cap_val in cap_dict.items():
-        if pd.isna(cap_val):
-            continue
-        prob += (
-            pulp.lpSum(x_vars.get((r, ln, sh), 0) for r in fx.index)
-            <= cap_val
-        )
-
-    # 최적화를 실행합니다.
-    prob.solve(PULP_CBC_CMD(msg=True))
-
-    # 슬랙이 발생한 요청에 대해, 해당 요청의 모든 조합별로 SlackQty를 기록합니다.
-    records = []
-    for r in fx.index:
-        slack_val = slack[r].varValue or 0
-        if slack_val > 1e-6:
-            for ln, sh in combos[r]:
-                records.append({
-                    'Line':     ln,
-                    'Shift':    sh,
-                    'Capacity': cap_dict.get((ln, sh)),
-                    'SlackQty': slack_val
-                })
-
-    return pd.DataFrame(records)
+    return ViolationEngine(fx, cap, pd.DataFrame(), pd.DataFrame()).capacity()
 
 """2번 제약조건 검사: 그룹별 동시 가동 가능한 최대 라인 수(MaxLines)를 초과하는지 확인"""
 def check_max_line_violations(
     fx: pd.DataFrame,
     max_lines: pd.DataFrame
 ) -> pd.DataFrame:
-    # 요청별로 가능한 (그룹접두사, 교대) 조합을 만듭니다.
-    combos = {
-        r: [(ln.split('_')[0], sh)
-            for ln in fx.at[r, 'Fixed_Line']
-            for sh in fx.at[r, 'Fixed_Time']]
-        for r in fx.index
-    }
-
-    # 그룹별·교대별 최대 라인 수 딕셔너리로 변환합니다.
-    ml_dict = max_lines.set_index(['GroupPrefix','Shift'])['MaxLines'].to_dict()
-
-    # 목적함수에 슬랙 최소화를 설정한 최적화 문제를 생성합니다.
-    prob = pulp.LpProblem("MaxLineCheck", pulp.LpMinimize)
-
-    # 조합 선택 변수와 각 (그룹,교대)별 초과 슬랙 변수를 선언합니다.
-    z_vars = {
-        (r, p, sh): pulp.LpVariable(f"z_{r}_{p}_{sh}", cat="Binary")
-        for r, cmb in combos.items()
-        for p, sh in cmb
-    }
-    slack = {
-        (p, sh): pulp.LpVariable(f"s_line_{p}_{sh}", lowBound=0)
-        for (p, sh), max_ln in ml_dict.items()
-        if pd.notna(max_ln)
-    }
-
-    # 모든 슬랙의 합을 최소화하도록 목적식을 설정합니다.
-    prob += pulp.lpSum(slack.values())
-
-    # 각 요청은 반드시 하나의 (그룹,교대) 조합을 선택하도록 제약합니다.
-    for r in fx.index:
-        prob += pulp.lpSum(z_vars[(r, p, sh)] for p, sh in combos[r]) == 1
-
-    # 그룹별 동시 가동 라인 수 제약: 초과 시 슬랙변수로 보완합니다.
-    for (p, sh), max_ln in ml_dict.items():
-        if pd.isna(max_ln):
-            continue
-        prob += (
-            pulp.lpSum(z_vars.get((r, p, sh), 0) for r in fx.index)
-            <= max_ln + slack[(p, sh)]
-        )
-
-    # 최적화를 실행합니다.
-    prob.solve(PULP_CBC_CMD(msg=True))
-
-    # 슬랙이 발생한 (그룹,교대)별로 SlackCount를 기록합니다.
-    records = []
-    for (p, sh), var in slack.items():
-        val = var.varValue or 0
-        if val > 1e-6:
-            records.append({
-                'GroupPrefix': p,
-                'Shift':       sh,
-                'MaxLines':    ml_dict[(p, sh)],
-                'SlackCount':  val
-            })
-
-    return pd.DataFrame(records)
+    return ViolationEngine(fx, pd.DataFrame(), max_lines, pd.DataFrame()).max_line()
 
 """3번 제약조건 검사: 그룹별 최대 생산량(MaxQty)을 초과하는지 확인"""
 def check_max_qty_violations(
     fx: pd.DataFrame,
     max_qtys: pd.DataFrame
 ) -> pd.DataFrame:
-    # 요청별로 가능한 (그룹접두사, 교대) 조합을 생성합니다.
-    combos = {
-        r: [(ln.split('_')[0], sh)
-            for ln in fx.at[r, 'Fixed_Line']
-            for sh in fx.at[r, 'Fixed_Time']]
-        for r in fx.index
-    }
-
-    # 그룹별·교대별 최대 생산량 딕셔너리로 변환합니다.
-    mq_dict = max_qtys.set_index(['GroupPrefix','Shift'])['MaxQty'].to_dict()
-
-    # 슬랙 최소화를 목표로 한 최적화 문제를 생성합니다.
-    prob = pulp.LpProblem("MaxQtyCheck", pulp.LpMinimize)
-
-    # 조합 선택 변수와 초과 슬랙 변수를 선언합니다.
-    z_vars = {
-        (r, p, sh): pulp.LpVariable(f"z_{r}_{p}_{sh}", cat="Binary")
-        for r, cmb in combos.items()
-        for p, sh in cmb
-    }
-    slack = {
-        (p, sh): pulp.LpVariable(f"s_qty_{p}_{sh}", lowBound=0)
-        for (p, sh), max_q in mq_dict.items()
-        if pd.notna(max_q)
-    }
+    return ViolationEngine(fx, pd.DataFrame(), pd.DataFrame(), max_qtys).max_qty()
 
-    # 모든 슬랙의 합을 최소화하도록 목적식을 설정합니다.
-    prob += pulp.lpSum(slack.values())
-
-    # 각 요청은 반드시 하나의 (그룹,교대) 조합을 선택하도록 제약합니다.
-    for r in fx.index:
-        prob += pulp.lpSum(z_vars[(r, p, sh)] for p, sh in combos[r]) == 1
-
-    # 그룹별 최대 생산량 제약: 생산 수량을 곱해 합산하고, 초과 시 슬랙으로 보완합니다.
-    for (p, sh), max_q in mq_dict.items():
-        if pd.isna(max_q):
-            continue
-        prob += (
-            pulp.lpSum(
-                z_vars.get((r, p, sh), 0) * fx.at[r, 'Qty']
-                for r in fx.index
-            )
-            <= max_q + slack[(p, sh)]
-        )
-
-    # 최적화를 실행합니다.
-    prob.solve(PULP_CBC_CMD(msg=True))
-
-    # 슬랙이 발생한 (그룹,교대)별로 SlackQty를 기록합니다.
-    records = []
-    for (p, sh), var in slack.items():
-        val = var.varValue or 0
-        if val > 1e-6:
-            records.append({
-                'GroupPrefix': p,
-                'Shift':       sh,
-                'MaxQty':      mq_dict[(p, sh)],
-                'SlackQty':    val
-            })
-
-    return pd.DataFrame(records)
-
-"""모든 제약조건(Capacity, MaxLine, MaxQty)을 동시에 검사하여 위반 제약을 반환합니다."""
+"""
+모든 제약조건(Capacity, MaxLine, MaxQty)을 검사하여 위반 제약을 반환합니다.
+(검사 내용은 ViolationEngine.combined 참고. 여러 검사를 같이 돌릴 때는 ViolationEngine.run 사용)
+Capa 가 부족한 요청은 할당 가능한 양(요청량 - Capa 부족분)만 MaxLine / MaxQty 검사에 더하므로,
+MaxQty 위반량은 Capacity 위반으로 이미 보고한 부족분만큼 작게 나온다.
+"""
 def check_all_violations(
     fx: pd.DataFrame,
     cap: pd.DataFrame,
     max_lines: pd.DataFrame,
     max_qtys: pd.DataFrame
 ) -> pd.DataFrame:
-    fx['Qty'] = pd.to_numeric(fx['Qty'], errors='coerce').fillna(0)
-    
-    # 가능한 모든 (라인, 교대) 조합을 준비합니다.
-    combos = {
-        r: [(ln, sh)
-            for ln in fx.at[r, 'Fixed_Line']
-            for sh in fx.at[r, 'Fixed_Time']]
-        for r in fx.index
-    }
-
-    # 제약치 조회용 딕셔너리를 생성합니다.
-    cap_dict = cap.set_index(['Line','Shift'])['Capacity'].to_dict()
-    ml_dict  = max_lines.set_index(['GroupPrefix','Shift'])['MaxLines'].to_dict()
-    mq_dict  = max_qtys.set_index(['GroupPrefix','Shift'])['MaxQty'].to_dict()
-
-    # MILP 모델 생성 (모든 슬랙 최소화)
-    prob = pulp.LpProblem("AllConstraintsCheck", pulp.LpMinimize)
-
-    # 분할 할당을 위한 연속 변수 x_vars[(r,ln,sh)] ≥ 0
-    x_vars = {
-        (r, ln, sh): pulp.LpVariable(f"x_{r}_{ln}_{sh}", lowBound=0)
-        for r, cmb in combos.items()
-        for ln, sh in cmb
-    }
-
-    # Capacity 초과 슬랙 변수
-    s_cap = {
-        (ln, sh): pulp.LpVariable(f"s_cap_{ln}_{sh}", lowBound=0)
-        for (ln, sh) in cap_dict
-    }
-    # MaxLine 초과 슬랙 변수 (제약 없는 항목은 제외)
-    s_line = {
-        (p, sh): pulp.LpVariable(f"s_line_{p}_{sh}", lowBound=0)
-        for (p, sh), v in ml_dict.items() if pd.notna(v)
-    }
-    # MaxQty 초과 슬랙 변수 (제약 없는 항목은 제외)
-    s_qty = {
-        (p, sh): pulp.LpVariable(f"s_qty_{p}_{sh}", lowBound=0)
-        for (p, sh), v in mq_dict.items() if pd.notna(v)
-    }
-
-    # MaxLine 활성화를 위한 이진변수 y_vars[(r,ln,sh)] 과 라인·교대별 활성화 z_line[(ln,sh)]
-    M   = fx['Qty'].sum()
-    eps = 1e-6
-    y_vars  = {}
-    z_line  = {}
-    for r, cmb in combos.items():
-        for ln, sh in cmb:
-            # 요청별 활성화 여부
-            y = pulp.LpVariable(f"y_{r}_{ln}_{sh}", cat="Binary")
-            y_vars[(r, ln, sh)] = y
-            # 라인·교대별 활성화 여부
-            if (ln, sh) not in z_line:
-                z_line[(ln, sh)] = pulp.LpVariable(f"z_line_{ln}_{sh}", cat="Binary")
-            # Big-M 연계제약
-            prob += x_vars[(r, ln, sh)] <= M * y
-            prob += x_vars[(r, ln, sh)] >= eps * y
-            # y_vars ≤ z_line (same ln,sh 그룹화)
-            prob += y <= z_line[(ln, sh)]
-
-    # 목적식: Capacity, MaxLine, MaxQty 슬랙만 최소화
-    prob += (
-        pulp.lpSum(s_cap.values()) +
-        pulp.lpSum(s_line.values()) +
-        pulp.lpSum(s_qty.values())
-    )
-
-    # 요청량 제약: 분할 할당 합 == Qty
-    for r, cmb in combos.items():
-        prob += (
-            pulp.lpSum(x_vars[(r, ln, sh)] for ln, sh in cmb)
-            == fx.at[r, 'Qty']
-        )
-
-    # Capacity 제약: 각 (라인,교대)별 할당합 ≤ Capacity + s_cap
-    for (ln, sh), cap_val in cap_dict.items():
-        if pd.isna(cap_val):
-            continue
-        prob += (
-            pulp.lpSum(x_vars.get((r, ln, sh), 0) for r in fx.index)
-            <= cap_val + s_cap[(ln, sh)]
-        )
-
-    # MaxLine 제약: 서로 다른 라인 z_line 합 ≤ MaxLines + s_line
-    for (p, sh), max_ln in ml_dict.items():
-        if pd.isna(max_ln):
-            continue
-        prob += (
-            pulp.lpSum(
-                z_line[(ln, ss)]
-                for (ln, ss) in z_line
-                if ln.split('_')[0] == p and ss == sh
-            )
-            <= max_ln + s_line[(p, sh)]
-        )
-
-    # MaxQty 제약: 할당량 합 ≤ MaxQty + s_qty
-    for (p, sh), max_q in mq_dict.items():
-        if pd.isna(max_q):
-            continue
-        prob += (
-            pulp.lpSum(
-                x_vars.get((r, ln, ss), 0) * fx.at[r, 'Qty']
-                for r in fx.index
-                for ln, ss in combos[r]
-                if ln.split('_')[0] == p and ss == sh
-            )
-            <= max_q + s_qty[(p, sh)]
-        )
-
-    # 최적화 실행
-    prob.solve(PULP_CBC_CMD(msg=True))
-
-    # 발생한 슬랙을 모두 모아 테이블로 반환
-    records = []
-    for (ln, sh), var in s_cap.items():
-        v = var.varValue or 0
-        if v > 1e-6:
-            records.append({
-                'Constraint':   'Capacity',
-                'Line(GroupPrefix)':         ln,
-                'Shift':        sh,
-                'Limit':        cap_dict[(ln, sh)],
-                'ViolationAmt': v
-            })
-    for (p, sh), var in s_line.items():
-        v = var.varValue or 0
-        if v > 1e-6:
-            records.append({
-                'Constraint':   'MaxLine',
-                'Line(GroupPrefix)':  p,
-                'Shift':        sh,
-                'Limit':        ml_dict[(p, sh)],
-                'ViolationAmt': v
-            })
-    for (p, sh), var in s_qty.items():
-        v = var.varValue or 0
-        if v > 1e-6:
-            records.append({
-                'Constraint':   'MaxQty',
-                'Line(GroupPrefix)':  p,
-                'Shift':        sh,
-                'Limit':        mq_dict[(p, sh)],
-                'ViolationAmt': v
-            })
-
-    return pd.DataFrame(records)
+    return ViolationEngine(fx, cap, max_lines, max_qtys).combined()
 
 """전체 할당 실행"""
 def run_allocation() -> PreAssignFailures:
+    telemetry = RunTelemetry('run_allocation')
     # 데이터 로드 및 전처리
     fx, pa, dm, la, cq = load_data()
-    fx = fill_missing_lines(fx, la)
-    fx = fill_missing_times(fx)
-    fx = process_all_qty(fx, dm)
-    fx = expand_pre_assign(fx, pa)
+    fx = prepare_fixed_options(fx, pa, dm, la, shift_columns(cq) or ALL_SHIFTS)
+    telemetry.inputs = {'items': int(dm['Item'].nunique()) if 'Item' in dm.columns else 0,
+                        'lines': len(la.columns) - 1 if not la.empty else 0,
+                        'shifts': len(shift_columns(cq)), 'fixed_rows': len(fx)}
 
     # 결측 에러 분리
     fx, missing_fixed = extract_error_records(fx)
@@ -634,14 +345,15 @@ def run_allocation() -> PreAssignFailures:
     cap = get_capacity_constraints(cq)
     max_lines = get_max_line_constraints(cq)
     max_qtys  = get_max_qty_constraints(cq)
+    telemetry.lap('prep')
 
-    # 개별 검사 함수
-    # bad_cap = check_capacity_violations(fx, cap)
-    # bad_max_line = check_max_line_violations(fx, max_lines)
-    # bad_max_qty = check_max_qty_violations(fx, max_qtys)
-
-    # 통합 검사 함수
-    violations = check_all_violations(fx, cap, max_lines, max_qtys)
+    # 통합 검사 (조합 인덱스 / 제약치는 엔진이 한 번만 만들고, 개별 검사가 필요하면 checks 에 추가)
+    engine = ViolationEngine(fx, cap, max_lines, max_qtys)
+    violations = engine.run(['combined'])['combined']
+    telemetry.lap('solve')
+    report = prescreen_report()
+    print(f"사전 판정: MILP 생략 {report['milp_skipped']}/{report['checks']}회 ({report['skip_rate']:.0f}%), "
+          f"제약 {report['decided']}/{report['constraints']}개 판정 ({report['decided_rate']:.0f}%)")
 
     failures: PreAssignFailures = {
         'preassign': []
@@ -686,4 +398,17 @@ def run_allocation() -> PreAssignFailures:
             record['Reason'] = 'maximum production quantity'
 
         failures['preassign'].append(record)
+
+    # 검사 MILP 들은 모델 이름별로 변수 / 제약 수를 합산
+    for stat in engine.solve_stats:
+        telemetry.variables[stat['model']] = telemetry.variables.get(stat['model'], 0) + stat['variables']
+        telemetry.constraints[stat['model']] = telemetry.constraints.get(stat['model'], 0) + stat['constraints']
+    telemetry.lap('extract')
+    telemetry.write(
+        milp_models=len(engine.solve_stats),
+        milp_statuses=sorted({stat['status'] for stat in engine.solve_stats}),
+        prescreen=report,
+        violations=len(violations),
+        failures=len(failures['preassign']),
+    )
     return failures
\ No newline at end of file
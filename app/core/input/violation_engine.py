@@ -0,0 +1,412 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pulp
+from scipy.sparse import csr_array
+from scipy.sparse.csgraph import connected_components
+
+from app.models.common.settings_store import SettingsStore
+from ..model.solver_backend import get_backend
+from .capacity_flow import capacity_flow, capacity_excess
+from .violation_screen import (VIOLATION_COLUMNS, explode_combos, bound_violations, certain_violations,
+                               record_prescreen)
+
+"""
+사전할당 제약 위반 분석 엔진
+
+Capacity / MaxLine / MaxQty 검사와 통합 검사가 같이 쓰는 입력을 한 번만 만든다.
+- 요청 x (라인, 시프트) 조합 테이블과 요청별 조합 / (그룹, 시프트) 목록
+- 제약치 조회 딕셔너리 (Capacity, MaxLines, MaxQty)
+- Capacity 최대 유량 결과와 MaxLine / MaxQty 사전 판정 결과 (처음 필요할 때 한 번 계산)
+
+검사들은 run() 으로 스레드 풀에서 동시에 실행한다 (CBC 는 별도 프로세스에서 풀리므로 스레드로 충분).
+통합 검사의 MILP 는 Capa 가 있는 (라인, 시프트)나 판정하지 못한 (그룹, 시프트) 제약을 공유하지 않는
+요청 묶음끼리 서로 독립이므로, 묶음별 MILP 로 나눠서 동시에 푼다.
+솔버 로그는 msg=True 일 때만 출력한다 (기본값은 solver_log_ox 설정).
+
+사용 예)
+    engine = ViolationEngine(fx, cap, max_lines, max_qtys)
+    results = engine.run(['capacity', 'max_line', 'max_qty', 'combined'])
+"""
+
+EPS = 1e-6
+
+CHECKS = ('capacity', 'max_line', 'max_qty', 'combined')
+
+
+class ViolationEngine:
+    """
+    Args:
+        fx (DataFrame): 'Fixed_Line'(라인 목록), 'Fixed_Time'(시프트 목록), 'Qty' 컬럼을 가진 요청 테이블
+        cap (DataFrame): ['Line', 'Shift', 'Capacity']
+        max_lines (DataFrame): ['GroupPrefix', 'Shift', 'MaxLines']
+        max_qtys (DataFrame): ['GroupPrefix', 'Shift', 'MaxQty']
+        msg (bool): 솔버 로그 출력 여부. None 이면 solver_log_ox 설정
+        time_limit (int): MILP 1개당 제한 시간(초). None 이면 제한 없음
+        max_workers (int): 동시에 푸는 검사 / MILP 수. None 이면 기본값
+    """
+    def __init__(self, fx, cap, max_lines, max_qtys, msg=None, time_limit=None, max_workers=None):
+        self.fx = fx.copy()
+        self.fx['Qty'] = pd.to_numeric(self.fx['Qty'], errors='coerce').fillna(0)
+        self.cap = cap
+        self.max_lines = max_lines
+        self.max_qtys = max_qtys
+        self.msg = bool(SettingsStore.get('solver_log_ox', 0)) if msg is None else msg
+        self.time_limit = time_limit
+        self.max_workers = max_workers
+
+        # 조합 인덱스: 요청별 (라인, 시프트) 목록 / (그룹, 시프트) 목록 (요청 안의 중복 조합은 제거)
+        self.combos = explode_combos(self.fx)
+        self.cells = {r: list(zip(g['Line'], g['Shift'])) for r, g in self.combos.groupby('Request', sort=False)}
+        groups = self.combos.drop_duplicates(['Request', 'Prefix', 'Shift'])
+        self.groups = {r: list(zip(g['Prefix'], g['Shift'])) for r, g in groups.groupby('Request', sort=False)}
+        for r in self.fx.index:
+            self.cells.setdefault(r, [])
+            self.groups.setdefault(r, [])
+
+        # 제약치 조회용 딕셔너리
+        self.cap_dict = cap.set_index(['Line', 'Shift'])['Capacity'].to_dict() if not cap.empty else {}
+        self.ml_dict = max_lines.set_index(['GroupPrefix', 'Shift'])['MaxLines'].to_dict() if not max_lines.empty else {}
+        self.mq_dict = max_qtys.set_index(['GroupPrefix', 'Shift'])['MaxQty'].to_dict() if not max_qtys.empty else {}
+
+        self._flow = None
+        self._bounds = None
+        # 풀이한 MILP 별 크기 / 풀이 시간 / 상태 (실행 기록용)
+        self.solve_stats = []
+
+    """
+    Capacity 최대 유량 결과 (처음 한 번만 계산)
+    """
+    @property
+    def flow(self):
+        if self._flow is None:
+            self._flow = capacity_flow(self.fx, self.cap)
+        return self._flow
+
+    @property
+    def shortfalls(self):
+        return self.flow['shortfalls']
+
+    @property
+    def assignable(self):
+        return self.fx['Qty'] - self.shortfalls
+
+    """
+    MaxLine / MaxQty 위반량 하한/상한 사전 판정 결과 (처음 한 번만 계산)
+    """
+    @property
+    def bounds(self):
+        if self._bounds is None:
+            self._bounds = bound_violations(self.fx, self.assignable, self.max_lines, self.max_qtys, combos=self.combos)
+        return self._bounds
+
+    def _solve(self, prob):
+        started = time.time()
+        get_backend().solve(prob, time_limit=self.time_limit, msg=self.msg)
+        self.solve_stats.append({
+            'model': prob.name,
+            'variables': prob.numVariables(),
+            'constraints': prob.numConstraints(),
+            'solve_time': time.time() - started,
+            'status': pulp.LpStatus[prob.status],
+        })
+
+    """
+    검사 여러 개를 동시에 실행
+
+    Args:
+        checks (list): CHECKS 중 실행할 검사 이름
+
+    Returns:
+        dict: {검사 이름: 위반 테이블 DataFrame}
+    """
+    def run(self, checks=CHECKS):
+        unknown = set(checks) - set(CHECKS)
+        if unknown:
+            raise ValueError(f"알 수 없는 검사입니다: {sorted(unknown)}")
+        # 공유 입력은 스레드를 띄우기 전에 한 번만 계산
+        self.flow
+        if 'combined' in checks:
+            self.bounds
+        if len(checks) == 1:
+            return {checks[0]: getattr(self, checks[0])()}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {name: executor.submit(getattr(self, name)) for name in checks}
+            return {name: future.result() for name, future in futures.items()}
+
+    """
+    1번 제약조건 검사: 요청량(Qty)이 설비용량 합(Capacity)보다 초과하는지 확인 (최대 유량)
+    미할당량이 있는 요청에 대해, 해당 요청의 모든 조합별로 SlackQty 를 기록합니다.
+    """
+    def capacity(self):
+        shortfalls = self.shortfalls
+        records = []
+        for r, slack_val in shortfalls[shortfalls > EPS].items():
+            for ln in self.fx.at[r, 'Fixed_Line']:
+                for sh in self.fx.at[r, 'Fixed_Time']:
+                    records.append({
+                        'Line':     ln,
+                        'Shift':    sh,
+                        'Capacity': self.cap_dict.get((ln, sh)),
+                        'SlackQty': slack_val
+                    })
+        return pd.DataFrame(records)
+
+    """
+    요청마다 (그룹, 시프트) 하나를 고르는 모델 (max_line / max_qty 검사 공통)
+
+    Args:
+        name (str): 모델 이름
+        slack_prefix (str): 슬랙 변수 이름 접두어
+        limits (dict): {(그룹, 시프트): 한계치}
+        weight (callable): weight(r) -> 요청 r 이 그룹에 더하는 양
+
+    Returns:
+        tuple: (모델, {(그룹, 시프트): 초과 슬랙 변수})
+    """
+    def _group_choice_model(self, name, slack_prefix, limits, weight):
+        prob = pulp.LpProblem(name, pulp.LpMinimize)
+
+        # 조합 선택 변수와 각 (그룹,교대)별 초과 슬랙 변수를 선언합니다.
+        z_vars = {
+            (r, p, sh): pulp.LpVariable(f"z_{r}_{p}_{sh}", cat="Binary")
+            for r, grp in self.groups.items()
+            for p, sh in grp
+        }
+        slack = {
+            (p, sh): pulp.LpVariable(f"{slack_prefix}_{p}_{sh}", lowBound=0)
+            for (p, sh), limit in limits.items()
+            if pd.notna(limit)
+        }
+
+        # 모든 슬랙의 합을 최소화하도록 목적식을 설정합니다.
+        prob += pulp.lpSum(slack.values())
+
+        # 각 요청은 반드시 하나의 (그룹,교대) 조합을 선택하도록 제약합니다.
+        # 같은 제조동의 라인 여러 개가 한 시프트에 있어도 (그룹,교대) 조합은 한 번만 더함 (두 번 더하면 2z == 1 로 정수해가 없음)
+        for r, grp in self.groups.items():
+            if grp:
+                prob += pulp.lpSum(z_vars[(r, p, sh)] for p, sh in grp) == 1
+
+        # 그룹별 제약: 초과 시 슬랙변수로 보완합니다.
+        members = {}
+        for r, p, sh in z_vars:
+            members.setdefault((p, sh), []).append(r)
+        for (p, sh), var in slack.items():
+            prob += (
+                pulp.lpSum(z_vars[(r, p, sh)] * weight(r) for r in members.get((p, sh), []))
+                <= limits[(p, sh)] + var
+            )
+        return prob, slack
+
+    """
+    2번 제약조건 검사: 그룹별 동시 가동 가능한 최대 라인 수(MaxLines)를 초과하는지 확인
+    """
+    def max_line(self):
+        prob, slack = self._group_choice_model("MaxLineCheck", "s_line", self.ml_dict, lambda r: 1)
+        self._solve(prob)
+
+        records = []
+        for (p, sh), var in slack.items():
+            val = var.varValue or 0
+            if val > EPS:
+                records.append({
+                    'GroupPrefix': p,
+                    'Shift':       sh,
+                    'MaxLines':    self.ml_dict[(p, sh)],
+                    'SlackCount':  val
+                })
+        return pd.DataFrame(records)
+
+    """
+    3번 제약조건 검사: 그룹별 최대 생산량(MaxQty)을 초과하는지 확인
+    """
+    def max_qty(self):
+        qty = self.fx['Qty']
+        prob, slack = self._group_choice_model("MaxQtyCheck", "s_qty", self.mq_dict, lambda r: qty[r])
+        self._solve(prob)
+
+        records = []
+        for (p, sh), var in slack.items():
+            val = var.varValue or 0
+            if val > EPS:
+                records.append({
+                    'GroupPrefix': p,
+                    'Shift':       sh,
+                    'MaxQty':      self.mq_dict[(p, sh)],
+                    'SlackQty':    val
+                })
+        return pd.DataFrame(records)
+
+    """
+    통합 MILP 를 서로 독립인 요청 묶음으로 나눔
+
+    Capa 가 있는 (라인, 시프트)나 판정하지 못한 (그룹, 시프트) 제약을 같이 쓰는 요청끼리 한 묶음이다.
+    판정하지 못한 제약이 없는 묶음은 MILP 가 필요 없으므로 제외한다.
+
+    Returns:
+        list: [(요청 목록, {(그룹, 시프트) MaxLine 한계}, {(그룹, 시프트) MaxQty 한계}), ...]
+    """
+    def _components(self, ml_dict, mq_dict):
+        combos = self.combos
+        capacity = combos.join(self.cap.set_index(['Line', 'Shift'])['Capacity'], on=['Line', 'Shift'])['Capacity'] \
+            if not self.cap.empty else pd.Series(np.nan, index=combos.index)
+        limited = capacity.notna().to_numpy()
+        undecided = set(ml_dict) | set(mq_dict)
+        in_undecided = np.array([key in undecided for key in zip(combos['Prefix'], combos['Shift'])], dtype=bool)
+
+        # 요청 - 공유 키(Capa 조합, 미판정 그룹) 이분 그래프의 연결 요소
+        shift = combos['Shift'].astype(str)
+        edge_keys = pd.concat([('C|' + combos['Line'].astype(str) + '|' + shift)[limited],
+                               ('G|' + combos['Prefix'] + '|' + shift)[in_undecided]])
+        edge_requests = pd.concat([combos.loc[limited, 'Request'], combos.loc[in_undecided, 'Request']])
+        requests = pd.Index(self.fx.index)
+        keys = pd.Index(edge_keys.unique())
+        n = len(requests) + len(keys)
+        graph = csr_array((np.ones(len(edge_keys)),
+                           (requests.get_indexer(edge_requests), len(requests) + keys.get_indexer(edge_keys))), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+
+        components = []
+        for label, members in pd.Series(requests, index=labels[:len(requests)]).groupby(level=0):
+            member_groups = {group for r in members for group in self.groups[r]}
+            comp_ml = {k: v for k, v in ml_dict.items() if k in member_groups}
+            comp_mq = {k: v for k, v in mq_dict.items() if k in member_groups}
+            if comp_ml or comp_mq:
+                components.append((list(members), comp_ml, comp_mq))
+        return components
+
+    """
+    요청 묶음 하나의 MaxLine / MaxQty 최소 슬랙 MILP
+
+    Returns:
+        list: 위반 레코드
+    """
+    def _combined_component(self, requests, ml_dict, mq_dict):
+        fx = self.fx
+        assignable = self.assignable
+        cells = {r: self.cells[r] for r in requests}
+        cap_dict = {cell: self.cap_dict[cell] for cell in {c for cmb in cells.values() for c in cmb}
+                    if pd.notna(self.cap_dict.get(cell))}
+
+        # MILP 모델 생성 (모든 슬랙 최소화)
+        prob = pulp.LpProblem("AllConstraintsCheck", pulp.LpMinimize)
+
+        # 분할 할당을 위한 연속 변수 x_vars[(r,ln,sh)] ≥ 0
+        x_vars = {
+            (r, ln, sh): pulp.LpVariable(f"x_{r}_{ln}_{sh}", lowBound=0)
+            for r, cmb in cells.items()
+            for ln, sh in cmb
+        }
+
+        # MaxLine / MaxQty 초과 슬랙 변수
+        s_line = {(p, sh): pulp.LpVariable(f"s_line_{p}_{sh}", lowBound=0) for (p, sh) in ml_dict}
+        s_qty = {(p, sh): pulp.LpVariable(f"s_qty_{p}_{sh}", lowBound=0) for (p, sh) in mq_dict}
+
+        # MaxLine 활성화를 위한 이진변수 y_vars[(r,ln,sh)] 과 라인·교대별 활성화 z_line[(ln,sh)]
+        M   = fx['Qty'].sum()
+        eps = 1e-6
+        z_line = {}
+        for r, cmb in cells.items():
+            for ln, sh in cmb:
+                # 판정하지 못한 MaxLine 제약에 걸린 조합만 활성화 변수가 필요
+                if (ln.split('_')[0], sh) not in ml_dict:
+                    continue
+                # 요청별 활성화 여부
+                y = pulp.LpVariable(f"y_{r}_{ln}_{sh}", cat="Binary")
+                # 라인·교대별 활성화 여부
+                if (ln, sh) not in z_line:
+                    z_line[(ln, sh)] = pulp.LpVariable(f"z_line_{ln}_{sh}", cat="Binary")
+                # Big-M 연계제약
+                prob += x_vars[(r, ln, sh)] <= M * y
+                prob += x_vars[(r, ln, sh)] >= eps * y
+                # y_vars ≤ z_line (same ln,sh 그룹화)
+                prob += y <= z_line[(ln, sh)]
+
+        # 목적식: MaxLine, MaxQty 슬랙만 최소화
+        prob += pulp.lpSum(s_line.values()) + pulp.lpSum(s_qty.values())
+
+        # 요청량 제약: 분할 할당 합 == Capa 에 담을 수 있는 수량 (최대 유량 결과)
+        for r, cmb in cells.items():
+            prob += pulp.lpSum(x_vars[(r, ln, sh)] for ln, sh in cmb) == assignable[r]
+
+        # Capacity 제약: 각 (라인,교대)별 할당합 ≤ Capacity (부족량을 뺐으므로 항상 만족 가능)
+        by_cell, by_group = {}, {}
+        for (r, ln, sh), var in x_vars.items():
+            by_cell.setdefault((ln, sh), []).append(var)
+            by_group.setdefault((ln.split('_')[0], sh), []).append(var * fx.at[r, 'Qty'])
+        for cell, cap_val in cap_dict.items():
+            prob += pulp.lpSum(by_cell.get(cell, [])) <= cap_val
+
+        # MaxLine 제약: 서로 다른 라인 z_line 합 ≤ MaxLines + s_line
+        lines_by_group = {}
+        for (ln, sh), z in z_line.items():
+            lines_by_group.setdefault((ln.split('_')[0], sh), []).append(z)
+        for (p, sh), max_ln in ml_dict.items():
+            prob += pulp.lpSum(lines_by_group.get((p, sh), [])) <= max_ln + s_line[(p, sh)]
+
+        # MaxQty 제약: 할당량 합 ≤ MaxQty + s_qty
+        for (p, sh), max_q in mq_dict.items():
+            prob += pulp.lpSum(by_group.get((p, sh), [])) <= max_q + s_qty[(p, sh)]
+
+        # 최적화 실행
+        self._solve(prob)
+
+        records = []
+        for constraint, slacks, limits in (('MaxLine', s_line, ml_dict), ('MaxQty', s_qty, mq_dict)):
+            for (p, sh), var in slacks.items():
+                v = var.varValue or 0
+                if v > EPS:
+                    records.append({
+                        'Constraint':   constraint,
+                        'Line(GroupPrefix)':  p,
+                        'Shift':        sh,
+                        'Limit':        limits[(p, sh)],
+                        'ViolationAmt': v
+                    })
+        return records
+
+    """
+    모든 제약조건(Capacity, MaxLine, MaxQty)을 검사하여 위반 제약을 반환합니다.
+    Capacity 는 최대 유량으로 먼저 확인하고, Capa 에 담을 수 있는 만큼만 배정한 상태에서
+    MaxLine / MaxQty 는 위반량 하한/상한으로 먼저 판정(violation_screen)한 뒤
+    판정하지 못한 제약만 독립 요청 묶음별 MILP 슬랙으로 확인합니다. 모든 제약이 판정되면 MILP 를 풀지 않습니다.
+    """
+    def combined(self):
+        started = time.time()
+        bounds = self.bounds
+        certain = certain_violations(bounds)
+        if not certain.empty:
+            print(f"사전 판정 확실한 위반 {len(certain)}건: {certain[['Constraint', 'Line(GroupPrefix)', 'Shift']].values.tolist()}")
+        decided = bounds[bounds['Decided']]
+        undecided = bounds[~bounds['Decided']]
+        ml_dict = {(p, sh): self.ml_dict[(p, sh)] for p, sh in undecided.loc[undecided['Constraint'] == 'MaxLine', ['Prefix', 'Shift']].itertuples(index=False)}
+        mq_dict = {(p, sh): self.mq_dict[(p, sh)] for p, sh in undecided.loc[undecided['Constraint'] == 'MaxQty', ['Prefix', 'Shift']].itertuples(index=False)}
+
+        records = []
+        for (ln, sh), v in capacity_excess(self.fx, self.cap, self.shortfalls).items():
+            if v > EPS:
+                records.append({
+                    'Constraint':   'Capacity',
+                    'Line(GroupPrefix)':         ln,
+                    'Shift':        sh,
+                    'Limit':        self.cap_dict[(ln, sh)],
+                    'ViolationAmt': v
+                })
+        records.extend(certain_violations(decided).to_dict('records'))
+
+        record_prescreen(bounds, milp_skipped=undecided.empty)
+        if undecided.empty:
+            return pd.DataFrame(records, columns=VIOLATION_COLUMNS)
+
+        # 독립 요청 묶음별 MILP 를 동시에 풀이
+        components = self._components(ml_dict, mq_dict)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._combined_component, *component) for component in components]
+            for future in futures:
+                records.extend(future.result())
+        print(f"통합 검사 MILP {len(components)}개 ({len(ml_dict) + len(mq_dict)}개 제약, {time.time() - started:.1f}초)")
+
+        return pd.DataFrame(records, columns=VIOLATION_COLUMNS)
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+"""
+사전할당 MaxLine / MaxQty 위반 사전 판정 (MILP 전 단계)
+
+check_all_violations 의 MILP 는 이진 변수(y, z)와 big-M 으로 요청을 (라인, 시프트)에 나눠 담아서
+MaxLine / MaxQty 초과 슬랙의 최소 합을 구한다. 많은 경우 MILP 없이도 제약마다 위반량의 하한/상한을 바로 알 수 있다.
+(Capacity 는 최대 유량(capacity_flow)으로 이미 정확히 판정하고, 여기서는 Capa 에 담을 수 있는 수량 assignable 을 기준으로 본다)
+
+- 하한: 선택지가 (라인, 시프트) 하나뿐인 요청은 반드시 그 라인을 가동 -> 강제 라인 수 / 강제 수량
+- 상한: 해당 (그룹, 시프트)에 배정될 수 있는 모든 요청이 다 들어온 경우 -> 가능한 라인 수 / 가능한 수량
+- 하한 > 한계치이면 확실한 위반 (위반량은 최소 하한 - 한계치)
+- 하한 == 상한이면 어떤 배정이든 위반량이 같으므로 판정 완료 (상한 <= 한계치인 위반 불가 제약 포함)
+모든 제약이 판정 완료이면 MILP 를 건너뛰고, 아니면 판정하지 못한 제약만 MILP 로 확인한다.
+판정 완료 제약은 어떤 배정에서도 값이 같으므로 MILP 에서 빼도 나머지 제약의 최소 슬랙은 변하지 않는다.
+"""
+
+EPS = 1e-6
+
+VIOLATION_COLUMNS = ['Constraint', 'Line(GroupPrefix)', 'Shift', 'Limit', 'ViolationAmt']
+
+# 사전 판정 누적 통계 (프로그램 실행 동안)
+PRESCREEN_STATS = {'checks': 0, 'milp_skipped': 0, 'constraints': 0, 'decided': 0}
+
+
+"""
+요청 x (라인, 시프트) 조합 테이블 ['Request', 'Line', 'Shift', 'Prefix'] (요청 안의 중복 조합은 제거)
+"""
+def explode_combos(fx: pd.DataFrame) -> pd.DataFrame:
+    combos = pd.DataFrame({'Request': fx.index, 'Line': fx['Fixed_Line'].to_numpy(), 'Shift': fx['Fixed_Time'].to_numpy()})
+    combos = combos.explode('Line').explode('Shift').dropna(subset=['Line', 'Shift']).drop_duplicates()
+    combos['Shift'] = pd.to_numeric(combos['Shift'])
+    combos['Prefix'] = combos['Line'].astype(str).str.split('_').str[0]
+    return combos.reset_index(drop=True)
+
+
+"""
+제약 한계치 테이블을 (그룹, 시프트) 인덱스 Series 로 (한계치가 없는 항목은 제외)
+"""
+def _limits(table: pd.DataFrame, column: str) -> pd.Series:
+    if table.empty:
+        return pd.Series(dtype=float, index=pd.MultiIndex.from_tuples([], names=['Prefix', 'Shift']))
+    limits = table.dropna(subset=[column]).set_index(['GroupPrefix', 'Shift'])[column].astype(float)
+    limits.index = limits.index.set_names(['Prefix', 'Shift'])
+    return limits[~limits.index.duplicated(keep='last')]
+
+
+"""
+MaxLine / MaxQty 제약별 위반량 하한/상한 계산
+
+Args:
+    fx (DataFrame): 'Fixed_Line', 'Fixed_Time', 'Qty' 컬럼을 가진 요청 테이블
+    assignable (Series): 요청별 Capa 에 담을 수 있는 수량 (Qty - 최대 유량 부족량)
+    max_lines (DataFrame): ['GroupPrefix', 'Shift', 'MaxLines']
+    max_qtys (DataFrame): ['GroupPrefix', 'Shift', 'MaxQty']
+    combos (DataFrame): explode_combos 결과. 없으면 새로 만듦
+
+Returns:
+    DataFrame: ['Constraint', 'Prefix', 'Shift', 'Limit', 'Lower', 'Upper', 'Decided']
+        Lower / Upper 는 위반량(한계치 초과분)의 하한/상한
+"""
+def bound_violations(fx, assignable, max_lines, max_qtys, combos=None) -> pd.DataFrame:
+    if combos is None:
+        combos = explode_combos(fx)
+    qty = pd.to_numeric(fx['Qty'], errors='coerce').fillna(0)
+
+    # Capa 에 담을 수량이 없는 요청은 배정하지 않아도 되므로 제외
+    active = combos[combos['Request'].map(assignable).to_numpy() > EPS]
+    cells_per_request = active.groupby('Request')['Line'].transform('size').to_numpy()
+    forced = active[cells_per_request == 1]
+    group_key = active['Prefix'] + '|' + active['Shift'].astype(str)
+    groups_per_request = group_key.groupby(active['Request']).transform('nunique').to_numpy()
+    group_forced = active[groups_per_request == 1]
+
+    # MaxLine: 서로 다른 가동 라인 수
+    line_limits = _limits(max_lines, 'MaxLines')
+    possible_lines = active.drop_duplicates(['Prefix', 'Shift', 'Line']).groupby(['Prefix', 'Shift']).size()
+    forced_lines = forced.drop_duplicates(['Prefix', 'Shift', 'Line']).groupby(['Prefix', 'Shift']).size()
+    line_bounds = pd.DataFrame({
+        'Limit': line_limits,
+        'Low': forced_lines.reindex(line_limits.index, fill_value=0).to_numpy(dtype=float),
+        'High': possible_lines.reindex(line_limits.index, fill_value=0).to_numpy(dtype=float),
+    }, index=line_limits.index)
+
+    # MaxQty: 배정량 x 요청량 합 (check_all_violations 의 MaxQty 제약식과 같은 계수)
+    weight = (assignable * qty).rename('Weight')
+    qty_limits = _limits(max_qtys, 'MaxQty')
+    possible_qty = active.drop_duplicates(['Request', 'Prefix', 'Shift']).join(weight, on='Request').groupby(['Prefix', 'Shift'])['Weight'].sum()
+    forced_qty = group_forced.drop_duplicates('Request').join(weight, on='Request').groupby(['Prefix', 'Shift'])['Weight'].sum()
+    qty_bounds = pd.DataFrame({
+        'Limit': qty_limits,
+        'Low': forced_qty.reindex(qty_limits.index, fill_value=0).to_numpy(dtype=float),
+        'High': possible_qty.reindex(qty_limits.index, fill_value=0).to_numpy(dtype=float),
+    }, index=qty_limits.index)
+
+    bounds = pd.concat([line_bounds.assign(Constraint='MaxLine'), qty_bounds.assign(Constraint='MaxQty')])
+    limit = bounds['Limit'].to_numpy(dtype=float)
+    lower = np.maximum(bounds['Low'].to_numpy(dtype=float) - limit, 0)
+    upper = np.maximum(bounds['High'].to_numpy(dtype=float) - limit, 0)
+    return pd.DataFrame({
+        'Constraint': bounds['Constraint'].to_numpy(),
+        'Prefix': bounds.index.get_level_values('Prefix'),
+        'Shift': bounds.index.get_level_values('Shift'),
+        'Limit': limit,
+        'Lower': lower,
+        'Upper': upper,
+        'Decided': np.abs(upper - lower) <= EPS,
+    })
+
+
+"""
+사전 판정 결과를 위반 테이블 형식으로 (하한이 0 보다 큰 제약 = 확실한 위반)
+"""
+def certain_violations(bounds: pd.DataFrame) -> pd.DataFrame:
+    certain = bounds[bounds['Lower'] > EPS]
+    return pd.DataFrame({
+        'Constraint': certain['Constraint'].to_numpy(),
+        'Line(GroupPrefix)': certain['Prefix'].to_numpy(),
+        'Shift': certain['Shift'].to_numpy(),
+        'Limit': certain['Limit'].to_numpy(),
+        'ViolationAmt': certain['Lower'].to_numpy(),
+    }, columns=VIOLATION_COLUMNS)
+
+
+"""
+사전 판정 통계 누적 (check_all_violations 1회마다 호출)
+"""
+def record_prescreen(bounds: pd.DataFrame, milp_skipped: bool):
+    PRESCREEN_STATS['checks'] += 1
+    PRESCREEN_STATS['milp_skipped'] += int(milp_skipped)
+    PRESCREEN_STATS['constraints'] += len(bounds)
+    PRESCREEN_STATS['decided'] += int(bounds['Decided'].sum())
+
+
+"""
+사전 판정 통계 보고
+
+Returns:
+    dict: {'checks': 검사 횟수, 'milp_skipped': MILP 생략 횟수, 'skip_rate': MILP 생략 비율(%),
+           'constraints': 판정한 제약 수, 'decided': 사전 판정으로 끝난 제약 수, 'decided_rate': 비율(%)}
+"""
+def prescreen_report() -> dict:
+    stats = dict(PRESCREEN_STATS)
+    stats['skip_rate'] = stats['milp_skipped'] / stats['checks'] * 100 if stats['checks'] else 0.0
+    stats['decided_rate'] = stats['decided'] / stats['constraints'] * 100 if stats['constraints'] else 0.0
+    return stats
@@ -0,0 +1,392 @@
+import os
+import io
+import time
+import signal
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import pulp
+
+from app.models.common.project_grouping import ProjectGroupManager
+from app.models.common.settings_store import SettingsStore
+from .solve_job import SolveJob, cancel_on_terminate
+
+"""
+프로젝트 그룹 분해 최적화
+
+라인을 공유하지 않는 프로젝트 그룹끼리는 아이템 수요 / 라인 capa 제약이 서로 독립이고,
+제조동 단위 제약(물량 비중, Max_line, Max_qty)으로만 묶여 있다.
+- Max_line / Max_qty 는 그룹별 라인 capa 비율로 미리 나눠서 각 그룹 모델에 넣고
+- 그룹별 생산계획(execute)은 프로세스 풀에서 동시에 풀고
+- 물량 비중은 합친 결과에서 확인해서 어긋나면 생산량을 줄이는 작은 보정(repair) 모델로 맞춘다
+"""
+
+"""
+서로 라인을 공유하지 않는 프로젝트 그룹 목록
+
+ProjectGroupManager 의 그룹은 라인을 공유하는 프로젝트끼리 묶지만 그룹 사이에 공유 라인이 남을 수 있으므로,
+라인을 공유하는 그룹은 하나로 합친다.
+
+Args:
+    line_available (DataFrame): line_available 시트
+
+Returns:
+    list: [(프로젝트 목록, 라인 목록), ...]
+"""
+def independent_project_groups(line_available):
+    groups = ProjectGroupManager.create_project_groups(line_available)
+
+    merged = []
+    for projects in groups.values():
+        projects = set(projects)
+        lines = ProjectGroupManager.get_group_lines(projects, line_available)
+        # 라인이 겹치는 기존 그룹을 모두 흡수
+        for other in [g for g in merged if g[1] & lines]:
+            merged.remove(other)
+            projects |= other[0]
+            lines |= other[1]
+        merged.append((projects, lines))
+
+    return [(sorted(projects), sorted(lines)) for projects, lines in merged if lines]
+
+
+"""
+total 을 weights 비율로 정수 분배 (각 몫은 minimums 이상, 나머지는 소수점이 큰 순서로 1씩)
+"""
+def _split_budget(total, weights, minimums):
+    base = [int(m) for m in minimums]
+    remain = max(0, int(total) - sum(base))
+    weight_sum = sum(weights)
+    if weight_sum <= 0:
+        return base
+
+    shares = [remain * w / weight_sum for w in weights]
+    budget = [b + int(share) for b, share in zip(base, shares)]
+    leftover = remain - sum(int(share) for share in shares)
+    for i in sorted(range(len(shares)), key=lambda i: shares[i] - int(shares[i]), reverse=True)[:leftover]:
+        budget[i] += 1
+    return budget
+
+
+"""
+그룹 하나의 생산계획 풀이 (프로세스 풀 작업 함수)
+"""
+def _solve_group(task):
+    from app.core.optimization import Optimization
+
+    # 작업 취소로 이 프로세스가 종료될 때 CBC 자식 프로세스도 함께 멈추도록 함
+    with cancel_on_terminate(SolveJob(task['name'])) as job:
+        optimization = Optimization(task['input'], solver_backend=task['backend'], solve_job=job)
+        optimization.df_pre_result = task['pre_result']
+        # 그룹마다 찍는 모델 로그가 섞이지 않도록 숨김
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = optimization.execute(time_limit=task['time_limit'], warm_start=task['warm_start'])
+    return task['name'], result['result'], result.get('solve_info')
+
+
+"""
+프로세스 풀 작업자 초기화: 작업자 PID 를 부모 프로세스에 알리고, 원래 initializer 가 있으면 이어서 실행
+"""
+def _report_worker_pid(queue, initializer=None, initargs=()):
+    queue.put(os.getpid())
+    if initializer is not None:
+        initializer(*initargs)
+
+
+"""
+프로세스 풀 작업자 목록 (작업을 취소하면 작업자를 종료하기 위함)
+
+ProcessPoolExecutor 는 실행 중인 작업을 멈추는 API 도, 작업자 프로세스를 돌려주는 API 도 없으므로
+작업자가 시작할 때 initializer 로 알려 준 PID 를 모아 두고 종료 신호(SIGTERM)를 보낸다.
+작업자는 cancel_on_terminate 로 SIGTERM 을 받으면 자기 솔버 프로세스도 함께 멈춘다.
+"""
+class PoolWorkers:
+    def __init__(self, context):
+        self.queue = context.SimpleQueue()
+        self.pids = set()
+
+    """ProcessPoolExecutor 인자 (initializer, initargs). 작업자마다 따로 할 초기화가 있으면 initializer 로 넘김"""
+    def executor_kwargs(self, initializer=None, initargs=()):
+        return {'initializer': _report_worker_pid, 'initargs': (self.queue, initializer, initargs)}
+
+    def terminate(self):
+        while not self.queue.empty():
+            self.pids.add(self.queue.get())
+        for pid in self.pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                # 이미 종료된 작업자
+                pass
+
+
+"""
+1차 그룹 풀이 결과로 Max_qty / Max_line 예산 재분배
+
+각 (제조동, 시프트) 에서 예산을 다 쓴 그룹에 다른 그룹이 남긴 예산을 capa 비율로 나눠 주고,
+남긴 그룹의 예산은 실제 사용량으로 줄인다. (합계는 원래 예산과 같으므로 합친 결과는 계속 제약을 만족)
+
+Returns:
+    list: 예산이 늘어나서 다시 풀어야 하는 그룹 인덱스
+"""
+def rebalance_budgets(budgets, group_frames, groups):
+    rerun = set()
+    for key in budgets[0]:
+        b, s = key
+        used_qty, used_lines, capa = [], [], []
+        for (projects, lines), df in zip(groups, group_frames):
+            rows = df[df['Line'].str.startswith(b) & (df['Time'] == s)] if not df.empty else df
+            used_qty.append(int(rows['Qty'].sum()) if not rows.empty else 0)
+            used_lines.append(rows['Line'].nunique() if not rows.empty else 0)
+            capa.append(sum(1 for l in lines if l.startswith(b)))
+
+        for pos, used in [(0, used_qty), (1, used_lines)]:
+            budget = [budgets[i][key][pos] for i in range(len(groups))]
+            if budget[0] is None:
+                continue
+            binding = [i for i in range(len(groups)) if used[i] >= budget[i] and capa[i] > 0]
+            slack = sum(budget[i] - used[i] for i in range(len(groups)) if i not in binding)
+            if not binding or slack <= 0:
+                continue
+
+            extra = _split_budget(slack, [capa[i] for i in binding], [0] * len(binding))
+            for i in range(len(groups)):
+                new = budget[i] + extra[binding.index(i)] if i in binding else used[i]
+                values = list(budgets[i][key])
+                values[pos] = new
+                budgets[i][key] = tuple(values)
+                if i in binding and new > budget[i]:
+                    rerun.add(i)
+    return sorted(rerun)
+
+
+"""
+합친 결과가 제조동 물량 비중(capa_portion)을 벗어나면, 각 행의 생산량을 줄이는 것만 허용하는 모델로 보정
+(생산량을 줄이면 수요 / capa / Max_line / Max_qty 는 계속 만족하므로 비중 제약만 다시 맞추면 된다)
+"""
+def repair_portion(df_result, df_pinned, df_capa_portion, time_limit=None, backend=None, job=None):
+    from app.core.optimization import solve_model
+
+    key_columns = ['Item', 'Line', 'Time']
+    qty = df_result.groupby(key_columns)['Qty'].sum()
+    pinned = df_pinned.groupby(key_columns)['Qty'].sum().to_dict() if df_pinned is not None and not df_pinned.empty else {}
+
+    keep = {
+        key: pulp.LpVariable(f"keep_{i}", lowBound=min(pinned.get(key, 0), q), upBound=q, cat='Integer')
+        for i, (key, q) in enumerate(qty.items())
+    }
+    model = pulp.LpProblem("Portion_Repair", pulp.LpMaximize)
+    total = pulp.LpAffineExpression([(var, 1) for var in keep.values()])
+    model += total
+    for (ids, row) in df_capa_portion.iterrows():
+        building = pulp.LpAffineExpression([(var, 1) for (m, l, s), var in keep.items() if l.startswith(row['name'])])
+        model += row['upper_limit'] * total >= building
+        model += building >= row['lower_limit'] * total
+
+    solve_info = solve_model(model, time_limit, backend, job=job)
+    if not solve_info['has_solution']:
+        return None, solve_info
+
+    df = df_result.drop_duplicates(key_columns).set_index(key_columns)
+    df['Qty'] = [int(round(keep[key].varValue)) for key in df.index]
+    df = df[df['Qty'] > 0].reset_index()
+    return df[df_result.columns], solve_info
+
+
+"""
+합친 결과의 제조동 물량 비중 위반 여부
+"""
+def portion_violated(df_result, df_capa_portion, tol=1e-6):
+    total = df_result['Qty'].sum()
+    if total <= 0:
+        return False
+    for (ids, row) in df_capa_portion.iterrows():
+        share = df_result.loc[df_result['Line'].str.startswith(row['name']), 'Qty'].sum() / total
+        if share < row['lower_limit'] - tol or share > row['upper_limit'] + tol:
+            return True
+    return False
+
+
+"""
+Optimization.execute 를 프로젝트 그룹별로 나눠서 병렬로 풀이
+
+Args:
+    optimization (Optimization): 입력 데이터와 사전할당 결과(df_pre_result)를 가진 객체
+    time_limit (int): 전체 솔버 제한 시간(초). 그룹 풀이 / 재풀이 / 보정 / 대체 풀이가 모두 남은 시간을 나눠 씀
+    max_workers (int): 프로세스 수. None 이면 min(그룹 수, CPU 수)
+
+Returns:
+    dict: execute 와 같은 형태. solve_info 에 그룹별 / 보정 단계 메타데이터 포함
+"""
+def execute_decomposed(optimization, time_limit=None, max_workers=None):
+    start = time.time()
+    groups = independent_project_groups(optimization.df_line_available)
+    if len(groups) <= 1:
+        print("독립적인 프로젝트 그룹이 하나뿐이라 분해 없이 풉니다")
+        return optimization.execute(time_limit=time_limit)
+
+    backend = optimization.solver_backend or SettingsStore.get('solver_backend', 'cbc')
+    df_demand = optimization.demand_excel['demand']
+    df_line_available = optimization.df_line_available
+    df_capa_qty = optimization.df_capa_qty.set_index('Line')
+    df_pinned = optimization.df_pre_result
+    blocks = sorted(set(l[0] for l in optimization.line))
+
+    # 단계마다 제한 시간을 새로 주지 않고 시작 시각 기준으로 남은 시간만 사용
+    def remaining():
+        if time_limit is None:
+            return None
+        return max(1, int(time_limit - (time.time() - start)))
+
+    # 그룹별 고정(사전할당) 사용량: Max_qty / Max_line 예산의 최소값
+    def pinned_usage(lines, b, s):
+        if df_pinned is None or df_pinned.empty:
+            return 0, 0
+        rows = df_pinned[df_pinned['Line'].isin(lines) & df_pinned['Line'].str.startswith(b) & (df_pinned['Time'] == s)]
+        return int(rows['Qty'].sum()), rows['Line'].nunique()
+
+    # 제조동 * 시프트 별 Max_qty / Max_line 을 그룹별 라인 capa 비율로 분배
+    budgets = [{} for _ in groups]
+    for b in blocks:
+        for s in optimization.time:
+            group_lines = [[l for l in lines if l.startswith(b)] for projects, lines in groups]
+            usage = [pinned_usage(lines, b, s) for lines in group_lines]
+            capa = [sum(int(df_capa_qty.loc[l, s]) for l in lines) for lines in group_lines]
+
+            max_qty = df_capa_qty.loc[f'Max_qty_{b}', s] if f'Max_qty_{b}' in df_capa_qty.index else None
+            max_line = df_capa_qty.loc[f'Max_line_{b}', s] if f'Max_line_{b}' in df_capa_qty.index else None
+            qty_split = _split_budget(max_qty, capa, [u[0] for u in usage]) if pd.notna(max_qty) else [None] * len(groups)
+            line_split = _split_budget(max_line, [len(lines) for lines in group_lines], [u[1] for u in usage]) if pd.notna(max_line) else [None] * len(groups)
+            for i in range(len(groups)):
+                budgets[i][(b, s)] = (qty_split[i], line_split[i])
+
+    def make_task(i, warm_start=None):
+        projects, lines = groups[i]
+        master = dict(optimization.master_excel)
+        master['line_available'] = df_line_available[df_line_available['Project'].isin(projects)][['Project'] + lines].reset_index(drop=True)
+        # 물량 비중은 합친 결과에서 보정하므로 그룹 모델에서는 제외
+        master['capa_portion'] = optimization.df_capa_portion.assign(lower_limit=0, upper_limit=1)
+        capa_qty = optimization.df_capa_qty.copy()
+        for (b, s), (qty_budget, line_budget) in budgets[i].items():
+            if qty_budget is not None:
+                capa_qty.loc[capa_qty['Line'] == f'Max_qty_{b}', s] = qty_budget
+            if line_budget is not None:
+                capa_qty.loc[capa_qty['Line'] == f'Max_line_{b}', s] = line_budget
+        master['capa_qty'] = capa_qty
+
+        demand = df_demand[df_demand['Item'].str[3:7].isin(projects)].reset_index(drop=True)
+        pre_result = None
+        if df_pinned is not None and not df_pinned.empty:
+            pre_result = df_pinned[df_pinned['Item'].str[3:7].isin(projects)].reset_index(drop=True)
+
+        return {
+            'name': f'Group{i + 1:02d}',
+            'input': {'demand': {'demand': demand}, 'master': master, 'dynamic': optimization.dynamic_excel},
+            'pre_result': pre_result,
+            'warm_start': warm_start,
+            'time_limit': remaining(),
+            'backend': backend,
+        }
+
+    max_workers = max_workers or min(len(groups), os.cpu_count() or 1)
+    print(f"프로젝트 그룹 {len(groups)}개로 분해해서 프로세스 {max_workers}개로 풉니다")
+    # 그룹별 풀이는 다른 프로세스에서 돌기 때문에 솔버 로그 대신 단계만 알림
+    optimization.report_progress('start', f'Solving {len(groups)} project groups in {max_workers} processes...', time_limit=time_limit)
+    job = optimization.solve_job
+
+    # 분해 없이 다시 풀 때는 그룹 풀이에서 찾은 해를 초기해로 사용
+    def fallback_execute(frames):
+        frames = [df for df in frames if df is not None and not df.empty]
+        warm_start = pd.concat(frames, ignore_index=True) if frames else None
+        return optimization.execute(time_limit=remaining(), warm_start=warm_start)
+
+    # 취소되면 분해 없이 다시 풀지 않고 해 없음으로 반환
+    def cancelled_result():
+        print("최적화가 취소되어 분해 풀이를 중단합니다")
+        return {'result': pd.DataFrame(), 'combined': optimization.df_combined,
+                'solve_info': {'status': 'Not Solved', 'has_solution': False, 'cancelled': True,
+                               'time_limit': time_limit, 'solve_time': time.time() - start, 'backend': backend}}
+
+    if job is not None and job.cancelled:
+        return cancelled_result()
+
+    context = multiprocessing.get_context()
+    workers = PoolWorkers(context)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context, **workers.executor_kwargs()) as executor:
+        if job is not None:
+            # 작업을 취소하면 풀 작업자 프로세스를 종료
+            job.on_cancel(workers.terminate)
+        try:
+            try:
+                group_results = list(executor.map(_solve_group, [make_task(i) for i in range(len(groups))]))
+            except BrokenProcessPool:
+                if job is None or not job.cancelled:
+                    raise
+                return cancelled_result()
+
+            failed = [name for name, df, info in group_results if not (info and info['has_solution'])]
+            if failed:
+                if job is not None and job.cancelled:
+                    return cancelled_result()
+                print(f"그룹 {failed} 에서 해를 찾지 못해 분해 없이 다시 풉니다")
+                return fallback_execute([df for name, df, info in group_results if info and info['has_solution']])
+
+            # 예산 재분배: 예산을 다 쓴 그룹에 다른 그룹이 남긴 Max_qty / Max_line 을 몰아주고 그 그룹만 다시 풀기
+            rerun = rebalance_budgets(budgets, [df for name, df, info in group_results], groups)
+            if rerun:
+                print(f"남은 예산을 재분배해서 그룹 {len(rerun)}개를 다시 풉니다")
+                try:
+                    retried = list(executor.map(_solve_group, [make_task(i, group_results[i][1]) for i in rerun]))
+                except BrokenProcessPool:
+                    if job is None or not job.cancelled:
+                        raise
+                    # 취소되면 1차 그룹 풀이 결과를 그대로 사용
+                    retried = []
+                for i, (name, df, info) in zip(rerun, retried):
+                    if info and info['has_solution']:
+                        group_results[i] = (name, df, info)
+        finally:
+            # 풀이 끝난 뒤의 취소는 작업자를 찾지 않도록 해제
+            if job is not None:
+                job.off_cancel(workers.terminate)
+
+    group_infos = {name: info for name, df, info in group_results}
+
+    df_result = pd.concat([df for name, df, info in group_results if not df.empty], ignore_index=True)
+
+    # 물량 비중 보정
+    repair_info = None
+    if portion_violated(df_result, optimization.df_capa_portion):
+        df_repaired, repair_info = repair_portion(df_result, df_pinned, optimization.df_capa_portion, remaining(), backend, job)
+        if df_repaired is None:
+            if job is not None and job.cancelled:
+                return cancelled_result()
+            print("물량 비중 보정에 실패해 분해 없이 다시 풉니다")
+            return fallback_execute([df_result])
+        print(f"물량 비중 보정: {int(df_result['Qty'].sum())} -> {int(df_repaired['Qty'].sum())}")
+        df_result = df_repaired
+
+    infos = list(group_infos.values())
+    solve_info = {
+        'status': 'Optimal' if all(info['status'] == 'Optimal' for info in infos) else infos[0]['status'],
+        'solution_status': 'Decomposed',
+        'has_solution': True,
+        'objective': float(df_result['Qty'].sum()),
+        'time_limit_reached': any(info['time_limit_reached'] for info in infos),
+        'time_limit': time_limit,
+        'solve_time': time.time() - start,
+        'num_variables': sum(info['num_variables'] for info in infos),
+        'num_constraints': sum(info['num_constraints'] for info in infos),
+        'backend': backend,
+        'groups': group_infos,
+        'repair': repair_info,
+        'cancelled': job is not None and job.cancelled,
+    }
+
+    optimization.df_result = df_result
+    optimization.report_progress('done', f"Decomposed solve finished ({len(groups)} groups)", objective=solve_info['objective'])
+    print(f"분해 최적화 완료: 총 생산량 {int(df_result['Qty'].sum())}개 ({solve_info['solve_time']:.1f}초)")
+    return {'result': df_result, 'combined': optimization.df_combined, 'solve_info': solve_info}
@@ -0,0 +1,233 @@
+import copy
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core.optimization import RESULT_COLUMNS
+from app.models.common.settings_store import SettingsStore
+from .presolve import shift_limits, DEFAULT_MAX_LINE, DEFAULT_MAX_QTY
+from .decomposition import portion_violated, repair_portion
+
+"""
+EDD(납기 빠른 순) 구성 휴리스틱 생산계획
+
+솔버 없이 NumPy 배열로 (라인, 시프트) Capa 를 앞에서부터 채워서 수 밀리초 안에 계획을 만든다.
+- 아이템 순서: 납기(due_LT 시트의 Due_date_LT, 시프트) 빠른 순 -> 같은 납기면 SOP 가 큰 순
+- 사전할당(고정) 생산(df_pre_result)을 먼저 배치
+- 1단계: 아이템마다 SOP 수량을 납기 시프트 안에서 가장 이른 시프트부터 배치
+- 2단계: 남은 수요(MFG - 배치량)를 가장 이른 시프트부터 배치
+- 시프트 안에서는 이미 가동 중인 라인 -> (제조동 가동 라인 수가 Max_line 미만이면) 새 라인 순서로,
+  line_available 이 1 인 라인에만 (라인, 시프트) Capa 와 (제조동, 시프트) Max_qty 안에서 배치
+결과는 Optimization.execute 와 같은 컬럼(RESULT_COLUMNS)이다.
+Data Input 화면의 즉시 미리보기, 2차 MIP 의 초기해(MIP start), MIP 가 해를 찾지 못했을 때의 대체 계획으로 사용한다.
+제조동 물량 비중(capa_portion)은 배치 중에 보지 않고, balance_portion 이면 배치 후 repair_portion 으로 맞춘다.
+"""
+
+
+# 물량 비중 보정(repair_portion) 기본 제한 시간(초). 초기해 / 대체 계획이 2차 시간 예산을 쓰지 않도록 작게 둔다
+REPAIR_TIME_LIMIT = 10
+
+
+"""
+EDD 휴리스틱 계획 사용 여부 (2차 초기해 / 대체 계획). None 이면 edd_heuristic_ox 설정
+"""
+def use_edd_heuristic(enabled=None):
+    if enabled is None:
+        enabled = SettingsStore.get('edd_heuristic_ox', 1)
+    return bool(enabled)
+
+
+"""
+아이템별 납기 시프트. due_LT 시트에 없는 아이템은 계획 기간의 마지막 시프트
+"""
+def due_shifts(df_demand, df_due_LT, times):
+    last = max(times)
+    keys = pd.DataFrame({'Project': df_demand['Item'].str[3:7], 'Tosite_group': df_demand['Item'].str[7:8]})
+    if df_due_LT is None or df_due_LT.empty or 'Due_date_LT' not in df_due_LT.columns:
+        return np.full(len(df_demand), last, dtype=float)
+    df_due = df_due_LT.drop_duplicates(['Project', 'Tosite_group'], keep='last')[['Project', 'Tosite_group', 'Due_date_LT']]
+    due = keys.merge(df_due, how='left', on=['Project', 'Tosite_group'])['Due_date_LT']
+    return pd.to_numeric(due, errors='coerce').fillna(last).to_numpy(dtype=float)
+
+
+"""
+아이템 x 라인 생산 가능 여부 (line_available 이 1 인 프로젝트)
+"""
+def _compatibility(df_demand, df_line_available, lines):
+    df_available = df_line_available.set_index('Project') if 'Project' in df_line_available.columns else df_line_available
+    df_available = df_available.reindex(columns=lines).apply(pd.to_numeric, errors='coerce').fillna(0)
+    df_available = df_available.groupby(level=0).max()
+    projects = df_demand['Item'].str[3:7]
+    return df_available.reindex(projects).fillna(0).to_numpy() == 1
+
+
+"""
+EDD 휴리스틱으로 생산계획 구성
+
+Args:
+    optimization (Optimization): 입력 데이터를 가진 최적화 객체. df_pre_result 가 있으면 고정 생산으로 먼저 배치
+    balance_portion (bool): 제조동 물량 비중을 벗어나면 repair_portion 으로 생산량을 줄여서 맞출지 여부
+    time_limit (int): 물량 비중 보정 솔버 제한 시간(초)
+
+Returns:
+    dict: execute 와 같은 형태. solve_info 에 SOP / 수요 충족률 포함
+"""
+def edd_plan(optimization, balance_portion=False, time_limit=None):
+    start = time.time()
+    lines, times = list(optimization.line), list(optimization.time)
+    # execute 와 같이 아이템별 수요는 demand 시트의 마지막 행 값
+    df_demand = optimization.df_demand.drop_duplicates('Item', keep='last').reset_index(drop=True)
+    items = df_demand['Item'].tolist()
+    mfg = np.floor(pd.to_numeric(df_demand['MFG'], errors='coerce').fillna(0).clip(lower=0).to_numpy(dtype=float))
+    if 'SOP' in df_demand.columns:
+        sop = np.minimum(np.floor(pd.to_numeric(df_demand['SOP'], errors='coerce').fillna(0).clip(lower=0).to_numpy(dtype=float)), mfg)
+    else:
+        sop = np.zeros(len(items))
+    due = due_shifts(df_demand, optimization.df_due_LT, times)
+    compat = _compatibility(df_demand, optimization.df_line_available, lines)
+
+    df_capa = optimization.df_capa_qty.set_index('Line') if 'Line' in optimization.df_capa_qty.columns else optimization.df_capa_qty
+    capa = df_capa.reindex(index=lines, columns=times).apply(pd.to_numeric, errors='coerce').fillna(0).clip(lower=0).to_numpy(dtype=float)
+    blocks = sorted(set(l[0] for l in lines))
+    block_of = np.array([blocks.index(l[0]) for l in lines], dtype=int)
+    max_lines = shift_limits(optimization.df_capa_qty, 'Max_line', blocks, times, DEFAULT_MAX_LINE)
+    max_qtys = shift_limits(optimization.df_capa_qty, 'Max_qty', blocks, times, DEFAULT_MAX_QTY)
+    max_line = np.array([[max_lines[(b, s)] for s in times] for b in blocks], dtype=float)
+    max_qty = np.array([[max_qtys[(b, s)] for s in times] for b in blocks], dtype=float)
+
+    # 배치 상태
+    cell_left = capa.copy()
+    block_left = max_qty.copy()
+    active = np.zeros(capa.shape, dtype=bool)
+    block_lines = np.zeros(max_line.shape, dtype=int)
+    left = mfg.copy()
+    sop_left = sop.copy()
+    values = {}
+
+    def place(i, j, t, qty):
+        b = block_of[j]
+        key = (items[i], lines[j], times[t])
+        values[key] = values.get(key, 0) + int(qty)
+        cell_left[j, t] -= qty
+        block_left[b, t] -= qty
+        left[i] -= qty
+        if times[t] <= due[i]:
+            sop_left[i] -= qty
+        if not active[j, t]:
+            active[j, t] = True
+            block_lines[b, t] += 1
+
+    # 고정 생산 (execute 와 같이 생산 가능한 조합만)
+    item_index = {m: i for i, m in enumerate(items)}
+    line_index = {l: j for j, l in enumerate(lines)}
+    time_index = {s: t for t, s in enumerate(times)}
+    pinned = 0
+    df_pinned = optimization.df_pre_result
+    if df_pinned is not None and not df_pinned.empty:
+        for m, l, s, qty in df_pinned[['Item', 'Line', 'Time', 'Qty']].itertuples(index=False):
+            i, j, t = item_index.get(m), line_index.get(l), time_index.get(int(s)) if pd.notna(s) else None
+            if i is None or j is None or t is None or not compat[i, j] or not qty > 0:
+                continue
+            place(i, j, t, int(qty))
+            pinned += int(qty)
+    np.maximum(left, 0, out=left)
+    np.maximum(sop_left, 0, out=sop_left)
+
+    # 한 시프트에서 아이템 i 를 need 만큼 배치. 가동 중인 라인 먼저, 그 다음 여유가 큰 새 라인
+    def fill(i, t, need):
+        room = np.minimum(cell_left[:, t], block_left[block_of, t])
+        opened = active[:, t]
+        ok = compat[i] & (room >= 1) & (opened | (block_lines[block_of, t] < max_line[block_of, t]))
+        candidates = np.flatnonzero(ok)
+        if candidates.size == 0:
+            return 0
+        placed = 0
+        for j in candidates[np.lexsort((-room[candidates], ~opened[candidates]))]:
+            b = block_of[j]
+            if not active[j, t] and block_lines[b, t] >= max_line[b, t]:
+                continue
+            qty = int(min(need - placed, cell_left[j, t], block_left[b, t]))
+            if qty <= 0:
+                continue
+            place(i, j, t, qty)
+            placed += qty
+            if placed >= need:
+                break
+        return placed
+
+    order = np.lexsort((-sop, due))
+    # 1단계: SOP 수량을 납기 안에
+    for i in order:
+        for t in range(len(times)):
+            if sop_left[i] < 1 or left[i] < 1 or times[t] > due[i]:
+                break
+            fill(i, t, min(sop_left[i], left[i]))
+    # 2단계: 남은 수요를 가장 이른 시프트부터
+    for i in order:
+        for t in range(len(times)):
+            if left[i] < 1:
+                break
+            fill(i, t, left[i])
+
+    df_result = optimization.result_from_values(values) if values else pd.DataFrame(columns=RESULT_COLUMNS)
+    build_time = time.time() - start
+
+    # 제조동 물량 비중 보정
+    repair_info = None
+    if balance_portion and portion_violated(df_result, optimization.df_capa_portion):
+        df_repaired, repair_info = repair_portion(df_result, df_pinned, optimization.df_capa_portion, time_limit,
+                                                  optimization.solver_backend, optimization.solve_job)
+        if df_repaired is not None:
+            print(f"물량 비중 보정: {int(df_result['Qty'].sum())} -> {int(df_repaired['Qty'].sum())}")
+            df_result = df_repaired
+        else:
+            print("물량 비중 보정에 실패했습니다")
+
+    # 납기 안 SOP 충족률 / 수요 충족률 (보정 후 결과 기준)
+    produced = df_result.groupby('Item')['Qty'].sum() if not df_result.empty else pd.Series(dtype=float)
+    due_by_item = pd.Series(due, index=items)
+    in_due = df_result[pd.to_numeric(df_result['Time']) <= df_result['Item'].map(due_by_item)] if not df_result.empty else df_result
+    sop_met = np.minimum(in_due.groupby('Item')['Qty'].sum().reindex(items, fill_value=0).to_numpy(dtype=float), sop) if not df_result.empty else np.zeros(len(items))
+    objective = float(produced.sum())
+    solve_info = {
+        # 최적성 증명이 없는 계획이므로 Optimal 이 아닌 별도 상태로 표시
+        'status': 'Heuristic',
+        'solution_status': 'EDD',
+        'has_solution': True,
+        'objective': objective,
+        'demand_coverage': objective / mfg.sum() * 100 if mfg.sum() > 0 else 100.0,
+        'sop_coverage': sop_met.sum() / sop.sum() * 100 if sop.sum() > 0 else 100.0,
+        'pinned_qty': pinned,
+        'time_limit_reached': False,
+        'time_limit': time_limit,
+        'build_time': build_time,
+        'solve_time': time.time() - start,
+        'num_variables': 0,
+        'num_constraints': 0,
+        'backend': 'edd',
+        'repair': repair_info,
+        'portion_violated': portion_violated(df_result, optimization.df_capa_portion),
+        'cancelled': False,
+    }
+    print(f"EDD 휴리스틱: 생산량 {objective:,.0f} (수요 {solve_info['demand_coverage']:.1f}%, "
+          f"납기 내 SOP {solve_info['sop_coverage']:.1f}%), {build_time * 1000:.0f}ms")
+    return {'result': df_result, 'combined': optimization.df_combined, 'solve_info': solve_info}
+
+
+"""
+Data Input 화면 미리보기용 EDD 계획. 입력 데이터프레임을 변경하지 않도록 복사본으로 Optimization 을 만든다
+
+Args:
+    dataframes (dict): organized_dataframes ({'demand', 'master', 'dynamic'})
+    df_pinned (DataFrame): 고정할 사전할당 결과. 없으면 고정 생산 없이 배치
+
+Returns:
+    dict: edd_plan 결과
+"""
+def preview_plan(dataframes, df_pinned=None):
+    from app.core.optimization import Optimization
+
+    optimization = Optimization(copy.deepcopy(dataframes))
+    optimization.df_pre_result = df_pinned
+    return edd_plan(optimization)
@@ -0,0 +1,108 @@
+import pulp
+
+"""
+모델 구성용 부분합 캐시
+
+결정변수 x[(아이템, 라인, 시프트)] 를 한 번만 훑어서
+아이템별 / (라인, 시프트)별 항 목록을 만들어 두고,
+제조동별 / (제조동, 시프트)별 / 전체 합은 라인 단위 항 목록을 이어 붙여 만든다.
+제약조건마다 변수 딕셔너리 전체를 다시 훑던 것을 대신한다.
+"""
+class ExpressionCache:
+    """
+    Args:
+        x (dict): (아이템, 라인, 시프트) -> pulp 변수
+    """
+    def __init__(self, x):
+        self.x = x
+        self._by_item = {}
+        self._by_line_shift = {}
+        self._lines_by_prefix = {}
+        self._memo = {}
+
+        for (m, l, s), var in x.items():
+            term = (var, 1)
+            self._by_item.setdefault(m, []).append(term)
+            self._by_line_shift.setdefault((l, s), []).append(term)
+
+        self._lines = list(dict.fromkeys(l for (l, s) in self._by_line_shift))
+        self._shifts = list(dict.fromkeys(s for (l, s) in self._by_line_shift))
+
+    """
+    계수 딕셔너리(또는 (변수, 계수) 리스트)로 선형식을 한 번에 생성
+    """
+    @staticmethod
+    def affine(coeffs):
+        return pulp.LpAffineExpression(coeffs)
+
+    """
+    같은 키의 선형식은 한 번만 만들어 재사용
+    (제약조건이 선형식을 그대로 참조하는 pulp 버전이 있어 복사본을 반환)
+    """
+    def _cached(self, key, build_terms):
+        if key not in self._memo:
+            self._memo[key] = pulp.LpAffineExpression(build_terms())
+        return self._memo[key].copy()
+
+    def _prefix_lines(self, prefix):
+        if prefix not in self._lines_by_prefix:
+            self._lines_by_prefix[prefix] = [l for l in self._lines if l.startswith(prefix)]
+        return self._lines_by_prefix[prefix]
+
+    """
+    전체 생산량
+    """
+    def total(self):
+        return self._cached(('total',), lambda: [(var, 1) for var in self.x.values()])
+
+    """
+    아이템별 생산량
+    """
+    def item(self, m):
+        return self._cached(('item', m), lambda: self._by_item.get(m, []))
+
+    """
+    (라인, 시프트) 별 생산량
+    """
+    def line_shift(self, l, s):
+        return self._cached(('line_shift', l, s), lambda: self._by_line_shift.get((l, s), []))
+
+    """
+    제조동(라인 접두사)별 생산량
+    """
+    def building(self, prefix):
+        return self._cached(('building', prefix), lambda: [
+            term
+            for l in self._prefix_lines(prefix)
+            for s in self._shifts
+            for term in self._by_line_shift.get((l, s), [])
+        ])
+
+    """
+    (제조동, 시프트) 별 생산량
+    """
+    def building_shift(self, prefix, s):
+        return self._cached(('building_shift', prefix, s), lambda: [
+            term
+            for l in self._prefix_lines(prefix)
+            for term in self._by_line_shift.get((l, s), [])
+        ])
+
+
+"""
+(라인, 시프트) 키를 갖는 변수 딕셔너리를 (제조동, 시프트) 별 선형식으로 묶음
+
+Args:
+    y (dict): (라인, 시프트) -> pulp 변수
+    prefixes (list): 제조동(라인 접두사) 목록
+
+Returns:
+    dict: (제조동, 시프트) -> pulp.LpAffineExpression
+"""
+def group_by_building_shift(y, prefixes):
+    terms = {}
+    for (l, s), var in y.items():
+        for b in prefixes:
+            if l.startswith(b):
+                terms.setdefault((b, s), []).append((var, 1))
+    return {key: pulp.LpAffineExpression(value) for key, value in terms.items()}
@@ -0,0 +1,215 @@
+import re
+import time
+
+import pandas as pd
+import pulp
+
+from .solver_backend import get_backend
+
+"""
+수요 미충족(실행 불가능) 원인 진단
+
+사전할당 모델(linear_programming)은 수요량을 전부 생산하지 못하면 실패로 본다.
+모든 제약조건의 slack 을 출력하는 대신, 같은 모델을 탄력(elastic) 모델로 다시 풀어서
+어느 제약조건 그룹이 얼마나 모자라서 수요를 못 채우는지 표로 반환한다 (pre_assign.check_all_violations 와 같은 방식).
+- 수요 제약(constraint1)은 ≤ 를 == 로 바꿔 전량 생산을 요구하고, 부족분 슬랙을 붙인다
+- Capa / Max_line / Max_qty 제약(constraint4, 5-3, 6)은 우변을 늘리는 초과분 슬랙을 붙인다
+- 가동 여부 연계 제약(constraint5-1, 5-2)은 완화하지 않는다
+- 슬랙 합을 최소화해서 0 보다 큰 슬랙만 위반으로 보고한다
+
+find_conflict_set 은 위반/한계에 걸린 제약만 남긴 뒤 하나씩 빼 보는 deletion filter 로
+같이 있으면 수요를 채울 수 없는 작은 제약 집합(IIS)을 찾는다.
+"""
+
+# 완화 대상 제약조건 그룹: {제약조건 이름 접두어: 표시 이름}
+ELASTIC_FAMILIES = {
+    'constraint1': 'Demand',
+    'constraint4': 'Capacity',
+    'constraint5-3': 'MaxLine',
+    'constraint6': 'MaxQty',
+}
+# 전량 충족(==)을 요구하는 그룹
+REQUIRED_FAMILIES = {'constraint1'}
+
+# pulp 는 제약조건 이름의 '-', ' ' 를 '_' 로 바꾼다: 'constraint5-3,(I,1)' -> 'constraint5_3,(I,1)'
+FAMILY_PATTERN = re.compile(r'^constraint(\d+(?:[-_]\d+)?)')
+
+EPS = 1e-6
+
+
+"""
+제약조건 이름에서 그룹(constraint1, constraint5-3 ...)과 대상('(I_01,3)' 등)을 분리
+"""
+def constraint_family(name):
+    match = FAMILY_PATTERN.match(name)
+    if not match:
+        return None, name
+    return f"constraint{match.group(1).replace('_', '-')}", name[match.end():].strip('_,')
+
+
+"""
+원래 모델의 제약조건 목록: [(이름, 그룹, 대상, 계수 항, 부등호, 우변)]
+"""
+def _rows(model):
+    rows = []
+    for name, constraint in model.constraints.items():
+        family, target = constraint_family(name)
+        sense = constraint.sense
+        if family in REQUIRED_FAMILIES and sense == pulp.LpConstraintLE:
+            sense = pulp.LpConstraintEQ
+        rows.append((name, family, target, list(constraint.items()), sense, -constraint.constant))
+    return rows
+
+
+"""
+진단용 모델 구성
+
+Args:
+    rows (list): _rows 결과
+    keep (set): 포함할 완화 대상 제약 이름. None 이면 전부
+    elastic (bool): True 면 완화 대상 제약마다 슬랙을 붙이고 슬랙 합을 최소화, False 면 실행 가능 여부만 확인
+
+Returns:
+    tuple: (LpProblem, {제약 이름: 슬랙 변수})
+"""
+def _build(rows, keep=None, elastic=True):
+    prob = pulp.LpProblem("Infeasibility_Diagnosis", pulp.LpMinimize)
+    slacks = {}
+    for name, family, target, terms, sense, rhs in rows:
+        expr = pulp.LpAffineExpression(terms)
+        if family in ELASTIC_FAMILIES:
+            if keep is not None and name not in keep:
+                continue
+            if elastic:
+                slack = pulp.LpVariable(f"elastic_slack_{len(slacks)}", lowBound=0)
+                slacks[name] = slack
+                # ≤ 제약은 우변을 늘리고, == / ≥ 제약은 좌변의 부족분을 채움
+                expr = expr - slack if sense == pulp.LpConstraintLE else expr + slack
+        prob += pulp.LpConstraint(expr, sense, name, rhs)
+    prob += pulp.lpSum(slacks.values())
+    return prob, slacks
+
+
+"""
+원래 모델 변수 값을 보존하면서 진단 모델 풀이 (진단 모델은 원래 모델과 변수를 공유함)
+"""
+def _solve_preserving(model, prob, time_limit, backend):
+    saved = {var.name: var.varValue for var in model.variables()}
+    try:
+        get_backend(backend).solve(prob, time_limit, msg=False)
+        values = {var.name: var.varValue for var in prob.variables()}
+    finally:
+        for var in model.variables():
+            var.varValue = saved[var.name]
+    return prob.status, prob.sol_status, values
+
+
+"""
+탄력 모델로 수요 미충족 원인 진단
+
+Args:
+    model (LpProblem): 제약조건 이름이 constraintN 형식인 모델 (linear_programming 모델)
+    time_limit (int): 진단 모델 제한 시간(초)
+    backend (str): 솔버 백엔드. None 이면 설정값 사용
+
+Returns:
+    DataFrame: 위반된 제약 ['Family', 'Constraint', 'Target', 'Limit', 'ViolationAmt'] (위반이 없으면 빈 표)
+"""
+def diagnose_infeasibility(model, time_limit=None, backend=None):
+    started = time.time()
+    rows = _rows(model)
+    prob, slacks = _build(rows)
+    status, sol_status, values = _solve_preserving(model, prob, time_limit, backend)
+    if sol_status not in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+        print(f"진단 모델 풀이 실패: {pulp.LpStatus[status]}")
+
+    limits = {name: rhs for name, family, target, terms, sense, rhs in rows}
+    records = []
+    for name, slack in slacks.items():
+        amount = values.get(slack.name) or 0
+        if amount > EPS:
+            family, target = constraint_family(name)
+            records.append({
+                'Family': family,
+                'Constraint': ELASTIC_FAMILIES[family],
+                'Target': target,
+                'Limit': limits[name],
+                'ViolationAmt': amount,
+            })
+
+    violations = pd.DataFrame(records, columns=['Family', 'Constraint', 'Target', 'Limit', 'ViolationAmt'])
+    print(f"수요 미충족 진단: 위반 제약 {len(violations)}개, 위반량 합 {violations['ViolationAmt'].sum():,.0f} ({time.time() - started:.1f}초)")
+    return violations
+
+
+"""
+deletion filter 로 작은 충돌 제약 집합(IIS) 찾기
+
+위반된 제약과, 변수를 공유하는 (연계 제약을 거쳐서 포함) 한계에 걸린 제약만 후보로 남기고
+후보를 하나씩 빼서 여전히 실행 불가능하면 뺀 채로 둔다. 남은 제약은 하나만 빼도 실행 가능해지는 집합이다.
+판정을 못 한(제한 시간 초과) 제약은 남겨 둔다.
+
+Args:
+    model (LpProblem): 진단한 모델
+    violations (DataFrame): diagnose_infeasibility 결과
+    time_limit (int): 판정 1회당 제한 시간(초)
+    backend (str): 솔버 백엔드
+    max_tests (int): 최대 판정 횟수 (후보가 많으면 위반 제약과 가까운 것부터 사용)
+
+Returns:
+    DataFrame: 충돌 제약 ['Family', 'Constraint', 'Target', 'Limit']. 찾지 못하면 None
+"""
+def find_conflict_set(model, violations, time_limit=10, backend=None, max_tests=50):
+    if violations is None or violations.empty:
+        return None
+    started = time.time()
+    rows = _rows(model)
+    violated_targets = set(zip(violations['Family'], violations['Target']))
+    violated = {name for name, family, target, *_ in rows if (family, target) in violated_targets}
+
+    # 위반 제약의 변수에서 연계 제약을 한 번 거쳐 닿는 변수까지 모음
+    related = {var.name for name, family, target, terms, sense, rhs in rows if name in violated for var, coef in terms}
+    for name, family, target, terms, sense, rhs in rows:
+        names = {var.name for var, coef in terms}
+        if family not in ELASTIC_FAMILIES and names & related:
+            related |= names
+
+    # 후보: 위반 제약 + 관련 변수를 쓰면서 원래 모델의 해에서 한계에 걸린 제약
+    tight = []
+    for name, family, target, terms, sense, rhs in rows:
+        if family not in ELASTIC_FAMILIES or name in violated:
+            continue
+        if not any(var.name in related for var, coef in terms):
+            continue
+        lhs = sum((var.varValue or 0) * coef for var, coef in terms)
+        if sense == pulp.LpConstraintEQ or (sense == pulp.LpConstraintLE and lhs >= rhs - EPS) \
+                or (sense == pulp.LpConstraintGE and lhs <= rhs + EPS):
+            tight.append(name)
+    # 뺄 순서: 한계 제약 -> 수요 제약 -> 위반 제약 (위반 제약이 집합에 남도록)
+    order = sorted(tight, key=lambda name: constraint_family(name)[0] in REQUIRED_FAMILIES)
+    order = (order + [name for name, *_ in rows if name in violated])[-max_tests:]
+    keep = set(order)
+
+    def infeasible(names):
+        prob, _ = _build(rows, keep=names, elastic=False)
+        status, sol_status, values = _solve_preserving(model, prob, time_limit, backend)
+        if status == pulp.LpStatusInfeasible:
+            return True
+        # 판정 못 함(제한 시간)은 실행 불가능으로 보지 않고 제약을 남김
+        return None if sol_status == pulp.LpSolutionNoSolutionFound else False
+
+    if not infeasible(keep):
+        print("후보 제약만으로 실행 불가능함을 확인하지 못해 충돌 집합을 찾지 못했습니다")
+        return None
+    for name in order:
+        if infeasible(keep - {name}):
+            keep.discard(name)
+
+    limits = {name: rhs for name, family, target, terms, sense, rhs in rows}
+    records = []
+    for name in order:
+        if name in keep:
+            family, target = constraint_family(name)
+            records.append({'Family': family, 'Constraint': ELASTIC_FAMILIES[family], 'Target': target, 'Limit': limits[name]})
+    print(f"충돌 제약 집합: {len(records)}개 (후보 {len(order)}개, {time.time() - started:.1f}초)")
+    return pd.DataFrame(records, columns=['Family', 'Constraint', 'Target', 'Limit'])
@@ -0,0 +1,33 @@
+"""
+MIP start (warm start) 초기값 설정
+
+사전할당 결과나 이전 주차 계획을 x[(아이템, 라인, 시프트)] 의 초기값으로 넣고,
+생산량이 있는 (라인, 시프트) 의 y 를 1 로 맞춘다.
+나머지 변수는 초기값을 비워 두고 솔버(CBC)가 채워서 첫 해를 완성하도록 한다.
+(나머지를 0 으로 채우면 제조동 비중 하한 등에 걸려 초기해를 쓸 수 없는 경우가 많음)
+
+Args:
+    x (dict): (아이템, 라인, 시프트) -> pulp 변수
+    y (dict): (라인, 시프트) -> pulp 이진 변수
+    df_start (DataFrame): Item, Line, Time, Qty 컬럼을 갖는 초기해
+
+Returns:
+    int: 초기값으로 사용된 (아이템, 라인, 시프트) 조합 수 (모델에 없는 조합은 제외)
+"""
+def set_mip_start(x, y, df_start):
+    # 같은 조합이 여러 행으로 나뉘어 있으면 합쳐서 사용
+    start = df_start.groupby(['Item', 'Line', 'Time'])['Qty'].sum()
+
+    matched = 0
+    active = set()
+    for (m, l, s), qty in start.items():
+        if (m, l, s) in x and qty > 0:
+            x[(m, l, s)].setInitialValue(int(qty))
+            active.add((l, s))
+            matched += 1
+
+    for key in active:
+        if key in y:
+            y[key].setInitialValue(1)
+
+    return matched
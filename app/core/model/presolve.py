@@ -0,0 +1,186 @@
+import pandas as pd
+import pulp
+
+from app.models.common.settings_store import SettingsStore
+from .solver_backend import get_backend
+
+"""
+모델 presolve / 강화 (모델 생성 전에 계산)
+
+라인 가동 제약 total_produced <= BIG_M * y 의 BIG_M 을 전역 상수(1,000,000 / 10,000,000) 대신
+(라인, 시프트)별로 실제로 생산 가능한 최대량으로 줄이고, 변수 상한과 중복 제약을 정리해서 LP 완화를 강하게 만든다.
+- 변수 상한: x[(m, l, s)] <= min(아이템 수요, (l, s) Capa, (제조동, s) Max_qty). Max_line 이 0 이면 0 으로 고정
+- 셀 big-M: M(l, s) = min((l, s) Capa, (제조동, s) Max_qty, 셀 변수 상한 합). 0 이면 y 를 0 으로 고정
+- 중복 제약 제거 (다른 제약이나 변수 상한이 이미 보장하는 경우만)
+    Capa 제약      : y 가 있는 셀은 total_produced <= M * y (M <= Capa) 가 보장
+    아이템 수요 제약 : 아이템 변수 상한 합 <= 수요
+    Max_line 제약  : (제조동, 시프트)에서 가동 가능한 셀 수 <= Max_line
+    Max_qty 제약   : (제조동, 시프트) 셀 최대 생산량 합 <= Max_qty
+모든 값은 원래 제약이 이미 보장하는 범위이므로 정수해 집합은 바뀌지 않고 LP 완화만 좁아진다.
+"""
+
+# 시트에 값이 없을 때 사용하는 기본값 (제약이 없는 것과 같음)
+DEFAULT_MAX_LINE = 100
+DEFAULT_MAX_QTY = 10_000_000
+
+
+"""
+presolve 사용 여부. None 이면 presolve_ox 설정
+"""
+def use_presolve(enabled=None):
+    if enabled is None:
+        enabled = SettingsStore.get('presolve_ox', 1)
+    return bool(enabled)
+
+
+"""
+capa_qty 시트의 Max_line_{제조동} / Max_qty_{제조동} 행을 {(제조동, 시프트): 한계치} 로
+
+Args:
+    df_capa_qty (DataFrame): capa_qty 시트 (Line 컬럼 또는 Line 인덱스)
+    name (str): 'Max_line' 또는 'Max_qty'
+    blocks (list): 제조동 목록
+    times (list): 시프트 목록
+    default: 값이 없을 때 사용할 한계치
+"""
+def shift_limits(df_capa_qty, name, blocks, times, default):
+    rows = df_capa_qty.set_index('Line') if 'Line' in df_capa_qty.columns else df_capa_qty
+    limits = {}
+    for b in blocks:
+        key = f'{name}_{b}'
+        for s in times:
+            value = rows.at[key, s] if key in rows.index and s in rows.columns else None
+            limits[(b, s)] = float(value) if pd.notna(value) else default
+    return limits
+
+
+"""
+(라인, 시프트) 셀별 big-M / 변수 상한 / 중복 제약 판정
+"""
+class PlanBounds:
+    """
+    Args:
+        items_by_line_shift (dict): (라인, 시프트) -> 생산 가능한 아이템 목록
+        demand (dict): 아이템 -> 생산 가능한 최대량 (수요)
+        capacity (dict): (라인, 시프트) -> Capa
+        max_lines (dict): (제조동, 시프트) -> 새로 가동할 수 있는 라인 수 (shift_limits)
+        max_qtys (dict): (제조동, 시프트) -> 최대 생산량 (shift_limits)
+        big_m (int): presolve 를 쓰지 않을 때의 big-M
+        cells (iterable): 가동 여부 변수 y 가 있는 셀. None 이면 items_by_line_shift 전체
+        enabled (bool): False 이면 아무것도 줄이지 않음 (기존 모델과 같음)
+    """
+    def __init__(self, items_by_line_shift, demand, capacity, max_lines, max_qtys, big_m, cells=None, enabled=True):
+        self.enabled = enabled
+        self.default_big_m = big_m
+        self.cells = set(items_by_line_shift) if cells is None else set(cells)
+        self.var_ub = {}
+        self.cell_m = {}
+        self.redundant = {'capacity': set(), 'demand': set(), 'max_line': set(), 'max_qty': set()}
+        if not enabled:
+            return
+
+        # 변수 상한
+        for (l, s), items in items_by_line_shift.items():
+            b = l[0]
+            cap = min(capacity.get((l, s), big_m), max_qtys.get((b, s), DEFAULT_MAX_QTY))
+            if (l, s) in self.cells and max_lines.get((b, s), DEFAULT_MAX_LINE) <= 0:
+                cap = 0
+            for m in items:
+                self.var_ub[(m, l, s)] = max(0, min(demand.get(m, 0), cap))
+            cell_ub = sum(self.var_ub[(m, l, s)] for m in items)
+            self.cell_m[(l, s)] = max(0, min(cap, cell_ub))
+
+        # 중복 제약
+        ub_by_item = {}
+        for (m, l, s), ub in self.var_ub.items():
+            ub_by_item[m] = ub_by_item.get(m, 0) + ub
+        self.redundant['demand'] = {m for m, total in ub_by_item.items() if total <= demand.get(m, 0)}
+        self.redundant['capacity'] = {key for key in self.cell_m if key in self.cells}
+
+        lines_by_block, qty_by_block = {}, {}
+        for (l, s), m_cell in self.cell_m.items():
+            key = (l[0], s)
+            qty_by_block[key] = qty_by_block.get(key, 0) + m_cell
+            if (l, s) in self.cells and m_cell > 0:
+                lines_by_block[key] = lines_by_block.get(key, 0) + 1
+        self.redundant['max_line'] = {key for key, limit in max_lines.items() if lines_by_block.get(key, 0) <= limit}
+        self.redundant['max_qty'] = {key for key, limit in max_qtys.items() if qty_by_block.get(key, 0) <= limit}
+
+    """(라인, 시프트) 가동 제약의 big-M"""
+    def big_m(self, l, s):
+        return self.cell_m.get((l, s), self.default_big_m) if self.enabled else self.default_big_m
+
+    """제약 종류('capacity' / 'demand' / 'max_line' / 'max_qty')의 key 제약을 만들어야 하는지"""
+    def keep(self, kind, key):
+        return not self.enabled or key not in self.redundant[kind]
+
+    """
+    변수 상한 적용. 상한이 0 인 변수와 M 이 0 인 셀의 y 는 0 으로 고정
+
+    Returns:
+        dict: presolve 통계 (solve_info['presolve'])
+    """
+    def apply(self, x, y):
+        if not self.enabled:
+            return {'enabled': False}
+        fixed = 0
+        for key, ub in self.var_ub.items():
+            if key in x:
+                x[key].upBound = ub
+                fixed += ub <= 0
+        fixed_cells = 0
+        for key, m_cell in self.cell_m.items():
+            if key in y and m_cell <= 0:
+                y[key].upBound = 0
+                fixed_cells += 1
+        stats = {
+            'enabled': True,
+            'bounded_variables': len(self.var_ub),
+            'fixed_variables': int(fixed),
+            'fixed_cells': fixed_cells,
+            'max_big_m': max(self.cell_m.values(), default=0),
+            'removed_constraints': {kind: len(keys) for kind, keys in self.redundant.items()},
+        }
+        print(f"Presolve: 변수 상한 {stats['bounded_variables']}개 (0 고정 {fixed}개), 가동 불가 셀 {fixed_cells}개, "
+              f"big-M {self.default_big_m:,} -> 최대 {stats['max_big_m']:,.0f}, 중복 제약 제거 {stats['removed_constraints']}")
+        return stats
+
+
+"""
+모델 크기 (변수 수, 제약 수, 0 이 아닌 계수 수)
+"""
+def model_size(model):
+    return {
+        'num_variables': model.numVariables(),
+        'num_constraints': model.numConstraints(),
+        'num_nonzeros': sum(len(c) for c in model.constraints.values()),
+    }
+
+
+"""
+LP 완화(정수 조건을 뺀 모델)의 목적함수 값 = 루트 노드 bound
+정수 변수를 잠시 연속 변수로 바꿔서 설정된 솔버 백엔드로 풀고, 풀이 후 변수 종류를 되돌린다
+(모델의 변수 값과 상태를 덮어쓰므로 결과를 꺼낸 뒤에 호출)
+
+Args:
+    model (LpProblem): 모델
+    time_limit (int): 제한 시간(초)
+    backend (str): 솔버 백엔드. None 이면 설정값
+    progress (callable): 진행 상황 콜백
+    job (SolveJob): 취소할 수 있도록 솔버 프로세스를 등록할 작업
+
+Returns:
+    float: LP 완화 목적함수 값. 최적해를 찾지 못하면 (취소 포함) None
+"""
+def lp_relaxation_bound(model, time_limit=None, backend=None, progress=None, job=None):
+    integers = [var for var in model.variables() if var.cat == pulp.LpInteger]
+    for var in integers:
+        var.cat = pulp.LpContinuous
+    try:
+        get_backend(backend).solve(model, time_limit, msg=False, progress=progress, job=job)
+    finally:
+        for var in integers:
+            var.cat = pulp.LpInteger
+    if model.status != pulp.LpStatusOptimal or model.sol_status != pulp.LpSolutionOptimal:
+        return None
+    return pulp.value(model.objective)
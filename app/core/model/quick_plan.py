@@ -0,0 +1,179 @@
+import math
+import time
+
+import pandas as pd
+
+from app.core.optimization import RESULT_COLUMNS
+from app.models.common.settings_store import SettingsStore
+from .presolve import lp_relaxation_bound
+from .decomposition import portion_violated, repair_portion
+
+"""
+빠른 계획 (LP 완화 + 반올림 보정)
+
+최적성 증명이 필요 없는 what-if 확인용. execute 와 같은 모델의 LP 완화만 풀고 정수 계획으로 바꾼다.
+1. LP 완화 풀이 (정수 / 이진 조건 제외) -> 목적함수 값이 최적 정수해의 상한(LP bound)
+2. 생산량 내림: 수요 / Capa / Max_qty 는 모두 <= 제약이라 내림해도 계속 만족 (고정 생산량은 정수라 그대로)
+3. Max_line 보정: 가동 셀이 Max_line 을 넘는 (제조동, 시프트)는 고정 생산이 없는 셀 중 생산량이 적은 셀부터 닫음
+4. 채우기: 남은 수요를 가동 중인 셀 -> Max_line 여유가 있으면 새 셀 순서로 Capa / Max_qty 안에서 채움
+5. 제조동 물량 비중을 벗어나면 생산량을 줄이는 보정 모델(repair_portion)로 맞춤
+결과의 LP bound 대비 차이(gap)를 함께 보고한다. 최종 계획은 기존처럼 execute(MIP)로 푼다.
+"""
+
+# LP 해의 소수 오차 (내림할 때 0.9999999 가 0 이 되지 않도록)
+EPS = 1e-6
+
+
+"""
+빠른 계획 사용 여부. None 이면 quick_plan_ox 설정
+"""
+def use_quick_plan(enabled=None):
+    if enabled is None:
+        enabled = SettingsStore.get('quick_plan_ox', 0)
+    return bool(enabled)
+
+
+"""
+Max_line 을 넘는 (제조동, 시프트)의 셀을 생산량이 적은 순서로 닫음 (고정 생산이 있는 셀은 유지)
+"""
+def _close_excess_cells(values, max_lines, pinned_cells):
+    produced = {}
+    for (m, l, s), qty in values.items():
+        produced[(l, s)] = produced.get((l, s), 0) + qty
+    open_cells = {}
+    for (l, s), qty in produced.items():
+        if qty > 0:
+            open_cells.setdefault((l[0], s), []).append((l, s))
+
+    closed = set()
+    for key, cells in open_cells.items():
+        excess = int(math.ceil(len(cells) - max_lines.get(key, len(cells))))
+        if excess <= 0:
+            continue
+        candidates = sorted((c for c in cells if c not in pinned_cells), key=lambda c: produced[c])
+        closed.update(candidates[:excess])
+    return {key: qty for key, qty in values.items() if (key[1], key[2]) not in closed}, len(closed)
+
+
+"""
+남은 수요를 Capa / Max_qty / Max_line 안에서 채움. 가동 중인 셀을 먼저, 그 다음 Capa 가 큰 새 셀
+"""
+def _fill(values, plan):
+    items_by_line_shift, demand, capacity = plan['items_by_line_shift'], plan['demand'], plan['capacity']
+    max_lines, max_qtys = plan['max_lines'], plan['max_qtys']
+
+    item_left = dict(demand)
+    cell_used, block_used, block_lines = {}, {}, {}
+    for (m, l, s), qty in values.items():
+        item_left[m] = item_left.get(m, 0) - qty
+        cell_used[(l, s)] = cell_used.get((l, s), 0) + qty
+        block_used[(l[0], s)] = block_used.get((l[0], s), 0) + qty
+    for (l, s), qty in cell_used.items():
+        if qty > 0:
+            block_lines[(l[0], s)] = block_lines.get((l[0], s), 0) + 1
+
+    open_cells = [c for c in items_by_line_shift if cell_used.get(c, 0) > 0]
+    new_cells = sorted((c for c in items_by_line_shift if cell_used.get(c, 0) <= 0), key=lambda c: -capacity.get(c, 0))
+    added = 0
+    for cell in open_cells + new_cells:
+        l, s = cell
+        block = (l[0], s)
+        is_new = cell_used.get(cell, 0) <= 0
+        if is_new and block_lines.get(block, 0) >= max_lines.get(block, math.inf):
+            continue
+        room = min(capacity.get(cell, 0) - cell_used.get(cell, 0), max_qtys.get(block, math.inf) - block_used.get(block, 0))
+        for m in sorted(items_by_line_shift[cell], key=lambda m: -item_left.get(m, 0)):
+            if room <= 0:
+                break
+            qty = int(min(room, item_left.get(m, 0)))
+            if qty <= 0:
+                continue
+            values[(m, l, s)] = values.get((m, l, s), 0) + qty
+            item_left[m] -= qty
+            cell_used[cell] = cell_used.get(cell, 0) + qty
+            block_used[block] = block_used.get(block, 0) + qty
+            room -= qty
+            added += qty
+        if is_new and cell_used.get(cell, 0) > 0:
+            block_lines[block] = block_lines.get(block, 0) + 1
+    return values, added
+
+
+"""
+LP 완화 + 반올림 보정으로 빠른 생산계획 풀이
+
+Args:
+    optimization (Optimization): 사전할당 결과(df_pre_result)가 설정된 최적화 객체
+    time_limit (int): LP / 물량 비중 보정 솔버 제한 시간(초)
+
+Returns:
+    dict: execute 와 같은 형태. solve_info 에 LP bound 와 gap(%) 포함
+"""
+def execute_quick(optimization, time_limit=None):
+    start = time.time()
+    optimization.report_progress('build', 'Building the plan model (quick plan)...')
+    plan = optimization.build_plan_model()
+    model, x = plan['model'], plan['x']
+
+    optimization.report_progress('start', 'Solving the LP relaxation...', time_limit=time_limit)
+    lp_bound = lp_relaxation_bound(model, time_limit, optimization.solver_backend,
+                                   progress=optimization.progress_callback, job=optimization.solve_job)
+    if lp_bound is None:
+        print("❌ 빠른 계획: LP 완화 해를 찾지 못했습니다")
+        optimization.df_result = pd.DataFrame(columns=RESULT_COLUMNS)
+        return {'result': optimization.df_result, 'combined': optimization.df_combined, 'error': "❌ 해를 찾지 못했습니다.",
+                'solve_info': {'status': 'Infeasible', 'solution_status': 'LP Rounding', 'has_solution': False,
+                               'time_limit': time_limit, 'solve_time': time.time() - start}}
+    lp_time = time.time() - start
+
+    # 내림 -> Max_line 보정 -> 채우기
+    values = {key: math.floor(var.varValue + EPS) for key, var in x.items() if var.varValue is not None and var.varValue > EPS}
+    values = {key: qty for key, qty in values.items() if qty > 0}
+    rounded = sum(values.values())
+    df_pinned = optimization.df_pre_result
+    pinned_cells = set()
+    if df_pinned is not None and not df_pinned.empty:
+        pinned_cells = set(zip(df_pinned['Line'], df_pinned['Time']))
+    values, closed = _close_excess_cells(values, plan['max_lines'], pinned_cells)
+    values, added = _fill(values, plan)
+    df_result = optimization.result_from_values(values)
+
+    # 제조동 물량 비중 보정
+    repair_info = None
+    if portion_violated(df_result, optimization.df_capa_portion):
+        df_repaired, repair_info = repair_portion(df_result, df_pinned, optimization.df_capa_portion, time_limit,
+                                                  optimization.solver_backend, optimization.solve_job)
+        if df_repaired is not None:
+            print(f"물량 비중 보정: {int(df_result['Qty'].sum())} -> {int(df_repaired['Qty'].sum())}")
+            df_result = df_repaired
+        else:
+            print("물량 비중 보정에 실패했습니다. 최종 계획(MIP)으로 다시 확인하세요")
+
+    objective = float(df_result['Qty'].sum())
+    gap = (lp_bound - objective) / lp_bound * 100 if lp_bound > 0 else 0.0
+    print(f"빠른 계획: LP bound {lp_bound:,.0f}, 내림 {rounded:,} -> 셀 {closed}개 닫음 -> 채우기 +{added:,} -> "
+          f"생산량 {objective:,.0f} (gap {gap:.2f}%, {time.time() - start:.2f}초)")
+
+    optimization.df_result = df_result
+    solve_info = {
+        # 최적성 증명이 없는 계획이므로 Optimal 이 아닌 별도 상태로 표시
+        'status': 'Quick',
+        'solution_status': 'LP Rounding',
+        'has_solution': True,
+        'objective': objective,
+        'lp_bound': lp_bound,
+        'gap': gap,
+        'time_limit_reached': False,
+        'time_limit': time_limit,
+        'lp_time': lp_time,
+        'solve_time': time.time() - start,
+        'num_variables': model.numVariables(),
+        'num_constraints': model.numConstraints(),
+        'backend': 'cbc (LP)',
+        'presolve': plan['presolve'],
+        'repair': repair_info,
+        'portion_violated': portion_violated(df_result, optimization.df_capa_portion),
+        'cancelled': False,
+    }
+    optimization.report_progress('done', f'Quick plan ready (gap {gap:.2f}% to the LP bound)')
+    return {'result': df_result, 'combined': optimization.df_combined, 'solve_info': solve_info}
@@ -0,0 +1,154 @@
+import copy
+import time
+
+import pandas as pd
+
+from app.models.common.settings_store import SettingsStore
+from app.utils.shift_calendar import SHIFTS_PER_WEEK, SHIFTS_PER_DAY
+
+"""
+롤링 호라이즌 생산계획
+
+계획 기간(capa_qty 시프트 컬럼)이 길면 전체 시프트를 한 MIP 로 풀지 않고
+window 시프트 크기의 구간을 overlap 만큼 겹치면서 앞에서부터 차례로 푼다.
+- 구간마다 Optimization.execute 를 그 구간 시프트만으로 실행한다
+- 구간 앞쪽 (window - overlap) 시프트의 결과만 확정(freeze)하고, 겹치는 뒤쪽은 다음 구간에서 다시 푼다
+  (다음 구간은 이전 구간의 겹치는 부분 결과를 MIP start 로 사용)
+- 확정한 생산량만큼 아이템 수요를 줄여서 다음 구간으로 넘긴다
+- 사전할당(고정) 생산은 해당 시프트가 들어 있는 구간에서 고정하고, 뒤 구간의 고정량은 앞 구간 수요에서 미리 빼 둔다
+구간 크기가 일정하므로 풀이 시간은 계획 기간 길이에 비례해서 늘어난다.
+제한 시간은 전체 구간이 함께 쓰는 예산이다. 구간마다 남은 시간을 남은 구간 수로 나눠서 쓴다.
+
+생산계획 모델의 시프트 사이 연결 제약은 아이템 수요(constraint 1)뿐이다.
+자재 수량은 생산계획 모델에 들어가지 않으므로 (자재 부족은 결과 분석에서 확인) 넘겨줄 자재 잔량은 없다.
+제조동 물량 비중(capa_portion)은 구간마다 적용한다.
+"""
+
+
+"""
+구간 목록 [(구간 시프트, 확정할 시프트), ...]. 마지막 구간은 전부 확정
+"""
+def rolling_windows(shifts, window=SHIFTS_PER_WEEK, overlap=SHIFTS_PER_DAY):
+    shifts = sorted(shifts)
+    window = max(1, int(window))
+    step = max(1, window - max(0, int(overlap)))
+    windows = []
+    start = 0
+    while start < len(shifts):
+        span = shifts[start:start + window]
+        if start + window >= len(shifts):
+            windows.append((span, span))
+            break
+        windows.append((span, span[:step]))
+        start += step
+    return windows
+
+
+"""
+롤링 호라이즌 사용 여부: 설정이 켜져 있고 계획 기간이 구간보다 길 때
+"""
+def use_rolling_horizon(optimization, enabled=None):
+    if enabled is None:
+        enabled = SettingsStore.get('rolling_horizon_ox', 0)
+    window = int(SettingsStore.get('rolling_window', SHIFTS_PER_WEEK))
+    return bool(enabled) and len(optimization.time) > window
+
+
+"""
+롤링 호라이즌으로 생산계획 풀이
+
+Args:
+    optimization (Optimization): 사전할당 결과(df_pre_result)가 설정된 최적화 객체
+    window (int): 구간 크기(시프트). None 이면 rolling_window 설정
+    overlap (int): 다음 구간과 겹치는 시프트 수. None 이면 rolling_overlap 설정
+    time_limit (int): 모든 구간을 합친 솔버 제한 시간(초). None 이면 제한 없음
+
+Returns:
+    dict: execute 와 같은 형태. solve_info 에 구간별 메타데이터(windows), 풀지 못한 구간(skipped_windows) 포함
+"""
+def execute_rolling(optimization, window=None, overlap=None, time_limit=None):
+    start = time.time()
+    window = int(window or SettingsStore.get('rolling_window', SHIFTS_PER_WEEK))
+    overlap = int(SettingsStore.get('rolling_overlap', SHIFTS_PER_DAY) if overlap is None else overlap)
+    windows = rolling_windows(optimization.time, window, overlap)
+    print(f"롤링 호라이즌: 시프트 {len(optimization.time)}개를 구간 {len(windows)}개로 풉니다 (구간 {window}, 겹침 {overlap})")
+    optimization.report_progress('start', f'Solving {len(windows)} rolling windows...', time_limit=time_limit)
+
+    # execute 와 같이 아이템별 수요는 demand 시트의 마지막 행 값
+    df_demand = optimization.df_demand.drop_duplicates('Item', keep='last').reset_index(drop=True)
+    remaining = df_demand.set_index('Item')['MFG'].astype(float)
+    df_pinned = optimization.df_pre_result
+    if df_pinned is None or df_pinned.empty:
+        df_pinned = pd.DataFrame(columns=['Item', 'Time', 'Qty'])
+    pinned_time = pd.to_numeric(df_pinned['Time'])
+    # 결과의 MFG / SOP / Due_LT 는 구간 수요가 아니라 전체 수요와 전체 계획 기간 기준
+    attributes = {'last': optimization.item_attributes()}
+
+    committed, infos = [], []
+    columns = None
+    warm_start = None
+    job = optimization.solve_job
+    for i, (span, commit) in enumerate(windows):
+        if job is not None and job.cancelled:
+            print("최적화가 취소되어 남은 구간을 풀지 않습니다")
+            break
+
+        # 구간 뒤에 고정된 생산량은 남겨 두고, 나머지 수요만 이 구간에서 생산 가능
+        pinned_after = df_pinned[pinned_time > span[-1]].groupby('Item')['Qty'].sum()
+        window_demand = (remaining - pinned_after.reindex(remaining.index, fill_value=0)).clip(lower=0)
+        sub = copy.copy(optimization)
+        sub.time = list(span)
+        sub.df_demand = df_demand.assign(MFG=df_demand['Item'].map(window_demand).to_numpy())
+        sub.df_demand = sub.df_demand[sub.df_demand['MFG'] > 0].reset_index(drop=True)
+        sub.df_pre_result = df_pinned[pinned_time.isin(span)].reset_index(drop=True)
+        sub._item_attributes = dict(attributes)
+
+        print(f"[구간 {i + 1}/{len(windows)}] 시프트 {span[0]}~{span[-1]} (확정 {commit[0]}~{commit[-1]}), 아이템 {len(sub.df_demand)}개")
+        # 남은 시간을 남은 구간 수로 나눠서 사용
+        window_limit = None
+        if time_limit is not None:
+            window_limit = max(1, int((time_limit - (time.time() - start)) / (len(windows) - i)))
+        result = sub.execute(time_limit=window_limit, warm_start=warm_start)
+        info = result.get('solve_info') or {}
+        columns = result['result'].columns
+        infos.append({'window': (span[0], span[-1]), 'commit': (commit[0], commit[-1]), **info})
+
+        if info.get('has_solution'):
+            df_window = result['result']
+        else:
+            # 해가 없으면 이 구간은 고정 생산만 확정하고 넘어감
+            print(f"[구간 {i + 1}] 해를 찾지 못해 고정 생산만 확정합니다")
+            df_window = sub.df_pre_result.reindex(columns=columns)
+        window_time = pd.to_numeric(df_window['Time'])
+        df_commit = df_window[window_time.isin(commit)]
+        committed.append(df_commit)
+        remaining = remaining.sub(df_commit.groupby('Item')['Qty'].sum(), fill_value=0)
+        # 확정하지 않은 겹치는 부분은 다음 구간의 초기해로 사용
+        warm_start = df_window[~window_time.isin(commit)]
+
+    skipped = [(span[0], span[-1]) for span, commit in windows[len(infos):]]
+    if skipped:
+        print(f"⚠️ 구간 {len(skipped)}개(시프트 {skipped[0][0]}~{skipped[-1][1]})를 풀지 못해 그 기간의 계획이 비어 있습니다")
+
+    committed = [df for df in committed if not df.empty]
+    df_result = pd.concat(committed, ignore_index=True) if committed else pd.DataFrame(columns=columns)
+    optimization.df_result = df_result
+
+    solved = [info for info in infos if info.get('has_solution')]
+    solve_info = {
+        'status': 'Optimal' if solved and all(info['status'] == 'Optimal' for info in solved) else (infos[0].get('status') if infos else 'Not Solved'),
+        'solution_status': 'Rolling Horizon',
+        'has_solution': bool(solved),
+        'objective': float(df_result['Qty'].sum()) if not df_result.empty else 0.0,
+        'time_limit_reached': any(info.get('time_limit_reached') for info in infos),
+        'time_limit': time_limit,
+        'solve_time': time.time() - start,
+        'num_variables': max((info.get('num_variables', 0) for info in infos), default=0),
+        'num_constraints': max((info.get('num_constraints', 0) for info in infos), default=0),
+        'backend': solved[0].get('backend') if solved else None,
+        'windows': infos,
+        'skipped_windows': skipped,
+        'cancelled': job is not None and job.cancelled,
+    }
+    print(f"롤링 호라이즌 완료: 총 생산량 {solve_info['objective']:,.0f}, {solve_info['solve_time']:.1f}초")
+    return {'result': df_result, 'combined': optimization.df_combined, 'solve_info': solve_info}
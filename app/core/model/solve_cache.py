@@ -0,0 +1,206 @@
+import os
+import json
+import contextlib
+import time
+import hashlib
+import pandas as pd
+import pulp
+
+from app.models.common.settings_store import SettingsStore
+from app.core.model.mip_start import set_mip_start
+
+"""
+최적화 모델 / 결과 디스크 캐시
+
+입력 데이터프레임 해시를 키로
+- 모델 키  : 입력 데이터 + 단계(pre_assign / execute) + 단계 파라미터  -> 만든 모델(MPS) 과 변수 이름표
+- 결과 키  : 모델 키 + 설정값(솔버, 제한 시간, 옵션) + 직접 준 초기해  -> 풀이 결과 데이터프레임과 솔버 메타데이터
+를 저장한다. 입력과 설정이 모두 같으면 결과를 바로 돌려주고,
+설정만 바뀌었으면 저장된 모델을 읽어서 모델 구성 없이 바로 푼다. (초기해는 MPS 에 저장되지 않으므로 풀기 전에 다시 넣음)
+용량이 max_mb 를 넘으면 가장 오래 사용하지 않은 항목부터 지운다 (LRU, 파일 수정 시간 기준).
+
+주의: 모델 구성에 영향을 주는 설정이 생기면 그 설정은 결과 키가 아니라 모델 키에 넣어야 한다.
+"""
+
+# 결과 키에서 제외하는 설정 (파일 경로는 결과에 영향이 없음)
+CACHE_IGNORED_SETTINGS = {'op_InputRoute', 'op_SavingRoute', 'solve_cache_ox', 'solve_cache_mb'}
+
+"""
+데이터프레임을 정규화해서 해시 (인덱스 제외, 컬럼 이름 / 타입 / 값 기준)
+"""
+def _frame_digest(df):
+    df = df.reset_index(drop=True)
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    digest.update(json.dumps([str(t) for t in df.dtypes]).encode())
+    try:
+        values = pd.util.hash_pandas_object(df, index=False).values
+    except TypeError:
+        # 한 컬럼에 여러 타입이 섞여 있으면 문자열로 바꿔서 해시
+        values = pd.util.hash_pandas_object(df.astype(str), index=False).values
+    digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+"""
+딕셔너리 / 데이터프레임 / 일반 값이 섞인 구조를 안정적인 문자열로 변환 (키 정렬)
+"""
+def _normalize(value):
+    if isinstance(value, pd.DataFrame):
+        return {'__frame__': _frame_digest(value)}
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple, set)):
+        items = [_normalize(v) for v in value]
+        return sorted(items, key=str) if isinstance(value, set) else items
+    return value
+
+
+class SolveCache:
+    """
+    Args:
+        cache_dir (str): 캐시 폴더. 기본값 cache/solve
+        max_mb (int): 최대 용량(MB). 기본값은 설정값(solve_cache_mb)
+    """
+    def __init__(self, cache_dir=None, max_mb=None):
+        self.cache_dir = cache_dir or os.path.join('cache', 'solve')
+        self.max_bytes = int(max_mb or SettingsStore.get('solve_cache_mb', 512)) * 1024 * 1024
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    """
+    값들을 묶어서 캐시 키(sha256) 생성
+    """
+    @staticmethod
+    def make_key(*parts):
+        payload = json.dumps([_normalize(part) for part in parts], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    """
+    결과 키에 들어갈 설정값
+    """
+    @staticmethod
+    def settings_snapshot():
+        return {k: v for k, v in SettingsStore.get_all().items() if k not in CACHE_IGNORED_SETTINGS}
+
+    def _path(self, key, suffix):
+        return os.path.join(self.cache_dir, f"{key}{suffix}")
+
+    def _touch(self, *paths):
+        now = time.time()
+        for path in paths:
+            if os.path.exists(path):
+                os.utime(path, (now, now))
+
+    """
+    저장된 풀이 결과 조회. 없으면 None
+
+    Returns:
+        dict: {'result': DataFrame, 'solve_info': dict}
+    """
+    def get_result(self, key):
+        result_path, info_path = self._path(key, '.result.pkl'), self._path(key, '.info.json')
+        if not (os.path.exists(result_path) and os.path.exists(info_path)):
+            return None
+        try:
+            df = pd.read_pickle(result_path)
+            with open(info_path, 'r', encoding='utf-8') as f:
+                solve_info = json.load(f)
+        except Exception as e:
+            print(f"캐시 결과를 읽지 못했습니다 ({key[:12]}): {e}")
+            return None
+        self._touch(result_path, info_path)
+        return {'result': df, 'solve_info': solve_info}
+
+    """
+    풀이 결과 저장
+    """
+    def put_result(self, key, df, solve_info):
+        df.to_pickle(self._path(key, '.result.pkl'))
+        with open(self._path(key, '.info.json'), 'w', encoding='utf-8') as f:
+            json.dump(solve_info, f, ensure_ascii=False, default=str)
+        self.evict()
+
+    def has_model(self, key):
+        return os.path.exists(self._path(key, '.mps')) and os.path.exists(self._path(key, '.vars.json'))
+
+    """
+    만든 모델 저장
+
+    Args:
+        model (LpProblem): 풀기 전 모델
+        variables (dict): 결과 추출에 쓰는 (아이템, 라인, 시프트) -> 변수
+        line_variables (dict): (라인, 시프트) -> 가동 여부 변수. 다시 풀 때 MIP start 를 넣기 위해 저장
+    """
+    def put_model(self, key, model, variables, line_variables=None):
+        model.writeMPS(self._path(key, '.mps'))
+        with open(self._path(key, '.vars.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'sense': model.sense,
+                'variables': [[m, l, int(s), var.name] for (m, l, s), var in variables.items()],
+                'line_variables': [[l, int(s), var.name] for (l, s), var in (line_variables or {}).items()],
+            }, f, ensure_ascii=False)
+        self.evict()
+
+    """
+    저장된 모델을 읽어서 풀이 (모델 구성 생략)
+
+    Args:
+        warm_start (DataFrame): 초기해(MIP start)로 사용할 계획 (Item, Line, Time, Qty).
+                                MPS 파일에는 변수 초기값이 저장되지 않으므로 읽은 변수에 다시 넣는다
+        progress (callable): 풀이 진행 상황 콜백
+        job (SolveJob): 풀이를 취소할 수 있게 솔버 프로세스를 등록할 작업
+
+    Returns:
+        dict: {'values': {(아이템, 라인, 시프트): 생산량}, 'solve_info': dict}
+    """
+    def solve_model(self, key, time_limit=None, backend=None, warm_start=None, progress=None, job=None):
+        from app.core.optimization import solve_model
+
+        mps_path, vars_path = self._path(key, '.mps'), self._path(key, '.vars.json')
+        with open(vars_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        variables, model = pulp.LpProblem.fromMPS(mps_path, sense=meta['sense'])
+        self._touch(mps_path, vars_path)
+        x = {(m, l, s): variables[name] for m, l, s, name in meta['variables'] if name in variables}
+        y = {(l, s): variables[name] for l, s, name in meta.get('line_variables', []) if name in variables}
+
+        warm_start_rows = 0
+        if warm_start is not None and not warm_start.empty:
+            warm_start_rows = set_mip_start(x, y, warm_start)
+        solve_info = solve_model(model, time_limit, backend, warm_start=warm_start_rows > 0, progress=progress, job=job)
+        solve_info['warm_start_rows'] = warm_start_rows
+        values = {}
+        if solve_info['has_solution']:
+            for (m, l, s), var in x.items():
+                if var.varValue is not None:
+                    values[(m, l, s)] = int(round(var.varValue))
+        return {'values': values, 'solve_info': solve_info}
+
+    """
+    캐시 용량이 최대치를 넘으면 가장 오래 사용하지 않은 항목(키 단위)부터 삭제
+    """
+    def evict(self):
+        entries = {}
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if not os.path.isfile(path):
+                continue
+            key = name.split('.', 1)[0]
+            size, last_used = entries.get(key, (0, 0))
+            entries[key] = (size + stat.st_size, max(last_used, stat.st_mtime))
+
+        total = sum(size for size, last_used in entries.values())
+        for key, (size, last_used) in sorted(entries.items(), key=lambda kv: kv[1][1]):
+            if total <= self.max_bytes:
+                break
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(key + '.'):
+                    # 여러 프로세스가 같은 캐시를 쓰면 다른 프로세스가 먼저 지웠을 수 있음
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+            print(f"캐시 항목 삭제 (LRU): {key[:12]}")
@@ -0,0 +1,167 @@
+import os
+import signal
+import subprocess
+import threading
+import uuid
+
+"""
+최적화 작업(job) 단위 취소
+
+작업마다 SolveJob 을 하나 만들고, 풀이 중에 띄운 자식 프로세스(CBC, HiGHS 풀이 프로세스, 프로세스 풀 작업자)를 등록한다.
+cancel() 을 부르면 등록된 프로세스를 바로 멈춘다.
+- CBC (subprocess.Popen) : SIGINT 를 보내면 탐색을 멈추고 그때까지의 최선해(incumbent)를 해 파일에 쓰고 종료하므로
+                           stop_grace 초 동안 기다렸다가 그래도 살아 있으면 강제 종료
+                           (Windows 에는 자식 프로세스에 보낼 SIGINT 가 없어서 바로 강제 종료, 최선해 없음)
+- 그 밖의 프로세스 (multiprocessing) : 바로 terminate
+취소 이후에 새로 띄우는 프로세스는 시작하자마자 같은 방식으로 멈춘다.
+
+사용 예)
+    with SolveJob('pre_assign') as job:
+        Optimization(input, solve_job=job).pre_assign(...)
+"""
+class SolveJob:
+    # 실행 중인 작업 {job_id: SolveJob}
+    _active = {}
+    _active_lock = threading.Lock()
+
+    def __init__(self, name='optimization', stop_grace=2.0):
+        self.job_id = uuid.uuid4().hex[:8]
+        self.name = name
+        self.stop_grace = stop_grace
+        self.cancelled = False
+        self._processes = []
+        self._cancel_callbacks = []
+        self._lock = threading.Lock()
+        with SolveJob._active_lock:
+            SolveJob._active[self.job_id] = self
+
+    def __repr__(self):
+        return f"SolveJob({self.name}, {self.job_id}{', cancelled' if self.cancelled else ''})"
+
+    """
+    작업에 속한 자식 프로세스 실행 (subprocess.Popen 과 같은 인자)
+    """
+    def popen(self, args, **kwargs):
+        process = subprocess.Popen(args, **kwargs)
+        self.track(process)
+        return process
+
+    """
+    자식 프로세스 등록. 이미 취소된 작업이면 바로 멈춤
+    """
+    def track(self, process):
+        with self._lock:
+            self._processes.append(process)
+            cancelled = self.cancelled
+        if cancelled:
+            self._stop(process)
+        return process
+
+    def untrack(self, process):
+        with self._lock:
+            if process in self._processes:
+                self._processes.remove(process)
+
+    """
+    취소할 때 실행할 함수 등록 (프로세스 풀 종료 등)
+    """
+    def on_cancel(self, callback):
+        with self._lock:
+            self._cancel_callbacks.append(callback)
+            cancelled = self.cancelled
+        if cancelled:
+            callback()
+
+    """
+    on_cancel 로 등록한 함수 해제 (함수가 멈추는 대상이 이미 끝난 뒤에 취소해도 실행되지 않도록)
+    """
+    def off_cancel(self, callback):
+        with self._lock:
+            if callback in self._cancel_callbacks:
+                self._cancel_callbacks.remove(callback)
+
+    """
+    작업 취소. 자식 프로세스를 멈추고 바로 반환 (강제 종료는 백그라운드에서 기다렸다가 수행)
+    """
+    def cancel(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            processes = list(self._processes)
+            callbacks = list(self._cancel_callbacks)
+        print(f"최적화 작업 취소: {self.name} ({self.job_id}), 프로세스 {len(processes)}개 종료")
+        for process in processes:
+            self._stop(process)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"작업 취소 처리 오류: {e}")
+
+    def _stop(self, process):
+        if not isinstance(process, subprocess.Popen):
+            if process.is_alive():
+                process.terminate()
+            return
+        if process.poll() is not None:
+            return
+        if os.name == 'nt':
+            process.kill()
+            return
+        process.send_signal(signal.SIGINT)
+
+        def kill_after_grace():
+            try:
+                process.wait(timeout=self.stop_grace)
+            except subprocess.TimeoutExpired:
+                print(f"솔버가 {self.stop_grace}초 안에 멈추지 않아 강제 종료합니다 (pid {process.pid})")
+                process.kill()
+        threading.Thread(target=kill_after_grace, daemon=True).start()
+
+    """
+    작업 종료. 남아 있는 자식 프로세스가 있으면 정리하고 실행 중 목록에서 제거
+    """
+    def close(self):
+        with self._lock:
+            processes = list(self._processes)
+            self._processes.clear()
+        for process in processes:
+            alive = process.poll() is None if isinstance(process, subprocess.Popen) else process.is_alive()
+            if alive:
+                process.kill()
+        with SolveJob._active_lock:
+            SolveJob._active.pop(self.job_id, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    """
+    실행 중인 작업 목록
+    """
+    @classmethod
+    def active_jobs(cls):
+        with cls._active_lock:
+            return list(cls._active.values())
+
+    """
+    실행 중인 모든 작업 취소 (프로그램 종료 시 등)
+    """
+    @classmethod
+    def cancel_all(cls):
+        for job in cls.active_jobs():
+            job.cancel()
+
+
+"""
+프로세스 풀 작업자에서 사용: 부모가 작업자를 종료(terminate)하면 이 작업의 솔버 프로세스도 함께 멈추도록 함
+(Windows 의 terminate 는 핸들러 없이 바로 종료되어 CBC 는 제한 시간까지 남음)
+"""
+def cancel_on_terminate(job):
+    if os.name != 'nt':
+        signal.signal(signal.SIGTERM, lambda signum, frame: (job.cancel(), os._exit(1)))
+    return job
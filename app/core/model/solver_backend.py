@@ -0,0 +1,322 @@
+import os
+import re
+import subprocess
+import tempfile
+import multiprocessing
+import time
+import numpy as np
+import pulp
+from scipy.optimize import milp, LinearConstraint, Bounds
+from scipy.sparse import csr_array
+
+from app.models.common.settings_store import SettingsStore
+from .solver_progress import SolveProgressMonitor
+
+"""
+솔버 백엔드
+
+pulp 로 만든 모델(LpProblem)을 그대로 받아서
+- cbc  : pulp 기본 CBC 호출
+- highs: 모델을 희소 행렬로 변환해 scipy.optimize.milp (HiGHS) 로 직접 풀이
+둘 중 설정(solver_backend)에 맞는 솔버로 푼다.
+어느 백엔드로 풀어도 풀이 후에는 변수 값(varValue)과 model.status / model.sol_status 가
+pulp 로 푼 것과 같은 형태로 채워지므로, 결과 추출 코드는 그대로 사용한다.
+"""
+class SolverBackend:
+    name = None
+
+    """
+    모델 풀이
+
+    Args:
+        model (LpProblem): 풀이할 모델
+        time_limit (int): 제한 시간(초). None 이면 제한 없음
+        msg (bool): 솔버 로그 출력 여부
+        warm_start (bool): 변수에 설정된 초기값(setInitialValue)을 MIP start 로 사용할지 여부
+        progress (callable): 진행 상황 콜백 progress(event). 이벤트 형식은 solver_progress 참고
+        job (SolveJob): 취소할 수 있도록 솔버 프로세스를 등록할 작업. None 이면 취소 불가
+
+    Returns:
+        dict: 백엔드별 추가 메타데이터 (변환 시간, 첫 해 발견 시간 등)
+    """
+    def solve(self, model, time_limit=None, msg=True, warm_start=False, progress=None, job=None):
+        raise NotImplementedError
+
+
+# CBC 로그에서 해를 찾은 시점: "Integer solution of -13367 found by ... (0.21 seconds)"
+CBC_INCUMBENT_PATTERN = re.compile(r"solution of (?:cost )?-?[\d.e+]+ found by .*?\((\d+(?:\.\d+)?) seconds\)")
+
+"""
+CBC 로그에서 첫 번째 incumbent(정수해)를 찾은 시간(초)을 반환. 찾지 못하면 None
+"""
+def parse_first_incumbent_time(log):
+    match = CBC_INCUMBENT_PATTERN.search(log)
+    return float(match.group(1)) if match else None
+
+
+# CBC 가 최적성 증명 전에 멈췄을 때 요약의 최선 한계: "Upper bound:  7524.047" (최소화 문제는 Lower bound)
+CBC_BOUND_PATTERN = re.compile(r"^(?:Lower|Upper) bound:\s+(-?[\d.e+]+)", re.MULTILINE)
+
+"""
+CBC 로그 요약에서 최선 한계(bound)를 반환. 최적해로 끝났거나 찾지 못하면 None
+"""
+def parse_final_bound(log):
+    match = CBC_BOUND_PATTERN.search(log)
+    return abs(float(match.group(1))) if match else None
+
+
+"""
+초기값이 있는 변수만 MIP start 파일에 쓰는 CBC 호출
+(pulp 기본 동작은 초기값이 없는 변수를 0 으로 채워서, 일부만 주어진 초기해가 실행 불가능해짐.
+ 값이 없는 변수는 CBC 가 나머지를 채워서 완성한다)
+
+job 이 주어지면 CBC 프로세스를 작업에 등록해서 취소할 수 있게 한다.
+취소로 멈춘 CBC 가 해 파일을 남기면 그 최선해(incumbent)를 그대로 읽는다.
+"""
+class PartialStartCbcCmd(pulp.PULP_CBC_CMD):
+    def __init__(self, *args, job=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.job = job
+
+    def writesol(self, filename, lp, vs, variablesNames, constraintsNames):
+        given = {v.name for v in vs if v.value() is not None}
+        variablesNames = {k: v for k, v in variablesNames.items() if k in given}
+        return super().writesol(filename, lp, [v for v in vs if v.name in given], variablesNames, constraintsNames)
+
+    """
+    pulp COIN_CMD.solve_CBC 와 같은 명령으로 CBC 를 실행하되 프로세스를 작업(job)에 등록 (MPS 입력만 사용)
+    """
+    def solve_CBC(self, lp, use_mps=True):
+        if self.job is None:
+            return super().solve_CBC(lp, use_mps)
+
+        tmpMps, tmpSol, tmpMst = self.create_tmp_files(lp.name, "mps", "sol", "mst")
+        vs, variablesNames, constraintsNames, objectiveName = lp.writeMPS(tmpMps, rename=1)
+        args = [self.path, tmpMps]
+        if lp.sense == pulp.LpMaximize:
+            args.append("-max")
+        if self.optionsDict.get("warmStart", False):
+            self.writesol(tmpMst, lp, vs, variablesNames, constraintsNames)
+            args += ["-mips", tmpMst]
+        if self.timeLimit is not None:
+            args += ["-sec", str(self.timeLimit)]
+        for option in self.options + self.getOptions():
+            args += ("-" + option).split()
+        args += ["-solve" if self.mip else "-initialSolve", "-printingOptions", "all", "-solution", tmpSol]
+
+        popen_kwargs = {}
+        if os.name == "nt":
+            # GUI 에서 실행할 때 콘솔 창이 뜨지 않도록 함
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            popen_kwargs["startupinfo"] = startupinfo
+
+        log_path = self.optionsDict.get("logPath") or os.devnull
+        with open(log_path, "w") as pipe:
+            cbc = self.job.popen(args, stdout=pipe, stderr=pipe, stdin=subprocess.DEVNULL, **popen_kwargs)
+            returncode = cbc.wait()
+        self.job.untrack(cbc)
+
+        if not os.path.exists(tmpSol) or (returncode != 0 and not self.job.cancelled):
+            self.delete_tmp_files(tmpMps, tmpSol, tmpMst)
+            if self.job.cancelled:
+                # 해를 쓰기 전에 강제 종료된 경우
+                lp.assignStatus(pulp.LpStatusNotSolved, pulp.LpSolutionNoSolutionFound)
+                return lp.status
+            raise pulp.PulpSolverError(f"Pulp: Error while executing {self.path} (exit code {returncode})")
+
+        status, values, reducedCosts, shadowPrices, slacks, sol_status = self.readsol_MPS(
+            tmpSol, lp, vs, variablesNames, constraintsNames)
+        lp.assignVarsVals(values)
+        lp.assignVarsDj(reducedCosts)
+        lp.assignConsPi(shadowPrices)
+        lp.assignConsSlack(slacks, activity=True)
+        lp.assignStatus(status, sol_status)
+        self.delete_tmp_files(tmpMps, tmpSol, tmpMst)
+        return status
+
+
+class PulpCbcBackend(SolverBackend):
+    name = 'cbc'
+
+    def solve(self, model, time_limit=None, msg=True, warm_start=False, progress=None, job=None):
+        # 첫 해 발견 시간을 알기 위해 로그를 임시 파일로 받아서 읽는다 (logPath 를 쓰면 화면 출력은 꺼짐)
+        fd, log_path = tempfile.mkstemp(suffix='-cbc.log')
+        os.close(fd)
+        try:
+            solver = PartialStartCbcCmd(timeLimit=time_limit, msg=False, warmStart=warm_start, logPath=log_path, job=job)
+            if progress is None:
+                model.solve(solver)
+            else:
+                # 풀이 중에 기록되는 로그를 읽어서 presolve / 루트 LP / incumbent / 갭 을 전달
+                with SolveProgressMonitor(progress, time_limit, log_path):
+                    model.solve(solver)
+            with open(log_path, encoding='utf-8', errors='ignore') as f:
+                log = f.read()
+        finally:
+            os.remove(log_path)
+
+        if msg:
+            print(log)
+        return {'warm_start': warm_start, 'first_incumbent_time': parse_first_incumbent_time(log), 'bound': parse_final_bound(log)}
+
+
+class HighsBackend(SolverBackend):
+    name = 'highs'
+
+    """
+    LpProblem -> (c, A, 제약 하한/상한, 변수 하한/상한, 정수 여부) 희소 행렬 형태로 변환
+    milp 는 최소화만 지원하므로 최대화 문제는 목적함수 부호를 바꾼다
+    """
+    @staticmethod
+    def to_matrices(model):
+        variables = model.variables()
+        index = {var.name: i for i, var in enumerate(variables)}
+
+        sense = 1 if model.sense == pulp.LpMinimize else -1
+        c = np.zeros(len(variables))
+        if model.objective is not None:
+            for var, coef in model.objective.items():
+                c[index[var.name]] = sense * coef
+
+        rows, cols, vals = [], [], []
+        row_lb, row_ub = [], []
+        for i, constraint in enumerate(model.constraints.values()):
+            for var, coef in constraint.items():
+                rows.append(i)
+                cols.append(index[var.name])
+                vals.append(coef)
+            # pulp 제약은 (좌변 + constant) sense 0 형태로 저장되어 있다
+            rhs = -constraint.constant
+            row_lb.append(-np.inf if constraint.sense == pulp.LpConstraintLE else rhs)
+            row_ub.append(np.inf if constraint.sense == pulp.LpConstraintGE else rhs)
+        A = csr_array((vals, (rows, cols)), shape=(len(row_lb), len(variables)))
+
+        lower = np.array([-np.inf if var.lowBound is None else var.lowBound for var in variables], dtype=float)
+        upper = np.array([np.inf if var.upBound is None else var.upBound for var in variables], dtype=float)
+        integrality = np.array([1 if var.cat == pulp.LpInteger else 0 for var in variables])
+
+        return variables, c, A, np.array(row_lb, dtype=float), np.array(row_ub, dtype=float), lower, upper, integrality
+
+    def solve(self, model, time_limit=None, msg=True, warm_start=False, progress=None, job=None):
+        # scipy milp 는 MIP start 를 지원하지 않으므로 초기값은 무시하고 cold start 로 푼다
+        if warm_start:
+            print("highs 백엔드는 warm start 를 지원하지 않아 초기값 없이 풉니다")
+        start = time.time()
+        variables, c, A, row_lb, row_ub, lower, upper, integrality = self.to_matrices(model)
+        convert_time = time.time() - start
+
+        options = {'disp': bool(msg)}
+        if time_limit is not None:
+            options['time_limit'] = time_limit
+        constraints = [LinearConstraint(A, row_lb, row_ub)] if A.shape[0] > 0 else []
+
+        milp_args = (c, constraints, integrality, Bounds(lower, upper), options)
+        run = (lambda: self._milp_in_child(milp_args, job)) if job is not None else (lambda: _run_milp(*milp_args))
+        if progress is None:
+            res = run()
+        else:
+            # scipy milp 는 풀이 중 콜백이 없어서 경과 시간 알림과 종료 시 결과만 전달
+            with SolveProgressMonitor(progress, time_limit) as monitor:
+                res = run()
+                gap = getattr(res, 'mip_gap', None)
+                monitor.emit({
+                    'phase': 'done',
+                    'message': f'Solver finished: {res.message}',
+                    'objective': abs(res.fun) if res.fun is not None else None,
+                    'gap': gap * 100 if gap is not None else None,
+                })
+
+        if res is None:
+            # 풀이 프로세스가 취소로 종료됨 (HiGHS 는 중간 최선해를 돌려주지 않음)
+            model.assignStatus(pulp.LpStatusNotSolved, pulp.LpSolutionNoSolutionFound)
+            return {'convert_time': convert_time, 'mip_gap': None, 'warm_start': False, 'first_incumbent_time': None}
+
+        # scipy milp 상태 -> pulp 상태. 제한 시간에 걸려도 incumbent 가 있으면 CBC 와 같이 (Optimal, IntegerFeasible) 로 표시
+        if res.status == 0:
+            model.assignStatus(pulp.LpStatusOptimal, pulp.LpSolutionOptimal)
+        elif res.status == 1 and res.x is not None:
+            model.assignStatus(pulp.LpStatusOptimal, pulp.LpSolutionIntegerFeasible)
+        elif res.status == 1:
+            model.assignStatus(pulp.LpStatusNotSolved, pulp.LpSolutionNoSolutionFound)
+        elif res.status == 2:
+            model.assignStatus(pulp.LpStatusInfeasible, pulp.LpSolutionInfeasible)
+        elif res.status == 3:
+            model.assignStatus(pulp.LpStatusUnbounded, pulp.LpSolutionUnbounded)
+        else:
+            model.assignStatus(pulp.LpStatusUndefined, pulp.LpSolutionNoSolutionFound)
+
+        if res.x is not None:
+            # 정수 변수는 반올림 (int() 절사 시 4.9999 -> 4 가 되는 것을 방지)
+            values = np.where(integrality == 1, np.round(res.x), res.x)
+            for var, value in zip(variables, values):
+                var.varValue = float(value)
+
+        # milp 는 최소화로 풀었으므로 한계도 부호를 떼고 사용
+        bound = getattr(res, 'mip_dual_bound', None)
+        return {'convert_time': convert_time, 'mip_gap': getattr(res, 'mip_gap', None), 'warm_start': False, 'first_incumbent_time': None,
+                'bound': abs(bound) if bound is not None and np.isfinite(bound) else None}
+
+
+    """
+    milp 를 자식 프로세스에서 실행 (scipy milp 는 중간에 멈출 수 없으므로 프로세스째 종료해서 취소)
+
+    Returns:
+        OptimizeResult: 풀이 결과. 취소로 종료되면 None
+    """
+    @staticmethod
+    def _milp_in_child(milp_args, job):
+        context = multiprocessing.get_context('spawn')
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_milp_worker, args=(sender, milp_args), daemon=True)
+        process.start()
+        sender.close()
+        job.track(process)
+        try:
+            res = receiver.recv()
+        except EOFError:
+            res = None
+        finally:
+            process.join()
+            job.untrack(process)
+        if isinstance(res, Exception):
+            raise res
+        return res
+
+
+def _run_milp(c, constraints, integrality, bounds, options):
+    return milp(c, constraints=constraints, integrality=integrality, bounds=bounds, options=options)
+
+
+"""
+HiGHS 풀이 프로세스 작업 함수. 결과(또는 예외)를 파이프로 돌려줌
+"""
+def _milp_worker(conn, milp_args):
+    try:
+        conn.send(_run_milp(*milp_args))
+    except Exception as e:
+        conn.send(e)
+    finally:
+        conn.close()
+
+
+SOLVER_BACKENDS = {
+    PulpCbcBackend.name: PulpCbcBackend,
+    HighsBackend.name: HighsBackend,
+}
+
+"""
+솔버 백엔드 조회
+
+Args:
+    name (str): 'cbc' 또는 'highs'. None 이면 설정값(solver_backend) 사용
+
+Returns:
+    SolverBackend: 솔버 백엔드 객체
+"""
+def get_backend(name=None):
+    name = name or SettingsStore.get('solver_backend', 'cbc')
+    if name not in SOLVER_BACKENDS:
+        print(f"알 수 없는 솔버 백엔드 '{name}' 입니다. cbc 를 사용합니다")
+        name = PulpCbcBackend.name
+    return SOLVER_BACKENDS[name]()
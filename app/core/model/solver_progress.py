@@ -0,0 +1,188 @@
+import os
+import re
+import time
+import threading
+
+"""
+솔버 진행 상황 전달
+
+풀이 중 진행 상황을 콜백 callback(event) 으로 전달한다. event 는 아래 키를 갖는 dict
+- phase    : 'build'(모델 구성) / 'start'(솔버 시작) / 'presolve' / 'root_lp'(루트 LP 완료)
+             / 'incumbent'(정수해 발견) / 'search'(분기 탐색 중 갭 갱신) / 'solving'(경과 시간 알림) / 'done'
+- message  : 화면 표시용 문구
+- elapsed  : 솔버 시작 후 경과 시간(초)
+- time_limit : 제한 시간(초). 없으면 None
+- objective / bound / gap : 현재 최선해 / 최선 한계 / 갭(%) (알 수 있을 때만)
+- floor    : 지금까지 지난 단계 중 가장 높은 최소 진행률 (SolveProgressMonitor 가 채움)
+
+CBC 는 로그를 파일로 받을 때 출력 버퍼가 찰 때마다 기록하므로,
+로그 줄은 기록되는 대로 읽어서 전달하고 그 사이에는 경과 시간 알림(solving)을 1초마다 보낸다.
+"""
+
+# 단계별 최소 진행률 (0~1). 그 뒤로는 제한 시간 대비 경과 시간으로 채운다
+PHASE_FLOOR = {
+    'build': 0.0,
+    'start': 0.05,
+    'presolve': 0.1,
+    'root_lp': 0.2,
+    'incumbent': 0.3,
+    'search': 0.3,
+    'solving': 0.05,
+    'done': 1.0,
+}
+
+CBC_PRESOLVE_PATTERN = re.compile(r"^(?:Presolve \d+ \(|Cgl0004I processed model has)")
+CBC_ROOT_LP_PATTERN = re.compile(r"^Continuous objective value is (\S+) - ([\d.]+) seconds")
+CBC_ROOT_CUTS_PATTERN = re.compile(r"^Cbc0013I At root node, .* objective from \S+ to (\S+)")
+CBC_SOLUTION_PATTERN = re.compile(r"solution of (?:cost )?(-?[\d.e+]+) found by .*?\(([\d.]+) seconds\)")
+CBC_NODE_PATTERN = re.compile(r"^Cbc0010I After (\d+) nodes, \d+ on tree, (\S+) best solution, best possible (\S+) \(([\d.]+) seconds\)")
+CBC_RESULT_PATTERN = re.compile(r"^Result - (.*)")
+
+# CBC 는 해가 없을 때 최선해를 1e+50 으로 표시
+CBC_NO_SOLUTION = 1e49
+
+"""
+최선해와 한계로 상대 갭(%) 계산. 계산할 수 없으면 None
+"""
+def relative_gap(objective, bound):
+    if objective is None or bound is None or abs(objective) >= CBC_NO_SOLUTION:
+        return None
+    return abs(objective - bound) / max(abs(objective), 1e-9) * 100
+
+
+"""
+CBC 로그 한 줄을 진행 이벤트로 변환. 진행 상황과 관계없는 줄이면 None
+(CBC 는 최대화 문제도 최소화로 바꿔 풀기 때문에 로그의 목적함수 값은 부호를 떼고 표시)
+"""
+def parse_cbc_line(line):
+    line = line.strip()
+    if CBC_PRESOLVE_PATTERN.search(line):
+        return {'phase': 'presolve', 'message': 'Presolving the model...'}
+
+    match = CBC_ROOT_LP_PATTERN.search(line)
+    if match:
+        bound = abs(float(match.group(1)))
+        return {'phase': 'root_lp', 'message': f'Root LP solved (bound {bound:,.0f})', 'bound': bound}
+
+    match = CBC_ROOT_CUTS_PATTERN.search(line)
+    if match:
+        bound = abs(float(match.group(1)))
+        return {'phase': 'root_lp', 'message': f'Root cuts applied (bound {bound:,.0f})', 'bound': bound}
+
+    match = CBC_SOLUTION_PATTERN.search(line)
+    if match:
+        objective = abs(float(match.group(1)))
+        return {'phase': 'incumbent', 'message': f'Incumbent found (objective {objective:,.0f})', 'objective': objective}
+
+    match = CBC_NODE_PATTERN.search(line)
+    if match:
+        objective, bound = abs(float(match.group(2))), abs(float(match.group(3)))
+        gap = relative_gap(objective, bound)
+        if gap is None:
+            return {'phase': 'search', 'message': f'Searching {match.group(1)} nodes, no incumbent yet', 'bound': bound}
+        return {'phase': 'search', 'message': f'Searching {match.group(1)} nodes, gap {gap:.2f}%',
+                'objective': objective, 'bound': bound, 'gap': gap}
+
+    match = CBC_RESULT_PATTERN.search(line)
+    if match:
+        return {'phase': 'done', 'message': f'Solver finished: {match.group(1)}'}
+    return None
+
+
+"""
+이벤트를 진행률(%)로 변환
+
+Args:
+    event (dict): 진행 이벤트
+    start (int): 이 단계가 차지하는 진행률 구간 시작(%)
+    end (int): 구간 끝(%)
+"""
+def progress_percent(event, start=0, end=100):
+    # 경과 시간 알림(solving)이 앞 단계보다 낮은 진행률로 되돌아가지 않도록 지난 단계의 최소 진행률 유지
+    fraction = max(PHASE_FLOOR.get(event.get('phase'), 0.0), event.get('floor', 0.0))
+    time_limit = event.get('time_limit')
+    if event.get('phase') != 'done' and time_limit:
+        fraction = max(fraction, min(0.95, event.get('elapsed', 0) / time_limit))
+    return int(start + (end - start) * fraction)
+
+
+"""
+풀이 중 진행 상황 감시
+
+로그 파일(log_path)이 주어지면 새로 기록된 줄을 parse_line 으로 변환해서 전달하고,
+interval 초마다 경과 시간 알림을 보낸다. with 문으로 사용하며 끝날 때 남은 로그까지 읽는다.
+"""
+class SolveProgressMonitor:
+    def __init__(self, callback, time_limit=None, log_path=None, parse_line=parse_cbc_line, interval=1.0):
+        self.callback = callback
+        self.time_limit = time_limit
+        self.log_path = log_path
+        self.parse_line = parse_line
+        self.interval = interval
+        self.objective = None
+        self.bound = None
+        self.floor = 0.0
+        self._offset = 0
+        self._partial = ''
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = None
+
+    """
+    이벤트에 공통 정보(경과 시간, 제한 시간, 최근 최선해 / 한계 / 갭, 최소 진행률)를 채워서 전달
+    """
+    def emit(self, event):
+        self.floor = max(self.floor, PHASE_FLOOR.get(event.get('phase'), 0.0))
+        if event.get('objective') is not None:
+            self.objective = event['objective']
+        if event.get('bound') is not None:
+            self.bound = event['bound']
+        event.setdefault('elapsed', time.time() - self._start)
+        event.setdefault('time_limit', self.time_limit)
+        event.setdefault('objective', self.objective)
+        event.setdefault('bound', self.bound)
+        event.setdefault('gap', relative_gap(self.objective, self.bound))
+        event.setdefault('floor', self.floor)
+        try:
+            self.callback(event)
+        except Exception as e:
+            # 화면 갱신 오류 때문에 풀이가 중단되지 않도록 함
+            print(f"진행 상황 전달 오류: {e}")
+
+    def _read_log(self):
+        if not self.log_path or not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, encoding='utf-8', errors='ignore') as f:
+            f.seek(self._offset)
+            chunk = f.read()
+            self._offset = f.tell()
+        lines = (self._partial + chunk).split('\n')
+        # 마지막 줄은 아직 다 기록되지 않았을 수 있으므로 다음에 이어서 읽음
+        self._partial = lines.pop()
+        for line in lines:
+            event = self.parse_line(line)
+            if event is not None:
+                self.emit(event)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._read_log()
+            self.emit({'phase': 'solving', 'message': 'Solving...'})
+
+    def __enter__(self):
+        self._start = time.time()
+        self.emit({'phase': 'start', 'message': 'Solver started'})
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self._read_log()
+        if self._partial:
+            line, self._partial = self._partial, ''
+            event = self.parse_line(line)
+            if event is not None:
+                self.emit(event)
+        return False
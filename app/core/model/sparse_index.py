@@ -0,0 +1,100 @@
+import pandas as pd
+
+"""
+생산 가능한 (아이템, 라인, 시프트) 조합만 담는 희소 인덱스
+
+line_available 시트를 (Project, Line) 목록으로 펼친 뒤 아이템의 프로젝트와 조인하고
+시프트를 곱해 허용된 조합만 만든다.
+모든 아이템 x 라인 x 시프트 조합에 변수를 만든 뒤 x == 0 으로 막는 대신,
+처음부터 허용된 조합에만 변수를 만들기 위해 사용한다.
+"""
+class SparseIndex:
+    """
+    Args:
+        frame (DataFrame): Item, Line, Time 컬럼을 갖는 허용 조합 데이터프레임
+    """
+    def __init__(self, frame):
+        self.frame = frame.reset_index(drop=True)
+        self.keys = list(zip(self.frame['Item'], self.frame['Line'], self.frame['Time']))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    """
+    (라인, 시프트) 별 허용 아이템 목록
+    """
+    def items_by_line_shift(self):
+        grouped = self.frame.groupby(['Line', 'Time'], sort=False)['Item']
+        return {key: values.tolist() for key, values in grouped}
+
+    """
+    아이템별 허용 (라인, 시프트) 목록
+    """
+    def line_shifts_by_item(self):
+        grouped = self.frame.groupby('Item', sort=False)
+        return {item: list(zip(g['Line'], g['Time'])) for item, g in grouped}
+
+    """
+    변수가 하나라도 존재하는 (라인, 시프트) 목록
+    """
+    def line_shifts(self):
+        pairs = self.frame[['Line', 'Time']].drop_duplicates()
+        return list(zip(pairs['Line'], pairs['Time']))
+
+
+"""
+line_available 시트를 (Project, Line) 허용 목록으로 펼침
+
+Args:
+    line_available (DataFrame): Project 컬럼 + 라인별 0/1 컬럼
+    lines (list): 사용할 라인 목록
+
+Returns:
+    DataFrame: Project, Line 컬럼
+"""
+def melt_line_available(line_available, lines):
+    if 'Project' not in line_available.columns:
+        line_available = line_available.reset_index()
+    cols = [l for l in lines if l in line_available.columns]
+    long = line_available.melt(id_vars='Project', value_vars=cols, var_name='Line', value_name='Flag')
+    return long.loc[long['Flag'] == 1, ['Project', 'Line']]
+
+
+"""
+허용된 (아이템, 라인, 시프트) 조합 희소 인덱스 생성
+
+Args:
+    items (list): 아이템 코드 목록 (프로젝트는 아이템 코드의 [3:7])
+    line_available (DataFrame): line_available 시트
+    lines (list): 라인 목록 (결과 정렬 순서 기준)
+    times (list): 시프트 목록
+    restrict (DataFrame): Item, Line, Time 컬럼. 주어지면 이 조합들과 교집합만 남김
+        (사전할당의 Fixed_Line / Fixed_Time 범위)
+
+Returns:
+    SparseIndex: 라인 -> 시프트 -> 아이템 순으로 정렬된 희소 인덱스
+"""
+def build_sparse_index(items, line_available, lines, times, restrict=None):
+    items = list(dict.fromkeys(items))
+    df_items = pd.DataFrame({'Item': items})
+    df_items['Project'] = df_items['Item'].str[3:7]
+    df_items['_item_order'] = range(len(df_items))
+
+    df_lines = melt_line_available(line_available, lines)
+    frame = df_items.merge(df_lines, on='Project', how='inner')
+
+    if restrict is not None:
+        restrict = restrict[['Item', 'Line', 'Time']].drop_duplicates()
+        frame = frame.merge(restrict, on=['Item', 'Line'], how='inner')
+        frame = frame[frame['Time'].isin(times)]
+    else:
+        frame = frame.merge(pd.DataFrame({'Time': list(times)}), how='cross')
+
+    line_order = {l: i for i, l in enumerate(lines)}
+    frame = frame.assign(_line_order=frame['Line'].map(line_order))
+    frame = frame.sort_values(['_line_order', 'Time', '_item_order'], kind='stable')
+    frame['Time'] = frame['Time'].astype(int)
+    return SparseIndex(frame[['Item', 'Line', 'Time', 'Project']])
@@ -0,0 +1,339 @@
+import os
+import sys
+import math
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.utils.pattern_index import PatternIndex
+
+"""
+합성 입력 데이터 생성 (벤치마크 / 규모 테스트용)
+
+Optimization 이 읽는 demand / master / dynamic 시트와 같은 형태의 입력을 원하는 규모로 만든다.
+- demand      : demand (Item, To_Site, MFG, PB, SOP)
+- master      : line_available, capa_qty (Max_line_<제조동> / Max_qty_<제조동> 행 포함), capa_portion, due_LT,
+                capa_outgoing (Tosite_port, To_Site, 1~7일 출하 Capa), capa_imprinter
+- dynamic     : fixed_option, pre_assign (Item1~7 / Qty1~7), material_item (Top_Model_1~10),
+                material_qty (On-Hand, 'M/D(요일)' 입고 컬럼), material_equal, due_request
+아이템 코드는 'AAA' + 프로젝트(4) + Tosite_group(1) + 색상(2) + 일련번호(4) 의 14자리이다.
+수요 합계가 전체 Capa 의 load 배가 되도록 라인 Capa 를 정하므로 규모를 바꿔도 비슷한 난이도로 유지된다.
+같은 seed 면 항상 같은 데이터가 나온다.
+
+엑셀 파일로 저장:
+    python -m app.core.model.synthetic_instance [저장 폴더] [아이템 수] [seed]
+"""
+
+ITEM_PREFIX = 'AAA'
+ITEM_LENGTH = 14
+TOSITE_GROUPS = 'ABC'
+COLORS = ['BK', 'WH', 'SV', 'BL', 'GD', 'GR']
+WEEKDAYS = '월화수목금토일'
+# pre_assign 시트의 아이템 칸 수 (Item1~7), 자재 Top_Model 칸 수 (Top_Model_1~10)
+PRE_ASSIGN_SLOTS = 7
+TOP_MODEL_SLOTS = 10
+DEFAULT_START_DATE = date(2025, 5, 5)
+
+
+"""프로젝트(+ Tosite_group) 와일드카드 패턴 ('***P205*******')"""
+def _pattern(project, group=None):
+    head = '*' * len(ITEM_PREFIX) + project + (group or '')
+    return head + '*' * (ITEM_LENGTH - len(head))
+
+
+"""
+합성 입력 생성
+
+Args:
+    items (int): 아이템 수
+    lines_per_building (int): 제조동별 라인 수
+    buildings (tuple): 제조동 (라인 이름 첫 글자)
+    shifts (int): 계획 기간 시프트 수 (1일 = 2 시프트)
+    fixed_density (float): 아이템 수 대비 fixed_option 행 비율 (그 중 약 10%는 'ALL' 와일드카드 행)
+    bom_size (int): 프로젝트(아이템)마다 사용하는 자재 수
+    materials (int): 자재 수. None 이면 프로젝트 수 x bom_size / 3
+    pre_assign_rows (int): pre_assign 시트 행 수. None 이면 아이템 50개당 1행
+    load (float): 전체 Capa 대비 수요 합계 비율
+    seed (int): 난수 seed
+    start_date (date): 계획 시작일 (자재 입고 컬럼 이름). None 이면 DEFAULT_START_DATE
+
+Returns:
+    dict: Optimization 입력 ({'demand': {시트: df}, 'master': {...}, 'dynamic': {...}})
+"""
+def generate_instance(items=200, lines_per_building=4, buildings=('I', 'D', 'K', 'M'), shifts=14,
+                      fixed_density=0.05, bom_size=3, materials=None, pre_assign_rows=None, load=0.9,
+                      seed=0, start_date=None):
+    rng = np.random.default_rng(seed)
+    times = list(range(1, shifts + 1))
+    days = math.ceil(shifts / 2)
+
+    # demand
+    n_projects = max(2, items // 8)
+    projects = [f"P{100 + k}" for k in range(n_projects)]
+    sites = {g: [f"{g}{k:02d}" for k in range(1, 4)] for g in TOSITE_GROUPS}
+    item_project = [projects[k % n_projects] for k in range(items)]
+    item_group = rng.choice(list(TOSITE_GROUPS), items)
+    item_codes = [f"{ITEM_PREFIX}{p}{g}{rng.choice(COLORS)}{k:04X}"
+                  for k, (p, g) in enumerate(zip(item_project, item_group))]
+    mfg = (rng.integers(5, 100, items) * 10).astype(int)
+    df_demand = pd.DataFrame({
+        'Item': item_codes,
+        'To_Site': [rng.choice(sites[g]) for g in item_group],
+        'MFG': mfg,
+        'PB': 0,
+        'SOP': np.where(rng.random(items) < 0.7, np.floor(mfg * rng.uniform(0.2, 0.8, items)), 0).astype(int),
+    })
+
+    # line_available: 프로젝트마다 라인의 약 40%, 최소 한 라인
+    lines = [f"{b}_{j:02d}" for b in buildings for j in range(1, lines_per_building + 1)]
+    available = rng.random((n_projects, len(lines))) < 0.4
+    available[np.arange(n_projects), rng.integers(0, len(lines), n_projects)] = True
+    df_line_available = pd.DataFrame(available.astype(int), columns=lines)
+    df_line_available.insert(0, 'Project', projects)
+
+    # capa_qty: 수요 합계 = 전체 Capa x load
+    base = mfg.sum() / (len(lines) * shifts * load)
+    capa = np.maximum(np.round(base * rng.uniform(0.7, 1.3, (len(lines), 1)) * rng.uniform(0.9, 1.1, (len(lines), shifts)), -1), 10)
+    df_capa_qty = pd.DataFrame(capa.astype(int), columns=times)
+    df_capa_qty.insert(0, 'Line', lines)
+    limits = []
+    for b in buildings:
+        building_capa = capa[[l[0] == b for l in lines]].sum(axis=0)
+        limits.append({'Line': f'Max_line_{b}', **{t: max(1, lines_per_building - 1) for t in times}})
+        limits.append({'Line': f'Max_qty_{b}', **{t: int(round(q * 0.9, -1)) for t, q in zip(times, building_capa)}})
+    df_capa_qty = pd.concat([df_capa_qty, pd.DataFrame(limits)], ignore_index=True)
+
+    # capa_portion: 제조동 물량 비중
+    share = 1 / len(buildings)
+    df_capa_portion = pd.DataFrame({
+        'name': list(buildings),
+        'lower_limit': round(share / 2, 2) if len(buildings) > 1 else 0,
+        'upper_limit': min(1.0, round(share * 2, 2)),
+    })
+
+    # due_LT: 모든 (프로젝트, Tosite_group) 조합
+    df_due_LT = pd.DataFrame([
+        {'Project': p, 'Tosite_group': g, 'Due_date_LT': int(rng.integers(max(1, shifts // 4), shifts + 1))}
+        for p in projects for g in TOSITE_GROUPS
+    ])
+
+    # capa_outgoing: 출하지별 1~7일 출하 Capa (수요의 1~1.5배)
+    site_demand = df_demand.groupby('To_Site')['MFG'].sum()
+    outgoing = []
+    for g in TOSITE_GROUPS:
+        for site in sites[g]:
+            daily = site_demand.get(site, 0) / 7
+            outgoing.append({'Tosite_port': f"PORT_{g}", 'To_Site': site,
+                             **{d: int(round(daily * rng.uniform(1.0, 1.5), -1)) for d in range(1, 8)}})
+    df_capa_outgoing = pd.DataFrame(outgoing)
+
+    lines_of = {p: [l for l, ok in zip(lines, row) if ok] for p, row in zip(projects, available)}
+    line_index = {l: j for j, l in enumerate(lines)}
+    # 고정 수량은 아이템 수요의 절반, 셀 Capa 의 1/5 을 넘지 않게
+    fixed_left = (mfg // 2).astype(int)
+
+    # fixed_option: 아이템 고정 행 + 약 10% 'ALL' 와일드카드 행 (프로젝트 전체 수요를 생산 가능 라인에 고정)
+    fixed = []
+    n_fixed = int(round(items * fixed_density))
+    n_wild = int(round(n_fixed * 0.1))
+    for p in rng.choice(projects, min(n_wild, n_projects), replace=False):
+        fixed.append({'Fixed_Group': _pattern(p), 'Fixed_Line': ','.join(lines_of[p]), 'Fixed_Time': np.nan, 'Qty': 'ALL'})
+    for i in rng.choice(items, min(n_fixed - len(fixed), items), replace=False):
+        ok = lines_of[item_project[i]]
+        fixed_lines = list(rng.choice(ok, min(len(ok), int(rng.integers(1, 3))), replace=False))
+        fixed_times = sorted(rng.choice(times, int(rng.integers(1, 4)), replace=False).tolist())
+        cell = min(capa[line_index[l], t - 1] for l in fixed_lines for t in fixed_times)
+        qty = int(min(fixed_left[i], cell // 5))
+        if qty <= 0:
+            continue
+        fixed_left[i] -= qty
+        fixed.append({'Fixed_Group': item_codes[i], 'Fixed_Line': ','.join(fixed_lines),
+                      'Fixed_Time': ','.join(map(str, fixed_times)), 'Qty': qty})
+    df_fixed_option = pd.DataFrame(fixed, columns=['Fixed_Group', 'Fixed_Line', 'Fixed_Time', 'Qty'])
+
+    # pre_assign: 라인 x (1 / 2 시프트) 행마다 Item1~7 / Qty1~7 칸 중 몇 칸에 생산 가능한 아이템 배정
+    item_available = available[[k % n_projects for k in range(items)]]
+    items_of_line = {l: np.flatnonzero(item_available[:, j]).tolist() for j, l in enumerate(lines)}
+    pre_assign = []
+    for _ in range(max(1, items // 50) if pre_assign_rows is None else pre_assign_rows):
+        line = lines[int(rng.integers(len(lines)))]
+        row = {'Line': line, 'Shift': int(rng.integers(1, 3))}
+        for k in range(1, PRE_ASSIGN_SLOTS + 1):
+            row[f'Item{k}'], row[f'Qty{k}'] = np.nan, np.nan
+        candidates = items_of_line[line]
+        for k in sorted(rng.choice(range(1, PRE_ASSIGN_SLOTS + 1), int(rng.integers(1, 4)), replace=False)):
+            t = 2 * k + row['Shift'] - 2
+            if not candidates or t > shifts:
+                continue
+            i = candidates[int(rng.integers(len(candidates)))]
+            qty = int(min(fixed_left[i], capa[line_index[line], t - 1] // 5))
+            if qty <= 0:
+                continue
+            fixed_left[i] -= qty
+            row[f'Item{k}'], row[f'Qty{k}'] = item_codes[i], qty
+        pre_assign.append(row)
+    df_pre_assign = pd.DataFrame(pre_assign)
+
+    # material_item: 프로젝트마다 bom_size 개 자재. 자재마다 Top_Model 패턴 최대 TOP_MODEL_SLOTS 개
+    n_materials = materials or max(bom_size, n_projects * bom_size // 3)
+    top_models = [[] for _ in range(n_materials)]
+    for p in projects:
+        free = [m for m in range(n_materials) if len(top_models[m]) < TOP_MODEL_SLOTS]
+        if len(free) < bom_size:
+            top_models.extend([] for _ in range(bom_size - len(free)))
+            free = [m for m in range(len(top_models)) if len(top_models[m]) < TOP_MODEL_SLOTS]
+        for m in rng.choice(free, bom_size, replace=False):
+            # 30% 는 Tosite_group 까지 지정한 패턴
+            group = rng.choice(list(TOSITE_GROUPS)) if rng.random() < 0.3 else None
+            top_models[m].append(_pattern(p, group))
+    material_codes = [f"MAT{m:05d}" for m in range(len(top_models))]
+    df_material_item = pd.DataFrame({
+        'Material': material_codes,
+        '종류': rng.choice(['PCB', 'CASE', 'LCD', 'BATT'], len(top_models)),
+        '가용 L/T': rng.integers(1, 4, len(top_models)),
+        'Active_OX': 'O',
+        **{f'Top_Model_{k}': [patterns[k - 1] if len(patterns) >= k else np.nan for patterns in top_models]
+           for k in range(1, TOP_MODEL_SLOTS + 1)},
+    })
+
+    # material_qty: 자재별 사용 수요의 40~90% 재고 + 일자별 입고. 일부 자재는 계획 중 부족이 생김
+    bom = material_bom({'demand': {'demand': df_demand}, 'dynamic': {'material_item': df_material_item}})
+    usage = pd.Series({m: df_demand.loc[df_demand['Item'].isin(its), 'MFG'].sum() for m, its in bom.items()}).reindex(material_codes, fill_value=0)
+    start_date = start_date or DEFAULT_START_DATE
+    date_columns = [f"{d.month}/{d.day}({WEEKDAYS[d.weekday()]})" for d in (start_date + timedelta(days=k) for k in range(days))]
+    df_material_qty = pd.DataFrame({
+        'Material': material_codes,
+        'Active_OX': np.where(rng.random(len(material_codes)) < 0.95, 'O', 'X'),
+        'On-Hand': np.round(usage.to_numpy() * rng.uniform(0.4, 0.9, len(material_codes))).astype(int),
+    })
+    receipts = np.where(rng.random((len(material_codes), days)) < 0.3,
+                        np.round(usage.to_numpy()[:, None] * rng.uniform(0.05, 0.3, (len(material_codes), days))), 0)
+    df_material_qty = pd.concat([df_material_qty, pd.DataFrame(receipts.astype(int), columns=date_columns)], axis=1)
+
+    # material_equal: 자재 10개당 대체 그룹 하나 (2~3개)
+    equal = []
+    for _ in range(len(material_codes) // 10):
+        group = list(rng.choice(material_codes, int(rng.integers(2, 4)), replace=False)) + [np.nan]
+        equal.append({'Material A': group[0], 'Material B': group[1], 'Material C': group[2]})
+    df_material_equal = pd.DataFrame(equal, columns=['Material A', 'Material B', 'Material C'])
+
+    return {
+        'demand': {'demand': df_demand},
+        'master': {
+            'line_available': df_line_available,
+            'capa_qty': df_capa_qty,
+            'capa_portion': df_capa_portion,
+            'capa_outgoing': df_capa_outgoing,
+            'capa_imprinter': pd.DataFrame(),
+            'due_LT': df_due_LT,
+        },
+        'dynamic': {
+            'fixed_option': df_fixed_option,
+            'pre_assign': df_pre_assign,
+            'material_item': df_material_item,
+            'material_qty': df_material_qty,
+            'material_equal': df_material_equal,
+            'due_request': pd.DataFrame(),
+        },
+    }
+
+
+"""
+입력 규모 요약 (벤치마크 보고서용)
+"""
+def instance_size(instance):
+    df_capa_qty = instance['master']['capa_qty']
+    return {
+        'items': int(instance['demand']['demand']['Item'].nunique()),
+        'lines': len(instance['master']['line_available'].columns) - 1,
+        'shifts': len([col for col in df_capa_qty.columns if col != 'Line']),
+        'fixed_rows': len(instance['dynamic']['fixed_option']),
+        'pre_assign_rows': len(instance['dynamic']['pre_assign']),
+        'materials': len(instance['dynamic']['material_item']),
+    }
+
+
+"""
+자재별 사용 아이템 {자재: [아이템, ...]} (material_item 의 Top_Model 패턴과 demand 아이템 매칭)
+"""
+def material_bom(instance):
+    df_material_item = instance['dynamic']['material_item']
+    index = PatternIndex(instance['demand']['demand']['Item'].unique())
+    columns = [col for col in df_material_item.columns if str(col).startswith('Top_Model_')]
+    bom = {}
+    for material, patterns in zip(df_material_item['Material'], df_material_item[columns].to_numpy(dtype=object)):
+        items = set()
+        for pattern in patterns:
+            if isinstance(pattern, str):
+                items.update(index.matching_items(pattern))
+        bom[material] = sorted(items)
+    return bom
+
+
+"""
+생산계획 결과로 Material Detail 시트 (결과 파일의 두 번째 시트) 생성
+
+자재별, 시프트별 잔량 = 재고 + 그 날까지 입고 - 그 시프트까지 사용량 (아이템 1개당 자재 1개). 음수면 부족.
+MaterialShortageAnalyzer 가 읽는 형태 (첫 컬럼 자재, 시프트 컬럼, 마지막 컬럼 Items)
+
+Args:
+    instance (dict): generate_instance 결과 (또는 같은 형태의 입력)
+    df_result (DataFrame): 생산계획 결과 (Item, Time, Qty)
+"""
+def material_detail(instance, df_result):
+    df_material_qty = instance['dynamic']['material_qty']
+    df_material_qty = df_material_qty[df_material_qty['Active_OX'] == 'O'].set_index('Material')
+    times = [col for col in instance['master']['capa_qty'].columns if col != 'Line']
+    on_hand_at = list(df_material_qty.columns).index('On-Hand')
+    date_columns = list(df_material_qty.columns[on_hand_at + 1:])
+
+    produced = df_result.pivot_table(index='Item', columns='Time', values='Qty', aggfunc='sum') if not df_result.empty else pd.DataFrame()
+    produced = produced.reindex(columns=times, fill_value=0).fillna(0)
+    rows = []
+    for material, items in material_bom(instance).items():
+        if material not in df_material_qty.index:
+            continue
+        stock = float(df_material_qty.loc[material, 'On-Hand'])
+        receipts = pd.to_numeric(df_material_qty.loc[material, date_columns], errors='coerce').fillna(0).to_numpy()
+        # 시프트 t 는 (t + 1) // 2 번째 날
+        arrived = np.array([receipts[:min(len(receipts), (t + 1) // 2)].sum() for t in times])
+        used = produced.reindex(items).fillna(0).sum(axis=0).cumsum().to_numpy()
+        rows.append({'Material': material, **dict(zip(times, (stock + arrived - used).round().astype(int))), 'Items': items})
+    return pd.DataFrame(rows, columns=['Material', *times, 'Items'])
+
+
+"""
+합성 입력을 demand / master / dynamic 엑셀 파일로 저장
+
+Args:
+    instance (dict): generate_instance 결과
+    folder (str): 저장 폴더
+    name (str): 파일 이름 앞부분 (파일 이름에 demand / master / dynamic 이 들어가야 Data Input 화면이 구분함)
+
+Returns:
+    dict: FilePaths 키별 경로 {'demand_excel_file', 'master_excel_file', 'dynamic_excel_file'}
+"""
+def write_workbooks(instance, folder, name='synthetic'):
+    os.makedirs(folder, exist_ok=True)
+    paths = {}
+    for kind in ('demand', 'master', 'dynamic'):
+        path = os.path.join(folder, f"{name}_{kind}.xlsx")
+        with pd.ExcelWriter(path) as writer:
+            for sheet, df in instance[kind].items():
+                df.to_excel(writer, sheet_name=sheet, index=False)
+        paths[f'{kind}_excel_file'] = path
+    return paths
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    folder = args[0] if args else 'synthetic'
+    items = int(args[1]) if len(args) >= 2 else 200
+    seed = int(args[2]) if len(args) >= 3 else 0
+
+    instance = generate_instance(items=items, seed=seed)
+    paths = write_workbooks(instance, folder, f"synthetic_{items}")
+    print(instance_size(instance))
+    for path in paths.values():
+        print(path)
@@ -0,0 +1,252 @@
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from app.models.common.settings_store import SettingsStore
+from app.models.common.file_store import FilePaths
+from .solver_progress import relative_gap
+
+"""
+최적화 실행 기록 (JSONL)
+
+pre_assign / linear_programming / execute / run_allocation 을 실행할 때마다 한 줄(JSON)씩 기록한다.
+- inputs      : 입력 크기 (아이템 / 라인 / 시프트 / 고정 행 수)와 입력 파일 이름(dataset)
+- variables   : 변수 종류별 개수 (x / y / shipment ...)
+- constraints : 제약 종류별 개수 (demand / capacity / max_line ...). 모델에 추가된 순서대로 구간을 나눠 센다
+- timings     : 단계별 시간(초) prep(데이터 준비) / build(모델 구성) / solve(솔버) / extract(결과 추출)
+- solve       : 솔버 상태, 목적함수, 최선 한계(bound), 갭(%)
+기록 파일은 telemetry_path 설정 (기본 logs/optimization_runs.jsonl).
+기록 중 오류가 나도 최적화에는 영향을 주지 않는다.
+
+추세 보기:
+    python -m app.core.model.telemetry [기록 파일] [실행 종류]
+"""
+
+DEFAULT_LOG_PATH = os.path.join('logs', 'optimization_runs.jsonl')
+
+# 추세 표에서 느린 실행으로 표시할 기준 (같은 실행 종류의 전체 시간 중앙값 대비 배수)
+SLOW_FACTOR = 2.0
+
+
+"""
+실행 기록 사용 여부. None 이면 telemetry_ox 설정
+"""
+def use_telemetry(enabled=None):
+    if enabled is None:
+        enabled = SettingsStore.get('telemetry_ox', 1)
+    return bool(enabled)
+
+
+"""
+기록 파일 경로 (telemetry_path 설정)
+"""
+def log_path():
+    return SettingsStore.get('telemetry_path', DEFAULT_LOG_PATH) or DEFAULT_LOG_PATH
+
+
+"""
+입력 파일 이름 (어느 주차 데이터로 실행했는지 구분용). 파일로 읽지 않았으면 None
+"""
+def dataset_name():
+    path = FilePaths.get('demand_excel_file')
+    return os.path.basename(path) if path else None
+
+
+"""
+한 번의 최적화 실행 기록
+
+lap(phase) 로 직전 lap 이후 시간을 단계 시간에 더하고,
+constraints_added(model, family) 로 직전 호출 이후 모델에 추가된 제약 수를 그 종류로 센다.
+"""
+class RunTelemetry:
+    """
+    Args:
+        kind (str): 실행 종류 ('pre_assign' / 'linear_programming' / 'execute' / 'run_allocation')
+        enabled (bool): False 이면 기록하지 않음. None 이면 telemetry_ox 설정
+    """
+    def __init__(self, kind, enabled=None):
+        self.kind = kind
+        self.enabled = use_telemetry(enabled)
+        self.started = time.time()
+        self._last_lap = self.started
+        self._last_count = 0
+        self.inputs = {}
+        self.variables = {}
+        self.constraints = {}
+        self.timings = {}
+
+    """직전 lap 이후 경과 시간을 phase 단계 시간에 더함"""
+    def lap(self, phase):
+        now = time.time()
+        self.timings[phase] = self.timings.get(phase, 0.0) + now - self._last_lap
+        self._last_lap = now
+
+    """직전 호출 이후 모델에 추가된 제약 수를 family 로 기록"""
+    def constraints_added(self, model, family):
+        count = len(model.constraints)
+        added = count - self._last_count
+        if added:
+            self.constraints[family] = self.constraints.get(family, 0) + added
+        self._last_count = count
+
+    """변수 종류별 개수 기록 (variables={'x': x, 'y': y} 처럼 변수 딕셔너리)"""
+    def count_variables(self, **variables):
+        for family, values in variables.items():
+            self.variables[family] = len(values)
+
+    """
+    기록 한 줄 생성
+
+    Args:
+        solve_info (dict): solve_model 결과. 솔버를 쓰지 않는 실행이면 None
+        extra: 실행 종류별 추가 항목 (진단 / 위반 건수 등)
+    """
+    def record(self, solve_info=None, **extra):
+        solve = None
+        if solve_info is not None:
+            objective = solve_info.get('objective')
+            bound = solve_info.get('bound')
+            if bound is None and solve_info.get('has_solution') and not solve_info.get('time_limit_reached'):
+                # 최적성 증명까지 끝났으면 한계 = 목적함수
+                bound = objective
+            solve = {
+                'backend': solve_info.get('backend'),
+                'status': solve_info.get('status'),
+                'solution_status': solve_info.get('solution_status'),
+                'objective': objective,
+                'bound': bound,
+                'gap': relative_gap(objective, bound),
+                'time_limit': solve_info.get('time_limit'),
+                'time_limit_reached': solve_info.get('time_limit_reached'),
+                'warm_start': solve_info.get('warm_start'),
+                'first_incumbent_time': solve_info.get('first_incumbent_time'),
+                'cancelled': solve_info.get('cancelled'),
+                'num_variables': solve_info.get('num_variables'),
+                'num_constraints': solve_info.get('num_constraints'),
+            }
+        return {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'kind': self.kind,
+            'dataset': dataset_name(),
+            'inputs': self.inputs,
+            'variables': self.variables,
+            'constraints': self.constraints,
+            'timings': {**self.timings, 'total': time.time() - self.started},
+            'solve': solve,
+            **extra,
+        }
+
+    """
+    기록 한 줄을 JSONL 파일에 추가
+
+    Returns:
+        dict: 기록한 내용. 기록하지 않았으면 None
+    """
+    def write(self, solve_info=None, path=None, **extra):
+        if not self.enabled:
+            return None
+        try:
+            record = self.record(solve_info, **extra)
+            path = path or log_path()
+            folder = os.path.dirname(path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=_to_json) + '\n')
+            return record
+        except Exception as e:
+            print(f"실행 기록 저장 실패: {str(e)}")
+            return None
+
+
+"""numpy 값 등 json 이 모르는 값 변환"""
+def _to_json(value):
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+"""
+기록 파일 -> 실행마다 한 행인 데이터프레임 (중첩 항목은 inputs.items, timings.solve 처럼 펼침)
+"""
+def load_runs(path=None):
+    path = path or log_path()
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"실행 기록에서 읽을 수 없는 줄을 건너뜁니다: {line[:80]}")
+    if not records:
+        return pd.DataFrame()
+    df = pd.json_normalize(records)
+    df['time'] = pd.to_datetime(df['time'])
+    return df
+
+
+"""
+실행별 가장 많은 제약 종류 ("capacity 1,234" 형태, 느린 실행의 원인 확인용)
+"""
+def largest_family(df_runs, prefix='constraints'):
+    columns = [col for col in df_runs.columns if col.startswith(prefix + '.')]
+    if not columns:
+        return pd.Series(None, index=df_runs.index, dtype=object)
+    counts = df_runs[columns].apply(pd.to_numeric, errors='coerce')
+    family = counts.fillna(-1).idxmax(axis=1).where(counts.notna().any(axis=1))
+    return pd.Series(
+        [f"{name[len(prefix) + 1:]} {int(count):,}" if isinstance(name, str) else None
+         for name, count in zip(family, counts.max(axis=1))],
+        index=df_runs.index,
+    )
+
+
+"""
+실행 추세 표: 시간 순서대로 입력 크기, 모델 크기, 단계 시간, 상태 / 갭, 가장 많은 제약 종류.
+전체 시간이 같은 실행 종류 중앙값의 SLOW_FACTOR 배를 넘거나 제한 시간에 걸린 실행은 slow 로 표시
+
+Args:
+    df_runs (DataFrame): load_runs 결과
+    kind (str): 실행 종류. None 이면 전체
+"""
+def trend_table(df_runs, kind=None):
+    if df_runs.empty:
+        return df_runs
+    if kind:
+        df_runs = df_runs[df_runs['kind'] == kind]
+    columns = {
+        'time': 'time', 'kind': 'kind', 'dataset': 'dataset',
+        'inputs.items': 'items', 'inputs.lines': 'lines', 'inputs.shifts': 'shifts', 'inputs.fixed_rows': 'fixed',
+        'solve.num_variables': 'vars', 'solve.num_constraints': 'cons',
+        'timings.prep': 'prep', 'timings.build': 'build', 'timings.solve': 'solve', 'timings.extract': 'extract',
+        'timings.total': 'total', 'solve.status': 'status', 'solve.gap': 'gap(%)', 'solve.time_limit_reached': 'limit',
+    }
+    df = df_runs.reindex(columns=list(columns)).rename(columns=columns)
+    df['largest'] = largest_family(df_runs)
+    median = df.groupby('kind')['total'].transform('median')
+    df['slow'] = (df['total'] > median * SLOW_FACTOR) | (df['limit'] == True)
+    return df.sort_values('time').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    df_runs = load_runs(args[0] if args else None)
+    if df_runs.empty:
+        print("실행 기록이 없습니다")
+        sys.exit(0)
+    df = trend_table(df_runs, args[1] if len(args) >= 2 else None)
+    print(df.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    slow = df[df['slow']]
+    if not slow.empty:
+        print(f"\n느린 실행 {len(slow)}개 (같은 종류 중앙값의 {SLOW_FACTOR:g}배 이상 또는 제한 시간 도달)")
+        print(slow[['time', 'kind', 'dataset', 'items', 'vars', 'cons', 'build', 'solve', 'total', 'gap(%)', 'largest']]
+              .to_string(index=False, float_format=lambda v: f"{v:.2f}"))
@@ -1,14 +1,96 @@
+import time
+import numpy as np
 import pandas as pd
 import pulp 
-import re
 from pulp import LpStatus
 
+from .model.sparse_index import build_sparse_index
+from .model.expression_cache import ExpressionCache, group_by_building_shift
+from .model.solver_backend import get_backend
+from .model.mip_start import set_mip_start
+from .model.infeasibility import diagnose_infeasibility, find_conflict_set
+from .model.presolve import PlanBounds, shift_limits, use_presolve, DEFAULT_MAX_LINE, DEFAULT_MAX_QTY
+from .model.telemetry import RunTelemetry
+from ..utils.pattern_index import PatternIndex
+from ..utils.shift_calendar import horizon_shifts
+
+# 할당 결과 데이터프레임 컬럼
+RESULT_COLUMNS = ['Line','Time','Demand','Item','Qty','Project','To_site','SOP','MFG','RMC','Due_LT']
+# 해의 소수 오차 (정수 변수 값 2.9999999 가 2 로 내려가지 않도록)
+VALUE_EPS = 1e-6
+
+
+"""
+변수 딕셔너리의 해를 한 번에 NumPy 배열로 꺼내서 생산량이 1 이상인 조합만 데이터프레임으로 반환
+
+Args:
+    x (dict): (아이템, 라인, 시프트) -> 변수
+    keys (list): 꺼낼 키와 결과 행 순서. None 이면 x 의 순서 (희소 인덱스면 라인 -> 시프트 -> 아이템 순)
+
+Returns:
+    DataFrame: Item, Line, Time, Qty (생산량은 소수점 내림)
+"""
+def solution_frame(x, keys=None):
+    keys = list(x) if keys is None else keys
+    values = np.fromiter((x[key].varValue or 0.0 for key in keys), dtype=float, count=len(keys))
+    units = np.floor(values + VALUE_EPS).astype(int)
+    produced = np.flatnonzero(units > 0)
+    df = pd.DataFrame([keys[i] for i in produced], columns=['Item', 'Line', 'Time'])
+    df['Qty'] = units[produced]
+    return df
+
+"""
+모델 최적화 실행 후 결과 메타데이터 반환
+
+Args:
+    model (LpProblem): 풀이할 모델
+    time_limit (int): 솔버 제한 시간(초). None 이면 제한 없음
+    backend (str): 솔버 백엔드 ('cbc' / 'highs'). None 이면 설정값(solver_backend) 사용
+    warm_start (bool): 변수 초기값을 MIP start 로 사용할지 여부
+    progress (callable): 풀이 중 진행 상황 콜백 progress(event) (solver_progress 참고)
+    job (SolveJob): 취소할 수 있도록 솔버 프로세스를 등록할 작업. 취소되면 그때까지의 최선해를 사용
+
+Returns:
+    dict: 상태, 목적함수 값, 제한 시간 도달 여부, 풀이 시간, 모델 크기
+"""
+def solve_model(model, time_limit=None, backend=None, warm_start=False, progress=None, job=None):
+    solver = get_backend(backend)
+    start = time.time()
+    if job is not None and job.cancelled:
+        # 이미 취소된 작업이면 풀지 않음
+        model.assignStatus(pulp.LpStatusNotSolved, pulp.LpSolutionNoSolutionFound)
+        backend_info = {}
+    else:
+        backend_info = solver.solve(model, time_limit, warm_start=warm_start, progress=progress, job=job)
+    solve_time = time.time() - start
+
+    has_solution = model.sol_status in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible)
+    return {
+        'status': LpStatus[model.status],
+        'solution_status': pulp.LpSolution[model.sol_status],
+        'has_solution': has_solution,
+        'objective': pulp.value(model.objective) if has_solution else None,
+        # 제한 시간 안에 최적성 증명을 못 하고 멈춘 경우 (incumbent 가 있으면 그 해를 사용)
+        'time_limit_reached': model.sol_status in (pulp.LpSolutionIntegerFeasible, pulp.LpSolutionNoSolutionFound) and model.status != pulp.LpStatusInfeasible,
+        'time_limit': time_limit,
+        'solve_time': solve_time,
+        'num_variables': model.numVariables(),
+        'num_constraints': model.numConstraints(),
+        'backend': solver.name,
+        'cancelled': job is not None and job.cancelled,
+        **backend_info,
+    }
+
 class Optimization:
-    def __init__(self,input):
+    def __init__(self,input, solver_backend = None, progress_callback = None, solve_job = None, presolve = None):
         """
         input 데이터를 받아서 optimization 객체를 생성합니다
 
         Parameters:
+        solver_backend (str) : 'cbc' 또는 'highs'. None 이면 설정값(solver_backend) 사용
+        progress_callback (callable) : 모델 구성 / 풀이 진행 상황 콜백 progress_callback(event) (solver_progress 참고)
+        solve_job (SolveJob) : 풀이를 취소할 수 있게 솔버 프로세스를 등록할 작업 (solve_job 참고)
+        presolve (bool) : 모델 생성 전에 big-M / 변수 상한을 줄이고 중복 제약을 뺄지 여부. None 이면 설정값(presolve_ox) 사용
         input (dictionary) : 
             {
                 'demand':{
@@ -50,7 +132,8 @@ class Optimization:
         self.df_capa_imprinter = self.master_excel['capa_imprinter']
         self.df_due_LT = self.master_excel['due_LT']
 
-        self.time = {i for i in self.df_capa_qty.columns}
+        # 계획 기간: capa_qty 시트의 시프트 컬럼 (1주 = 14 시프트, 더 길 수 있음)
+        self.time = horizon_shifts(self.df_capa_qty)
         self.line = self.df_line_available.columns
         self.port_list = self.df_capa_outgoing.Tosite_port.unique()
         self.day_list = list(reversed(range(1, 8)))
@@ -64,12 +147,21 @@ class Optimization:
         self.df_fixed_option = self.dynamic_excel['fixed_option']
 
         # 리스트로 쓰는게 편해서 리스트로 변환
-        self.time = self.time.difference({'Line'})
-        self.time = list(range(1,15))
         self.line = self.line.to_list()[1:]
 
         self.df_pre_result = None
         self.df_result = None
+        self.df_combined = None
+        self.solver_backend = solver_backend
+        self.progress_callback = progress_callback
+        self.solve_job = solve_job
+        self.presolve = use_presolve(presolve)
+        # 마지막으로 만든 모델과 결과 추출용 변수, (라인, 시프트) 가동 변수 (모델 캐시 저장용)
+        self.model = None
+        self.model_vars = None
+        self.model_line_vars = None
+        # 아이템별 결과 값 (To_site / SOP / MFG / Due_LT). item_attributes 에서 집계 방식별로 처음 한 번만 계산
+        self._item_attributes = {}
 
         self.df_material_item = self.df_material_item.drop(['종류','가용 L/T'],axis=1)
         self.df_material_item = self.df_material_item[self.df_material_item['Active_OX']=='O']
@@ -79,9 +171,23 @@ class Optimization:
         self.df_material_item = pd.merge(self.df_material_item,self.df_material_qty,how='left',on='Material')
         # print(self.df_material_item)
 
+    """진행 상황 콜백이 있으면 이벤트 전달"""
+    def report_progress(self, phase, message, **info):
+        if self.progress_callback is not None:
+            self.progress_callback({'phase': phase, 'message': message, **info})
+
+    """모델 구성이 끝났음을 알리고 풀이"""
+    def _solve(self, model, time_limit, warm_start=False):
+        self.report_progress('build', f"Model built ({model.numVariables():,} variables, {model.numConstraints():,} constraints)")
+        return solve_model(model, time_limit, self.solver_backend, warm_start=warm_start,
+                           progress=self.progress_callback, job=self.solve_job)
+
     """사전할당 알고리즘 함수"""
-    def pre_assign(self,showlog = False):
+    def pre_assign(self,showlog = False, time_limit = None):
         """
+        Parameters:
+            time_limit (int): 솔버 제한 시간(초). 제한에 걸리면 그때까지의 최선해를 사용
+
         Returns:
             dictionary: 
                 {
@@ -90,6 +196,8 @@ class Optimization:
                     'error': 에러 문구 문자열
                 }
         """
+        self.report_progress('build', 'Building the pre-assignment model...')
+        telemetry = RunTelemetry('pre_assign')
         # pre_assign 시트
         df_demand_item = self.df_demand.groupby("Item")[["MFG","PB","SOP"]].sum()
         columns = ['Item','Line','Time','Qty']
@@ -101,16 +209,15 @@ class Optimization:
         
         # fixed_option 시트
         new_labels = []
+        demand_items = PatternIndex(df_demand_item.index)
         for idx, row in self.df_fixed_option.iterrows():
             if '*' in row['Fixed_Group'] and str.isdigit(str(row['Qty'])):
                 print('ignore row : ',row)
                 continue
             if '*' in row['Fixed_Group'] or str(row['Qty']).lower()=='all':
-                regex = '^' + row['Fixed_Group'].replace('*','.') + '$'
-                for item in df_demand_item.index:
-                    if re.fullmatch(regex,item):
-                        qty = df_demand_item.loc[item,'MFG']
-                        new_labels.append({'Item':item,'Line':row['Fixed_Line'],'Time':row['Fixed_Time'],'Qty':qty})
+                for item in demand_items.matching_items(row['Fixed_Group']):
+                    qty = df_demand_item.loc[item,'MFG']
+                    new_labels.append({'Item':item,'Line':row['Fixed_Line'],'Time':row['Fixed_Time'],'Qty':qty})
             else:
                 new_labels.append({'Item':row['Fixed_Group'],'Line':row['Fixed_Line'],'Time':row['Fixed_Time'],'Qty':row['Qty']})
 
@@ -118,8 +225,9 @@ class Optimization:
         df_new_labels = pd.DataFrame(new_labels)
         self.df_combined = pd.concat([self.df_combined,df_new_labels], ignore_index=True)
 
-        self.df_line_available = self.df_line_available.set_index('Project')
-        self.df_capa_qty = self.df_capa_qty.set_index('Line')
+        # 인덱스를 바꾼 사본을 사용 (이후 execute 가 원본 시트 형태를 그대로 쓸 수 있도록)
+        df_line_available = self.df_line_available.set_index('Project')
+        df_capa_qty = self.df_capa_qty.set_index('Line')
         demands = df_demand_item.index
 
         df_demand_item = df_demand_item.reset_index()
@@ -127,67 +235,91 @@ class Optimization:
         df_demand_item['Tosite_group'] = df_demand_item['Item'].str[7:8]
         df_demand_item = pd.merge(df_demand_item,self.df_due_LT,how='left',on=['Project','Tosite_group'])
         df_demand_item = df_demand_item.set_index('Item')
+        telemetry.inputs = {'items': len(demands), 'lines': len(self.line), 'shifts': len(self.time), 'fixed_rows': len(self.df_combined)}
+        telemetry.lap('prep')
 
         # 문제 정의
         x = pulp.LpVariable.dicts("produce", [(d, l, t) for d in demands for l in self.line for t in self.time], lowBound=0, cat='Continuous')
         model = pulp.LpProblem("LineShift_Production_Scheduling", pulp.LpMaximize)
+        # 아이템별, (라인*시프트)별, 제조동별 부분합을 한 번만 만들어 모든 제약조건에서 재사용
+        cache = ExpressionCache(x)
         
         # 제약조건 0: 사전할당 테이블
         for idx, row in self.df_combined.iterrows():
             line = list(map(str.strip,str(row['Line']).split(','))) if pd.notna(row['Line']) else self.line
             time = list(map(int, str(row['Time']).split(','))) if pd.notna(row['Time']) else self.time
             model += (pulp.lpSum([x[(row['Item'], l, t)] for l in line for t in time]) >= row['Qty'], f"pre_assign_{row['Item']}_{idx}")
+        telemetry.constraints_added(model, 'pre_assign')
 
-        # 제약조건 1: 모델별 총 수요량 충족 
-        for d in demands:
-            model += pulp.lpSum([x[(d, l, t)] for l in self.line for t in self.time]) <= df_demand_item.loc[d,'MFG']
+        # presolve: (라인, 시프트)별 big-M, 변수 상한, 중복 제약 판정
+        blocks = list(set(l[0] for l in self.line))
+        max_lines = shift_limits(df_capa_qty, 'Max_line', blocks, self.time, DEFAULT_MAX_LINE)
+        max_qtys = shift_limits(df_capa_qty, 'Max_qty', blocks, self.time, DEFAULT_MAX_QTY)
+        # 아이템별 라인 생산 가능 여부 (시프트와 무관하므로 라인마다 한 번만 계산)
+        available = df_line_available.loc[demands.str[3:7], self.line].to_numpy() == 1
+        # 생산 가능 아이템 목록은 presolve 에서만 사용
+        compatible = {}
+        if self.presolve:
+            for j, l in enumerate(self.line):
+                items = list(demands[available[:, j]])
+                compatible.update({(l, t): items for t in self.time})
+        bounds = PlanBounds(compatible, df_demand_item['MFG'].to_dict(), {(l, t): df_capa_qty.loc[l,t] for l in self.line for t in self.time},
+                            max_lines, max_qtys, big_m=10_000_000, enabled=self.presolve)
 
-        # 제약조건 2: 라인/시프트에서 생산 가능한 모델만 허용
+        # 제약조건 1: 모델별 총 수요량 충족 
         for d in demands:
-            for l in self.line:
+            if bounds.keep('demand', d):
+                model += cache.item(d) <= df_demand_item.loc[d,'MFG']
+        telemetry.constraints_added(model, 'demand')
+
+        # 제약조건 2: 라인/시프트에서 생산 가능한 모델만 허용 (presolve 면 제약 대신 변수 상한 0)
+        for i, d in enumerate(demands):
+            for j, l in enumerate(self.line):
+                if available[i, j]:
+                    continue
                 for t in self.time:
-                    if self.df_line_available.loc[d[3:7],l] != 1:
+                    if self.presolve:
+                        x[(d, l, t)].upBound = 0
+                    else:
                         model += x[(d, l, t)] == 0
+        telemetry.constraints_added(model, 'line_available')
 
          # 제약조건 3: 제조동별 물량 비중 상한/하한
         for ids,row in self.df_capa_portion.iterrows():
-            model += (
-               row['upper_limit'] * pulp.lpSum([x[(d, l, t)] for (d, l, t) in x]) >=
-               pulp.lpSum([x[(d, l, t)] for (d, l, t) in x if l.startswith(row['name'])])
-            )
-            model += (
-                pulp.lpSum([x[(d, l, t)] for (d, l, t) in x if l.startswith(row['name'])]) >=
-                row['lower_limit'] * pulp.lpSum([x[(d, l, t)] for (d, l, t) in x])
-            )
+            model += row['upper_limit'] * cache.total() >= cache.building(row['name'])
+            model += cache.building(row['name']) >= row['lower_limit'] * cache.total()
+        telemetry.constraints_added(model, 'portion')
         # 제약조건 4: 각 라인/시프트 조합의 최대 생산량 제한.
         for l in self.line:
             for t in self.time:
-                model += pulp.lpSum([x[(d, l, t)] for d in demands]) <= self.df_capa_qty.loc[l,t]
+                if bounds.keep('capacity', (l, t)):
+                    model += cache.line_shift(l, t) <= df_capa_qty.loc[l,t]
+        telemetry.constraints_added(model, 'capacity')
 
         # 제약조건 5: 각 (제조동 * 시프트) 별 가동가능한 최대 라인 수. Max_line.
+        # big-M 은 presolve 면 (라인, 시프트)별 최대 생산 가능량, 아니면 충분히 큰 값
         y = pulp.LpVariable.dicts("line_shift_active", [(l,t) for l in self.line for t in self.time], cat="Binary")
-        BIG_M = 10_000_000  # 충분히 큰 값
+        presolve_info = bounds.apply(x, y)
         for l in self.line:
             for t in self.time:
-                total_produced = pulp.lpSum(x[(d, l, t)] for d in demands)
-                model += total_produced <= BIG_M * y[(l, t)]
+                total_produced = cache.line_shift(l, t)
+                model += total_produced <= bounds.big_m(l, t) * y[(l, t)]
                 model += total_produced >= 1 * y[(l, t)] 
+        telemetry.constraints_added(model, 'line_active')
 
-        blocks = list(set(l[0] for l in self.line))
+        active_lines = group_by_building_shift(y, blocks)
         for b in blocks:
             for time in self.time:
-                max_line = self.df_capa_qty.loc[f'Max_line_{b}',time] if pd.notna(self.df_capa_qty.loc[f'Max_line_{b}',time]) else 100
-                model += pulp.lpSum(
-                    y[(l, t)] for l in self.line for t in self.time if l.startswith(b) and t == time
-                ) <= max_line
+                if bounds.keep('max_line', (b, time)):
+                    model += active_lines.get((b, time), pulp.LpAffineExpression()) <= max_lines[(b, time)]
+        telemetry.constraints_added(model, 'max_line')
 
         # 제약조건 6: 각 (제조동 * 시프트) 별 최대 생산 수량. Max_qty
         for b in blocks:
             for time in self.time:
-                max_qty = self.df_capa_qty.loc[f'Max_qty_{b}',time] if pd.notna(self.df_capa_qty.loc[f'Max_qty_{b}',time]) else 10_000_000
-                model += pulp.lpSum(
-                    x[(d, l, t)] for (d,l,t) in x if l.startswith(b) and t == time
-                ) <= max_qty
+                if bounds.keep('max_qty', (b, time)):
+                    model += cache.building_shift(b, time) <= max_qtys[(b, time)]
+        telemetry.constraints_added(model, 'max_qty')
 
         
 
@@ -197,40 +329,45 @@ class Optimization:
         for d in demands:
             lt = df_demand_item.loc[d,'Due_date_LT']
             sop = df_demand_item.loc[d,'SOP']
-            sop_result = pulp.lpSum(x[(d, l, t)] for l in self.line for t in range(1,lt+1))
-            model += sop_result - sop <= BIG_M * shipment_variable[d]
+            sop_result = cache.affine({x[(d, l, t)]: 1 for l in self.line for t in range(1,lt+1)})
+            # sop_result 는 수요(MFG)를 넘을 수 없으므로 big-M 은 MFG - SOP 면 충분
+            sop_m = max(0, df_demand_item.loc[d,'MFG'] - sop) if self.presolve else 10_000_000
+            model += sop_result - sop <= sop_m * shipment_variable[d]
             model += sop_result >= sop * shipment_variable[d]
+        telemetry.constraints_added(model, 'sop')
 
 
+        # 1주(14 시프트) 가중치를 주마다 반복
         shift_weight = [0,0,0.001,0.001,0.003,0.003,0.006,0.006,0.02,0.02,0.1,0.1,0.1,0.1]
-        obj1 = pulp.lpSum(shift_weight[t-1] * x[(d, l, t)] for d in demands for l in self.line for t in self.time)
-        obj2 = pulp.lpSum(shipment_variable[d] for d in demands)
+        obj1 = cache.affine({var: shift_weight[(t-1) % len(shift_weight)] for (d, l, t), var in x.items()})
+        obj2 = cache.affine({shipment_variable[d]: 1 for d in demands})
         # model += -1 * obj1 + obj2
         model += obj2
-        model.solve()
-
-        
+        telemetry.count_variables(x=x, y=y, shipment=shipment_variable)
+        telemetry.lap('build')
+        self.model, self.model_vars, self.model_line_vars = model, x, y
+        solve_info = self._solve(model, time_limit)
+        solve_info['presolve'] = presolve_info
+        telemetry.lap('solve')
+        # 단계별 시간 (이후 lap 도 같은 dict 에 더해짐, 벤치마크 보고서용)
+        solve_info['timings'] = telemetry.timings
+
+        if not solve_info['has_solution']:
+            print("해를 찾지 못했습니다. 상태:", solve_info['status'])
+            self.df_pre_result = pd.DataFrame(columns=RESULT_COLUMNS)
+            telemetry.write(solve_info)
+            return {'result':self.df_pre_result, 'combined' : self.df_combined, 'error':f"❌ 해를 찾지 못했습니다.", 'solve_info' : solve_info}
 
         print(pulp.value(model.objective))
-        results = []
-        for l in self.line:
-            for t in self.time:
-                print(f"{l} - {t} 시프트:")
-                for d in demands:
-                    units = int(pulp.value(x[(d, l, t)]))
-                    if units > 0:
-                        print(f"  모델 {d} → {units}개 생산")
-                        sop = -99
-                        mfg = -99
-                        due_lt= -99
-                        to_site = "XX"
-                        results.append((l,t,d+to_site,d,units,d[3:7],to_site,sop,mfg,d[3:11],due_lt)) 
+        # 라인 -> 시프트 -> 아이템 순서로 해를 한 번에 꺼냄
+        df_values = solution_frame(x, [(d, l, t) for l in self.line for t in self.time for d in demands])
+        if showlog: print(df_values.to_string(index=False))
         print('총 수요량',df_demand_item['MFG'].sum())
-        print(f"\n총 생산량: {sum(x[d, l, t].value() for d in demands for l in self.line for t in self.time)}개")
+        print(f"\n총 생산량: {pulp.value(cache.total())}개")
         print('목적함수 값',pulp.value(model.objective))
-        total_production = pulp.value(pulp.lpSum([x[(d, l, t)] for (d, l, t) in x]))
+        total_production = pulp.value(cache.total())
         for (idx,row) in self.df_capa_portion.iterrows():
-            line_production =pulp.value(pulp.lpSum([x[(d, l, t)] for (d, l, t) in x if l.startswith(row['name'])]))
+            line_production =pulp.value(cache.building(row['name']))
             line_ratio = (line_production / total_production) * 100 if total_production != 0 else 0
             print(f"{row['name']}라인 생산량: {int(line_production)}개, {row['name']}라인 비중: {line_ratio:.2f}%")
         if LpStatus[model.status] == 'Optimal':
@@ -241,20 +378,30 @@ class Optimization:
                 
                     
             
-        self.df_pre_result = pd.DataFrame(results,columns=['Line','Time','Demand','Item','Qty','Project','To_site','SOP','MFG','RMC','Due_LT'])
-        return {'result':self.df_pre_result, 'combined' : self.df_combined }
+        self.df_pre_result = self.result_frame(df_values, aggregate='sum')
+        telemetry.lap('extract')
+        telemetry.write(solve_info, result_rows=len(self.df_pre_result))
+        return {'result':self.df_pre_result, 'combined' : self.df_combined, 'solve_info' : solve_info }
     """사전할당 알고리즘 함수"""
-    def linear_programming(self, showlog = False):
+    def linear_programming(self, showlog = False, time_limit = None, diagnose = False, conflict = False):
         """
+        Parameters:
+            time_limit (int): 솔버 제한 시간(초). 제한에 걸리면 그때까지의 최선해를 사용
+            diagnose (bool): 수요를 다 채우지 못하면 탄력 모델로 위반 제약을 진단할지 여부 (showlog 이면 항상 진단)
+            conflict (bool): 진단 후 deletion filter 로 충돌 제약 집합(IIS)까지 찾을지 여부
+
         Returns:
             dictionary: 
                 {
                     'result': 할당 결과 데이터프레임,
                     'combined': fixed option + pre assign 시트 데이터프레임
                     'error': 에러 문구 문자열
+                    'diagnosis': 위반 제약 데이터프레임 (진단한 경우)
+                    'conflict': 충돌 제약 데이터프레임 (찾은 경우)
                 }
 
         """
+        telemetry = RunTelemetry('linear_programming')
         # 모든 (line * shift) 를 원소로 하는 리스트
         line_shifts = [(l,s) for l in self.line for s in self.time]
         # 생산해야 하는 아이템들 리스트. 
@@ -273,21 +420,20 @@ class Optimization:
 
         # 통합한 시트의 아이템들을 items 와 demand 에 추가
         done_list = []
+        demand_items = PatternIndex(self.df_demand['Item'])
         for index, row in self.df_combined.iterrows():
             if '*' in row['Fixed_Group']:
                 if pd.isna(row['Qty']):
                     if showlog: print(row['Fixed_Group']+' 아이템의 Qty 가 비어있습니다')
                     continue
                 elif str(row['Qty']).lower() == 'all':
-                    for idx, demandrow in self.df_demand.iterrows():
-                        regex =  str(row['Fixed_Group']).replace("*",".")
-                        item = demandrow['Item']
-                        if bool(re.fullmatch(regex, item)):
-                            if item in demand:
-                                demand[item] = demand[item] + demandrow['MFG']
-                            else: 
-                                demand[item] = demandrow['MFG']
-                                done_list.append(item)
+                    matched = demand_items.mask(str(row['Fixed_Group']))
+                    for item, mfg in zip(self.df_demand['Item'][matched], self.df_demand['MFG'][matched]):
+                        if item in demand:
+                            demand[item] = demand[item] + mfg
+                        else: 
+                            demand[item] = mfg
+                            done_list.append(item)
                 else :# 여러 아이템을 ***P205******* 처럼 선택하고 Qty 에 값이 있을 경우
                     if showlog: (row['Fixed_Group'],",",row['Qty'])
                     if showlog: print("여러 아이템을 선택하고 수량을 입력했기 때문에 오류입니다")
@@ -317,17 +463,14 @@ class Optimization:
 
 
         # 라인*시프트 별 생산가능 아이템. pre_assign, fixed_option 시트의 조건들이 들어가야함.
-        allowed_items = {} # (line*shift) 별 생산 가능한 모델
         fixed_line_shifts = {}
         for idx, row in self.df_combined.iterrows():
             fixed_lines = row['Fixed_Line'].split(",") if pd.notna(row['Fixed_Line']) else self.line
             fixed_times = list(map(int,str(row['Fixed_Time']).split(","))) if pd.notna(row['Fixed_Time']) else self.time
 
             if '*' in str(row['Fixed_Group']):
-                regex = str(row['Fixed_Group']).replace("*",".")
-                for item in self.df_demand['Item']:
-                    if bool(re.fullmatch(regex, item)):
-                        fixed_line_shifts[item] = [(line,time) for line in fixed_lines for time in fixed_times]
+                for item in demand_items.matching_items(str(row['Fixed_Group'])):
+                    fixed_line_shifts[item] = [(line,time) for line in fixed_lines for time in fixed_times]
                 continue
             if row['Fixed_Group'] in fixed_line_shifts:
                 fixed_line_shifts[row['Fixed_Group']].extend([(line,time) for line in fixed_lines for time in fixed_times])
@@ -336,278 +479,549 @@ class Optimization:
 
         if showlog: print('fixed_line_shifts : ',fixed_line_shifts)
 
-        for l, s in line_shifts:
+        for l in self.line:
             if l not in self.df_line_available.columns:
                 raise ValueError(f"라인 {l}는 line_available에 존재하지 않습니다.")
-            projects = self.df_line_available[self.df_line_available[l] == 1]['Project'].tolist()
-            # 특정 라인*시프트에서는 특정 프로젝트의 모델만 생산 가능하고,그 모델은 사전할당에서 지정한 라인*시프트 범위 내여야 한다
-            allowed = []
-            for m in items:
-                if any(m[3:7] == project for project in projects) and (l,s) in fixed_line_shifts[m]:
-                    allowed.append(m)
-                elif not any(m[3:7] == project for project in projects) and (l,s) in fixed_line_shifts[m]:
-                    if showlog: print(f"{m} 아이템은 {l},{s} 에서 생산할 수 없는 아이템입니다")
-            allowed_items[(l, s)] = allowed
+
+        # 특정 라인*시프트에서는 특정 프로젝트의 모델만 생산 가능하고,그 모델은 사전할당에서 지정한 라인*시프트 범위 내여야 한다
+        # line_available 과 사전할당 범위를 조인해서 생산 가능한 (아이템, 라인, 시프트) 조합만 남긴다
+        df_fixed = pd.DataFrame(
+            [(m, line, time) for m, pairs in fixed_line_shifts.items() if m in demand for (line, time) in pairs],
+            columns=['Item', 'Line', 'Time']
+        )
+        index = build_sparse_index(items, self.df_line_available, self.line, self.time, restrict=df_fixed)
+        allowed_items = index.items_by_line_shift()
         if showlog: print('allowed_items : ',allowed_items)
+        if showlog:
+            rejected = df_fixed.merge(index.frame, on=['Item', 'Line', 'Time'], how='left', indicator=True)
+            for _, row in rejected[rejected['_merge'] == 'left_only'].iterrows():
+                print(f"{row['Item']} 아이템은 {row['Line']},{row['Time']} 에서 생산할 수 없는 아이템입니다")
+        telemetry.inputs = {'items': len(items), 'lines': len(self.line), 'shifts': len(self.time), 'fixed_rows': len(self.df_combined)}
+        telemetry.lap('prep')
+
+        plan = self.build_pre_assign_model(index, items, demand, capacity, self.presolve, telemetry)
+        model, x, y, cache, presolve_info = plan['model'], plan['x'], plan['y'], plan['cache'], plan['presolve']
+        telemetry.count_variables(x=x, y=y)
+        telemetry.lap('build')
+
+        # 최적화
+        self.model, self.model_vars, self.model_line_vars = model, x, y
+        solve_info = self._solve(model, time_limit)
+        solve_info['presolve'] = presolve_info
+        telemetry.lap('solve')
+        solve_info['timings'] = telemetry.timings
+
+        if not solve_info['has_solution']:
+            print(f"❌ 모델 최적화 실패: {solve_info['status']}")
+            self.df_pre_result = pd.DataFrame(columns=RESULT_COLUMNS)
+            telemetry.write(solve_info)
+            return {'result':self.df_pre_result ,'error':f"❌ 최적해를 찾지 못했습니다.", 'solve_info' : solve_info}
+
+        # 결과 저장 & 출력
+        if showlog: print(y.values())
+        df_values = solution_frame(x)
+        if showlog: print(df_values.to_string(index=False))
+
+        # 제조동별 생산량
+        total_production = pulp.value(cache.total())
+        for (idx,row) in self.df_capa_portion.iterrows():
+            line_production =pulp.value(cache.building(row['name']))
+            line_ratio = (line_production / total_production) * 100 if total_production != 0 else 0
+            print(f"{row['name']}라인 생산량:{int(line_production)}개, {row['name']}라인 비중: {line_ratio:.2f}%")
 
+        self.df_pre_result = self.result_frame(df_values, aggregate='sum')
+        print(self.df_pre_result)
+        telemetry.lap('extract')
+        unassigned = sum(demand.values()) - int(pulp.value(model.objective))
+        #주어진 수요량을 모두 생산 가능하면 해를 찾은 것
+
+        if pulp.LpStatus[model.status] == 'Optimal':
+            if int(pulp.value(model.objective)) == sum(demand.values()):
+                print(f"\n최적해를 찾았습니다")
+                print(f"\n총 생산량: {int(pulp.value(model.objective))}개")
+                print(f"\n총 생산 수요량: {sum(demand.values())}개")
+            else:
+                print("❌ 최적해를 찾지 못했습니다.")
+                print(f"\n총 생산 수요량: {sum(demand.values())}")
+                print(f"\n총 생산량: {int(pulp.value(model.objective))}개")
+                print(f"\n미할당량: {sum(demand.values())-int(pulp.value(model.objective))}개")
+                result = {'result':self.df_pre_result ,'error':f"❌ 최적해를 찾지 못했습니다.", 'solve_info' : solve_info}
+                if diagnose or showlog:
+                    # 모든 제약조건의 slack 을 출력하는 대신 위반된 제약 그룹과 위반량만 진단
+                    # presolve 는 중복 제약을 변수 상한으로 바꿔 빼므로 (진단은 이름 있는 제약만 완화) 줄이지 않은 모델로 진단
+                    diagnosis_model = self._unreduced_pre_assign_model(model, index, items, demand, capacity)
+                    result['diagnosis'] = diagnose_infeasibility(diagnosis_model, time_limit, self.solver_backend)
+                    print(result['diagnosis'].to_string(index=False))
+                    if conflict:
+                        result['conflict'] = find_conflict_set(diagnosis_model, result['diagnosis'], time_limit or 10, self.solver_backend)
+                        if result['conflict'] is not None:
+                            print(result['conflict'].to_string(index=False))
+                    telemetry.lap('diagnose')
+                telemetry.write(solve_info, result_rows=len(self.df_pre_result), unassigned=unassigned)
+                return result
+        else:
+            print(f"❌ 모델 최적화 실패: {pulp.LpStatus[model.status]}")
+
+        # df_pre_result.to_excel('pre_assign_result.xlsx',index=False)
+        telemetry.write(solve_info, result_rows=len(self.df_pre_result), unassigned=unassigned)
+        return {'result':self.df_pre_result, 'combined' : self.df_combined, 'solve_info' : solve_info }
+
+    """
+    사전할당(1차) 모델 구성
+
+    Args:
+        index: build_sparse_index 결과 (생산 가능한 (아이템, 라인, 시프트) 조합)
+        items (list): 아이템 목록
+        demand (dict): 아이템 -> 할당해야 하는 수량
+        capacity (dict): (라인, 시프트) -> Capa
+        presolve (bool): 변수 상한 / big-M 을 줄이고 중복 제약을 뺄지 여부
+        telemetry (RunTelemetry): 제약 종류별 개수를 기록할 실행 기록. None 이면 기록하지 않음
+
+    Returns:
+        dict: {'model', 'x', 'y', 'cache', 'presolve'(presolve 통계)}
+    """
+    def build_pre_assign_model(self, index, items, demand, capacity, presolve, telemetry=None):
+        telemetry = telemetry or RunTelemetry('build_pre_assign_model', enabled=False)
         # 결정 변수: 모델 m을 라인 l, 시프트 s에서 몇 개 생산할지. 카테고리는 정수형.
-        x = pulp.LpVariable.dicts("produce", [(m, l, s) for m in items for (l, s) in line_shifts], lowBound=0, cat='Integer')
+        # 생산 가능한 조합에만 변수를 만든다 (제약조건 2 를 변수 생성 단계에서 반영)
+        x = pulp.LpVariable.dicts("produce", index.keys, lowBound=0, cat='Integer')
+        items_by_line_shift = index.items_by_line_shift()
+        # 아이템별, (라인*시프트)별, 제조동별 부분합을 한 번만 만들어 모든 제약조건에서 재사용
+        cache = ExpressionCache(x)
 
         # y 는 각 (라인 * 시프트) 를 키값으로, 그 (라인*시프트) 가 가동중이면 1, 아니면 0 을 value 값으로 갖는 pulp 딕셔너리
-        y = pulp.LpVariable.dicts("line_shift_active", line_shifts, cat="Binary")
+        # 생산 가능한 아이템이 없는 (라인*시프트) 는 가동될 수 없으므로 변수를 만들지 않는다
+        y = pulp.LpVariable.dicts("line_shift_active", index.line_shifts(), cat="Binary")
 
         # 문제 정의. 최대화 문제
         model = pulp.LpProblem("LineShift_Production_Scheduling", pulp.LpMaximize)
         
         # 목적함수: 총 생산량 최대화
-        model += pulp.lpSum([x[(m, l, s)] for m in items for (l, s) in line_shifts])
+        model += cache.total()
+
+        # presolve: (라인, 시프트)별 big-M, 변수 상한, 중복 제약 판정
+        blocks = list(set(l[0] for l in self.line)) # 제조동 리스트 ['I','D','K','M']
+        max_lines = shift_limits(self.df_capa_qty, 'Max_line', blocks, self.time, DEFAULT_MAX_LINE)
+        max_qtys = shift_limits(self.df_capa_qty, 'Max_qty', blocks, self.time, DEFAULT_MAX_QTY)
+        bounds = PlanBounds(items_by_line_shift, demand, capacity, max_lines, max_qtys, big_m=1_000_000, enabled=presolve)
+        presolve_info = bounds.apply(x, y)
  
         # 제약조건 1: 모델별 총 수요량 충족 + 사전할당 알고리즘에서 모든 아이템은 무조건 할당되어야함
         # 아래의 조건에서는 <= 부등식을 넣었지만 최종 생산량이 수요량과 같지 않은 경우는 사전할당에 실패한 경우로 보고 
         # 딕셔너리에 'error' 키를 담아서 반환
         for m in items:
-            model += (pulp.lpSum([x[(m, l, s)] for (l, s) in line_shifts]) <= demand[m],f'constraint1 ({m})')
+            if bounds.keep('demand', m):
+                model += (cache.item(m) <= demand[m],f'constraint1 ({m})')
+        telemetry.constraints_added(model, 'demand')
 
         # 제약조건 2: 라인/시프트에서 생산 가능한 모델만 허용
-        for (l, s) in line_shifts:
-            for m in items:
-                if m not in allowed_items.get((l, s), []):
-                    model += (x[(m, l, s)] == 0, f"constraint2 ({m},{l},{s})")
-        #  model += x[(m, l, s)] == 0 으로 넣어도 동작하지만 제약조건 각각에 constraint2 와같이 이름을 붙여준 것은 
-        # 해를 찾지 못했을 경우 위배되는 제약조건이 무엇인지 알 수 있게 하기 위함.
+        # 허용되지 않은 조합은 변수 자체가 없으므로 별도의 x == 0 제약이 필요 없다.
 
         # 제약조건 3: 제조동별 물량 비중 상한/하한 (사전 할당에서는 물량 비중을 고려하지 않는게 맞다는 판단 하에 제약조건 제외)
 
-        # 제약조건 4: 각 라인/시프트 조합의 최대 생산량 제한
-        for (l, s) in line_shifts:
-            model += (pulp.lpSum([x[(m, l, s)] for m in items]) <= capacity[(l, s)],f'constraint4 ({l},{s})')
+        # 제약조건 4: 각 라인/시프트 조합의 최대 생산량 제한 (presolve 면 제약조건 5-1 이 대신 보장)
+        for (l, s) in items_by_line_shift:
+            if bounds.keep('capacity', (l, s)):
+                model += (cache.line_shift(l, s) <= capacity[(l, s)],f'constraint4 ({l},{s})')
+        telemetry.constraints_added(model, 'capacity')
 
         # 제약조건 5: 각 (제조동 * 시프트) 별 가동가능한 최대 라인 수. capa_qty 시트와 관련됨. Max_line
         # 특정 y[(l,s)] 가 1이면 그 (라인*시프트) 에서 생산되는 모델이 적어도 1개는 있다는 뜻.반대로 0이면 하나도 없다는 뜻.
-        BIG_M = 1_000_000  # 충분히 큰 값. _ 는 오직 가독성을 위한 표현.
-        for (l, s) in line_shifts:
-            total_produced = pulp.lpSum(x[(m, l, s)] for m in items)
-            model += (total_produced <= BIG_M * y[(l, s)],f'constraint5-1 ({l},{s})')
+        # big-M 은 presolve 면 (라인, 시프트)별 최대 생산 가능량, 아니면 충분히 큰 값(1,000,000)
+        for (l, s) in items_by_line_shift:
+            total_produced = cache.line_shift(l, s)
+            model += (total_produced <= bounds.big_m(l, s) * y[(l, s)],f'constraint5-1 ({l},{s})')
             model += (y[(l, s)] <= total_produced ,f'constraint5-2 ({l},{s})')
-            
-        blocks = list(set(l[0] for l in self.line)) # 제조동 리스트 ['I','D','K','M']
-
-        # for (l, s) in line_shifts:
-        #     print(f"y[{(l, s)}]:", type(y[(l, s)]))
-
+        telemetry.constraints_added(model, 'line_active')
 
+        active_lines = group_by_building_shift(y, blocks)
         for b in blocks:
             for shift in self.time:
-                series = self.df_capa_qty.loc[self.df_capa_qty['Line'] == f"Max_line_{b}", shift]
-                max_line = int(series.values[0]) if pd.notna(series.values[0]) else 100
-                model += (pulp.lpSum(
-                    y[(l, s)] for (l, s) in line_shifts if l.startswith(b) and s == shift
-                ) <= max_line,f'constraint5-3,({b},{shift})')
+                if bounds.keep('max_line', (b, shift)):
+                    model += (active_lines.get((b, shift), pulp.LpAffineExpression()) <= max_lines[(b, shift)],f'constraint5-3,({b},{shift})')
+        telemetry.constraints_added(model, 'max_line')
 
         # 제약조건 6: 각 (제조동 * 시프트) 별 최대 생산 수량. capa_qty 시트와 관련됨. Max_qty
         for b in blocks:
             for shift in self.time:
-                series = self.df_capa_qty.loc[self.df_capa_qty['Line'] == f"Max_qty_{b}", shift]
-                max_qty = int(series.values[0]) if pd.notna(series.values[0]) else 10_000_000
-                model += (pulp.lpSum(
-                    x[(m, l, s)] for m in items for (l, s) in line_shifts if l.startswith(b) and s == shift
-                ) <= max_qty,f'constraint6 ({b},{shift})')
-
-        # 최적화
-        model.solve()
-
-        # 결과 저장 & 출력
-        results = []
-        if showlog: print(y.values())
-        for (l, s) in line_shifts:
-            if showlog: print(f"{l} - {s} 시프트:")
-            for m in items:
-                units = int(pulp.value(x[(m, l, s)]))
-                if units > 0:
-                    if showlog: print(f"  모델 {m} → {units}개 생산")
-                    # 아이템의 SOP 와 MFG 값은 demand 시트에서 참조, due_LT 값은 due_LT 시트에서 참조
-                    # 해야 하지만 사전할당에서 To_site 값까지 입력하지 않기 때문에 임의 값으로 넣어놓고 추후 생각해보겠음.
-                    sop = -99
-                    mfg = -99
-                    due_lt= -99
-                    to_site = "XX"
-                    results.append((l,s,m+to_site,m,units,m[3:7],to_site,sop,mfg,m[3:11],due_lt)) 
-                    
-        # 제조동별 생산량
-        total_production = pulp.value(pulp.lpSum([x[(m, l, s)] for (m, l, s) in x]))
-        for (idx,row) in self.df_capa_portion.iterrows():
-            line_production =pulp.value(pulp.lpSum([x[(m, l, s)] for (m, l, s) in x if l.startswith(row['name'])]))
-            line_ratio = (line_production / total_production) * 100 if total_production != 0 else 0
-            print(f"{row['name']}라인 생산량:{int(line_production)}개, {row['name']}라인 비중: {line_ratio:.2f}%")
-
-        self.df_pre_result = pd.DataFrame(results,columns=['Line','Time','Demand','Item','Qty','Project','To_site','SOP','MFG','RMC','Due_LT'])
-        print(self.df_pre_result)
-        #주어진 수요량을 모두 생산 가능하면 해를 찾은 것
-
-        if pulp.LpStatus[model.status] == 'Optimal':
-            if int(pulp.value(model.objective)) == sum(demand.values()):
-                print(f"\n최적해를 찾았습니다")
-                print(f"\n총 생산량: {int(pulp.value(model.objective))}개")
-                print(f"\n총 생산 수요량: {sum(demand.values())}개")
-            else:
-                print("❌ 최적해를 찾지 못했습니다.")
-                print(f"\n총 생산 수요량: {sum(demand.values())}")
-                print(f"\n총 생산량: {int(pulp.value(model.objective))}개")
-                print(f"\n미할당량: {sum(demand.values())-int(pulp.value(model.objective))}개")
-                if showlog:
-                    for item in y.values():     
-                        print(item, item.varValue)
-                if showlog:
-                    for name, constraint in model.constraints.items():
-                        slack_value = constraint.slack
-                        if slack_value is not None and slack_value < 0:
-                            print(slack_value)
-                            print(f"제약조건 '{name}'이 위배됨: slack = {slack_value}")
-                            print(f"제약조건: {constraint}")
-                return {'result':self.df_pre_result ,'error':f"❌ 최적해를 찾지 못했습니다."}
-        else:
-            print(f"❌ 모델 최적화 실패: {pulp.LpStatus[model.status]}")
-        if showlog:print(pulp.value(model.objective))
-        if showlog:
-            for name, constraint in model.constraints.items():
-                slack_value = constraint.slack
-                if slack_value is not None and slack_value < 0:
-                    print("=" * 80)
-                    print(f"❗ 제약조건 '{name}' 위배: slack = {slack_value}")
-                    print(f"제약식 원본: {constraint}")
-                    print(f"좌변(lhs) 값: {constraint.value()}")  # 실제 계산된 좌변 값
-                    print(f"우변(rhs): {constraint.constant}")  # 우변 값 (우변에 있는 상수)
-                    print(f"연산자: {constraint.sense}")  # -1: <=, 0: =, 1: >=
-                    
-                    # 사용된 변수들의 값도 같이 출력
-                    used_vars = constraint.keys()
-                    print("사용된 변수 값:")
-                    for var in used_vars:
-                        print(f"  {var.name} = {var.varValue}")
-        
-
-        # df_pre_result.to_excel('pre_assign_result.xlsx',index=False)
-        return {'result':self.df_pre_result, 'combined' : self.df_combined }
-
-    """생산계획 최적화 알고리즘 함수"""
-    def execute(self,showlog = False):
+                if bounds.keep('max_qty', (b, shift)):
+                    model += (cache.building_shift(b, shift) <= max_qtys[(b, shift)],f'constraint6 ({b},{shift})')
+        telemetry.constraints_added(model, 'max_qty')
+
+        return {'model': model, 'x': x, 'y': y, 'cache': cache, 'presolve': presolve_info}
+
+    """
+    presolve 를 쓰지 않은 사전할당 모델 (수요 미충족 진단용)
+    presolve 로 푼 경우 같은 모델을 presolve 없이 다시 만들고 풀이한 변수 값을 옮겨 둔다 (충돌 집합 후보 선정에 사용)
+
+    Args:
+        model (LpProblem): 풀이한 사전할당 모델
+        index, items, demand, capacity: build_pre_assign_model 인자
+
+    Returns:
+        LpProblem: presolve 를 쓰지 않았으면 model 그대로
+    """
+    def _unreduced_pre_assign_model(self, model, index, items, demand, capacity):
+        if not self.presolve:
+            return model
+        unreduced = self.build_pre_assign_model(index, items, demand, capacity, presolve=False)['model']
+        values = {var.name: var.varValue for var in model.variables()}
+        for var in unreduced.variables():
+            var.varValue = values.get(var.name)
+        return unreduced
+
+    """
+    생산계획(2차) 모델 구성. execute 와 빠른 계획(quick_plan)이 같은 모델을 사용
+
+    Args:
+        telemetry (RunTelemetry): 데이터 준비 / 모델 구성 시간과 제약 종류별 개수를 기록할 실행 기록. None 이면 기록하지 않음
+
+    Returns:
+        dict: {'model', 'x', 'y', 'cache', 'items_by_line_shift', 'demand', 'capacity',
+               'max_lines', 'max_qtys', 'presolve'(presolve 통계)}
+    """
+    def build_plan_model(self, telemetry=None):
+        telemetry = telemetry or RunTelemetry('build_plan_model', enabled=False)
         # 아이템에 To_site 까지 포함해서 아이템의 단위로 설정 (출하 capa를 목적함수에 포함시키기 위함)
         # 반면에 사전할당은 To_site 미포함
-        items = self.df_demand['Item'].tolist()
+        items = list(dict.fromkeys(self.df_demand['Item']))
         line_shifts = [(l,s) for l in self.line for s in self.time]
         demand = dict(zip(self.df_demand['Item'], self.df_demand['MFG']))
         capacity = {(l,s):int(self.df_capa_qty.loc[self.df_capa_qty['Line'] == l, s].values[0]) for (l, s) in line_shifts}
 
-        allowed_items = {}
-        for l, s in line_shifts:
+        for l in self.line:
             if l not in self.df_line_available.columns:
                 print(f"라인 {l}는 line_available에 존재하지 않습니다.")
-                continue
-            # line_available에서 값이 1 인 프로젝트들의 리스트
-            projects = self.df_line_available[self.df_line_available[l] == 1]['Project'].tolist()
-            allowed = [m for m in items if any(m[3:7] == project for project in projects)]
-            allowed_items[(l, s)] = allowed
 
-        # 결정 변수 x : 모델 m을 라인 l, 시프트 s에서 몇 개 생산할지의 딕셔너리
-        x = pulp.LpVariable.dicts("produce", [(m, l, s) for m in items for (l, s) in line_shifts], lowBound=0, cat='Integer')
+        # line_available에서 값이 1 인 프로젝트의 아이템만 (라인, 시프트) 에 허용.
+        # 데이터프레임 조인으로 생산 가능한 (아이템, 라인, 시프트) 조합만 남긴다
+        index = build_sparse_index(items, self.df_line_available, self.line, self.time)
+        items_by_line_shift = index.items_by_line_shift()
+        telemetry.inputs = {'items': len(items), 'lines': len(self.line), 'shifts': len(self.time),
+                            'fixed_rows': len(self.df_pre_result) if self.df_pre_result is not None else 0}
+        telemetry.lap('prep')
+
+        # 결정 변수 x : 모델 m을 라인 l, 시프트 s에서 몇 개 생산할지의 딕셔너리. 생산 가능한 조합에만 변수를 만든다
+        x = pulp.LpVariable.dicts("produce", index.keys, lowBound=0, cat='Integer')
+        # 아이템별, (라인*시프트)별, 제조동별 부분합을 한 번만 만들어 모든 제약조건에서 재사용
+        cache = ExpressionCache(x)
         # 문제 정의
         model = pulp.LpProblem("LineShift_Production_Scheduling", pulp.LpMaximize)
         
         # 목적함수: 총 생산량 최대화 (추후 지표 8가지를 최적화 하는 목적함수로 수정 예정)
-        model += pulp.lpSum([x[(m, l, s)] for m in items for (l, s) in line_shifts])
+        model += cache.total()
+
+        # presolve: (라인, 시프트)별 big-M, 변수 상한, 중복 제약 판정
+        blocks = list(set(l[0] for l in self.line)) # 제조동 리스트 ['I','D','K','M']
+        max_lines = shift_limits(self.df_capa_qty, 'Max_line', blocks, self.time, DEFAULT_MAX_LINE)
+        max_qtys = shift_limits(self.df_capa_qty, 'Max_qty', blocks, self.time, DEFAULT_MAX_QTY)
+        bounds = PlanBounds(items_by_line_shift, demand, capacity, max_lines, max_qtys, big_m=10_000_000, enabled=self.presolve)
 
         # 제약조건 0: 사전할당 결과가 있다면 그 결과를 제약조건에 포함시켜서 고정
         if self.df_pre_result is not None:
             for idx,row in self.df_pre_result.iterrows():
                 if (row['Item'], row['Line'], row['Time']) in x:
                     model += x[(row['Item'], row['Line'], row['Time'])] == row['Qty']
+                elif row['Item'] in demand:
+                    print(f"사전할당 {row['Item']} ({row['Line']},{row['Time']}) 은 생산 불가능한 조합이라 고정하지 않습니다")
+        telemetry.constraints_added(model, 'pinned')
 
         # 제약조건 1: 모델별 수요량 보다 적게 생산. 꼭 모든 수요를 만족시키지 않아도 됨. demand 시트와 관련됨. 
         for m in items:
-            model += pulp.lpSum([x[(m, l, s)] for (l, s) in line_shifts]) <= demand[m]
+            if bounds.keep('demand', m):
+                model += cache.item(m) <= demand[m]
+        telemetry.constraints_added(model, 'demand')
 
         # 제약조건 2: 라인/시프트에서 생산 가능한 모델만 허용. line_available 시트와 관련됨.
-        for (l, s) in line_shifts:
-            for m in items:
-                if m not in allowed_items.get((l, s), []):
-                    model += x[(m, l, s)] == 0
+        # 허용되지 않은 조합은 변수 자체가 없으므로 별도의 x == 0 제약이 필요 없다.
 
         # 제약조건 3: 제조동별 물량 비중 상한/하한. capa_portion 시트와 관련됨.
         for (ids,row) in self.df_capa_portion.iterrows():
-            model += (
-               row['upper_limit'] * pulp.lpSum([x[(m, l, s)] for (m, l, s) in x]) >=
-               pulp.lpSum([x[(m, l, s)] for (m, l, s) in x if l.startswith(row['name'])])
-            )
-            model += (
-                pulp.lpSum([x[(m, l, s)] for (m, l, s) in x if l.startswith(row['name'])]) >=
-                row['lower_limit'] * pulp.lpSum([x[(m, l, s)] for (m, l, s) in x])
-            )
-
-        # 제약조건 4: 각 라인/시프트 조합의 최대 생산량 제한. capa_qty 시트와 관련됨.
-        for (l, s) in line_shifts:
-            model += pulp.lpSum([x[(m, l, s)] for m in items]) <= capacity[(l, s)]
+            model += row['upper_limit'] * cache.total() >= cache.building(row['name'])
+            model += cache.building(row['name']) >= row['lower_limit'] * cache.total()
+        telemetry.constraints_added(model, 'portion')
+
+        # 제약조건 4: 각 라인/시프트 조합의 최대 생산량 제한. capa_qty 시트와 관련됨. (presolve 면 제약조건 5 가 대신 보장)
+        for (l, s) in items_by_line_shift:
+            if bounds.keep('capacity', (l, s)):
+                model += cache.line_shift(l, s) <= capacity[(l, s)]
+        telemetry.constraints_added(model, 'capacity')
         
         # 제약조건 5: 각 (제조동 * 시프트) 별 가동가능한 최대 라인 수. capa_qty 시트와 관련됨. Max_line
         # 결정변수 y 추가. y 는 각 (라인 * 시프트) 를 키값으로, 그 (라인*시프트) 가 가동중이면 1, 아니면 0 을 value 값으로 갖는 pulp 딕셔너리
-        y = pulp.LpVariable.dicts("line_shift_active", line_shifts, cat="Binary")
+        # 생산 가능한 아이템이 없는 (라인*시프트) 는 가동될 수 없으므로 변수를 만들지 않는다
+        y = pulp.LpVariable.dicts("line_shift_active", index.line_shifts(), cat="Binary")
+        presolve_info = bounds.apply(x, y)
         # 특정 y[(l,s)] 가 1이면 그 (라인*시프트) 에서 생산되는 모델이 적어도 1개는 있다는 뜻.반대로 0이면 하나도 없다는 뜻.
-        BIG_M = 10_000_000  # 충분히 큰 값. _ 는 오직 가독성을 위한 표현.
-        for (l, s) in line_shifts:
-            total_produced = pulp.lpSum(x[(m, l, s)] for m in items)
-            model += total_produced <= BIG_M * y[(l, s)]
+        # big-M 은 presolve 면 (라인, 시프트)별 최대 생산 가능량, 아니면 충분히 큰 값(10,000,000)
+        for (l, s) in items_by_line_shift:
+            total_produced = cache.line_shift(l, s)
+            model += total_produced <= bounds.big_m(l, s) * y[(l, s)]
             model += total_produced >= 1 * y[(l, s)]  
-            
-        blocks = list(set(l[0] for l in self.line)) # 제조동 리스트 ['I','D','K','M']
+        telemetry.constraints_added(model, 'line_active')
 
+        active_lines = group_by_building_shift(y, blocks)
         for b in blocks:
             for shift in self.time:
-                series = self.df_capa_qty.loc[self.df_capa_qty['Line'] == f"Max_line_{b}", shift]
-                max_line = int(series.values[0]) if pd.notna(series.values[0]) else 100
-                model += pulp.lpSum(
-                    y[(l, s)] for (l, s) in line_shifts if l.startswith(b) and s == shift
-                ) <= max_line
+                if bounds.keep('max_line', (b, shift)):
+                    model += active_lines.get((b, shift), pulp.LpAffineExpression()) <= max_lines[(b, shift)]
+        telemetry.constraints_added(model, 'max_line')
 
         # 제약조건 6: 각 (제조동 * 시프트) 별 최대 생산 수량. capa_qty 시트와 관련됨. Max_qty
         for b in blocks:
             for shift in self.time:
-                series = self.df_capa_qty.loc[self.df_capa_qty['Line'] == f"Max_qty_{b}", shift]
-                max_qty = int(series.values[0]) if pd.notna(series.values[0]) else 10_000_000
-                model += pulp.lpSum(
-                    x[(m, l, s)] for m in items for (l, s) in line_shifts if l.startswith(b) and s == shift
-                ) <= max_qty
+                if bounds.keep('max_qty', (b, shift)):
+                    model += cache.building_shift(b, shift) <= max_qtys[(b, shift)]
+        telemetry.constraints_added(model, 'max_qty')
+        telemetry.count_variables(x=x, y=y)
+        telemetry.lap('build')
+
+        return {
+            'model': model, 'x': x, 'y': y, 'cache': cache, 'items_by_line_shift': items_by_line_shift,
+            'demand': demand, 'capacity': capacity, 'max_lines': max_lines, 'max_qtys': max_qtys, 'presolve': presolve_info,
+        }
+
+    """생산계획 최적화 알고리즘 함수"""
+    def execute(self,showlog = False, time_limit = None, warm_start = None):
+        """
+        Parameters:
+            time_limit (int): 솔버 제한 시간(초). 제한에 걸리면 그때까지의 최선해(incumbent)를 사용
+            warm_start (DataFrame): 초기해로 사용할 계획 (Item, Line, Time, Qty). 사전할당 결과나 이전 주차 계획.
+                                    고정 제약이 아니라 MIP start 로만 사용
+
+        Returns:
+            dictionary: 
+                {
+                    'result': 생산계획 결과 데이터프레임 (해를 찾지 못하면 빈 데이터프레임),
+                    'combined': fixed option + pre assign 시트 데이터프레임,
+                    'solve_info': 솔버 상태 / 목적함수 / 풀이 시간 메타데이터
+                }
+        """
+        self.report_progress('build', 'Building the plan model...')
+        telemetry = RunTelemetry('execute')
+        plan = self.build_plan_model(telemetry)
+        model, x, y, cache = plan['model'], plan['x'], plan['y'], plan['cache']
+        items_by_line_shift, presolve_info = plan['items_by_line_shift'], plan['presolve']
+
+        # 초기해(MIP start) 설정
+        warm_start_rows = 0
+        if warm_start is not None and not warm_start.empty:
+            warm_start_rows = set_mip_start(x, y, warm_start)
+            print(f"MIP start: {len(warm_start)}개 행 중 {warm_start_rows}개 조합을 초기해로 사용")
+            telemetry.lap('build')
 
         # 최적화
-        model.solve()
+        self.model, self.model_vars, self.model_line_vars = model, x, y
+        solve_info = self._solve(model, time_limit, warm_start=warm_start_rows > 0)
+        solve_info['warm_start_rows'] = warm_start_rows
+        solve_info['presolve'] = presolve_info
+        telemetry.lap('solve')
+        solve_info['timings'] = telemetry.timings
+
+        if not solve_info['has_solution']:
+            print(f"❌ 모델 최적화 실패: {solve_info['status']}")
+            self.df_result = pd.DataFrame(columns=RESULT_COLUMNS)
+            telemetry.write(solve_info, warm_start_rows=warm_start_rows)
+            return {'result':self.df_result, 'combined' : self.df_combined, 'error':f"❌ 해를 찾지 못했습니다.", 'solve_info' : solve_info}
 
         # 결과 출력
-        results = []
-        for (l, s) in line_shifts:
-            if showlog: print(f"{l} - {s} 시프트:")
-            for m in items:
-                units = int(pulp.value(x[(m, l, s)]))
-                if units > 0:
-                    if showlog: print(f"  모델 {m} → {units}개 생산")
-                    # 아이템의 SOP 와 MFG 값은 demand 시트에서 참조, due_LT 값은 due_LT 시트에서 참조
-                    sop = -99
-                    mfg = -99
-                    due_lt = -99
-                    to_site = "XX"
-                    # sop = self.df_demand.loc[(self.df_demand['Item']==m[:-2])&(self.df_demand['To_Site']==m[-2:]),'SOP'].values[0]
-                    # mfg = self.df_demand.loc[(self.df_demand['Item']==m[:-2])&(self.df_demand['To_Site']==m[-2:]),'MFG'].values[0]
-                    # due_lt= self.df_due_LT.loc[(self.df_due_LT['Project']==m[3:7])&(self.df_due_LT['Tosite_group']==m[7:8]),'Due_date_LT'].values[0]
-                    results.append((l,s,m+to_site,m,units,m[3:7],to_site,sop,mfg,m[3:11],due_lt)) 
+        df_values = solution_frame(x)
+        if showlog: print(df_values.to_string(index=False))
         print(f"\n총 생산량: {int(pulp.value(model.objective))}개")
         # 제조동별 생산량
-        total_production = pulp.value(pulp.lpSum([x[(m, l, s)] for (m, l, s) in x]))
+        total_production = pulp.value(cache.total())
         for (idx,row) in self.df_capa_portion.iterrows():
-            line_production =pulp.value(pulp.lpSum([x[(m, l, s)] for (m, l, s) in x if l.startswith(row['name'])]))
+            line_production =pulp.value(cache.building(row['name']))
             line_ratio = (line_production / total_production) * 100 if total_production != 0 else 0
             print(f"{row['name']}라인 생산량: {int(line_production)}개, {row['name']}라인 비중: {line_ratio:.2f}%")
 
-        df_result = pd.DataFrame(results,columns=['Line','Time','Demand','Item','Qty','Project','To_site','SOP','MFG','RMC','Due_LT'])
-        print(df_result)
-        return {'result':self.df_result, 'combined' : self.df_combined }
-    
+        self.df_result = self.result_frame(df_values)
+        print(self.df_result)
+        telemetry.lap('extract')
+        telemetry.write(solve_info, warm_start_rows=warm_start_rows, result_rows=len(self.df_result))
+        return {'result':self.df_result, 'combined' : self.df_combined, 'solve_info' : solve_info }
+
+    """
+    (아이템, 라인, 시프트) -> 생산량 딕셔너리로 결과 데이터프레임 생성 (라인, 시프트 순 정렬)
+    캐시에 저장된 모델을 풀었을 때처럼 모델 변수 없이 값만 있는 경우에 사용
+    """
+    def result_from_values(self, values):
+        line_order = {l: i for i, l in enumerate(self.line)}
+        df_values = pd.DataFrame([(m, l, s, units) for (m, l, s), units in values.items() if units > 0],
+                                 columns=['Item', 'Line', 'Time', 'Qty'])
+        order = df_values['Line'].map(line_order).fillna(len(line_order))
+        df_values = df_values.assign(_order=order).sort_values(['_order', 'Time'], kind='stable').drop(columns='_order')
+        return self.result_frame(df_values)
+
+    """
+    아이템별 결과 값 (집계 방식별로 처음 한 번만 계산)
+    - To_site : demand 시트에서 아이템의 마지막 행
+    - SOP / MFG : aggregate 가 'last' 면 마지막 행 (execute 의 아이템별 수요와 같은 기준),
+                  'sum' 이면 아이템의 모든 행의 합 (pre_assign / linear_programming 의 아이템별 수요와 같은 기준)
+    - Due_LT : due_LT 시트의 (Project, Tosite_group) 값. 없으면 계획 기간의 마지막 시프트
+    """
+    def item_attributes(self, aggregate='last'):
+        if aggregate in self._item_attributes:
+            return self._item_attributes[aggregate]
+        df = self.df_demand.drop_duplicates('Item', keep='last').set_index('Item')
+        attrs = pd.DataFrame(index=df.index)
+        attrs['To_site'] = df['To_Site'].astype(str) if 'To_Site' in df.columns else "XX"
+        for col in ['SOP', 'MFG']:
+            if col not in df.columns:
+                attrs[col] = 0
+            elif aggregate == 'sum':
+                values = pd.to_numeric(self.df_demand[col], errors='coerce').fillna(0)
+                attrs[col] = values.groupby(self.df_demand['Item']).sum().reindex(df.index).astype(int)
+            else:
+                attrs[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+
+        due_lt = pd.Series(np.nan, index=df.index)
+        if self.df_due_LT is not None and 'Due_date_LT' in self.df_due_LT.columns:
+            df_due = self.df_due_LT.drop_duplicates(['Project', 'Tosite_group'], keep='last')
+            keys = pd.DataFrame({'Project': df.index.str[3:7], 'Tosite_group': df.index.str[7:8]})
+            due_lt = keys.merge(df_due[['Project', 'Tosite_group', 'Due_date_LT']], how='left', on=['Project', 'Tosite_group'])['Due_date_LT']
+            due_lt.index = df.index
+        attrs['Due_LT'] = pd.to_numeric(due_lt, errors='coerce').fillna(max(self.time)).astype(int)
+        self._item_attributes[aggregate] = attrs
+        return attrs
+
+    """
+    (Item, Line, Time, Qty) 데이터프레임 -> 결과 데이터프레임 (RESULT_COLUMNS)
+    아이템별 To_site / SOP / MFG / Due_LT 를 한 번의 병합으로 채워서, 결과를 쓰는 쪽에서 demand 시트를 다시 읽지 않아도 되게 한다
+    """
+    def result_frame(self, df_values, aggregate='last'):
+        df = df_values.join(self.item_attributes(aggregate), on='Item')
+        # demand 시트에 없는 아이템 (화면에서 직접 추가한 행 등)
+        df['To_site'] = df['To_site'].fillna("XX")
+        df[['SOP', 'MFG']] = df[['SOP', 'MFG']].fillna(0).astype(int)
+        df['Due_LT'] = df['Due_LT'].fillna(max(self.time)).astype(int)
+        df['Demand'] = df['Item'] + df['To_site']
+        df['Project'] = df['Item'].str[3:7]
+        df['RMC'] = df['Item'].str[3:11]
+        return df[RESULT_COLUMNS].reset_index(drop=True)
+
+    """수동 조정 주변 재최적화 함수"""
+    def reoptimize(self, df_plan, df_edited, cells, showlog = False, time_limit = None):
+        """
+        결과 화면에서 수정한 행과, 수정과 관련 없는 (라인, 시프트) 셀의 할당은 그대로 고정하고
+        수정이 일어난 셀(cells)에 있는 아이템들만 다시 배치하는 작은 모델을 푼다.
+        고정된 할당량은 상수로 넣고, 각 제약조건의 우변에서 고정량만큼을 빼서 남은 용량 안에서만 배치한다.
+
+        Parameters:
+            df_plan (DataFrame): 현재 계획 (Item, Line, Time, Qty 포함)
+            df_edited (DataFrame): 사용자가 수정한 행. 수정한 값 그대로 고정
+            cells (set): 다시 배치할 (라인, 시프트) 조합
+            time_limit (int): 솔버 제한 시간(초)
+
+        Returns:
+            dictionary:
+                {
+                    'result': 재최적화된 전체 계획 데이터프레임 (해를 찾지 못하면 df_plan 그대로),
+                    'solve_info': 솔버 상태 / 목적함수 / 풀이 시간 메타데이터,
+                    'neighborhood': 재배치 대상 셀 / 아이템 / 변수 수
+                }
+        """
+        key_columns = ['Item', 'Line', 'Time']
+        df_plan = df_plan.copy()
+        df_plan['Time'] = df_plan['Time'].astype(int)
+        cells = {(str(l), int(s)) for (l, s) in cells}
+        edited_keys = set(zip(df_edited['Item'], df_edited['Line'], df_edited['Time'].astype(int)))
+
+        # 셀 안에 있으면서 사용자가 직접 수정하지 않은 행만 다시 배치, 나머지는 고정
+        in_cells = pd.Series([(l, s) in cells for l, s in zip(df_plan['Line'], df_plan['Time'])], index=df_plan.index)
+        is_edited = pd.Series([key in edited_keys for key in zip(df_plan['Item'], df_plan['Line'], df_plan['Time'])], index=df_plan.index)
+        df_free = df_plan[in_cells & ~is_edited]
+        df_fixed = df_plan[~(in_cells & ~is_edited)]
+
+        demand = dict(zip(self.df_demand['Item'], self.df_demand['MFG']))
+        items = [m for m in dict.fromkeys(list(df_edited['Item']) + list(df_free['Item'])) if m in demand]
+
+        # 재배치 대상 (아이템 x 셀) 중 생산 가능한 조합만 변수로 만든다. 수정한 행의 조합은 고정값이므로 제외
+        df_restrict = pd.DataFrame(
+            [(m, l, s) for m in items for (l, s) in cells if (m, l, s) not in edited_keys],
+            columns=key_columns,
+        )
+        index = build_sparse_index(items, self.df_line_available, self.line, self.time, restrict=df_restrict)
+        items_by_line_shift = index.items_by_line_shift()
+
+        x = pulp.LpVariable.dicts("produce", index.keys, lowBound=0, cat='Integer')
+        cache = ExpressionCache(x)
+        model = pulp.LpProblem("Neighborhood_Reoptimization", pulp.LpMaximize)
+        model += cache.total()
+
+        # 고정된 할당량 집계
+        fixed_qty = df_fixed.groupby(key_columns)['Qty'].sum()
+        fixed_by_item = fixed_qty.groupby(level='Item').sum().to_dict()
+        fixed_by_cell = fixed_qty.groupby(level=['Line', 'Time']).sum().to_dict()
+        fixed_total = int(fixed_qty.sum())
+        blocks = list(set(l[0] for l in self.line)) # 제조동 리스트 ['I','D','K','M']
+
+        # presolve: 고정량을 뺀 남은 수요 / Capa / Max_line / Max_qty 기준으로 big-M, 변수 상한, 중복 제약 판정
+        remaining_demand = {m: max(0, demand[m] - fixed_by_item.get(m, 0)) for m in items}
+        remaining_capacity = {(l, s): max(0, int(self.df_capa_qty.loc[self.df_capa_qty['Line'] == l, s].values[0]) - fixed_by_cell.get((l, s), 0))
+                              for (l, s) in items_by_line_shift}
+        max_lines = shift_limits(self.df_capa_qty, 'Max_line', blocks, self.time, DEFAULT_MAX_LINE)
+        max_qtys = shift_limits(self.df_capa_qty, 'Max_qty', blocks, self.time, DEFAULT_MAX_QTY)
+        for (b, shift) in max_lines:
+            max_lines[(b, shift)] = max(0, max_lines[(b, shift)] - sum(1 for (l, s), q in fixed_by_cell.items() if s == shift and l.startswith(b) and q > 0))
+            max_qtys[(b, shift)] = max(0, max_qtys[(b, shift)] - sum(q for (l, s), q in fixed_by_cell.items() if s == shift and l.startswith(b)))
+        y_cells = [key for key in index.line_shifts() if fixed_by_cell.get(key, 0) <= 0]
+        bounds = PlanBounds(items_by_line_shift, remaining_demand, remaining_capacity, max_lines, max_qtys,
+                            big_m=10_000_000, cells=y_cells, enabled=self.presolve)
+
+        # 제약조건 1: 모델별 수요량 - 고정량 보다 적게 생산
+        for m in items:
+            if bounds.keep('demand', m):
+                model += cache.item(m) <= remaining_demand[m]
+
+        # 제약조건 3: 제조동별 물량 비중 상한/하한 (고정량 포함한 전체 기준)
+        for (ids,row) in self.df_capa_portion.iterrows():
+            fixed_building = sum(q for (l, s), q in fixed_by_cell.items() if l.startswith(row['name']))
+            model += row['upper_limit'] * (cache.total() + fixed_total) >= cache.building(row['name']) + fixed_building
+            model += cache.building(row['name']) + fixed_building >= row['lower_limit'] * (cache.total() + fixed_total)
+
+        # 제약조건 4: 라인/시프트 최대 생산량 - 고정량
+        for (l, s) in items_by_line_shift:
+            if bounds.keep('capacity', (l, s)):
+                model += cache.line_shift(l, s) <= remaining_capacity[(l, s)]
+
+        # 제약조건 5: 고정량이 있는 셀은 이미 가동중. 나머지 셀만 가동 여부 변수 y 를 둔다
+        y = pulp.LpVariable.dicts("line_shift_active", y_cells, cat="Binary")
+        presolve_info = bounds.apply(x, y)
+        for (l, s), var in y.items():
+            model += cache.line_shift(l, s) <= bounds.big_m(l, s) * var
+            model += cache.line_shift(l, s) >= 1 * var
+
+        active_lines = group_by_building_shift(y, blocks)
+        for b in blocks:
+            for shift in self.time:
+                if bounds.keep('max_line', (b, shift)):
+                    model += active_lines.get((b, shift), pulp.LpAffineExpression()) <= max_lines[(b, shift)]
+
+        # 제약조건 6: (제조동 * 시프트) 별 최대 생산 수량 - 고정량
+        for b in blocks:
+            for shift in self.time:
+                if bounds.keep('max_qty', (b, shift)):
+                    model += cache.building_shift(b, shift) <= max_qtys[(b, shift)]
+
+        # 현재 배치를 초기해로 사용
+        warm_start_rows = set_mip_start(x, y, df_free) if not df_free.empty else 0
+
+        solve_info = self._solve(model, time_limit, warm_start=warm_start_rows > 0)
+        solve_info['presolve'] = presolve_info
+        neighborhood = {'cells': len(cells), 'items': len(items), 'variables': len(x)}
+        print(f"재최적화 대상: 셀 {len(cells)}개, 아이템 {len(items)}개, 변수 {len(x)}개 ({solve_info['status']}, {solve_info['solve_time']:.2f}초)")
+
+        if not solve_info['has_solution']:
+            print(f"❌ 재최적화 실패: {solve_info['status']}")
+            return {'result': df_plan, 'error': "❌ 해를 찾지 못했습니다.", 'solve_info': solve_info, 'neighborhood': neighborhood}
+
+        df_values = solution_frame(x)
+        if showlog: print(df_values.to_string(index=False))
+
+        df_result = pd.concat([df_fixed, self.result_frame(df_values)], ignore_index=True)
+        return {'result': df_result, 'solve_info': solve_info, 'neighborhood': neighborhood}
+
 
 
 if __name__ == "__main__":
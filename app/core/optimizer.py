@@ -1,34 +1,239 @@
 import pandas as pd
 from datetime import datetime
 
-"""최적화 클래스 : 현재 사전할당 결과 반환"""
+from app.core.optimization import Optimization, RESULT_COLUMNS
+from app.core.model.decomposition import execute_decomposed
+from app.core.model.rolling_horizon import execute_rolling, use_rolling_horizon
+from app.core.model.quick_plan import execute_quick, use_quick_plan
+from app.core.model.edd_heuristic import edd_plan, use_edd_heuristic, REPAIR_TIME_LIMIT
+from app.core.model.solve_cache import SolveCache
+from app.models.common.file_store import DataStore
+from app.models.common.settings_store import SettingsStore
+
+"""
+최적화 클래스 : 사전할당(1차) -> 생산계획(2차) 2단계 MIP 수행
+
+- 1차: Optimization.pre_assign (time_limit1). UI 에서 이미 만든 사전할당 결과가 있으면 그 결과를 사용
+- 2차: 1차 결과를 고정한 Optimization.execute (time_limit2)
+각 단계는 제한 시간에 걸리면 그때까지의 최선해를 사용한다.
+2차는 EDD 휴리스틱 계획을 초기해로 사용하고, 해를 찾지 못하면 EDD 휴리스틱 계획을 대체 계획으로 반환한다
+(휴리스틱 계획은 초기해나 대체 계획으로 쓸 때만 만들고, 물량 비중 보정은 2차와 별도의 짧은 제한 시간으로 푼다)
+(EDD 휴리스틱을 쓰지 않으면 1차 결과를 초기해 / 대체 계획으로 사용).
+"""
 class Optimizer:
     def __init__(self):
         self.result_data = None
-        
+        self.cache = None
+
     def run_optimization(self, input_data):
         # Args:
         #     input_data (dict): 입력 파라미터와 데이터프레임을 포함하는 딕셔너리
-            
+        #         'pre_assigned_df': 1차(사전할당) 결과. 비어있으면 1차를 직접 수행
+        #         'selected_projects': 최적화 대상 프로젝트 목록. 비어있으면 전체
+        #         'dataframes': Optimization 입력. 없으면 DataStore 의 organized_dataframes
+        #         'time_limit1', 'time_limit2': 단계별 제한 시간(초). 없으면 SettingsStore 값
+        #         'warm_start': 2차 초기해로 사용할 계획(예: 이전 주차 계획). 없으면 EDD 휴리스틱 계획(사용하지 않으면 1차 결과)을 초기해로 사용
+        #         'heuristic': EDD 휴리스틱 계획을 2차 초기해 / 해를 찾지 못했을 때의 대체 계획으로 사용할지 여부. 없으면 SettingsStore 의 edd_heuristic_ox
+        #         'decompose': 2차를 프로젝트 그룹별로 나눠 병렬로 풀지 여부. 없으면 SettingsStore 의 decompose_ox
+        #         'rolling_horizon': 계획 기간이 rolling_window 보다 길면 2차를 구간별로 나눠 풀지 여부. 없으면 SettingsStore 의 rolling_horizon_ox
+        #         'quick': 2차를 LP 완화 + 반올림 보정의 빠른 계획으로 풀지 여부 (what-if 확인용, False 면 최종 MIP). 없으면 SettingsStore 의 quick_plan_ox
+        #         'use_cache': 모델 / 결과 디스크 캐시 사용 여부. 없으면 SettingsStore 의 solve_cache_ox
+        #         'progress_callback': 모델 구성 / 솔버 진행 상황 콜백 progress_callback(event) (solver_progress 참고)
+        #         'solve_job': 취소할 수 있게 솔버 프로세스를 등록할 작업(SolveJob). 취소되면 그때까지의 최선해를 반환
+
         # Returns:
-        #     dict: 결과 데이터프레임을 포함하는 딕셔너리
+        #     dict: 결과 데이터프레임과 단계별 솔버 메타데이터를 포함하는 딕셔너리
 
-        # 입력 데이터에서 사전 할당 데이터프레임 가져오기
         pre_assigned_df = input_data.get('pre_assigned_df', pd.DataFrame())
-        
-        # 사전 할당 데이터를 그대로 결과로 사용
-        self.result_data = pre_assigned_df.copy()
-        
+        projects = input_data.get('selected_projects') or []
+        time_limit1 = input_data.get('time_limit1') or SettingsStore.get('time_limit1', 10)
+        time_limit2 = input_data.get('time_limit2') or SettingsStore.get('time_limit2', 300)
+
+        dataframes = input_data.get('dataframes') or DataStore.get('organized_dataframes', {})
+        if not all(dataframes.get(key) for key in ('demand', 'master', 'dynamic')):
+            # 입력 데이터가 없으면 사전 할당 데이터를 그대로 결과로 사용
+            print("최적화 입력 데이터가 없어 사전할당 결과를 그대로 사용합니다")
+            self.result_data = pre_assigned_df.copy()
+            return {
+                'assignment_result': self.result_data,
+                'lp_results': None,
+                'mip_results': None
+            }
+
+        prepared = self._prepare_input(dataframes, projects)
+        self.cache = SolveCache() if input_data.get('use_cache', SettingsStore.get('solve_cache_ox', 1)) else None
+        # Optimization 이 입력 데이터프레임에 컬럼을 추가하므로 그 전에 입력 해시를 만든다
+        input_key = SolveCache.make_key(prepared) if self.cache else None
+        job = input_data.get('solve_job')
+        optimization = Optimization(prepared, progress_callback=input_data.get('progress_callback'), solve_job=job)
+
+        # 1차: 사전할당
+        started = datetime.now()
+        if pre_assigned_df is not None and not pre_assigned_df.empty:
+            df_stage1 = pre_assigned_df.copy()
+            lp_results = {'status': 'Provided', 'has_solution': True, 'time_limit': time_limit1}
+        else:
+            stage1 = self._cached_stage(optimization, 'pre_assign', [input_key], time_limit1,
+                                        lambda: optimization.pre_assign(time_limit=time_limit1))
+            df_stage1 = stage1['result']
+            lp_results = stage1.get('solve_info')
+        if projects and not df_stage1.empty:
+            df_stage1 = df_stage1[df_stage1['Project'].isin(projects)]
+        optimization.df_pre_result = df_stage1.reset_index(drop=True)
+
+        # 2차: 사전할당 결과를 고정한 생산계획. 초기해(MIP start)를 주어 첫 해를 빨리 찾도록 함
+        decompose = input_data.get('decompose', SettingsStore.get('decompose_ox', 0))
+        rolling = use_rolling_horizon(optimization, input_data.get('rolling_horizon'))
+        quick = use_quick_plan(input_data.get('quick'))
+        use_heuristic = use_edd_heuristic(input_data.get('heuristic'))
+        heuristic = {}
+
+        # 고정 생산을 포함한 EDD 계획 (수 밀리초 + 물량 비중 보정). 초기해나 대체 계획으로 실제로 쓸 때만 한 번 만든다
+        def heuristic_plan():
+            if 'plan' not in heuristic:
+                heuristic['plan'] = edd_plan(optimization, balance_portion=True, time_limit=min(REPAIR_TIME_LIMIT, time_limit2))
+            return heuristic['plan']
+
+        # 2차 초기해: 직접 준 계획이 있으면 그 계획, 없으면 EDD 휴리스틱 계획(사용하지 않으면 1차 결과)
+        def stage2_warm_start():
+            warm_start = input_data.get('warm_start')
+            if warm_start is None:
+                warm_start = heuristic_plan()['result'] if use_heuristic else optimization.df_pre_result
+            return warm_start
+
+        def run_stage2():
+            if quick:
+                # 최적성 증명 없이 LP 완화 해를 반올림한 계획 (LP bound 대비 gap 보고)
+                return execute_quick(optimization, time_limit=time_limit2)
+            if rolling:
+                # 긴 계획 기간은 구간별로 앞에서부터 풀고 확정 (모든 구간이 time_limit2 를 나눠 씀)
+                return execute_rolling(optimization, time_limit=time_limit2)
+            if decompose:
+                # 라인을 공유하지 않는 프로젝트 그룹별로 나눠서 병렬 풀이
+                return execute_decomposed(optimization, time_limit=time_limit2)
+            return optimization.execute(time_limit=time_limit2, warm_start=stage2_warm_start())
+
+        if job is not None and job.cancelled:
+            print("최적화가 취소되어 2차 최적화를 건너뜁니다")
+            stage2 = {'result': pd.DataFrame(columns=RESULT_COLUMNS), 'solve_info': None}
+        else:
+            stage2 = self._cached_stage(optimization, 'execute', [input_key, optimization.df_pre_result, bool(decompose), rolling, quick, use_heuristic],
+                                        time_limit2, run_stage2, warm_start=stage2_warm_start,
+                                        result_parts=[input_data.get('warm_start')])
+        mip_results = stage2.get('solve_info')
+        df_stage2 = stage2['result']
+
+        if mip_results and mip_results['has_solution']:
+            self.result_data = df_stage2
+        elif use_heuristic and not (job is not None and job.cancelled):
+            print("2차 최적화에서 해를 찾지 못해 EDD 휴리스틱 계획을 사용합니다")
+            fallback = heuristic_plan()
+            self.result_data = fallback['result']
+            mip_results = {**(mip_results or {'status': 'Not Solved', 'has_solution': False}), 'fallback': fallback['solve_info']}
+        else:
+            print("2차 최적화에서 해를 찾지 못해 1차 결과를 사용합니다")
+            self.result_data = df_stage1.reset_index(drop=True) if not df_stage1.empty else pd.DataFrame(columns=RESULT_COLUMNS)
+
         # 결과 딕셔너리 생성
         results = {
             'assignment_result': self.result_data,
-            'lp_results': None,
-            'mip_results': None
+            'lp_results': lp_results,
+            'mip_results': mip_results
+        }
+
+        print(f"최적화 완료: {len(self.result_data)}개 행 처리됨 ({(datetime.now() - started).total_seconds():.1f}초)")
+        return results
+
+    """
+    캐시를 거쳐서 최적화 단계 실행
+    - 입력 / 설정이 모두 같은 결과가 있으면 그대로 반환
+    - 같은 입력으로 만든 모델이 있으면 모델 구성 없이 저장된 모델(MPS)을 풀어서 반환 (warm_start() 계획을 MIP start 로 다시 넣음)
+    - 둘 다 없으면 run() 으로 실행하고 모델과 결과를 저장
+    key_parts 는 모델 키, result_parts 는 모델은 같고 풀이 결과만 달라지는 값(직접 준 초기해 등)으로 결과 키에만 넣는다
+    """
+    def _cached_stage(self, optimization, stage, key_parts, time_limit, run, warm_start=None, result_parts=()):
+        if self.cache is None:
+            return run()
+
+        model_key = SolveCache.make_key(stage, *key_parts)
+        result_key = SolveCache.make_key(model_key, time_limit, SolveCache.settings_snapshot(), *result_parts)
+
+        cached = self.cache.get_result(result_key)
+        if cached is not None:
+            print(f"[캐시] {stage}: 같은 입력/설정의 결과를 재사용합니다")
+            cached['solve_info']['cache'] = 'result'
+            optimization.report_progress('done', f'Reused the cached {stage} result')
+            return cached
+
+        if self.cache.has_model(model_key):
+            print(f"[캐시] {stage}: 저장된 모델을 읽어서 풉니다 (모델 구성 생략)")
+            solved = self.cache.solve_model(model_key, time_limit, optimization.solver_backend,
+                                            warm_start=warm_start() if warm_start is not None else None,
+                                            progress=optimization.progress_callback, job=optimization.solve_job)
+            result = {
+                'result': optimization.result_from_values(solved['values']),
+                'solve_info': {**solved['solve_info'], 'cache': 'model'},
+            }
+        else:
+            optimization.model = None
+            result = run()
+            # 분해 풀이처럼 모델 하나로 풀지 않은 경우에는 모델을 저장하지 않음
+            if optimization.model is not None:
+                self.cache.put_model(model_key, optimization.model, optimization.model_vars, optimization.model_line_vars)
+
+        solve_info = result.get('solve_info')
+        # 취소로 중간에 멈춘 결과는 저장하지 않음
+        if solve_info and solve_info['has_solution'] and not solve_info.get('cancelled'):
+            self.cache.put_result(result_key, result['result'], solve_info)
+        return result
+
+    """
+    결과 화면 수동 조정 주변 재최적화
+    수정한 행과 수정과 관련 없는 셀은 고정하고, 수정이 일어난 (라인, 시프트) 셀만 다시 배치한다
+    """
+    def reoptimize_neighborhood(self, input_data):
+        # Args:
+        #     input_data (dict):
+        #         'plan': 현재 계획 (AssignmentModel 데이터프레임)
+        #         'edited': 사용자가 수정한 행
+        #         'cells': 다시 배치할 (라인, 시프트) 조합
+        #         'dataframes': Optimization 입력. 없으면 DataStore 의 organized_dataframes
+        #         'time_limit': 제한 시간(초). 없으면 SettingsStore 의 time_limit1
+
+        # Returns:
+        #     dict: 'assignment_result' 와 솔버 메타데이터('mip_results'), 재배치 범위('neighborhood')
+
+        df_plan = input_data['plan']
+        time_limit = input_data.get('time_limit') or SettingsStore.get('time_limit1', 10)
+        dataframes = input_data.get('dataframes') or DataStore.get('organized_dataframes', {})
+        if not all(dataframes.get(key) for key in ('demand', 'master', 'dynamic')):
+            print("최적화 입력 데이터가 없어 재최적화를 할 수 없습니다")
+            return {'assignment_result': df_plan, 'mip_results': None, 'neighborhood': None,
+                    'error': "최적화 입력 데이터가 없습니다."}
+
+        optimization = Optimization(self._prepare_input(dataframes, []))
+        result = optimization.reoptimize(df_plan, input_data['edited'], input_data['cells'], time_limit=time_limit)
+
+        self.result_data = result['result']
+        return {
+            'assignment_result': self.result_data,
+            'mip_results': result.get('solve_info'),
+            'neighborhood': result.get('neighborhood'),
+            'error': result.get('error'),
+        }
+
+    """
+    Optimization 입력 준비: 원본 데이터프레임을 변경하지 않도록 복사하고,
+    선택된 프로젝트의 수요만 남긴다
+    """
+    @staticmethod
+    def _prepare_input(dataframes, projects):
+        prepared = {
+            file_type: {name: df.copy() for name, df in sheets.items()}
+            for file_type, sheets in dataframes.items()
+            if isinstance(sheets, dict)
         }
-        
-        print(f"최적화 완료: {len(self.result_data)}개 행 처리됨")
-        
-        import time
-        time.sleep(1)
-        
-        return results
\ No newline at end of file
+        if projects:
+            df_demand = prepared['demand']['demand']
+            prepared['demand']['demand'] = df_demand[df_demand['Item'].str[3:7].isin(projects)].reset_index(drop=True)
+        return prepared
@@ -0,0 +1,476 @@
+import math
+import random
+import threading
+import time
+
+import pandas as pd
+
+from app.analysis.output.kpi_score import KpiScore
+from app.core.model.edd_heuristic import due_shifts
+from app.core.model.presolve import shift_limits, DEFAULT_MAX_LINE, DEFAULT_MAX_QTY
+from app.models.common.file_store import DataStore
+from app.utils.shift_calendar import horizon_shifts, shift_weight
+
+"""
+결과 계획 로컬 서치 개선 (Polish)
+
+MIP / 휴리스틱 / 결과 화면에서 수정한 계획을 다시 풀지 않고 제한 시간 동안 조금씩 고쳐서 KPI 점수를 올린다.
+- 이웃해 (아이템, 라인, 시프트) 단위
+    move  : 한 행의 생산량 전체를 다른 (라인, 시프트)로 이동
+    split : 한 행의 생산량 일부만 다른 (라인, 시프트)로 이동
+    swap  : 서로 다른 셀의 두 행이 같은 수량만큼 자리를 바꿈 (셀 생산량은 그대로)
+- 점수는 KpiScore 와 같은 항목(SOP / 가동률 / 자재)을 셀 / 아이템 단위로 증분 계산하고
+  KpiScore.calculate_total_score 로 합친다. 총점이 같으면 납기 내 SOP 부족 수량이 적은 계획을 선택
+- 실행 가능성은 PlanAdjustmentValidator 와 같은 규칙 (이미 어긴 규칙은 더 나빠지지 않게)
+    라인-아이템 호환(line_available), (라인, 시프트) Capa, 납기(납기 이후 시프트로 미루지 않음), 제조동 비율(capa_portion)
+  여기에 생산계획 모델의 (제조동, 시프트) Max_line / Max_qty 도 지킨다
+아이템별 총 생산량은 바뀌지 않으므로 수요 제약도 그대로 만족한다.
+"""
+
+# 점수 비교 허용 오차
+EPS = 1e-9
+
+
+class PlanImprover:
+    """
+    Args:
+        df_plan (DataFrame): 개선할 계획 (Line, Time, Item, Qty 컬럼. 나머지 컬럼은 그대로 유지)
+        dataframes (dict): organized_dataframes ({'demand', 'master'}). 없으면 DataStore 값
+        material_analyzer (MaterialShortageAnalyzer): 자재 부족 정보. 없으면 KpiScore 처럼 자재 점수 0 (고정)
+        df_pinned (DataFrame): 줄이거나 옮기지 않을 행 (Line, Time, Item, Qty). 예: 수동 조정한 행
+        seed (int): 난수 시드
+    """
+    def __init__(self, df_plan, dataframes=None, material_analyzer=None, df_pinned=None, seed=None):
+        dataframes = dataframes or DataStore.get("organized_dataframes", {})
+        master = dataframes.get('master', {})
+        df_demand = dataframes.get('demand', {}).get('demand', pd.DataFrame(columns=['Item', 'SOP']))
+        df_capa_qty = master.get('capa_qty', pd.DataFrame(columns=['Line']))
+        df_line_available = master.get('line_available', pd.DataFrame(columns=['Project']))
+
+        self.rng = random.Random(seed)
+        self._stop = threading.Event()
+        self.kpi = KpiScore()
+        self.opts = self.kpi.get_options()
+        self.columns = list(df_plan.columns)
+
+        df_plan = df_plan[pd.to_numeric(df_plan['Qty'], errors='coerce').fillna(0) > 0].copy()
+        df_plan['Time'] = df_plan['Time'].astype(int)
+        df_plan['Qty'] = pd.to_numeric(df_plan['Qty']).astype(int)
+        self.times = horizon_shifts(df_capa_qty, df_plan['Time'])
+
+        # 라인-아이템 호환 (프로젝트 -> 라인)
+        df_available = df_line_available.set_index('Project') if 'Project' in df_line_available.columns else df_line_available
+        self.lines = [l for l in df_available.columns if isinstance(l, str)]
+        self.project_lines = {
+            project: [l for l in self.lines if row.get(l) == 1]
+            for project, row in df_available.iterrows()
+        }
+
+        # (라인, 시프트) Capa. 시트에 없으면 제약 없음 (PlanAdjustmentValidator 와 같음)
+        rows = df_capa_qty.set_index('Line') if 'Line' in df_capa_qty.columns else df_capa_qty
+        self.capa = {}
+        for l in self.lines:
+            if l in rows.index:
+                for s in self.times:
+                    value = rows.at[l, s] if s in rows.columns else None
+                    if pd.notna(value):
+                        self.capa[(l, s)] = float(value)
+        blocks = sorted(set(l[0] for l in self.lines) | set(df_plan['Line'].str[0]))
+        self.max_lines = shift_limits(df_capa_qty, 'Max_line', blocks, self.times, DEFAULT_MAX_LINE)
+        self.max_qtys = shift_limits(df_capa_qty, 'Max_qty', blocks, self.times, DEFAULT_MAX_QTY)
+        self.portion = {}
+        for _, row in master.get('capa_portion', pd.DataFrame(columns=['name'])).iterrows():
+            self.portion[row['name']] = (float(row['lower_limit']), float(row['upper_limit']))
+
+        # 아이템별 SOP / 납기 (KpiScore 와 같이 아이템의 첫 SOP 값)
+        df_items = df_demand.drop_duplicates('Item')
+        self.sop = dict(zip(df_items['Item'], pd.to_numeric(df_items['SOP'], errors='coerce').fillna(0))) if 'SOP' in df_items.columns else {}
+        due = due_shifts(df_items, master.get('due_LT'), self.times) if not df_items.empty else []
+        self.due = dict(zip(df_items['Item'], due))
+        self.last_shift = max(self.times)
+
+        # 가동률 가중치 (KpiScore 와 같이 weight_day_ox 가 켜져 있을 때만)
+        self.weights = self.opts.get('weight_day', [1.0] * 14) if self.opts.get('weight_day_ox', 0) else [1.0] * 14
+
+        # 자재 부족: (아이템, 시프트) 가 계획에 있으면 그 시프트의 부족량이 자재 점수에서 빠짐
+        self.has_material = material_analyzer is not None and hasattr(material_analyzer, 'shortage_results')
+        self.penalty = self._material_penalty(getattr(material_analyzer, 'material_detail_df', None)) if self.has_material else {}
+
+        # 고정 행
+        self.pinned = {}
+        if df_pinned is not None and not df_pinned.empty:
+            for (m, l, s), qty in df_pinned.groupby(['Item', 'Line', 'Time'])['Qty'].sum().items():
+                self.pinned[(m, l, int(s))] = qty
+
+        # 행 템플릿 (결과에 나머지 컬럼을 그대로 유지하기 위함)
+        self.templates = {}
+        self.item_templates = {}
+        for row in df_plan.to_dict('records'):
+            key = (row['Item'], row['Line'], row['Time'])
+            self.templates.setdefault(key, row)
+            self.item_templates.setdefault(row['Item'], row)
+
+        self._init_state(df_plan.groupby(['Item', 'Line', 'Time'], sort=False)['Qty'].sum())
+        self.best_value = sum(self.best_weighted_capacity().values())
+
+    """
+    Material Detail -> {(아이템, 시프트): 부족량 합계}
+    """
+    @staticmethod
+    def _material_penalty(df_detail):
+        penalty = {}
+        if df_detail is None or df_detail.empty or 'Items' not in df_detail.columns:
+            return penalty
+        shift_cols = [c for c in df_detail.columns if str(c).isdigit() and int(str(c)) >= 1]
+        for _, row in df_detail.iterrows():
+            items = row['Items'] if isinstance(row['Items'], list) else []
+            for col in shift_cols:
+                amount = pd.to_numeric(row[col], errors='coerce')
+                if pd.notna(amount) and amount < 0:
+                    for item in items:
+                        key = (str(item).strip(), int(str(col)))
+                        penalty[key] = penalty.get(key, 0) + abs(amount)
+        return penalty
+
+    """
+    KpiScore.calculate_utilization_score 의 Best 배치: 시프트별 최대 생산 능력으로 앞에서부터 총 생산량을 채움 (가중치 적용)
+    """
+    def best_weighted_capacity(self):
+        shift_capacity = {}
+        for s in self.times:
+            total = 0
+            for b in sorted(set(l[0] for l in self.lines)):
+                max_line = self.max_lines.get((b, s), DEFAULT_MAX_LINE)
+                max_qty = self.max_qtys.get((b, s), DEFAULT_MAX_QTY)
+                capacities = sorted((self.capa[(l, s)] for l in self.lines if l[0] == b and (l, s) in self.capa), reverse=True)
+                total += min(sum(capacities[:int(max_line)]), max_qty) if max_line > 0 and max_qty > 0 else 0
+            shift_capacity[s] = total
+        best, remaining = {}, self.total
+        for s in self.times:
+            best[s] = min(shift_capacity[s], max(remaining, 0))
+            remaining -= best[s]
+        return {s: qty * shift_weight(self.weights, s) for s, qty in best.items()}
+
+    """
+    증분 계산 상태 초기화
+    """
+    def _init_state(self, qty_by_key):
+        self.x = {}
+        self.cells_by_item = {}
+        self.items_by_cell = {}
+        self.cell_load = {}
+        self.block_qty = {}
+        self.block_active = {}
+        self.block_total = {}
+        self.in_due = {m: 0 for m in self.sop}
+        self.pair_qty = {}
+        self.penalty_pairs = set()
+        self.weighted = 0.0
+        self.material = 0.0
+        self.total = 0
+        # 처음에는 생산량이 없으므로 SOP 가 있는 아이템은 모두 부족
+        self.short_items = {m for m, sop in self.sop.items() if sop > 0}
+        self.shortfall = float(sum(sop for sop in self.sop.values() if sop > 0))
+        self.sop_ok = len(self.sop) - len(self.short_items)
+        for (m, l, s), qty in qty_by_key.items():
+            self._add(m, (l, int(s)), int(qty))
+            self.total += int(qty)
+
+    """
+    (아이템, 셀)에 qty 만큼 더하고 (음수면 뺌) 모든 집계값 갱신
+    """
+    def _add(self, m, cell, qty):
+        l, s = cell
+        key = (m, l, s)
+        new = self.x.get(key, 0) + qty
+        if new > 0:
+            self.x[key] = new
+            self.cells_by_item.setdefault(m, set()).add(cell)
+            self.items_by_cell.setdefault(cell, set()).add(m)
+        else:
+            self.x.pop(key, None)
+            self.cells_by_item.get(m, set()).discard(cell)
+            self.items_by_cell.get(cell, set()).discard(m)
+
+        load_old = self.cell_load.get(cell, 0)
+        self.cell_load[cell] = load_old + qty
+        block = (l[0], s)
+        self.block_qty[block] = self.block_qty.get(block, 0) + qty
+        self.block_active[block] = self.block_active.get(block, 0) + (load_old + qty > 0) - (load_old > 0)
+        self.block_total[l[0]] = self.block_total.get(l[0], 0) + qty
+        self.weighted += qty * shift_weight(self.weights, s)
+
+        if m in self.sop and s <= self.due.get(m, self.last_shift):
+            sop = self.sop[m]
+            before = max(0.0, sop - self.in_due[m])
+            self.in_due[m] += qty
+            after = max(0.0, sop - self.in_due[m])
+            self.shortfall += after - before
+            if before > 0 and after <= 0:
+                self.short_items.discard(m)
+                self.sop_ok += 1
+            elif before <= 0 and after > 0:
+                self.short_items.add(m)
+                self.sop_ok -= 1
+
+        pair = (m, s)
+        pair_old = self.pair_qty.get(pair, 0)
+        self.pair_qty[pair] = pair_old + qty
+        penalty = self.penalty.get(pair, 0)
+        if penalty and (pair_old > 0) != (pair_old + qty > 0):
+            self.material += penalty if pair_old + qty > 0 else -penalty
+            if pair_old + qty > 0:
+                self.penalty_pairs.add(pair)
+            else:
+                self.penalty_pairs.discard(pair)
+
+    """
+    KpiScore 와 같은 점수 {'Mat', 'SOP', 'Util', 'Total'}
+    """
+    def scores(self):
+        sop_score = self.sop_ok / len(self.sop) * 100 if self.sop else 100.0
+        util_score = (1 - (self.weighted / self.best_value) / 100) * 100 if self.best_value > 0 else 100.0
+        if not self.has_material:
+            mat_score = 0
+        else:
+            mat_score = (1 - self.material / self.total) * 100 if self.total > 0 else 100.0
+        total = self.kpi.calculate_total_score(mat_score, sop_score, util_score)
+        return {'Mat': mat_score, 'SOP': sop_score, 'Util': util_score, 'Total': total}
+
+    """비교용 목적값: 총점 -> 납기 내 SOP 부족 수량 -> 자재 부족량 -> 가중 생산량 (클수록 좋음)"""
+    def _objective(self):
+        return (round(self.scores()['Total'], 9), -self.shortfall, -self.material, -self.weighted)
+
+    """제조동 비율(capa_portion) 위반량 합계"""
+    def _portion_violation(self):
+        if not self.total:
+            return 0.0
+        violation = 0.0
+        for b, (lower, upper) in self.portion.items():
+            qty = self.block_total.get(b, 0)
+            violation += max(0.0, lower * self.total - qty) + max(0.0, qty - upper * self.total)
+        return violation
+
+    """아이템을 생산할 수 있는 라인"""
+    def _lines_for(self, m):
+        return self.project_lines.get(m[3:7], [])
+
+    """셀에 더 넣을 수 있는 양 (Capa / Max_qty)"""
+    def _room(self, cell):
+        l, s = cell
+        room = self.capa.get(cell, float('inf')) - self.cell_load.get(cell, 0)
+        room = min(room, self.max_qtys.get((l[0], s), DEFAULT_MAX_QTY) - self.block_qty.get((l[0], s), 0))
+        return int(max(0, min(room, 10_000_000)))
+
+    """
+    이동 한 번의 정적 규칙: 라인-아이템 호환, 납기 이후로 미루지 않음, 고정 행 유지
+    """
+    def _allowed(self, m, src, dst, qty):
+        if qty <= 0 or src == dst or dst[0] not in self._lines_for(m):
+            return False
+        if dst[1] > max(self.due.get(m, self.last_shift), src[1]):
+            return False
+        key = (m, src[0], src[1])
+        return self.x.get(key, 0) - qty >= self.pinned.get(key, 0)
+
+    """
+    이동 목록(ops)을 적용해 보고, 실행 가능하고 목적값이 좋아지면 유지 아니면 되돌림
+    """
+    def _try(self, ops, best):
+        for m, src, dst, qty in ops:
+            if not self._allowed(m, src, dst, qty):
+                return False
+        cells = {c for _, src, dst, _ in ops for c in (src, dst)}
+        blocks = {(l[0], s) for l, s in cells}
+        before = {
+            'cells': {c: self.cell_load.get(c, 0) for c in cells},
+            'qty': {b: self.block_qty.get(b, 0) for b in blocks},
+            'active': {b: self.block_active.get(b, 0) for b in blocks},
+            'portion': self._portion_violation(),
+        }
+        for m, src, dst, qty in ops:
+            self._add(m, src, -qty)
+            self._add(m, dst, qty)
+
+        feasible = True
+        for c, load in before['cells'].items():
+            new = self.cell_load.get(c, 0)
+            if new > load and c in self.capa and new > self.capa[c]:
+                feasible = False
+        for b in blocks:
+            if self.block_qty.get(b, 0) > before['qty'][b] and self.block_qty[b] > self.max_qtys.get(b, DEFAULT_MAX_QTY):
+                feasible = False
+            if self.block_active.get(b, 0) > before['active'][b] and self.block_active[b] > self.max_lines.get(b, DEFAULT_MAX_LINE):
+                feasible = False
+        if feasible and self._portion_violation() > before['portion'] + EPS:
+            feasible = False
+
+        if feasible and self._objective() > best:
+            return True
+        for m, src, dst, qty in reversed(ops):
+            self._add(m, dst, -qty)
+            self._add(m, src, qty)
+        return False
+
+    """무작위 (아이템, 셀)"""
+    def _random_key(self):
+        while self._keys:
+            key = self._keys[self.rng.randrange(len(self._keys))]
+            if key in self.x:
+                return key
+            self._keys.remove(key)
+        return None
+
+    """무작위 목적지 셀. latest 가 있으면 그 시프트까지만"""
+    def _random_cell(self, m, latest=None):
+        lines = self._lines_for(m)
+        times = [s for s in self.times if latest is None or s <= latest]
+        if not lines or not times:
+            return None
+        return (self.rng.choice(lines), self.rng.choice(times))
+
+    """
+    납기 내 SOP 가 부족한 아이템의 늦은 생산을 납기 안으로 (여유가 없으면 그 셀의 다른 아이템과 swap)
+    """
+    def _sop_candidate(self):
+        m = self.rng.choice(tuple(self.short_items))
+        due = self.due.get(m, self.last_shift)
+        late = [c for c in self.cells_by_item.get(m, ()) if c[1] > due]
+        dst = self._random_cell(m, due)
+        if not late or dst is None:
+            return None
+        src = self.rng.choice(late)
+        qty = min(self.x[(m, src[0], src[1])], math.ceil(self.sop[m] - self.in_due[m]))
+        room = self._room(dst)
+        if room > 0:
+            return ('move' if qty <= room and qty == self.x[(m, src[0], src[1])] else 'split', [(m, src, dst, min(qty, room))])
+        # 늦은 시프트로 옮겨도 납기 안인 아이템과 swap (납기 이후로는 미룰 수 없음)
+        others = [o for o in self.items_by_cell.get(dst, ()) if o != m and src[1] <= self.due.get(o, self.last_shift)]
+        if not others:
+            return None
+        other = self.rng.choice(others)
+        qty = min(qty, self.x[(other, dst[0], dst[1])])
+        return ('swap', [(m, src, dst, qty), (other, dst, src, qty)])
+
+    """
+    자재가 부족한 (아이템, 시프트) 생산을 다른 시프트로
+    """
+    def _material_candidate(self):
+        m, s = self.rng.choice(tuple(self.penalty_pairs))
+        cells = [c for c in self.cells_by_item.get(m, ()) if c[1] == s]
+        dst = self._random_cell(m)
+        if not cells or dst is None or dst[1] == s:
+            return None
+        src = self.rng.choice(cells)
+        qty = min(self.x[(m, src[0], src[1])], self._room(dst))
+        return ('move', [(m, src, dst, qty)])
+
+    """
+    무작위 move / split
+    """
+    def _move_candidate(self):
+        key = self._random_key()
+        if key is None:
+            return None
+        m, l, s = key
+        dst = self._random_cell(m)
+        if dst is None:
+            return None
+        room = self._room(dst)
+        qty = self.x[key]
+        if self.rng.random() < 0.5 and qty <= room:
+            return ('move', [(m, (l, s), dst, qty)])
+        qty = min(room, self.rng.randint(1, qty))
+        return ('split', [(m, (l, s), dst, qty)])
+
+    """
+    무작위 swap: 서로 다른 셀의 두 행이 같은 수량만큼 자리를 바꿈
+    """
+    def _swap_candidate(self):
+        first, second = self._random_key(), self._random_key()
+        if first is None or second is None or first[0] == second[0] or first[1:] == second[1:]:
+            return None
+        qty = min(self.x[first], self.x[second])
+        return ('swap', [(first[0], first[1:], second[1:], qty), (second[0], second[1:], first[1:], qty)])
+
+    def _candidate(self):
+        r = self.rng.random()
+        if self.short_items and r < 0.4:
+            return self._sop_candidate()
+        if self.penalty_pairs and r < 0.55:
+            return self._material_candidate()
+        if r < 0.8:
+            return self._move_candidate()
+        return self._swap_candidate()
+
+    """
+    현재 계획을 결과 데이터프레임으로 (원래 행의 나머지 컬럼 유지, 새 조합은 같은 아이템 행을 복사)
+    """
+    def result(self):
+        rows = []
+        for key, qty in self.x.items():
+            template = self.templates.get(key)
+            row = dict(template) if template is not None else dict(self.item_templates.get(key[0], {}), _id=None)
+            row.update({'Item': key[0], 'Line': key[1], 'Time': key[2], 'Qty': int(qty)})
+            rows.append(row)
+        df = pd.DataFrame(rows, columns=self.columns)
+        return df.sort_values(['Line', 'Time'], kind='stable').reset_index(drop=True)
+
+    """
+    실행 중인 개선을 멈춤 (그때까지의 최선 계획을 반환)
+    """
+    def stop(self):
+        self._stop.set()
+
+    """
+    제한 시간 동안 로컬 서치로 계획 개선
+
+    Args:
+        time_limit (float): 제한 시간(초)
+        callback (callable): 개선된 계획이 있을 때 callback(df_plan, scores) (stream_interval 간격으로)
+        stream_interval (float): callback 최소 간격(초)
+        patience (int): 이 횟수만큼 연속으로 개선이 없으면 일찍 종료
+
+    Returns:
+        dict: {'result', 'scores', 'initial_scores', 'iterations', 'improvements'(이웃해별), 'time'}
+    """
+    def improve(self, time_limit=10, callback=None, stream_interval=1.0, patience=200_000):
+        start = time.time()
+        initial = self.scores()
+        best = self._objective()
+        improvements = {'move': 0, 'split': 0, 'swap': 0}
+        iterations, stale = 0, 0
+        last_stream, pending = start, False
+        self._keys = list(self.x)
+
+        while time.time() - start < time_limit and stale < patience and not self._stop.is_set():
+            iterations += 1
+            stale += 1
+            if iterations % 1000 == 0:
+                self._keys = list(self.x)
+            candidate = self._candidate()
+            if candidate is None:
+                continue
+            kind, ops = candidate
+            if self._try(ops, best):
+                best = self._objective()
+                improvements[kind] += 1
+                stale, pending = 0, True
+            if callback and pending and time.time() - last_stream >= stream_interval:
+                callback(self.result(), self.scores())
+                last_stream, pending = time.time(), False
+
+        df_result = self.result()
+        scores = self.scores()
+        if callback and pending:
+            callback(df_result, scores)
+        print(f"계획 개선: Total {initial['Total']:.2f} -> {scores['Total']:.2f} (SOP {initial['SOP']:.1f} -> {scores['SOP']:.1f}), "
+              f"{iterations:,}회 시도, 개선 {improvements}, {time.time() - start:.1f}초")
+        return {
+            'result': df_result,
+            'scores': scores,
+            'initial_scores': initial,
+            'iterations': iterations,
+            'improvements': improvements,
+            'time': time.time() - start,
+        }
@@ -0,0 +1,257 @@
+import io
+import os
+import sys
+import json
+import time
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from app.core.optimizer import Optimizer
+from app.core.model.solve_job import SolveJob, cancel_on_terminate
+from app.core.model.decomposition import PoolWorkers
+from app.models.common.settings_store import SettingsStore
+from app.models.common.file_store import DataStore
+
+"""
+설정 시나리오 일괄 비교
+
+SettingsStore 설정을 바꾼 시나리오 N개를 한 번에 풀고 KPI 를 비교표로 반환한다.
+- 입력 데이터는 한 번만 준비해서 프로세스 풀 작업자마다 한 번씩만 넘긴다 (작업마다 다시 보내지 않음)
+- 시나리오별 최적화(Optimizer.run_optimization)는 프로세스 풀에서 동시에 푼다
+- KPI 계산에만 쓰이는 설정(KPI_ONLY_SETTINGS)만 다른 시나리오는 계획이 같으므로 한 번만 풀고 결과를 공유한다
+- KPI(KpiScore), 제조동 비중(CapaRatioAnalyzer), 요일별 가동률(CapaUtilization)은
+  시나리오 설정을 적용한 상태로 부모 프로세스에서 계산한다 (마스터 파일 경로 등 화면 상태를 그대로 사용)
+
+사용 예)
+    table = ScenarioRunner().run({
+        'Base': {},
+        'SOP x2': {'weight_sop_ox': 2.0},
+        'Day weights': {'weight_day_ox': 1, 'weight_day': [1.0] * 10 + [0.5] * 4},
+    })['table']
+"""
+
+# KPI 계산에만 쓰이고 최적화 모델에는 영향이 없는 설정
+KPI_ONLY_SETTINGS = {'weight_sop_ox', 'weight_mat_qty', 'weight_operation', 'weight_day_ox', 'weight_day'}
+
+# 작업자 프로세스가 공유하는 입력 (프로세스 시작 시 한 번만 전달받음)
+_shared_input = {}
+
+
+def _init_worker(dataframes, projects):
+    _shared_input['dataframes'] = dataframes
+    _shared_input['projects'] = projects
+
+
+"""
+시나리오 하나 풀이 (프로세스 풀 작업 함수)
+"""
+def _solve_scenario(task):
+    # 작업자 프로세스는 부모의 설정 상태를 모르므로 부모 설정 + 시나리오 설정 전체를 적용
+    SettingsStore.update(task['settings'])
+    started = time.time()
+    with cancel_on_terminate(SolveJob(task['name'])) as job:
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = Optimizer().run_optimization({
+                'dataframes': _shared_input['dataframes'],
+                'selected_projects': _shared_input['projects'],
+                # 시나리오끼리 이미 병렬로 풀고 있으므로 그룹 분해 병렬 풀이는 끔
+                'decompose': False,
+                'solve_job': job,
+            })
+    return {
+        'name': task['name'],
+        'result': results['assignment_result'],
+        'lp_results': results['lp_results'],
+        'mip_results': results['mip_results'],
+        'elapsed': time.time() - started,
+    }
+
+
+"""
+설정을 잠시 바꿔서 실행 (끝나면 원래 설정으로 복원)
+"""
+@contextlib.contextmanager
+def settings_override(overrides):
+    saved = SettingsStore.get_all()
+    SettingsStore.update(overrides)
+    try:
+        yield
+    finally:
+        SettingsStore.update(saved)
+
+
+"""
+계획 하나의 KPI / 제조동 비중 / 요일별 가동률 계산 (현재 설정 기준)
+
+Args:
+    df_result (DataFrame): 생산계획 결과
+    demand_df (DataFrame): demand 시트
+
+Returns:
+    dict: {'KPI_Mat', 'KPI_SOP', 'KPI_Util', 'KPI_Total', 'Ratio_<제조동>', 'Util_<요일>'}
+"""
+def evaluate_plan(df_result, demand_df):
+    from app.analysis.output.kpi_score import KpiScore
+    from app.analysis.output.capa_ratio import CapaRatioAnalyzer
+    from app.analysis.output.daily_capa_utilization import CapaUtilization
+    from app.analysis.output.material_shortage_analysis import MaterialShortageAnalyzer
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        material_analyzer = MaterialShortageAnalyzer()
+        try:
+            material_analyzer.analyze_material_shortage(df_result)
+        except Exception as e:
+            print(f"자재 부족 분석 오류: {e}")
+
+        kpi = KpiScore()
+        kpi.set_data(df_result, material_analyzer, demand_df)
+        scores = kpi.calculate_all_scores()
+        ratios = CapaRatioAnalyzer.analyze_capa_ratio(data_df=df_result, is_initial=True) if not df_result.empty else {}
+        utilization = CapaUtilization.analyze_utilization(df_result)
+
+    row = {f'KPI_{name}': score for name, score in scores.items()}
+    row.update({f'Ratio_{building}': ratio for building, ratio in sorted(ratios.items())})
+    row.update({f'Util_{day}': value for day, value in (utilization or {}).items()})
+    return row
+
+
+class ScenarioRunner:
+    """
+    Args:
+        dataframes (dict): Optimization 입력. 없으면 DataStore 의 organized_dataframes
+        projects (list): 최적화 대상 프로젝트. 비어있으면 전체
+        max_workers (int): 동시에 푸는 시나리오 수. 없으면 CPU 수
+        solve_job (SolveJob): 일괄 실행 전체를 취소할 때 사용할 작업
+    """
+    def __init__(self, dataframes=None, projects=None, max_workers=None, solve_job=None):
+        self.dataframes = dataframes or DataStore.get('organized_dataframes', {})
+        self.projects = projects or []
+        self.max_workers = max_workers
+        self.solve_job = solve_job
+
+    """
+    시나리오 목록 정리: {이름: 설정 dict}. 알 수 없는 설정 키는 제외
+    """
+    @staticmethod
+    def _normalize_scenarios(scenarios):
+        if not isinstance(scenarios, dict):
+            scenarios = {f'Scenario {i + 1}': overrides for i, overrides in enumerate(scenarios)}
+        known = set(SettingsStore.get_all())
+        normalized = {}
+        for name, overrides in scenarios.items():
+            unknown = set(overrides) - known
+            if unknown:
+                print(f"시나리오 '{name}' 의 알 수 없는 설정은 무시합니다: {sorted(unknown)}")
+            normalized[name] = {k: v for k, v in overrides.items() if k in known}
+        return normalized
+
+    """
+    시나리오 일괄 실행
+
+    Args:
+        scenarios (dict | list): {이름: SettingsStore 덮어쓸 설정 dict} 또는 설정 dict 목록
+
+    Returns:
+        dict: {
+            'table': 시나리오별 비교표 DataFrame,
+            'results': {이름: 생산계획 결과 DataFrame},
+            'solve_info': {이름: {'lp_results', 'mip_results'}}
+        }
+    """
+    def run(self, scenarios):
+        scenarios = self._normalize_scenarios(scenarios)
+        base_settings = SettingsStore.get_all()
+
+        # 모델에 영향을 주는 설정이 같은 시나리오끼리 묶어서 한 번만 풀이
+        solve_groups = {}
+        for name, overrides in scenarios.items():
+            settings = {**base_settings, **overrides}
+            solve_key = json.dumps({k: v for k, v in settings.items() if k not in KPI_ONLY_SETTINGS}, sort_keys=True, default=str)
+            solve_groups.setdefault(solve_key, {'name': name, 'settings': settings, 'members': []})['members'].append(name)
+        tasks = [{'name': group['name'], 'settings': group['settings']} for group in solve_groups.values()]
+
+        max_workers = self.max_workers or min(len(tasks), os.cpu_count() or 1)
+        print(f"시나리오 {len(scenarios)}개 (풀이 {len(tasks)}개) 를 프로세스 {max_workers}개로 풉니다")
+
+        started = time.time()
+        solved = {}
+        context = multiprocessing.get_context()
+        workers = PoolWorkers(context)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                 **workers.executor_kwargs(_init_worker, (self.dataframes, self.projects))) as executor:
+            if self.solve_job is not None:
+                # 취소하면 풀 작업자를 종료 (작업자는 SIGTERM 을 받으면 자기 솔버를 멈춤)
+                self.solve_job.on_cancel(workers.terminate)
+            try:
+                futures = [executor.submit(_solve_scenario, task) for task in tasks]
+                for future in as_completed(futures):
+                    outcome = future.result()
+                    solved[outcome['name']] = outcome
+                    print(f"시나리오 풀이 완료: {outcome['name']} ({outcome['elapsed']:.1f}초)")
+            except BrokenProcessPool:
+                if self.solve_job is None or not self.solve_job.cancelled:
+                    raise
+                print("시나리오 일괄 실행이 취소되었습니다")
+            finally:
+                # 풀이 끝난 뒤의 취소는 작업자를 찾지 않도록 해제
+                if self.solve_job is not None:
+                    self.solve_job.off_cancel(workers.terminate)
+
+        rows, results, solve_info = [], {}, {}
+        demand_df = self.dataframes.get('demand', {}).get('demand')
+        if self.projects and demand_df is not None:
+            demand_df = demand_df[demand_df['Item'].str[3:7].isin(self.projects)]
+        for group in solve_groups.values():
+            outcome = solved.get(group['name'])
+            for name in group['members']:
+                row = {'Scenario': name, 'Overrides': json.dumps(scenarios[name], ensure_ascii=False, default=str)}
+                if outcome is None:
+                    rows.append({**row, 'Status': 'Cancelled'})
+                    continue
+
+                mip = outcome['mip_results'] or {}
+                df_result = outcome['result']
+                results[name] = df_result
+                solve_info[name] = {'lp_results': outcome['lp_results'], 'mip_results': outcome['mip_results']}
+                row.update({
+                    'Status': mip.get('status', 'Stage 1 only'),
+                    'Shared_Solve': group['name'] if name != group['name'] else '',
+                    'Total_Qty': int(df_result['Qty'].sum()) if not df_result.empty else 0,
+                    'Solve_Time': outcome['elapsed'],
+                    'Time_Limit_Reached': mip.get('time_limit_reached'),
+                })
+                with settings_override(scenarios[name]):
+                    row.update(evaluate_plan(df_result, demand_df))
+                rows.append(row)
+
+        print(f"시나리오 일괄 실행 완료 ({time.time() - started:.1f}초)")
+        return {'table': pd.DataFrame(rows), 'results': results, 'solve_info': solve_info}
+
+
+if __name__ == "__main__":
+    # python -m app.core.scenario_runner demand.xlsx master.xlsx dynamic.xlsx scenarios.json [out.csv]
+    # scenarios.json : {"이름": {"설정": 값, ...}, ...}
+    from app.models.common.file_store import FilePaths
+
+    args = sys.argv[1:]
+    if len(args) < 4:
+        print("usage: python -m app.core.scenario_runner demand.xlsx master.xlsx dynamic.xlsx scenarios.json [out.csv]")
+        sys.exit(1)
+
+    FilePaths.set("master_excel_file", args[1])
+    input = {
+        'demand': pd.read_excel(args[0], sheet_name=None),
+        'master': pd.read_excel(args[1], sheet_name=None),
+        'dynamic': pd.read_excel(args[2], sheet_name=None),
+    }
+    with open(args[3], 'r', encoding='utf-8') as f:
+        scenarios = json.load(f)
+
+    table = ScenarioRunner(input).run(scenarios)['table']
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    if len(args) >= 5:
+        table.to_csv(args[4], index=False, encoding='utf-8-sig')
@@ -12,6 +12,20 @@ class SettingsStore:
         # Basic 설정
         "time_limit1": 10,  # 1차 알고리즘 수행시간(초)
         "time_limit2": 300,  # 2차 알고리즘 수행시간(초)
+        "solver_backend": "cbc",  # 솔버 (cbc: PuLP CBC, highs: scipy HiGHS)
+        "decompose_ox": 0,  # 2차 프로젝트 그룹별 분해(병렬) 풀이 여부
+        "quick_plan_ox": 0,  # 2차를 LP 완화 + 반올림 빠른 계획으로 풀지 여부 (최종 계획은 MIP)
+        "edd_heuristic_ox": 1,  # EDD 휴리스틱 계획을 2차 초기해 / 해를 찾지 못했을 때의 대체 계획으로 사용할지 여부
+        "polish_time_limit": 10,  # 결과 화면 계획 개선(Polish) 로컬 서치 수행시간(초)
+        "presolve_ox": 1,  # 모델 생성 전 big-M / 변수 상한 강화 및 중복 제약 제거 여부
+        "rolling_horizon_ox": 0,  # 2차 롤링 호라이즌 풀이 여부 (계획 기간이 구간보다 길 때)
+        "rolling_window": 14,  # 롤링 호라이즌 구간 크기(시프트)
+        "rolling_overlap": 2,  # 롤링 호라이즌 구간 겹침(시프트)
+        "solve_cache_ox": 1,  # 같은 입력의 모델/결과 캐시 사용 여부
+        "solve_cache_mb": 512,  # 캐시 최대 용량(MB)
+        "solver_log_ox": 0,  # 사전할당 검사 솔버 로그 출력 여부
+        "telemetry_ox": 1,  # 최적화 실행 기록(JSONL) 저장 여부
+        "telemetry_path": "logs/optimization_runs.jsonl",  # 최적화 실행 기록 파일
         "weight_sop_ox": 1.0,  # SOP 가중치
         "weight_mat_qty": 1.0,  # 자재 가중치
         "weight_linecnt_bypjt": 1.0,  # PJT분산 가중치
@@ -1,6 +1,7 @@
 import pandas as pd
 from app.models.common.file_store import FilePaths, DataStore
 from app.utils.fileHandler import load_file
+from app.utils.shift_calendar import horizon_shifts
 from app.utils.error_handler import (
     error_handler, safe_operation,
     DataError, FileError
@@ -252,7 +253,7 @@ def process_production(df_line_available, df_capa_qty) :
                     line_str = str(line)
                     capacities = {}
 
-                    for shift in range(1, 15) :
+                    for shift in horizon_shifts(filtered_capa_qty) :
                         capacity = 0
 
                         if shift in shift_columns :
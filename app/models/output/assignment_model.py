@@ -294,6 +294,49 @@ class AssignmentModel(QObject):
         return True
     
 
+    """
+    원본 대비 수정된 행과, 수정으로 영향을 받은 (라인, 시프트) 셀 반환
+    (이동한 행은 이전 셀과 새 셀, 삭제된 행은 이전 셀이 영향을 받음)
+    """
+    def get_adjustment_neighborhood(self):
+        key_columns = ['Line', 'Time', 'Item', 'Qty']
+        current = self._ensure_correct_types(self._df.copy())
+        original = self._ensure_correct_types(self._original_df.copy())
+
+        merged = current[['_id'] + key_columns].merge(
+            original[['_id'] + key_columns], on='_id', how='outer', suffixes=('', '_orig'), indicator=True
+        )
+        changed = merged['_merge'] != 'both'
+        for col in key_columns:
+            changed |= merged[col] != merged[f'{col}_orig']
+        merged = merged[changed]
+
+        df_edited = current[current['_id'].isin(merged.loc[merged['_merge'] != 'right_only', '_id'])]
+        cells = set()
+        for line_col, time_col in [('Line', 'Time'), ('Line_orig', 'Time_orig')]:
+            for line, time in merged[[line_col, time_col]].dropna().itertuples(index=False):
+                cells.add((str(line), int(time)))
+
+        return df_edited, cells
+
+    """
+    재최적화 결과로 현재 데이터 교체 (원본은 유지해서 리셋 가능)
+    """
+    def replace_dataframe(self, new_df: pd.DataFrame):
+        new_df = self._ensure_correct_types(new_df.copy())
+
+        # 새로 배치된 행에는 ID 생성
+        if '_id' not in new_df.columns:
+            new_df['_id'] = None
+        missing = new_df['_id'].isna()
+        new_df.loc[missing, '_id'] = [str(uuid.uuid4()) for _ in range(int(missing.sum()))]
+
+        self._df = new_df.reset_index(drop=True)
+
+        has_changes = self._check_for_changes()
+        self.dataModified.emit(has_changes)
+        self.modelDataChanged.emit()
+
     def get_comparison_dataframe(self):
         return {
             'original': self._ensure_correct_types(self._original_df.copy()),
@@ -0,0 +1,152 @@
+import fnmatch
+
+import numpy as np
+import pandas as pd
+
+"""
+아이템 와일드카드 패턴 인덱스
+
+Fixed_Group, 자재 Top_Model 같은 아이템 패턴('***P205*******')은 아이템 코드 자리 기준의 고정 길이 패턴이다.
+패턴과 아이템의 길이가 같으면 '*' / '?' 는 그 자리의 아무 한 글자, 나머지 글자는 같은 자리에 같은 글자가 있어야 일치한다.
+길이가 다른 '*' 패턴(예: 'AAAP205*')은 fnmatch 와 같이 '*' 를 임의 길이 문자열로 보고, '[' 가 들어간 패턴도 fnmatch 규칙을 따른다.
+(대소문자는 구분)
+
+- PatternIndex(아이템 목록) : "패턴 P 에 일치하는 아이템" 을 자리별 글자 비교(NumPy)로 한 번에 계산
+- PatternSet(패턴 목록)     : "아이템 I 에 일치하는 패턴" 을 패턴 전체에 대해 한 번에 계산
+아이템 / 패턴은 (개수, 최대 길이) 유니코드 코드 배열로 만들어 두고, 자리별 비교 결과는 캐시해서 재사용한다.
+"""
+
+WILDCARDS = '*?'
+
+
+"""
+문자열 목록 -> (개수, 최대 길이) 유니코드 코드 배열 (짧은 문자열 뒤는 0)
+"""
+def _char_codes(strings):
+    width = max((len(s) for s in strings), default=0) or 1
+    codes = np.array(strings, dtype=f'<U{width}').view(np.uint32)
+    return codes.reshape(len(strings), width)
+
+
+def _is_positional(pattern):
+    return '[' not in pattern
+
+
+class PatternIndex:
+    """
+    Args:
+        items (iterable): 아이템 목록 (순서와 중복을 그대로 유지. 문자열이 아닌 값은 어떤 패턴과도 일치하지 않음)
+    """
+    def __init__(self, items):
+        self.items = np.array(list(items), dtype=object)
+        self.valid = np.array([isinstance(item, str) for item in self.items], dtype=bool)
+        strings = [item if valid else '' for item, valid in zip(self.items, self.valid)]
+        self.lengths = np.array([len(s) for s in strings], dtype=int)
+        self.codes = _char_codes(strings)
+        # (자리, 글자) -> 그 자리에 그 글자가 있는 아이템 마스크
+        self._position_masks = {}
+        self._length_masks = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def _position_mask(self, pos, ch):
+        key = (pos, ch)
+        if key not in self._position_masks:
+            self._position_masks[key] = self.codes[:, pos] == ord(ch)
+        return self._position_masks[key]
+
+    def _length_mask(self, length):
+        if length not in self._length_masks:
+            self._length_masks[length] = self.valid & (self.lengths == length)
+        return self._length_masks[length]
+
+    """
+    패턴에 일치하는 아이템 마스크 (bool 배열, 아이템 순서)
+    """
+    def mask(self, pattern):
+        if not isinstance(pattern, str):
+            return np.zeros(len(self.items), dtype=bool)
+        if not _is_positional(pattern):
+            return np.array([valid and fnmatch.fnmatchcase(item, pattern)
+                             for item, valid in zip(self.items, self.valid)], dtype=bool)
+
+        width = self.codes.shape[1]
+        if len(pattern) > width:
+            matched = np.zeros(len(self.items), dtype=bool)
+        else:
+            matched = self._length_mask(len(pattern)).copy()
+            for pos, ch in enumerate(pattern):
+                if ch not in WILDCARDS:
+                    matched &= self._position_mask(pos, ch)
+
+        # 길이가 다른 아이템은 '*' 를 임의 길이로 보고 비교
+        if '*' in pattern:
+            others = self.valid & (self.lengths != len(pattern))
+            if others.any():
+                matched[others] = [fnmatch.fnmatchcase(item, pattern) for item in self.items[others]]
+        return matched
+
+    """
+    패턴에 일치하는 아이템 목록 (아이템 순서)
+    """
+    def matching_items(self, pattern):
+        return list(self.items[self.mask(pattern)])
+
+    """
+    패턴별 일치 아이템 {패턴: [아이템, ...]} (같은 패턴은 한 번만 계산)
+    """
+    def match_all(self, patterns):
+        return {pattern: self.matching_items(pattern) for pattern in dict.fromkeys(patterns)}
+
+    """
+    (패턴, 아이템) 일치 쌍 데이터프레임 ['Pattern', 'Item'] (join 용)
+    """
+    def pairs(self, patterns):
+        rows = [(pattern, item) for pattern, items in self.match_all(patterns).items() for item in items]
+        return pd.DataFrame(rows, columns=['Pattern', 'Item'])
+
+
+class PatternSet:
+    """
+    Args:
+        patterns (iterable): 패턴 목록 (중복 제거, 순서 유지)
+    """
+    def __init__(self, patterns):
+        self.patterns = list(dict.fromkeys(p for p in patterns if isinstance(p, str)))
+        positional = [_is_positional(p) for p in self.patterns]
+        self.positional = np.array(positional, dtype=bool)
+        self.lengths = np.array([len(p) for p in self.patterns], dtype=int)
+        self.codes = _char_codes(self.patterns)
+        self.wild = np.isin(self.codes, [ord(ch) for ch in WILDCARDS])
+        self.variable = np.array([('*' in p) or not pos for p, pos in zip(self.patterns, positional)], dtype=bool)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    """
+    아이템에 일치하는 패턴 마스크 (bool 배열, 패턴 순서)
+    """
+    def mask(self, item):
+        matched = np.zeros(len(self.patterns), dtype=bool)
+        if not isinstance(item, str) or not self.patterns:
+            return matched
+
+        length = len(item)
+        same = self.positional & (self.lengths == length)
+        if same.any() and length <= self.codes.shape[1]:
+            item_codes = _char_codes([item])[0]
+            window = self.codes[same, :length]
+            matched[same] = ((window == item_codes) | self.wild[same, :length]).all(axis=1)
+
+        # 길이가 다르거나 '[' 가 들어간 패턴은 fnmatch 규칙으로 비교
+        others = self.variable & ~same
+        for i in np.flatnonzero(others):
+            matched[i] = fnmatch.fnmatchcase(item, self.patterns[i])
+        return matched
+
+    """
+    아이템에 일치하는 패턴 목록 (패턴 순서)
+    """
+    def matching(self, item):
+        return [self.patterns[i] for i in np.flatnonzero(self.mask(item))]
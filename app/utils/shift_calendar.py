@@ -0,0 +1,83 @@
+"""
+시프트(Time) 달력
+
+시프트는 1 부터 시작하고 하루 2 시프트(주간 / 야간), 일주일 14 시프트다.
+1,2(월), 3,4(화), ..., 13,14(일), 15,16(다음 주 월), ...
+계획 기간은 capa_qty 시트의 시프트 컬럼 수로 정해지며 14 시프트(1주)보다 길 수 있다.
+"""
+
+SHIFTS_PER_DAY = 2
+DAYS_PER_WEEK = 7
+SHIFTS_PER_WEEK = SHIFTS_PER_DAY * DAYS_PER_WEEK
+DAY_NAMES = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+# 시프트 컬럼을 찾지 못했을 때 사용하는 기본 계획 기간 (1주)
+DEFAULT_SHIFTS = list(range(1, SHIFTS_PER_WEEK + 1))
+
+
+"""
+시트의 시프트 컬럼 (정수 또는 숫자 문자열 컬럼) -> 정렬된 정수 시프트 목록
+"""
+def shift_columns(df):
+    shifts = set()
+    for col in getattr(df, 'columns', []):
+        if isinstance(col, bool):
+            continue
+        if isinstance(col, int) or (hasattr(col, 'is_integer') and col.is_integer()):
+            shifts.add(int(col))
+        elif isinstance(col, str) and col.strip().isdigit():
+            shifts.add(int(col.strip()))
+    return sorted(s for s in shifts if s >= 1)
+
+
+"""
+계획 기간 시프트 목록: capa_qty 시프트 컬럼, 없으면 결과의 Time 을 주 단위로 올림, 둘 다 없으면 1주
+"""
+def horizon_shifts(df_capa_qty=None, times=None):
+    shifts = shift_columns(df_capa_qty) if df_capa_qty is not None else []
+    if shifts:
+        return shifts
+    times = [int(t) for t in (times if times is not None else []) if str(t).lstrip('-').isdigit() and int(t) >= 1]
+    if times:
+        weeks = (max(times) - 1) // SHIFTS_PER_WEEK + 1
+        return list(range(1, weeks * SHIFTS_PER_WEEK + 1))
+    return list(DEFAULT_SHIFTS)
+
+
+"""시프트 -> 계획 기간 안의 일차 (0 부터)"""
+def shift_day_index(shift):
+    return (int(shift) - 1) // SHIFTS_PER_DAY
+
+
+"""시프트 -> 요일 이름 ('Mon' ~ 'Sun')"""
+def shift_day(shift):
+    return DAY_NAMES[shift_day_index(shift) % DAYS_PER_WEEK]
+
+
+"""시프트 -> 주차 (1 부터)"""
+def shift_week(shift):
+    return (int(shift) - 1) // SHIFTS_PER_WEEK + 1
+
+
+"""시프트 -> 'Day' / 'Night'"""
+def shift_period(shift):
+    return "Day" if int(shift) % 2 == 1 else "Night"
+
+
+"""
+계획 기간 일자 헤더. 1주 이하면 요일 이름, 더 길면 'W2 Mon' 처럼 주차를 붙임
+"""
+def day_labels(shifts):
+    days = max((shift_day_index(s) for s in shifts), default=DAYS_PER_WEEK - 1) + 1
+    days = max(DAYS_PER_WEEK, -(-days // DAYS_PER_WEEK) * DAYS_PER_WEEK)
+    if days <= DAYS_PER_WEEK:
+        return list(DAY_NAMES)
+    return [f"W{d // DAYS_PER_WEEK + 1} {DAY_NAMES[d % DAYS_PER_WEEK]}" for d in range(days)]
+
+
+"""
+시프트별 가중치. weight_day 설정(1주 14개)은 주마다 반복해서 적용
+"""
+def shift_weight(weights, shift):
+    if not weights:
+        return 1.0
+    return weights[(int(shift) - 1) % len(weights)]
@@ -9,6 +9,7 @@ import re
 
 from app.core.input.pre_assign import run_allocation
 from app.core.input.maintenance import calc_plan_retention
+from app.core.model.edd_heuristic import preview_plan
 from app.models.common.file_store import FilePaths, DataStore
 
 from app.views.components.data_upload_components.date_range_selector import DateRangeSelector
@@ -755,8 +756,38 @@ class DataInputPage(QWidget) :
         except Exception as e :
             print(f'error : {str(e)}')
 
+        try :
+            self.run_plan_preview()
+        except Exception as e :
+            print(f'plan preview failed : {str(e)}')
+
         self.parameter_component.show_failures.emit(failures)
 
+    """
+    EDD 휴리스틱으로 생산계획 미리보기 (솔버 없이 바로 계산, 최종 계획은 최적화 실행)
+    """
+    def run_plan_preview(self) :
+        self.prepare_dataframes_for_optimization()
+        preview = preview_plan(DataStore.get("organized_dataframes", {}))
+        df_preview = preview['result']
+        info = preview['solve_info']
+        DataStore.set("heuristic_preview", df_preview)
+
+        summary = {
+            'Total production': info['objective'],
+            'Demand coverage': info['demand_coverage'],
+            'SOP coverage': info['sop_coverage'],
+            'Portion violated': info['portion_violated'],
+            'Build time (ms)': info['build_time'] * 1000,
+        }
+        current_data = self.left_parameter_component.all_project_analysis_data.copy()
+        current_data['Plan Preview'] = {
+            'display_df' : df_preview[['Line', 'Time', 'Item', 'Qty']],
+            'summary' : summary
+        }
+        self.left_parameter_component.set_project_analysis_data(current_data)
+        self.update_status_message(True, f"계획 미리보기: 생산량 {info['objective']:,.0f}, 납기 내 SOP {info['sop_coverage']:.1f}% ({summary['Build time (ms)']:.0f}ms)")
+
     """
     Save 버튼 클릭 시 현재 데이터를 원본 파일에 저장
     """
@@ -67,6 +67,7 @@ class LeftParameterComponent(QWidget):
             "Materials",
             "Current Shipment",
             "Plan Retention",
+            "Plan Preview",
         ]
 
         # 버튼 영역을 위한 프레임
@@ -455,6 +456,8 @@ class LeftParameterComponent(QWidget):
                     headers = ["Category", "Name", "SOP", "Production", "Fulfillment Rate", "Status"]
                 elif metric == 'Plan Retention':
                     headers = ['Line','Time','RMC','Item','Previous Qty','Max Item Qty','Max RMC Qty']
+                elif metric == 'Plan Preview':
+                    headers = ['Line','Time','Item','Qty']
                 else:
                     headers = list(display_df.columns) if hasattr(display_df, 'columns') else []
 
@@ -585,6 +588,14 @@ class LeftParameterComponent(QWidget):
                     ("Required SKU Plan Retention Rate2",f"{SettingsStore.get('op_SKU_2',0)} %"),
                     ("Required RMC Plan Retention Rate2",f"{SettingsStore.get('op_RMC_2',0)} %"),
                 ]
+            elif metric == 'Plan Preview':
+                summary_data = [
+                    ("Total Production", f"{summary.get('Total production', 0):,.0f}"),
+                    ("Demand Coverage", f"{summary.get('Demand coverage', 0):.1f}%"),
+                    ("SOP Within Due", f"{summary.get('SOP coverage', 0):.1f}%"),
+                    ("Capa Portion", "Violated" if summary.get('Portion violated') else "OK"),
+                    ("Build Time", f"{summary.get('Build time (ms)', 0):.0f} ms"),
+                ]
             # Summary 테이블에 데이터 추가
             for label, value in summary_data:
                 item = QTreeWidgetItem([label, str(value)])
@@ -613,6 +624,9 @@ class LeftParameterComponent(QWidget):
                         item.setForeground(1, QColor("#F39C12"))
                     else:
                         item.setForeground(1, QColor("#2ECC71"))
+                elif metric == 'Plan Preview' and label == "Capa Portion":
+                    if value == "Violated":
+                        item.setForeground(1, QColor("#F39C12"))
                 elif metric == 'Current Shipment' and label == "Fulfillment Rate":
                     rate_value = float(str(value).replace('%', ''))
                     if rate_value < 90:
@@ -3,11 +3,13 @@ from PyQt5.QtWidgets import (
     QPushButton, QFrame, QHBoxLayout, QMessageBox,
     QApplication, QTextEdit
 )
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, QTime
+from PyQt5.QtCore import Qt, pyqtSignal, QThread, QTime
 from PyQt5.QtGui import QFont
 
 from app.resources.fonts.font_manager import font_manager
 from app.models.common.settings_store import SettingsStore
+from app.core.model.solver_progress import progress_percent
+from app.core.model.solve_job import SolveJob
 from app.models.common.screen_manager import *
 
 
@@ -17,108 +19,56 @@ class OptimizationWorker(QThread):
     status_updated = pyqtSignal(str)  # 상태 메시지 업데이트 시그널
     optimization_finished = pyqtSignal(dict)  # 최적화 완료 시그널 (결과 포함)
     error_occurred = pyqtSignal(str)  # 오류 발생 시그널
+    solver_progress = pyqtSignal(dict)  # 솔버 진행 이벤트 (경과 시간, 갭 등)
 
     def __init__(self, data_input_page, parent=None):
         super().__init__(parent)
         self.data_input_page = data_input_page
         self.is_cancelled = False
         self.optimization_engine = None
+        # 취소 시 솔버 프로세스를 바로 멈추기 위한 작업
+        self.solve_job = SolveJob('pre_assign')
+        # 마지막으로 전달한 솔버 진행률 (여러 번 푸는 경우에도 진행률이 되돌아가지 않도록)
+        self.solver_percent = 20
+
+    """
+    솔버 진행 이벤트를 진행률(20~95%)과 상태 문구로 전달
+    (경과 시간 알림(solving)은 진행률과 시간 표시만 갱신)
+    """
+    def on_solver_progress(self, event):
+        self.solver_percent = max(self.solver_percent, progress_percent(event, 20, 95))
+        self.progress_updated.emit(self.solver_percent)
+        self.solver_progress.emit(event)
+        if event['phase'] != 'solving':
+            self.status_updated.emit(event['message'])
 
     def run(self):
         try:
-            # UI 업데이트 처리를 위한 imports
-            from PyQt5.QtWidgets import QApplication
-            import time
-
-            # 진행 상황 초기화 - 0%부터 시작
             self.progress_updated.emit(0)
-            self.status_updated.emit("Initializing optimization...")
-            QApplication.processEvents()
-            time.sleep(0.1)  # UI가 업데이트될 시간을 줌
-
-            # 더 세분화된 진행률로 시작
-            for i in range(1, 5):
-                self.progress_updated.emit(i * 2)
-                QApplication.processEvents()
-                time.sleep(0.05)
-
-            # 데이터프레임 준비 (초기 10% 진행)
             self.status_updated.emit("Preparing the dataframe...")
-            self.progress_updated.emit(10)
-            QApplication.processEvents()
 
             self.data_input_page.prepare_dataframes_for_optimization()
 
-            # 데이터프레임 준비 후 진행률 업데이트
-            for i in range(6, 10):
-                self.progress_updated.emit(i * 2)
-                QApplication.processEvents()
-                time.sleep(0.05)
-
             if self.is_cancelled:
                 return
 
-            # 최적화 엔진 초기화 (약 20% 진행)
+            # 최적화 엔진 초기화
             self.status_updated.emit("Initializing the optimization engine...")
-            self.progress_updated.emit(20)
-            QApplication.processEvents()
+            self.progress_updated.emit(10)
 
             from app.core.optimization import Optimization
             from app.models.common.file_store import DataStore
 
-            # 엔진 초기화 중간 진행률 업데이트
-            for i in range(11, 15):
-                self.progress_updated.emit(i * 2)
-                QApplication.processEvents()
-                time.sleep(0.05)
-
             all_dataframes = DataStore.get("organized_dataframes", {})
-
-            # 데이터프레임 로드 후 진행률 업데이트
-            for i in range(15, 20):
-                self.progress_updated.emit(i * 2)
-                QApplication.processEvents()
-                time.sleep(0.05)
-
-            self.optimization_engine = Optimization(all_dataframes)
-
-            if self.is_cancelled:
-                return
-
-            # 모델 정의 및 제약 조건 설정 (약 40% 진행)
-            self.status_updated.emit("Building the optimization model...")
-            self.progress_updated.emit(40)
-            QApplication.processEvents()
-
-            # 모델 설정 진행률 세분화
-            for i in range(21, 30):
-                self.progress_updated.emit(i * 2)
-                QApplication.processEvents()
-                time.sleep(0.05)
+            self.optimization_engine = Optimization(all_dataframes, progress_callback=self.on_solver_progress,
+                                                   solve_job=self.solve_job)
 
             if self.is_cancelled:
                 return
 
-            # 최적화 실행 (약 60% 진행)
-            self.status_updated.emit("Running the optimization model...")
-            self.progress_updated.emit(60)
-            QApplication.processEvents()
-
-            # 최적화 진행 중 단계적 업데이트
-            for i in range(31, 35):
-                self.progress_updated.emit(i * 2)
-                QApplication.processEvents()
-                time.sleep(0.05)
-
-            # 최적화 실행
-            result = self.optimization_engine.pre_assign()
-
-            # 결과 처리 중 진행률 업데이트
-            self.status_updated.emit("Processing optimization results...")
-            for i in range(70, 95, 5):
-                self.progress_updated.emit(i)
-                QApplication.processEvents()
-                time.sleep(0.05)
+            # 최적화 실행 (1차 알고리즘 수행시간 제한 적용). 이후 진행률은 모델 구성 / 솔버 이벤트로 갱신
+            self.progress_updated.emit(20)
+            result = self.optimization_engine.pre_assign(time_limit=SettingsStore.get('time_limit1', 10))
 
             if self.is_cancelled:
                 return
@@ -126,8 +76,6 @@ class OptimizationWorker(QThread):
             # 완료 및 결과 반환
             self.status_updated.emit("Optimization complete! Please wait a moment...")
             self.progress_updated.emit(100)
-            QApplication.processEvents()
-            time.sleep(0.2)  # 완료 상태 표시를 위한 약간의 지연
 
             self.optimization_finished.emit(result)
 
@@ -135,9 +83,13 @@ class OptimizationWorker(QThread):
             import traceback
             traceback.print_exc()
             self.error_occurred.emit(str(e))
+        finally:
+            self.solve_job.close()
 
     def cancel(self):
         self.is_cancelled = True
+        # 단계 사이의 확인을 기다리지 않고 실행 중인 솔버를 바로 멈춤
+        self.solve_job.cancel()
 
 
 class OptimizationProgressDialog(QDialog):
@@ -391,9 +343,9 @@ class OptimizationProgressDialog(QDialog):
         self.worker.status_updated.connect(self.update_status)
         self.worker.optimization_finished.connect(self.on_optimization_finished)
         self.worker.error_occurred.connect(self.on_error_occurred)
+        self.worker.solver_progress.connect(self.update_solver_progress)
 
-        # UI가 업데이트될 시간을 주기 위해 약간의 지연 후 작업 시작
-        QTimer.singleShot(200, self.worker.start)
+        self.worker.start()
         self.log_message("Starting the optimization process.")
 
     def update_progress(self, value):
@@ -421,23 +373,12 @@ class OptimizationProgressDialog(QDialog):
                 }}
             """)
 
-        # 상태 메시지 업데이트
+        # 시간 정보는 솔버 이벤트(update_solver_progress)가 갱신하고, 솔버 전후 단계만 여기서 표시
         if value < 20:
             self.time_label.setText("Preparing data...")
-        elif value < 40:
-            self.time_label.setText("Defining constraints...")
-        elif value < 60:
-            self.time_label.setText("Configuring model...")
-        elif value < 80:
-            self.time_label.setText("Optimizing...")
-        elif value < 95:
-            self.time_label.setText("Almost done...")
-        else:
+        elif value >= 95:
             self.time_label.setText("Completed. Displaying results...")
 
-            if value == 100:
-                self.cancel_button.setText("Cancel")
-
         # 로그에 진행률 기록
         if value % 10 == 0:  # 10% 단위로만 로그 기록
             self.log_message(f"Progress: {value}%")
@@ -445,6 +386,17 @@ class OptimizationProgressDialog(QDialog):
         # UI 업데이트 강제 실행
         QApplication.processEvents()
 
+    def update_solver_progress(self, event):
+        """솔버 경과 시간 / 제한 시간 / 갭 표시"""
+        text = f"Elapsed {event.get('elapsed', 0):.1f}s"
+        if event.get('time_limit'):
+            text += f" / {event['time_limit']}s"
+        if event.get('gap') is not None:
+            text += f"  ·  gap {event['gap']:.2f}%"
+        elif event.get('objective') is not None:
+            text += f"  ·  objective {event['objective']:,.0f}"
+        self.time_label.setText(text)
+
     def update_status(self, message):
         """상태 메시지 업데이트"""
         self.status_label.setText(message)
@@ -480,8 +432,7 @@ class OptimizationProgressDialog(QDialog):
         # 결과를 포함하여 완료 시그널 발생
         self.optimization_completed.emit(result)
 
-        # 다이얼로그를 자동으로 닫기 (약간의 지연 후)
-        QTimer.singleShot(800, self.accept)  # 0.8초 후 다이얼로그 닫기
+        self.accept()
 
     def on_error_occurred(self, error_message):
         """오류 발생 처리"""
@@ -1,14 +1,18 @@
 import threading
-import time
 import pandas as pd
 from PyQt5.QtCore import QThread, pyqtSignal
 
 from app.core.optimizer import Optimizer
+from app.core.model.solver_progress import progress_percent
+from app.core.model.solve_job import SolveJob
 from app.models.common.settings_store import SettingsStore
 
 class ProcessThread(QThread):
     progress = pyqtSignal(int, int)
+    status = pyqtSignal(str)
     finished = pyqtSignal(pd.DataFrame)
+    # 계획 일부를 만들지 못했을 때 사용자에게 보여줄 경고 문구
+    warning = pyqtSignal(str)
 
     def __init__(self, df: pd.DataFrame, projects: list, time_limit: int = None):
         super().__init__()
@@ -16,33 +20,60 @@ class ProcessThread(QThread):
         self.projects = projects
         # 설정된 time_limit 없으면 기본값 사용
         self.time_limit = time_limit or SettingsStore._settings.get("time_limit2", 300)
+        # 솔버는 자체적으로 제한 시간을 지키므로, 모델 생성/결과 처리 시간만큼 여유를 두고 기다림
+        self.grace_period = 30
         self._opt_result = None
+        # 취소 / 시간 초과 시 솔버 프로세스를 바로 멈추기 위한 작업
+        self.solve_job = SolveJob('plan')
+        # 마지막으로 전달한 진행률 (여러 번 푸는 경우에도 진행률이 되돌아가지 않도록)
+        self.percent = 0
+
+    """
+    솔버 진행 이벤트 -> 진행률 / 남은 시간 / 상태 문구
+    """
+    def _on_solver_progress(self, event):
+        remaining = self.time_limit - event.get('elapsed', 0) if event.get('time_limit') else self.time_limit
+        self.percent = max(self.percent, min(99, progress_percent(event)))
+        self.progress.emit(self.percent, max(0, int(remaining)))
+        if event['phase'] != 'solving':
+            self.status.emit(event['message'])
+
+    """
+    실행 중인 솔버를 멈춤. 찾은 최선해가 있으면 그 결과로 finished 가 발생
+    """
+    def cancel(self):
+        self.solve_job.cancel()
 
     def run(self):
-        start = time.time()
-        
         """
         최적화 작업
         """
         def do_opt():
             results = Optimizer().run_optimization({
                 'pre_assigned_df': self.df,
-                'selected_projects': self.projects
+                'selected_projects': self.projects,
+                'time_limit2': self.time_limit,
+                'progress_callback': self._on_solver_progress,
+                'solve_job': self.solve_job,
             })
             self._opt_result = results['assignment_result']
+            skipped = (results.get('mip_results') or {}).get('skipped_windows')
+            if skipped:
+                self.warning.emit(f"Shifts {skipped[0][0]}~{skipped[-1][1]} could not be solved within the time limit "
+                                  f"and are left empty in the plan ({len(skipped)} rolling windows).")
 
+        self.progress.emit(0, int(self.time_limit))
         opt_thread = threading.Thread(target=do_opt, daemon=True)
         opt_thread.start()
 
-        while True:
-            elapsed = time.time() - start
-            pct = min(100, int(elapsed / self.time_limit * 100))
-            remaining = max(0, int(self.time_limit - elapsed))
-            self.progress.emit(pct, remaining)
-
-            if self._opt_result is not None or elapsed >= self.time_limit:
-                break
-            time.sleep(1)
+        # 진행률은 솔버 이벤트로 갱신하고, 여기서는 끝날 때까지(최대 제한 시간 + 여유) 기다리기만 함
+        opt_thread.join(timeout=self.time_limit + self.grace_period)
+        if opt_thread.is_alive():
+            # 시간 초과: 솔버를 멈추고 최선해를 읽을 때까지만 기다림
+            print("최적화 제한 시간을 넘겨 솔버를 멈춥니다")
+            self.solve_job.cancel()
+            opt_thread.join(timeout=self.grace_period)
+        self.solve_job.close()
 
         self.progress.emit(100, 0)
 
@@ -50,4 +81,4 @@ class ProcessThread(QThread):
         if self._opt_result is not None:
             self.finished.emit(self._opt_result)
         else:
-            self.finished.emit(self.df)
\ No newline at end of file
+            self.finished.emit(self.df)
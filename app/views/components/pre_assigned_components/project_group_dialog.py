@@ -5,7 +5,7 @@ from PyQt5.QtGui import QFont, QCursor, QPalette, QColor
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QCheckBox, QSizePolicy,
     QLabel, QFrame, QScrollArea, QWidget, QPushButton, QProgressBar,
-    QStackedLayout, QApplication
+    QStackedLayout, QApplication, QMessageBox
 )
 from .processThread import ProcessThread
 from app.models.common.screen_manager import *
@@ -22,6 +22,9 @@ class ProjectGroupDialog(QDialog):
         self.df = df
         self.project_groups = project_groups
         self.df_to_opt = None
+        # 최근 솔버 단계 문구
+        self.solver_status = ""
+        self.thread = None
 
         # 콜백 함수가 있으면 완료 시 호출되도록 연결
         if on_done_callback:
@@ -223,7 +226,7 @@ class ProjectGroupDialog(QDialog):
             }}
         """)
         self.cancel_button.setCursor(QCursor(Qt.PointingHandCursor))
-        self.cancel_button.clicked.connect(self.reject)
+        self.cancel_button.clicked.connect(self._on_cancel_clicked)
         button_layout.addWidget(self.cancel_button)
 
         main_layout.addWidget(button_frame)
@@ -260,9 +263,36 @@ class ProjectGroupDialog(QDialog):
 
         self.thread = ProcessThread(self.df_to_opt, projects)
         self.thread.progress.connect(self._on_progress)
+        self.thread.status.connect(self._on_status)
         self.thread.finished.connect(self._on_finished)
+        self.thread.warning.connect(self._on_warning)
         self.thread.start()
 
+    """
+    취소 버튼. 최적화 중이면 솔버를 멈추고 그때까지 찾은 최선해로 완료 (없으면 사전할당 결과 사용)
+    """
+    def _on_cancel_clicked(self):
+        if self.thread is not None and self.thread.isRunning():
+            self.cancel_button.setEnabled(False)
+            self.solver_status = "Stopping the solver..."
+            self.thread.cancel()
+        else:
+            self.reject()
+
+    """
+    솔버 단계(presolve, incumbent, gap 등) 문구 저장. 다음 진행률 갱신 때 남은 시간과 함께 표시
+    """
+    @pyqtSlot(str)
+    def _on_status(self, message: str):
+        self.solver_status = message
+
+    """
+    계획 일부를 만들지 못한 경우 (롤링 호라이즌 구간 생략 등) 경고
+    """
+    @pyqtSlot(str)
+    def _on_warning(self, message: str):
+        QMessageBox.warning(self, "Optimization", message)
+
     """
     스레드 진행률 업데이트
     """
@@ -271,7 +301,8 @@ class ProjectGroupDialog(QDialog):
         self.progress_bar.setValue(pct)
 
         m, s = divmod(remaining, 60)
-        self.time_label.setText(f"remaining time: {m}:{s:02d}")
+        status = f"  ·  {self.solver_status}" if self.solver_status else ""
+        self.time_label.setText(f"remaining time: {m}:{s:02d}{status}")
         if not self.time_label.isVisible():
             self.time_label.show()
             self.adjustSize()
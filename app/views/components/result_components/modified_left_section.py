@@ -12,6 +12,7 @@ from .filter_widget import FilterWidget
 from .search_widget import SearchWidget
 from app.utils.fileHandler import load_file
 from app.utils.item_key_manager import ItemKeyManager
+from app.utils.shift_calendar import day_labels
 from app.resources.fonts.font_manager import font_manager
 from app.models.common.screen_manager import *
 
@@ -1122,6 +1123,8 @@ class ModifiedLeftSection(QWidget):
             # Line과 Time 값 추출
             all_lines = self.data['Line'].unique()
             times = sorted(self.data['Time'].unique())
+            # 계획 기간이 1주보다 길면 주차를 붙인 요일 헤더로 열을 늘림
+            self.days = day_labels(times)
 
             # 제조동 별로 정렬된 라인 목록 생성 (각 제조동 내에서는 라인 이름 기준 오름차순으로 정렬)
             lines = []
@@ -1695,6 +1698,8 @@ class ModifiedLeftSection(QWidget):
                 lines.extend(sorted_building_lines)
 
             times = sorted(self.data['Time'].unique())
+            # 계획 기간이 1주보다 길면 주차를 붙인 요일 헤더로 열을 늘림
+            self.days = day_labels(times)
 
             # 교대 시간 구분
             shifts = {}
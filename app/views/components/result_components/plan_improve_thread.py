@@ -0,0 +1,38 @@
+import pandas as pd
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from app.core.output.plan_improver import PlanImprover
+from app.models.common.settings_store import SettingsStore
+
+
+"""
+결과 계획 개선(Polish) 작업 스레드
+
+PlanImprover.improve 를 UI 스레드 밖에서 실행하고, 점수가 좋아질 때마다 개선된 계획을 improved 로 보낸다.
+"""
+class PlanImproveThread(QThread):
+    improved = pyqtSignal(pd.DataFrame, dict)
+    finished = pyqtSignal(dict)
+
+    def __init__(self, improver: PlanImprover, time_limit: int = None):
+        super().__init__()
+        self.improver = improver
+        # 설정된 time_limit 없으면 기본값 사용
+        self.time_limit = time_limit or SettingsStore.get("polish_time_limit", 10)
+
+    """
+    개선 중단. 그때까지 찾은 계획으로 finished 가 발생
+    """
+    def cancel(self):
+        self.improver.stop()
+
+    def run(self):
+        try:
+            results = self.improver.improve(
+                time_limit=self.time_limit,
+                callback=lambda df, scores: self.improved.emit(df, scores),
+            )
+        except Exception as e:
+            print(f"계획 개선 중 오류 발생: {str(e)}")
+            results = {'error': str(e)}
+        self.finished.emit(results)
@@ -1,6 +1,6 @@
 from PyQt5.QtWidgets import (QMessageBox, QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout,
                              QFrame, QSplitter, QStackedWidget, QTableWidget, QHeaderView,
-                            QScrollArea, QGridLayout, QFileDialog)
+                            QScrollArea, QGridLayout, QFileDialog, QApplication)
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 from PyQt5.QtGui import QCursor, QFont
 import pandas as pd
@@ -17,6 +17,7 @@ from app.resources.styles.result_style import ResultStyles
 from app.views.components.result_components.modified_left_section import ModifiedLeftSection
 from app.views.components.result_components.table_widget.split_allocation_widget import SplitAllocationWidget
 from app.views.components.result_components.items_container import ItemsContainer
+from app.views.components.result_components.plan_improve_thread import PlanImproveThread
 from app.views.components.result_components.right_section.adj_error_manager import AdjErrorManager
 from app.views.components.result_components.right_section.tab_manager import TabManager
 from app.views.components.result_components.table_widget.split_allocation_widget import SplitAllocationWidget
@@ -42,6 +43,7 @@ class ResultPage(QWidget):
         self.material_analyzer = None  # 자재 부족량 분석기 추가
         self.pre_assigned_items = set()  # 사전할당된 아이템 저장
         self.controller = None 
+        self.polish_thread = None  # 계획 개선(Polish) 작업 스레드
 
         # KPI Calculator 
         self.kpi_score = KpiScore(self.main_window)
@@ -93,6 +95,20 @@ class ResultPage(QWidget):
         export_btn.clicked.connect(self.export_results)
         export_btn.setStyleSheet(ResultStyles.EXPORT_BUTTON_STYLE)
 
+        # Re-optimize 버튼 (수동 조정 주변만 재최적화)
+        reoptimize_btn = QPushButton("Re-optimize")
+        reoptimize_btn.setCursor(QCursor(Qt.PointingHandCursor))
+        reoptimize_btn.setFixedSize(w(130), h(40))
+        reoptimize_btn.clicked.connect(self.reoptimize_around_edits)
+        reoptimize_btn.setStyleSheet(ResultStyles.EXPORT_BUTTON_STYLE)
+
+        # Polish 버튼 (제한 시간 동안 로컬 서치로 계획 개선, 실행 중에 누르면 중단)
+        self.polish_btn = QPushButton("Polish")
+        self.polish_btn.setCursor(QCursor(Qt.PointingHandCursor))
+        self.polish_btn.setFixedSize(w(100), h(40))
+        self.polish_btn.clicked.connect(self.polish_plan)
+        self.polish_btn.setStyleSheet(ResultStyles.EXPORT_BUTTON_STYLE)
+
         # Report 버튼
         report_btn = QPushButton("Report")
         report_btn.setCursor(QCursor(Qt.PointingHandCursor))
@@ -101,6 +117,8 @@ class ResultPage(QWidget):
 
         title_layout.addWidget(title_label)
         title_layout.addStretch(1)
+        title_layout.addWidget(reoptimize_btn)
+        title_layout.addWidget(self.polish_btn)
         title_layout.addWidget(export_btn)
         # title_layout.addWidget(report_btn)
 
@@ -163,7 +181,7 @@ class ResultPage(QWidget):
         kpi_layout.addWidget(self.kpi_widget)
 
         # 1) demand_df 로드
-        self.demand_df = DataStore.get("organized_dataframes", {}).get("demand", pd.DataFrame())
+        self.demand_df = self._demand_sheet()
 
         # 2) KPI 위젯과 데이터 연결
         self.kpi_score.set_kpi_widget(self.kpi_widget)
@@ -712,6 +730,84 @@ class ResultPage(QWidget):
             f"An error occurred during export:\n{str(e)}"
         )
 
+    """
+    수동 조정한 셀 주변만 재최적화
+    """
+    def reoptimize_around_edits(self):
+        if not (hasattr(self, 'controller') and self.controller):
+            QMessageBox.warning(self, "Re-optimize", "No optimization result to re-optimize.")
+            return
+
+        try:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            results = self.controller.reoptimize_around_edits()
+        except Exception as e:
+            print(f"재최적화 과정에서 오류 발생: {str(e)}")
+            results = {'error': str(e)}
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        if results is None:
+            QMessageBox.information(self, "Re-optimize", "There are no adjustments to re-optimize around.")
+        elif results.get('error'):
+            QMessageBox.warning(self, "Re-optimize", f"Re-optimization failed:\n{results['error']}")
+        else:
+            info = results.get('mip_results') or {}
+            QMessageBox.information(
+                self, "Re-optimize",
+                f"Re-optimized {results['neighborhood']['cells']} line/shift cells "
+                f"in {info.get('solve_time', 0):.1f}s."
+            )
+
+    """
+    로컬 서치로 현재 계획 개선 (수정한 행 / 사전할당 아이템은 고정)
+    개선된 계획은 진행 중에도 화면에 반영하고, 실행 중에 다시 누르면 중단
+    """
+    def polish_plan(self):
+        if self.polish_thread is not None and self.polish_thread.isRunning():
+            self.polish_thread.cancel()
+            return
+        if not (hasattr(self, 'controller') and self.controller):
+            QMessageBox.warning(self, "Polish", "No optimization result to polish.")
+            return
+
+        try:
+            improver = self.controller.create_plan_improver(self.pre_assigned_items, self.material_analyzer)
+        except Exception as e:
+            print(f"계획 개선 준비 중 오류 발생: {str(e)}")
+            QMessageBox.warning(self, "Polish", f"Plan polish failed:\n{str(e)}")
+            return
+
+        self.polish_thread = PlanImproveThread(improver)
+        self.polish_thread.improved.connect(self.on_plan_improved)
+        self.polish_thread.finished.connect(self.on_polish_finished)
+        self.polish_btn.setText("Stop")
+        self.polish_thread.start()
+
+    """
+    개선된 계획을 모델에 반영 (원본은 유지해서 리셋 가능)
+    """
+    def on_plan_improved(self, df_plan, scores):
+        if self.controller:
+            self.controller.model.replace_dataframe(df_plan)
+        print(f"계획 개선 반영: Total {scores.get('Total', 0):.2f}")
+
+    def on_polish_finished(self, results):
+        self.polish_btn.setText("Polish")
+        self.polish_thread = None
+        if results.get('error'):
+            QMessageBox.warning(self, "Polish", f"Plan polish failed:\n{results['error']}")
+            return
+
+        before, after = results['initial_scores'], results['scores']
+        QMessageBox.information(
+            self, "Polish",
+            f"Total score {before['Total']:.2f} -> {after['Total']:.2f} "
+            f"(SOP {before['SOP']:.1f} -> {after['SOP']:.1f}, Util {before['Util']:.1f} -> {after['Util']:.1f}, "
+            f"Mat {before['Mat']:.1f} -> {after['Mat']:.1f})\n"
+            f"{sum(results['improvements'].values())} improving moves in {results['time']:.1f}s."
+        )
+
     """
     왼쪽 위젯의 아이템들에 자재 부족 상태 적용
     
@@ -1060,17 +1156,28 @@ class ResultPage(QWidget):
 
 
     """
-    Base KPI 점수를 계산하고 위젯에 표시
+    demand 시트 데이터프레임. Data Input 화면에서 불러온 데이터가 있으면 그대로 쓰고, 없을 때만 파일에서 읽음
+    (결과의 SOP / MFG / Due_LT / To_site 는 최적화에서 이미 채워져 있으므로 KPI 의 전체 수요 목록 용도)
     """
-    def _refresh_base_kpi(self):
-        demand_df = None
+    def _demand_sheet(self):
+        demand = DataStore.get("organized_dataframes", {}).get("demand", {})
+        if isinstance(demand, dict):
+            demand = demand.get("demand")
+        if isinstance(demand, pd.DataFrame) and not demand.empty:
+            return demand
 
-        # 원본 결과(조정 전) 점수 계산
         demand_path = FilePaths.get("demand_excel_file")
         if demand_path and os.path.exists(demand_path):
-            # 모든 시트를 dict 형태로 읽어오기
-            demand_df = pd.read_excel(demand_path, sheet_name='demand')
-            
+            return pd.read_excel(demand_path, sheet_name='demand')
+        return None
+
+    """
+    Base KPI 점수를 계산하고 위젯에 표시
+    """
+    def _refresh_base_kpi(self):
+        # 원본 결과(조정 전) 점수 계산
+        demand_df = self._demand_sheet()
+
         data = self.result_data if (self.result_data is not None and not self.result_data.empty) else pd.DataFrame()
         self.kpi_score.set_data(
             result_data=data,
@@ -56,6 +56,70 @@ class ModernBasicTabComponent(BaseTabComponent):
             min=1, max=86400, default=SettingsStore.get("time_limit2", 300),
         )
 
+        solvers = ["cbc", "highs"]
+        default_solver = SettingsStore.get("solver_backend", "cbc")
+        running_section.add_setting_item(
+            "Solver", "solver_backend", "combobox",
+            items=solvers,
+            default_index=solvers.index(default_solver) if default_solver in solvers else 0,
+            return_text=True
+        )
+
+        running_section.add_setting_item(
+            "Quick Plan (LP Rounding, No Optimality Proof)", "quick_plan_ox", "checkbox",
+            default=bool(SettingsStore.get("quick_plan_ox", 0))
+        )
+
+        running_section.add_setting_item(
+            "Start From EDD Heuristic Plan", "edd_heuristic_ox", "checkbox",
+            default=bool(SettingsStore.get("edd_heuristic_ox", 1))
+        )
+
+        running_section.add_setting_item(
+            "Plan Polish Time(s)", "polish_time_limit", "input",
+            min=1, max=3600, default=SettingsStore.get("polish_time_limit", 10),
+        )
+
+        running_section.add_setting_item(
+            "Tighten Model Bounds (Presolve)", "presolve_ox", "checkbox",
+            default=bool(SettingsStore.get("presolve_ox", 1))
+        )
+
+        running_section.add_setting_item(
+            "Solve Project Groups in Parallel", "decompose_ox", "checkbox",
+            default=bool(SettingsStore.get("decompose_ox", 0))
+        )
+
+        running_section.add_setting_item(
+            "Rolling Horizon for Long Horizons", "rolling_horizon_ox", "checkbox",
+            default=bool(SettingsStore.get("rolling_horizon_ox", 0))
+        )
+
+        running_section.add_setting_item(
+            "Rolling Window (shifts)", "rolling_window", "input",
+            min=2, max=84, default=SettingsStore.get("rolling_window", 14),
+        )
+
+        running_section.add_setting_item(
+            "Rolling Window Overlap (shifts)", "rolling_overlap", "input",
+            min=0, max=28, default=SettingsStore.get("rolling_overlap", 2),
+        )
+
+        running_section.add_setting_item(
+            "Reuse Cached Results", "solve_cache_ox", "checkbox",
+            default=bool(SettingsStore.get("solve_cache_ox", 1))
+        )
+
+        running_section.add_setting_item(
+            "Show Pre-Assign Check Solver Log", "solver_log_ox", "checkbox",
+            default=bool(SettingsStore.get("solver_log_ox", 0))
+        )
+
+        running_section.add_setting_item(
+            "Record Optimization Run Log", "telemetry_ox", "checkbox",
+            default=bool(SettingsStore.get("telemetry_ox", 1))
+        )
+
         # 가중치 섹션
         weight_section = ModernSettingsSectionComponent("Weight")
         weight_section.setting_changed.connect(self.on_setting_changed)
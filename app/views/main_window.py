@@ -3,6 +3,7 @@ from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QCursor
 import os
 from app.core.optimization import Optimization
+from app.core.model.solve_job import SolveJob
 from app.views.components import Navbar, DataInputPage, PlanningPage, ResultPage
 from app.views.models.data_model import DataModel
 from app.models.common.file_store import FilePaths
@@ -326,4 +327,11 @@ class MainWindow(QMainWindow):
         else :
             print('No assignment results available')
 
-        self.central_widget.setCurrentWidget(self.result_page)
\ No newline at end of file
+        self.central_widget.setCurrentWidget(self.result_page)
+
+    """
+    프로그램 종료 시 실행 중인 최적화 작업(솔버 프로세스) 종료
+    """
+    def closeEvent(self, event):
+        SolveJob.cancel_all()
+        super().closeEvent(event)
@@ -0,0 +1,190 @@
+import io
+import os
+import sys
+import copy
+import time
+import contextlib
+
+import pandas as pd
+
+from app.core.optimization import Optimization
+from app.core.input.pre_assign import run_allocation
+from app.models.common.file_store import FilePaths, DataStore
+from app.utils.fileHandler import load_file
+from app.core.model.synthetic_instance import generate_instance, instance_size, material_detail, write_workbooks
+
+"""
+전체 계획 파이프라인 규모 벤치마크
+
+합성 입력(synthetic_instance)을 규모 단계(ladder)별로 만들어 화면에서 실행하는 순서대로 단계별 시간을 잰다.
+- load      : demand / master / dynamic 엑셀 파일 읽기 (load_file)
+- check     : 사전할당 위반 검사 (run_allocation)
+- build     : 1차(pre_assign) + 2차(execute) 데이터 준비 / 모델 구성 / 초기해 설정
+- solve     : 1차 + 2차 솔버 풀이 / 결과 추출
+- material  : 자재 부족 분석 (MaterialShortageAnalyzer, Material Detail 은 합성 재고로 계산)
+- kpi       : KPI 점수 (KpiScore)
+- export    : 결과 파일 저장 (result + Material Detail 시트)
+단계별 시간과 모델 크기를 규모별로 비교표로 만들고, 가장 작은 규모 대비 배수를 함께 보고한다.
+
+사용법:
+    python -m bench.bench_pipeline [저장 폴더] [제한시간(초)] [아이템 수,아이템 수,...]
+"""
+STAGES = ['load', 'check', 'build', 'solve', 'material', 'kpi', 'export']
+
+# 입력 / 결과 파일과 보고서 기본 저장 폴더
+DEFAULT_FOLDER = os.path.join('bench', 'output')
+
+# 규모 단계: generate_instance 인자
+DEFAULT_LADDER = [
+    {'items': 50, 'lines_per_building': 2},
+    {'items': 200, 'lines_per_building': 4},
+    {'items': 800, 'lines_per_building': 6},
+]
+
+
+"""
+단계 시간 측정 (단계 로그는 비교에 방해되므로 숨김)
+"""
+@contextlib.contextmanager
+def _stage(timings, name):
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+    timings[name] = timings.get(name, 0.0) + time.time() - start
+
+
+"""
+입력 파일 경로와 시트를 화면에서 파일을 열었을 때처럼 FilePaths / DataStore 에 등록
+"""
+def _register_inputs(paths, dataframes):
+    flat = {}
+    for kind, sheets in dataframes.items():
+        path = paths[f'{kind}_excel_file']
+        FilePaths.set(f'{kind}_excel_file', path)
+        for sheet, df in sheets.items():
+            flat[f"{path}:{sheet}"] = df
+    DataStore.set('dataframes', flat)
+    DataStore.set('organized_dataframes', dataframes)
+    # 결과 파일이 등록되어 있으면 자재 부족 분석이 그 파일을 읽으므로 해제
+    FilePaths.set('result_file', None)
+
+
+"""
+합성 입력 하나로 파이프라인 전체를 한 번 실행
+
+Args:
+    instance (dict): generate_instance 결과
+    folder (str): 입력 / 결과 파일 저장 폴더
+    name (str): 파일 이름 앞부분
+    time_limit (int): 단계별 솔버 제한 시간(초)
+    backend (str): 솔버 백엔드. None 이면 설정값
+
+Returns:
+    dict: 규모, 단계별 시간(초), 모델 크기, 풀이 상태
+"""
+def run_pipeline(instance, folder, name='synthetic', time_limit=None, backend=None):
+    from app.analysis.output.kpi_score import KpiScore
+    from app.analysis.output.material_shortage_analysis import MaterialShortageAnalyzer
+
+    timings = {}
+    paths = write_workbooks(instance, folder, name)
+
+    with _stage(timings, 'load'):
+        dataframes = {kind: load_file(paths[f'{kind}_excel_file']) for kind in ('demand', 'master', 'dynamic')}
+    _register_inputs(paths, dataframes)
+
+    with _stage(timings, 'check'):
+        failures = run_allocation()
+
+    # Optimization 이 입력 데이터프레임에 컬럼을 추가하므로 복사본 사용
+    optimization = Optimization(copy.deepcopy(dataframes), solver_backend=backend)
+    with _stage(timings, 'optimize'):
+        pre = optimization.pre_assign(time_limit=time_limit)
+        optimization.df_pre_result = pre['result']
+        result = optimization.execute(time_limit=time_limit, warm_start=pre['result'])
+    # 1차 / 2차 단계 시간을 모델 구성(prep / build)과 풀이(solve / extract)로 나눔
+    optimize = timings.pop('optimize')
+    phases = [pre.get('solve_info', {}).get('timings', {}), result.get('solve_info', {}).get('timings', {})]
+    timings['solve'] = sum(t.get('solve', 0.0) + t.get('extract', 0.0) for t in phases)
+    timings['build'] = optimize - timings['solve']
+
+    df_result = result['result']
+    df_detail = material_detail(dataframes, df_result)
+    DataStore.set('simplified_dataframes', {'material_detail': df_detail})
+    with _stage(timings, 'material'):
+        material_analyzer = MaterialShortageAnalyzer()
+        shortages = material_analyzer.analyze_material_shortage(df_result)
+
+    with _stage(timings, 'kpi'):
+        kpi = KpiScore()
+        kpi.set_data(df_result, material_analyzer, dataframes['demand']['demand'])
+        scores = kpi.calculate_all_scores()
+
+    with _stage(timings, 'export'):
+        with pd.ExcelWriter(os.path.join(folder, f"{name}_result.xlsx")) as writer:
+            df_result.to_excel(writer, sheet_name='result', index=False)
+            df_detail.to_excel(writer, sheet_name='Material Detail', index=False)
+
+    info = result.get('solve_info') or {}
+    return {
+        'name': name,
+        **instance_size(instance),
+        'num_variables': info.get('num_variables'),
+        'num_constraints': info.get('num_constraints'),
+        'status': info.get('status'),
+        'objective': info.get('objective'),
+        'check_failures': len(failures.get('preassign', [])),
+        'shortage_items': len(shortages),
+        'kpi_total': scores.get('Total'),
+        **{stage: timings.get(stage) for stage in STAGES},
+        'total': sum(timings.get(stage, 0.0) for stage in STAGES),
+    }
+
+
+"""
+규모 단계별로 파이프라인을 실행하고 비교표 반환
+
+Args:
+    folder (str): 입력 / 결과 파일과 보고서(pipeline_report.csv) 저장 폴더
+    ladder (list): 규모 단계별 generate_instance 인자. None 이면 DEFAULT_LADDER
+    time_limit (int): 단계별 솔버 제한 시간(초)
+    backend (str): 솔버 백엔드
+    seed (int): 합성 입력 seed
+
+Returns:
+    DataFrame: 규모별 한 행. <단계>_x 컬럼은 가장 작은 규모 대비 시간 배수
+"""
+def run_ladder(folder=DEFAULT_FOLDER, ladder=None, time_limit=None, backend=None, seed=0):
+    records = []
+    for params in ladder or DEFAULT_LADDER:
+        instance = generate_instance(seed=seed, **params)
+        name = f"synthetic_{params.get('items', 200)}"
+        print(f"[{name}] {instance_size(instance)}")
+        try:
+            records.append(run_pipeline(instance, folder, name, time_limit=time_limit, backend=backend))
+        except Exception as e:
+            print(f"[{name}] 실행 실패: {str(e)}")
+            records.append({'name': name, **instance_size(instance), 'status': f"error: {e}"})
+
+    df = pd.DataFrame(records)
+    # 가장 작은 규모 대비 배수 (어느 단계가 규모에 따라 빨리 늘어나는지 확인)
+    for stage in STAGES + ['total']:
+        if stage in df.columns and pd.notna(df[stage].iloc[0]) and df[stage].iloc[0] > 0:
+            df[f'{stage}_x'] = df[stage] / df[stage].iloc[0]
+    os.makedirs(folder, exist_ok=True)
+    df.to_csv(os.path.join(folder, 'pipeline_report.csv'), index=False, encoding='utf-8-sig')
+    return df
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    folder = args[0] if args else DEFAULT_FOLDER
+    time_limit = int(args[1]) if len(args) >= 2 else None
+    ladder = None
+    if len(args) >= 3:
+        # 아이템 수만 지정하면 라인 수는 기본 단계처럼 규모에 따라 늘림
+        ladder = [{'items': int(n), 'lines_per_building': min(8, 2 + k * 2)} for k, n in enumerate(args[2].split(','))]
+
+    df = run_ladder(folder, ladder, time_limit=time_limit)
+    print(df.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"\n보고서: {os.path.join(folder, 'pipeline_report.csv')}")
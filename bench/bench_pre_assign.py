@@ -0,0 +1,223 @@
+import sys
+import time
+import fnmatch
+
+import numpy as np
+import pandas as pd
+
+from app.core.input.pre_assign import prepare_fixed_options
+
+"""
+사전할당 fixed_option 전처리 벤치마크
+
+행 단위(iterrows) 기존 구현과 prepare_fixed_options 를 시트 크기 배수별로 실행해서
+실행 시간을 비교하고 결과가 같은지 확인한다.
+시트 배수 n 은 fixed_option / pre_assign / demand 시트 행을 n 번 이어 붙인 입력이다
+(demand 아이템과 그 아이템을 가리키는 fixed_option / pre_assign 아이템 이름은 복사본마다 바꿔서 겹치지 않게 함).
+
+사용법:
+    python -m bench.bench_pre_assign [demand.xlsx master.xlsx dynamic.xlsx] [배수 ...]
+    (엑셀 파일이 없으면 임의로 만든 시트 사용, 배수 기본값 1 10)
+"""
+
+
+"""기존 구현 (비교 기준): pre_assign 데이터 fixed_option 이동"""
+def legacy_expand_pre_assign(fixed_opt, pre_assign):
+    records = []
+    for _, row in pre_assign.iterrows():
+        line = row['Line']
+        shift = row['Shift']
+        for k in range(1, 8):
+            item, qty = row[f'Item{k}'], row[f'Qty{k}']
+            t = (k - 1) * 2 + shift
+            if pd.isna(item) and pd.isna(qty):
+                continue
+            if pd.isna(item) or pd.isna(qty):
+                records.append({'Fixed_Group': item, 'Fixed_Line': [line], 'Fixed_Time': [t], 'Qty': qty})
+                continue
+            exact_mask = (
+                fixed_opt['Qty'].notna()
+                & (fixed_opt['Fixed_Group'] == item)
+                & fixed_opt['Fixed_Line'].apply(lambda lst: line in lst)
+                & fixed_opt['Fixed_Time'].apply(lambda lst: t in lst)
+            )
+            remaining1 = float(qty) - float(fixed_opt[exact_mask]['Qty'].sum())
+            if remaining1 <= 0:
+                continue
+            wc_mask = (
+                fixed_opt['Qty'].notna()
+                & fixed_opt['Fixed_Group'].notna()
+                & fixed_opt['Fixed_Group'].apply(lambda pat: isinstance(pat, str) and fnmatch.fnmatch(item, pat))
+                & ~exact_mask
+                & fixed_opt['Fixed_Line'].apply(lambda lst: line in lst)
+                & fixed_opt['Fixed_Time'].apply(lambda lst: t in lst)
+            )
+            remaining2 = remaining1 - float(fixed_opt[wc_mask]['Qty'].sum())
+            if remaining2 <= 0:
+                continue
+            records.append({'Fixed_Group': item, 'Fixed_Line': [line], 'Fixed_Time': [t], 'Qty': remaining2})
+    return pd.concat([fixed_opt, pd.DataFrame(records)], ignore_index=True, sort=False)
+
+
+"""기존 구현 (비교 기준): Fixed_Line / Fixed_Time 채우기, 'ALL' 수량 계산"""
+def legacy_prepare_fixed_options(fixed_opt, pre_assign, demand, line_available):
+    records = []
+    for _, row in fixed_opt.iterrows():
+        fl = row.get('Fixed_Line')
+        if pd.isna(fl):
+            avail = line_available[line_available['Project'] == row['Fixed_Group'][3:7]]
+            new_line = [col for col, val in avail.iloc[0].items() if col != 'Project' and val == 1] if not avail.empty else []
+        elif isinstance(fl, str) and ',' in fl:
+            new_line = [x.strip() for x in fl.split(',') if x.strip()]
+        else:
+            new_line = [fl]
+        new_row = row.astype(object)
+        new_row['Fixed_Line'] = new_line
+        records.append(new_row)
+    fixed_opt = pd.DataFrame(records, columns=fixed_opt.columns)
+
+    records = []
+    for _, row in fixed_opt.iterrows():
+        ft = row.get('Fixed_Time')
+        if pd.isna(ft):
+            new_val = list(range(1, 15))
+        elif isinstance(ft, str) and ',' in ft:
+            new_val = [int(x.strip()) for x in ft.split(',') if x.strip().isdigit()]
+        else:
+            try:
+                new_val = [int(ft)]
+            except (TypeError, ValueError):
+                new_val = []
+        new_row = row.astype(object)
+        new_row['Fixed_Time'] = new_val
+        records.append(new_row)
+    fixed_opt = pd.DataFrame(records, columns=fixed_opt.columns)
+
+    records = []
+    for _, row in fixed_opt.iterrows():
+        new_row = row.astype(object)
+        qg, pat = row['Qty'], row['Fixed_Group']
+        if isinstance(qg, str) and qg.strip().lower() == 'all':
+            new_row['Qty'] = demand.loc[demand['Item'].apply(lambda s: fnmatch.fnmatch(s, pat)), 'MFG'].sum()
+        records.append(new_row)
+    fixed_opt = pd.DataFrame(records, columns=fixed_opt.columns)
+
+    return legacy_expand_pre_assign(fixed_opt, pre_assign)
+
+
+"""
+임의 시트 생성 (fixed_option, pre_assign, demand, line_available)
+아이템 약 300개, fixed_option 150행, pre_assign 80행 (1배 기준)
+"""
+def make_sheets(seed=0):
+    rng = np.random.default_rng(seed)
+    projects = [f"P{200 + i}" for i in range(20)]
+    lines = [f"{b}_{i:02d}" for b in 'IDKM' for i in range(1, 9)]
+    items = sorted({f"AAA{projects[k % len(projects)]}{'ABC'[k % 3]}{k:03d}XX"[:14].ljust(14, 'Z') for k in range(300)})
+
+    demand = pd.DataFrame({'Item': items, 'MFG': rng.integers(10, 800, len(items))})
+    line_available = pd.DataFrame({'Project': projects})
+    for line in lines:
+        line_available[line] = (rng.random(len(projects)) < 0.4).astype(int)
+
+    fixed = []
+    for _ in range(150):
+        group = items[rng.integers(len(items))]
+        if rng.random() < 0.3:
+            group = '***' + group[3:7] + '*' * 7
+        fixed.append({
+            'Fixed_Group': group,
+            'Fixed_Line': np.nan if rng.random() < 0.4 else ', '.join(rng.choice(lines, rng.integers(1, 4), replace=False)),
+            'Fixed_Time': np.nan if rng.random() < 0.4 else ','.join(map(str, rng.choice(range(1, 15), rng.integers(1, 4), replace=False))),
+            'Qty': 'ALL' if rng.random() < 0.3 else int(rng.integers(10, 200)),
+        })
+
+    pre = []
+    for _ in range(80):
+        row = {'Line': lines[rng.integers(len(lines))], 'Shift': int(rng.integers(1, 3))}
+        for k in range(1, 8):
+            filled = rng.random() < 0.5
+            row[f'Item{k}'] = items[rng.integers(len(items))] if filled else np.nan
+            row[f'Qty{k}'] = int(rng.integers(10, 300)) if filled else np.nan
+        pre.append(row)
+    return pd.DataFrame(fixed), pd.DataFrame(pre), demand, line_available
+
+
+"""
+시트 행을 scale 번 이어 붙임. 복사본 i 의 아이템 이름은 끝 두 글자를 i 로 바꿔서 서로 겹치지 않게 한다
+"""
+def scale_sheets(fixed_opt, pre_assign, demand, line_available, scale):
+    def rename(value, i):
+        return value[:-2] + f"{i:02d}" if isinstance(value, str) and len(value) >= 14 and '*' not in value else value
+
+    item_cols = [f'Item{k}' for k in range(1, 8)]
+    fixed_parts, pre_parts, demand_parts = [], [], []
+    for i in range(scale):
+        fx = fixed_opt.copy()
+        fx['Fixed_Group'] = fx['Fixed_Group'].map(lambda v: rename(v, i))
+        pa = pre_assign.copy()
+        pa[item_cols] = pa[item_cols].map(lambda v: rename(v, i))
+        dm = demand.copy()
+        dm['Item'] = dm['Item'].map(lambda v: rename(v, i))
+        fixed_parts.append(fx)
+        pre_parts.append(pa)
+        demand_parts.append(dm)
+    return (pd.concat(fixed_parts, ignore_index=True), pd.concat(pre_parts, ignore_index=True),
+            pd.concat(demand_parts, ignore_index=True), line_available)
+
+
+"""
+배수별로 기존 구현 / 새 구현 실행 시간 비교
+
+Returns:
+    DataFrame: ['scale', 'fixed_option_rows', 'pre_assign_rows', 'legacy_time', 'vectorized_time', 'speedup', 'identical']
+"""
+def run_benchmark(sheets, scales=(1, 10)):
+    records = []
+    for scale in scales:
+        scaled = scale_sheets(*sheets, scale)
+
+        start = time.time()
+        legacy = legacy_prepare_fixed_options(*[df.copy() for df in scaled])
+        legacy_time = time.time() - start
+
+        start = time.time()
+        vectorized = prepare_fixed_options(*[df.copy() for df in scaled])
+        vectorized_time = time.time() - start
+
+        try:
+            pd.testing.assert_frame_equal(legacy, vectorized)
+            identical = True
+        except AssertionError as e:
+            print(f"{scale}배 결과가 다릅니다: {e}")
+            identical = False
+
+        records.append({
+            'scale': scale,
+            'fixed_option_rows': len(scaled[0]),
+            'pre_assign_rows': len(scaled[1]),
+            'legacy_time': legacy_time,
+            'vectorized_time': vectorized_time,
+            'speedup': legacy_time / vectorized_time if vectorized_time > 0 else None,
+            'identical': identical,
+        })
+    return pd.DataFrame(records)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) >= 3 and args[0].endswith('.xlsx'):
+        demand_sheets = pd.read_excel(args[0], sheet_name=None)
+        master_sheets = pd.read_excel(args[1], sheet_name=None)
+        dynamic_sheets = pd.read_excel(args[2], sheet_name=None)
+        fixed_opt = dynamic_sheets['fixed_option']
+        # DataLoader.load_dynamic_data 와 같게 Fixed_Time 은 문자열로 읽음
+        fixed_opt['Fixed_Time'] = fixed_opt['Fixed_Time'].apply(lambda x: str(x) if pd.notna(x) else np.nan)
+        sheets = (fixed_opt, dynamic_sheets['pre_assign'], demand_sheets['demand'], master_sheets['line_available'])
+        args = args[3:]
+    else:
+        sheets = make_sheets()
+
+    scales = [int(arg) for arg in args] or [1, 10]
+    df = run_benchmark(sheets, scales)
+    print(df.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
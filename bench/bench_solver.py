@@ -0,0 +1,158 @@
+import sys
+import copy
+import time
+import contextlib
+import io
+import pandas as pd
+
+from app.core.optimization import Optimization
+from app.core.model.solver_backend import SOLVER_BACKENDS
+from app.core.model.presolve import model_size, lp_relaxation_bound
+
+"""
+솔버 백엔드 벤치마크
+
+같은 입력에 대해 최적화 단계(pre_assign / linear_programming / execute)를
+백엔드별로 실행하고, 모델 구성 시간과 풀이 시간, 목적함수 값을 비교한다.
+(모델 구성 시간 = 전체 실행 시간 - 풀이 시간. 결과 추출 시간 포함)
+
+사용법:
+    python -m bench.bench_solver demand.xlsx master.xlsx dynamic.xlsx [제한시간(초)]
+"""
+STAGES = ['pre_assign', 'linear_programming', 'execute']
+
+
+"""
+백엔드 x 단계 별로 한 번씩 실행한 결과를 데이터프레임으로 반환
+
+Args:
+    input (dict): Optimization 입력 ({'demand':..., 'master':..., 'dynamic':...})
+    backends (list): 비교할 백엔드 이름 목록. None 이면 전체
+    time_limit (int): 단계별 솔버 제한 시간(초)
+"""
+def run_benchmark(input, backends=None, time_limit=None):
+    records = []
+    for backend in backends or list(SOLVER_BACKENDS):
+        for stage in STAGES:
+            # Optimization 이 입력 데이터프레임에 컬럼을 추가하므로 매번 복사본 사용
+            optimization = Optimization(copy.deepcopy(input), solver_backend=backend)
+
+            start = time.time()
+            # 솔버/모델 로그는 비교에 방해되므로 숨김
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = getattr(optimization, stage)(time_limit=time_limit)
+            total_time = time.time() - start
+
+            info = result.get('solve_info') or {}
+            records.append({
+                'backend': backend,
+                'stage': stage,
+                'status': info.get('status'),
+                'objective': info.get('objective'),
+                'num_variables': info.get('num_variables'),
+                'num_constraints': info.get('num_constraints'),
+                'build_time': total_time - info.get('solve_time', 0),
+                'solve_time': info.get('solve_time'),
+                'total_time': total_time,
+            })
+    return pd.DataFrame(records)
+
+
+"""
+2차(execute) warm start 효과 비교
+
+사전할당 결과를 고정한 같은 모델을 초기해 없이(cold) / 사전할당 결과를 초기해로(warm) 풀어서
+첫 해 발견 시간과 풀이 시간을 비교한다. (첫 해 발견 시간은 cbc 로그에서만 측정 가능)
+
+Args:
+    input (dict): Optimization 입력
+    backend (str): 솔버 백엔드
+    time_limit (int): 솔버 제한 시간(초)
+"""
+def run_warm_start_benchmark(input, backend='cbc', time_limit=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_pre = Optimization(copy.deepcopy(input), solver_backend=backend).pre_assign(time_limit=time_limit)['result']
+
+    records = []
+    for mode, warm_start in [('cold', None), ('warm', df_pre)]:
+        optimization = Optimization(copy.deepcopy(input), solver_backend=backend)
+        optimization.df_pre_result = df_pre
+        with contextlib.redirect_stdout(io.StringIO()):
+            info = optimization.execute(time_limit=time_limit, warm_start=warm_start).get('solve_info') or {}
+        records.append({
+            'mode': mode,
+            'status': info.get('status'),
+            'objective': info.get('objective'),
+            'warm_start_rows': info.get('warm_start_rows'),
+            'first_incumbent_time': info.get('first_incumbent_time'),
+            'solve_time': info.get('solve_time'),
+        })
+
+    df = pd.DataFrame(records).set_index('mode')
+    for col in ['first_incumbent_time', 'solve_time']:
+        cold, warm = df.loc['cold', col], df.loc['warm', col]
+        if pd.notna(cold) and pd.notna(warm):
+            print(f"{col}: cold {cold:.3f}s -> warm {warm:.3f}s ({cold - warm:+.3f}s 개선)")
+    return df.reset_index()
+
+
+"""
+presolve 효과 비교
+
+단계별로 presolve 없이(off) / presolve 로(on) 모델을 만들어 풀고,
+모델 크기(변수 / 제약 / 계수 수)와 루트 bound(LP 완화 목적함수 값), 풀이 결과를 비교한다.
+루트 bound 가 최적값에 가까울수록 분기 탐색이 줄어든다.
+
+Args:
+    input (dict): Optimization 입력
+    backend (str): 솔버 백엔드
+    time_limit (int): 솔버 제한 시간(초)
+    stages (list): 비교할 단계. None 이면 STAGES 전체
+"""
+def run_presolve_benchmark(input, backend='cbc', time_limit=None, stages=None):
+    records = []
+    for stage in stages or STAGES:
+        for presolve in (False, True):
+            optimization = Optimization(copy.deepcopy(input), solver_backend=backend, presolve=presolve)
+            with contextlib.redirect_stdout(io.StringIO()):
+                info = getattr(optimization, stage)(time_limit=time_limit).get('solve_info') or {}
+                # 결과를 꺼낸 뒤 같은 모델의 LP 완화를 풀어서 루트 bound 계산
+                size = model_size(optimization.model)
+                root_bound = lp_relaxation_bound(optimization.model, time_limit, backend)
+            records.append({
+                'stage': stage,
+                'presolve': 'on' if presolve else 'off',
+                **size,
+                'root_bound': root_bound,
+                'objective': info.get('objective'),
+                'status': info.get('status'),
+                'solve_time': info.get('solve_time'),
+            })
+
+    df = pd.DataFrame(records)
+    for stage, group in df.groupby('stage', sort=False):
+        off, on = group.iloc[0], group.iloc[1]
+        print(f"[{stage}] 제약 {off['num_constraints']:,} -> {on['num_constraints']:,}, 계수 {off['num_nonzeros']:,} -> {on['num_nonzeros']:,}, "
+              f"루트 bound {off['root_bound']} -> {on['root_bound']} (목적함수 {on['objective']})")
+    return df
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    paths = args[:3] if len(args) >= 3 else ['ssafy_demand_0507.xlsx', 'ssafy_master_0507.xlsx', 'ssafy_dynamic_0507.xlsx']
+    time_limit = int(args[3]) if len(args) >= 4 else None
+
+    input = {
+        'demand': pd.read_excel(paths[0], sheet_name=None),
+        'master': pd.read_excel(paths[1], sheet_name=None),
+        'dynamic': pd.read_excel(paths[2], sheet_name=None),
+    }
+
+    df = run_benchmark(input, time_limit=time_limit)
+    print(df.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+    df_warm = run_warm_start_benchmark(input, time_limit=time_limit)
+    print(df_warm.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+    df_presolve = run_presolve_benchmark(input, time_limit=time_limit)
+    print(df_presolve.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
@@ -1,6 +1,7 @@
 # main.py
 import sys
 import traceback
+import multiprocessing
 from PyQt5.QtWidgets import QApplication, QMessageBox, QStyleFactory
 from PyQt5.QtCore import Qt
 from app.resources.styles.app_style import AppStyle
@@ -37,6 +38,9 @@ def _styled_msgbox(parent, title, text,
     return msg.exec_()
 
 if __name__ == "__main__":
+    # 패키징된 실행 파일에서 프로세스 풀(프로젝트 그룹 병렬 최적화) 사용을 위해 필요
+    multiprocessing.freeze_support()
+
     # High DPI 설정 (선택사항)
     # if hasattr(Qt, 'AA_EnableHighDpiScaling'):
     #     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
@@ -0,0 +1,34 @@
+import copy
+import os
+
+import pytest
+
+# 화면 없이 PyQt5 모듈을 import 할 수 있도록
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from app.models.common.settings_store import SettingsStore
+from app.core.model.synthetic_instance import generate_instance
+
+
+"""
+테스트 중에는 최적화 실행 기록(logs/)을 남기지 않음
+"""
+@pytest.fixture(autouse=True)
+def no_telemetry():
+    previous = SettingsStore.get('telemetry_ox')
+    SettingsStore.set('telemetry_ox', 0)
+    yield
+    SettingsStore.set('telemetry_ox', previous)
+
+
+"""
+작은 합성 입력 (Optimization 이 입력 데이터프레임을 바꾸므로 테스트마다 복사본 사용)
+"""
+@pytest.fixture(scope='session')
+def _small_instance():
+    return generate_instance(items=40, lines_per_building=2, shifts=6, seed=1)
+
+
+@pytest.fixture
+def small_instance(_small_instance):
+    return copy.deepcopy(_small_instance)
@@ -0,0 +1,99 @@
+import contextlib
+import io
+import multiprocessing
+import time
+
+from app.core.optimization import Optimization
+from app.core.model.decomposition import PoolWorkers, execute_decomposed, independent_project_groups
+from app.core.model.solve_job import SolveJob
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+_worker_value = {}
+
+
+def _set_worker_value(value):
+    _worker_value['value'] = value
+
+
+def _get_worker_value():
+    return _worker_value.get('value')
+
+
+def test_pool_workers_run_chained_initializer():
+    from concurrent.futures import ProcessPoolExecutor
+
+    context = multiprocessing.get_context()
+    workers = PoolWorkers(context)
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, **workers.executor_kwargs(_set_worker_value, (42,))) as executor:
+        assert executor.submit(_get_worker_value).result() == 42
+    assert not workers.queue.empty()
+
+
+def test_pool_workers_terminate_reported_workers():
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    context = multiprocessing.get_context()
+    workers = PoolWorkers(context)
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=2, mp_context=context, **workers.executor_kwargs()) as executor:
+        futures = [executor.submit(_sleep, 30) for _ in range(2)]
+        time.sleep(1)
+        workers.terminate()
+        for future in futures:
+            try:
+                future.result()
+            except BrokenProcessPool:
+                pass
+    assert len(workers.pids) == 2
+    assert time.time() - started < 20
+
+
+"""
+프로젝트 앞 절반은 *_01 라인, 뒤 절반은 *_02 라인에서만 생산하도록 line_available 을 두 그룹으로 나눔
+"""
+def _split_lines(instance):
+    df = instance['master']['line_available']
+    half = len(df) // 2
+    for column in df.columns.drop('Project'):
+        first = column.endswith('_01')
+        df[column] = [value if (row < half) == first else 0 for row, value in enumerate(df[column])]
+    df.loc[:half - 1, 'I_01'] = 1
+    df.loc[half:, 'I_02'] = 1
+    return instance
+
+
+def test_decomposed_solve_unregisters_cancel_hook(small_instance):
+    small_instance = _split_lines(small_instance)
+    assert len(independent_project_groups(small_instance['master']['line_available'])) == 2
+    with SolveJob('decomposed') as job:
+        optimization = Optimization(small_instance, solve_job=job)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = execute_decomposed(optimization, max_workers=2)
+        assert result['solve_info']['has_solution']
+        assert job._cancel_callbacks == []
+        # 풀이가 끝난 뒤 취소해도 오류 없이 처리
+        job.cancel()
+
+
+def test_decomposed_fallback_uses_group_solutions_and_remaining_time(small_instance, monkeypatch):
+    from app.core.model import decomposition
+
+    small_instance = _split_lines(small_instance)
+    optimization = Optimization(small_instance)
+    calls = []
+    # 보정에 실패하게 만들어 분해 없이 다시 푸는 경로로 보냄
+    monkeypatch.setattr(decomposition, 'portion_violated', lambda df_result, df_capa_portion: True)
+    monkeypatch.setattr(decomposition, 'repair_portion', lambda *args: (None, None))
+    optimization.execute = lambda time_limit=None, warm_start=None: calls.append((time_limit, warm_start)) or {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        execute_decomposed(optimization, time_limit=60, max_workers=2)
+
+    (time_limit, warm_start), = calls
+    assert time_limit < 60
+    assert warm_start is not None and warm_start['Qty'].sum() > 0
@@ -0,0 +1,48 @@
+import contextlib
+import copy
+import io
+
+import pytest
+
+from app.core.optimization import Optimization
+
+
+"""
+고정 수량을 Capa 보다 훨씬 크게 넣어 사전할당이 수요를 채울 수 없는 입력
+"""
+def _overloaded(instance, qty=100000):
+    df_fixed = instance['dynamic']['fixed_option']
+    row = df_fixed.index[df_fixed['Qty'].astype(str).str.lower() != 'all'][0]
+    df_fixed.loc[row, 'Qty'] = qty
+    return instance, df_fixed.loc[row, 'Fixed_Group']
+
+
+def _diagnose(instance, presolve):
+    optimization = Optimization(instance, presolve=presolve)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return optimization.linear_programming(diagnose=True, conflict=True)
+
+
+@pytest.mark.parametrize('presolve', [True, False])
+def test_diagnosis_reports_demand_shortfall(small_instance, presolve):
+    instance, item = _overloaded(small_instance)
+    result = _diagnose(instance, presolve)
+
+    diagnosis = result['diagnosis']
+    demand = diagnosis[diagnosis['Constraint'] == 'Demand']
+    assert demand['Target'].tolist() == [f'({item})']
+    assert demand['ViolationAmt'].iloc[0] > 0
+
+    conflict = result['conflict']
+    assert conflict is not None
+    assert f'({item})' in conflict['Target'].tolist()
+    assert (conflict['Constraint'] == 'Capacity').any()
+
+
+def test_diagnosis_same_with_and_without_presolve(small_instance):
+    instance, _ = _overloaded(small_instance)
+    full = _diagnose(copy.deepcopy(instance), False)
+    reduced = _diagnose(instance, True)
+
+    columns = ['Constraint', 'Target', 'Limit', 'ViolationAmt']
+    assert reduced['diagnosis'][columns].to_dict('records') == full['diagnosis'][columns].to_dict('records')
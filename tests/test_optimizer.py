@@ -0,0 +1,29 @@
+import contextlib
+import io
+
+from app.core import optimizer as optimizer_module
+from app.core.optimizer import Optimizer
+
+
+def _run(small_instance, monkeypatch, **options):
+    calls = []
+    edd_plan = optimizer_module.edd_plan
+    monkeypatch.setattr(optimizer_module, 'edd_plan', lambda *args, **kwargs: calls.append(kwargs) or edd_plan(*args, **kwargs))
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = Optimizer().run_optimization({'dataframes': small_instance, 'use_cache': False, 'heuristic': True,
+                                                'time_limit2': 30, **options})
+    return results, calls
+
+
+def test_edd_plan_built_once_as_warm_start(small_instance, monkeypatch):
+    results, calls = _run(small_instance, monkeypatch)
+    assert results['mip_results']['has_solution']
+    # 초기해로 한 번만 만들고, 물량 비중 보정은 2차 제한 시간이 아닌 작은 제한 시간 사용
+    assert len(calls) == 1
+    assert calls[0]['time_limit'] < 30
+
+
+def test_edd_plan_skipped_when_stage2_does_not_use_it(small_instance, monkeypatch):
+    results, calls = _run(small_instance, monkeypatch, quick=True)
+    assert results['mip_results']['has_solution']
+    assert calls == []
@@ -0,0 +1,50 @@
+import fnmatch
+
+import numpy as np
+import pytest
+
+from app.utils.pattern_index import PatternIndex, PatternSet
+
+
+"""
+아이템 코드에서 keep 자리만 남기고 나머지를 wildcard 로 바꾼 같은 길이의 패턴
+"""
+def _positional(item, keep, wildcard='*'):
+    return ''.join(ch if i in keep else wildcard for i, ch in enumerate(item))
+
+
+@pytest.mark.parametrize('wildcard', ['*', '?'])
+def test_positional_wildcard_matches_same_position(small_instance, wildcard):
+    items = small_instance['demand']['demand']['Item']
+    index = PatternIndex(items)
+    item = items.iloc[0]
+
+    # 프로젝트 자리(3~6)만 남긴 패턴 ('***P100*******') 은 같은 자리에 같은 프로젝트가 있는 아이템만
+    pattern = _positional(item, range(3, 7), wildcard)
+    expected = (items.str[3:7] == item[3:7]) & (items.str.len() == len(item))
+    assert index.mask(pattern).tolist() == expected.tolist()
+    # fnmatch 는 '*' 를 임의 길이로 보므로 다른 자리에 같은 글자가 있어도 일치할 수 있음
+    assert index.mask(pattern).sum() <= sum(fnmatch.fnmatchcase(i, pattern) for i in items)
+
+    # 색상 자리(8~9)만 남긴 패턴
+    pattern = _positional(item, range(8, 10), wildcard)
+    assert index.matching_items(pattern) == [i for i in items if len(i) == len(item) and i[8:10] == item[8:10]]
+
+
+def test_other_patterns_follow_fnmatch(small_instance):
+    items = list(small_instance['demand']['demand']['Item']) + ['AAAP100', None]
+    index = PatternIndex(items)
+    for pattern in ['AAAP100*', '*0005', 'AAAP10[01]*', 'AAAP100']:
+        expected = [isinstance(i, str) and fnmatch.fnmatchcase(i, pattern) for i in items]
+        assert index.mask(pattern).tolist() == expected, pattern
+    assert not index.mask(np.nan).any()
+
+
+def test_pattern_set_agrees_with_index(small_instance):
+    items = list(small_instance['demand']['demand']['Item'])
+    patterns = [_positional(item, range(3, 7)) for item in items[:5]] + [_positional(items[0], range(7, 8), '?'), 'AAAP10[23]*']
+    index = PatternIndex(items)
+    patterns_of = PatternSet(patterns)
+    for item in items:
+        matched = [p for p, hit in zip(patterns_of.patterns, patterns_of.mask(item)) if hit]
+        assert matched == [p for p in patterns_of.patterns if index.mask(p)[items.index(item)]], item
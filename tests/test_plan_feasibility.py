@@ -0,0 +1,95 @@
+import contextlib
+import io
+
+import pandas as pd
+
+from app.core.optimization import Optimization
+from app.core.model.edd_heuristic import edd_plan, due_shifts
+from app.core.output.plan_improver import PlanImprover
+
+
+"""
+계획의 규칙 위반량 {(규칙, 키...): 초과량} (위반이 없으면 빈 dict)
+라인-아이템 호환(line_available), (라인, 시프트) Capa, (제조동, 시프트) Max_line / Max_qty, 제조동 비율(capa_portion)
+"""
+def _violations(instance, df_plan):
+    master = instance['master']
+    capa = master['capa_qty'].set_index('Line')
+    available = master['line_available'].set_index('Project')
+    df = df_plan.assign(Time=df_plan['Time'].astype(int), Qty=pd.to_numeric(df_plan['Qty']))
+    df = df[df['Qty'] > 0]
+
+    violations = {}
+    def add(key, amount):
+        if amount > 1e-6:
+            violations[key] = amount
+
+    for (m, l), qty in df.groupby(['Item', 'Line'])['Qty'].sum().items():
+        if available.loc[m[3:7], l] != 1:
+            add(('line', m, l), qty)
+    for (l, s), qty in df.groupby(['Line', 'Time'])['Qty'].sum().items():
+        add(('capa', l, s), qty - capa.at[l, s])
+    for (b, s), rows in df.groupby([df['Line'].str[0], 'Time']):
+        add(('max_qty', b, s), rows['Qty'].sum() - capa.at[f'Max_qty_{b}', s])
+        add(('max_line', b, s), rows['Line'].nunique() - capa.at[f'Max_line_{b}', s])
+    total = df['Qty'].sum()
+    for _, row in master['capa_portion'].iterrows():
+        qty = df.loc[df['Line'].str.startswith(row['name']), 'Qty'].sum()
+        add(('portion', row['name']), max(row['lower_limit'] * total - qty, qty - row['upper_limit'] * total))
+    return violations
+
+
+def _pinned_kept(df_plan, df_pinned):
+    plan = df_plan.groupby(['Item', 'Line', 'Time'])['Qty'].sum()
+    pinned = df_pinned.groupby(['Item', 'Line', 'Time'])['Qty'].sum()
+    return (plan.reindex(pinned.index, fill_value=0) >= pinned).all()
+
+
+def _edd(instance):
+    optimization = Optimization(instance)
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimization.pre_assign()
+        plan = edd_plan(optimization, balance_portion=True, time_limit=10)
+    return optimization, plan
+
+
+def test_edd_plan_is_feasible(small_instance):
+    optimization, plan = _edd(small_instance)
+    df_plan = plan['result']
+
+    assert plan['solve_info']['has_solution'] and not plan['solve_info']['portion_violated']
+    assert _violations(small_instance, df_plan) == {}
+    assert _pinned_kept(df_plan, optimization.df_pre_result)
+    # 아이템별 생산량은 execute 와 같은 수요(아이템의 마지막 demand 행)를 넘지 않음
+    demand = optimization.df_demand.drop_duplicates('Item', keep='last').set_index('Item')['MFG']
+    produced = df_plan.groupby('Item')['Qty'].sum()
+    assert (produced <= demand.reindex(produced.index)).all()
+
+
+def test_plan_improver_keeps_plan_feasible(small_instance):
+    optimization = Optimization(small_instance)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_start = edd_plan(optimization)['result']
+    # 모든 행을 두 시프트 뒤로 미뤄서 납기 / Capa 를 어긴 계획에서 시작 (앞의 세 행은 고정)
+    df_start['Time'] = (df_start['Time'].astype(int) + 2).clip(upper=max(optimization.time))
+    df_pinned = df_start.head(3)
+    improver = PlanImprover(df_start, dataframes=small_instance, df_pinned=df_pinned, seed=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        improved = improver.improve(time_limit=2, patience=5_000)
+    df_plan = improved['result']
+
+    assert sum(improved['improvements'].values()) > 0
+    assert improved['scores']['Total'] > improved['initial_scores']['Total']
+    # 아이템별 총 생산량과 고정 행은 그대로
+    assert df_plan.groupby('Item')['Qty'].sum().to_dict() == df_start.groupby('Item')['Qty'].sum().to_dict()
+    assert _pinned_kept(df_plan, df_pinned)
+    # 원래 계획이 지키던 규칙은 계속 지키고, 어긴 규칙도 더 나빠지지 않음
+    before = _violations(small_instance, df_start)
+    for key, amount in _violations(small_instance, df_plan).items():
+        assert amount <= before.get(key, 0) + 1e-6, key
+    # 납기(또는 원래 계획의 마지막 시프트) 이후로 미루지 않음
+    df_items = small_instance['demand']['demand'].drop_duplicates('Item')
+    due = dict(zip(df_items['Item'], due_shifts(df_items, small_instance['master']['due_LT'], optimization.time)))
+    latest = df_start.groupby('Item')['Time'].max()
+    for item, time in df_plan.groupby('Item')['Time'].max().items():
+        assert time <= max(due[item], latest[item])
@@ -0,0 +1,33 @@
+import pandas as pd
+
+from app.core.input.pre_assign import check_max_line_violations, check_max_qty_violations
+
+
+"""
+요청 0 은 같은 제조동(I) 라인 두 개가 한 시프트에 있어 (I, 1) 조합이 라인마다 한 번씩 나옴
+"""
+def _requests():
+    return pd.DataFrame({
+        'Fixed_Line': [['I_01', 'I_02'], ['I_01'], ['D_01']],
+        'Fixed_Time': [[1], [1], [1]],
+        'Qty': [10, 20, 30],
+    })
+
+
+def test_max_line_counts_each_group_choice_once():
+    max_lines = pd.DataFrame({'GroupPrefix': ['I', 'D'], 'Shift': [1, 1], 'MaxLines': [1, 0]})
+    df = check_max_line_violations(_requests(), max_lines)
+    # I 에 요청 0, 1 -> 한 라인 초과, D 에 요청 2 -> 한 라인 초과
+    assert df.to_dict('records') == [
+        {'GroupPrefix': 'I', 'Shift': 1, 'MaxLines': 1, 'SlackCount': 1.0},
+        {'GroupPrefix': 'D', 'Shift': 1, 'MaxLines': 0, 'SlackCount': 1.0},
+    ]
+
+
+def test_max_qty_counts_each_group_choice_once():
+    max_qtys = pd.DataFrame({'GroupPrefix': ['I', 'D'], 'Shift': [1, 1], 'MaxQty': [15, 0]})
+    df = check_max_qty_violations(_requests(), max_qtys)
+    assert df.to_dict('records') == [
+        {'GroupPrefix': 'I', 'Shift': 1, 'MaxQty': 15, 'SlackQty': 15.0},
+        {'GroupPrefix': 'D', 'Shift': 1, 'MaxQty': 0, 'SlackQty': 30.0},
+    ]
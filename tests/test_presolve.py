@@ -0,0 +1,56 @@
+import contextlib
+import copy
+import io
+
+import pulp
+import pytest
+
+from app.core.optimization import Optimization
+from app.core.model.presolve import lp_relaxation_bound
+from app.core.model.solve_job import SolveJob
+
+
+def _plan_model(instance):
+    optimization = Optimization(instance)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return optimization.build_plan_model()['model']
+
+
+def test_lp_relaxation_bound_same_on_every_backend(small_instance):
+    model = _plan_model(small_instance)
+    integers = {var.name for var in model.variables() if var.cat == pulp.LpInteger}
+
+    bounds = {}
+    for backend in ('cbc', 'highs'):
+        with contextlib.redirect_stdout(io.StringIO()):
+            bounds[backend] = lp_relaxation_bound(model, backend=backend)
+        # 풀이 후 정수 변수는 그대로 정수 변수
+        assert {var.name for var in model.variables() if var.cat == pulp.LpInteger} == integers
+
+    assert bounds['cbc'] is not None
+    assert bounds['highs'] == pytest.approx(bounds['cbc'], rel=1e-6)
+
+
+def test_lp_relaxation_bound_reports_progress_and_stops_on_cancel(small_instance):
+    model = _plan_model(small_instance)
+    events = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert lp_relaxation_bound(model, backend='cbc', progress=events.append) is not None
+    assert events and events[0]['phase'] == 'start'
+
+    job = SolveJob('lp')
+    job.cancel()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert lp_relaxation_bound(model, backend='cbc', job=job) is None
+
+
+@pytest.mark.parametrize('stage', ['pre_assign', 'linear_programming', 'execute'])
+def test_presolve_keeps_objective(small_instance, stage):
+    objectives = {}
+    for presolve in (False, True):
+        optimization = Optimization(copy.deepcopy(small_instance), presolve=presolve)
+        with contextlib.redirect_stdout(io.StringIO()):
+            info = getattr(optimization, stage)()['solve_info']
+        assert info['has_solution']
+        objectives[presolve] = info['objective']
+    assert objectives[True] == pytest.approx(objectives[False], rel=1e-6)
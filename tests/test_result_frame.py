@@ -0,0 +1,71 @@
+import contextlib
+import copy
+import io
+
+import pandas as pd
+import pytest
+
+from app.core.optimization import Optimization
+from app.core.model.rolling_horizon import execute_rolling
+
+
+"""
+demand / due_LT 시트에서 직접 구한 아이템별 기대값
+(SOP / MFG 는 aggregate 가 'last' 면 아이템의 마지막 demand 행, 'sum' 이면 모든 행의 합)
+"""
+def _expected(instance, aggregate='last'):
+    df_all = instance['demand']['demand']
+    df_demand = df_all.drop_duplicates('Item', keep='last')
+    if aggregate == 'sum':
+        df_demand = df_demand.drop(columns=['SOP', 'MFG']).join(df_all.groupby('Item')[['SOP', 'MFG']].sum(), on='Item')
+    df_due = instance['master']['due_LT']
+    expected = df_demand.assign(Project=df_demand['Item'].str[3:7], Tosite_group=df_demand['Item'].str[7:8])
+    expected = expected.merge(df_due, how='left', on=['Project', 'Tosite_group'])
+    return expected.set_index('Item')[['To_Site', 'SOP', 'MFG', 'Due_date_LT']]
+
+
+"""
+앞쪽 아이템들의 demand 행을 하나씩 더 추가 (같은 아이템이 여러 행인 경우)
+"""
+def _duplicate_items(instance, count=10):
+    df = instance['demand']['demand']
+    extra = df.head(count).assign(SOP=df['SOP'].head(count) // 2, MFG=df['MFG'].head(count) // 2 + 1)
+    instance['demand']['demand'] = pd.concat([df, extra], ignore_index=True)
+    return set(extra['Item'])
+
+
+def _check(df_result, instance, aggregate='last'):
+    expected = _expected(instance, aggregate).reindex(df_result['Item'])
+    assert not df_result.empty
+    assert df_result['To_site'].tolist() == expected['To_Site'].astype(str).tolist()
+    assert df_result['SOP'].tolist() == expected['SOP'].astype(int).tolist()
+    assert df_result['MFG'].tolist() == expected['MFG'].astype(int).tolist()
+    assert df_result['Due_LT'].tolist() == expected['Due_date_LT'].astype(int).tolist()
+    assert (df_result['Demand'] == df_result['Item'] + df_result['To_site']).all()
+
+
+def test_execute_result_matches_demand(small_instance):
+    optimization = Optimization(small_instance)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = optimization.execute()
+    _check(result['result'], small_instance)
+
+
+def test_rolling_windows_keep_full_demand_values(small_instance):
+    optimization = Optimization(small_instance)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = execute_rolling(optimization, window=3, overlap=1)
+    assert len(result['solve_info']['windows']) > 1
+    _check(result['result'], small_instance)
+
+
+def test_duplicate_items_follow_each_stage_demand(small_instance):
+    duplicated = _duplicate_items(small_instance)
+    with contextlib.redirect_stdout(io.StringIO()):
+        pre_result = Optimization(copy.deepcopy(small_instance)).pre_assign()['result']
+        result = Optimization(copy.deepcopy(small_instance)).execute()['result']
+    # 사전할당은 아이템의 모든 행을 합친 수요, execute 는 마지막 행의 수요로 풂
+    assert duplicated & set(pre_result['Item'])
+    assert duplicated & set(result['Item'])
+    _check(pre_result, small_instance, aggregate='sum')
+    _check(result, small_instance)
@@ -0,0 +1,27 @@
+import contextlib
+import io
+
+from app.core.optimization import Optimization
+from app.core.model.rolling_horizon import execute_rolling
+from app.core.model.solve_job import SolveJob
+
+
+def test_windows_share_time_limit(small_instance):
+    optimization = Optimization(small_instance)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = execute_rolling(optimization, window=3, overlap=1, time_limit=12)
+    windows = result['solve_info']['windows']
+    assert len(windows) > 1
+    # 구간마다 남은 시간을 남은 구간 수로 나눠 쓰므로 첫 구간은 전체 제한 시간을 다 받지 않음
+    assert windows[0]['time_limit'] <= 12 // len(windows)
+    assert result['solve_info']['skipped_windows'] == []
+
+
+def test_cancelled_windows_are_reported(small_instance):
+    job = SolveJob('rolling')
+    job.cancel()
+    optimization = Optimization(small_instance, solve_job=job)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = execute_rolling(optimization, window=3, overlap=1, time_limit=12)
+    assert result['solve_info']['skipped_windows'] == [(1, 3), (3, 5), (5, 6)]
+    assert result['result'].empty
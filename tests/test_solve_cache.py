@@ -0,0 +1,67 @@
+import contextlib
+import copy
+import io
+import os
+
+import pandas as pd
+
+from app.core.optimizer import Optimizer
+from app.core.model.solve_cache import SolveCache
+
+
+def test_result_key_miss_hit(tmp_path, small_instance):
+    cache = SolveCache(str(tmp_path))
+    df_demand = small_instance['demand']['demand']
+    key = SolveCache.make_key('execute', small_instance, 300)
+
+    # 같은 내용이면 같은 키, 값이 하나라도 다르면 다른 키
+    assert SolveCache.make_key('execute', copy.deepcopy(small_instance), 300) == key
+    assert SolveCache.make_key('execute', small_instance, 301) != key
+    changed = copy.deepcopy(small_instance)
+    changed['demand']['demand'].loc[0, 'MFG'] += 1
+    assert SolveCache.make_key('execute', changed, 300) != key
+
+    assert cache.get_result(key) is None
+    cache.put_result(key, df_demand, {'status': 'Optimal', 'has_solution': True})
+    cached = cache.get_result(key)
+    pd.testing.assert_frame_equal(cached['result'], df_demand)
+    assert cached['solve_info'] == {'status': 'Optimal', 'has_solution': True}
+
+
+def test_evict_least_recently_used(tmp_path, small_instance):
+    cache = SolveCache(str(tmp_path))
+    df_demand = small_instance['demand']['demand']
+    cache.put_result('a', df_demand, {})
+    cache.put_result('b', df_demand, {})
+    entry_size = sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path) if name.startswith('a.'))
+    # a 를 더 오래전에 저장했지만 b 보다 나중에 조회
+    for name in os.listdir(tmp_path):
+        os.utime(tmp_path / name, (1000, 1000) if name.startswith('a.') else (2000, 2000))
+    assert cache.get_result('a') is not None
+
+    cache.max_bytes = int(entry_size * 2.5)
+    with contextlib.redirect_stdout(io.StringIO()):
+        cache.put_result('c', df_demand, {})
+    assert cache.get_result('b') is None
+    assert cache.get_result('a') is not None and cache.get_result('c') is not None
+
+
+def test_model_hit_keeps_warm_start(tmp_path, monkeypatch, small_instance):
+    monkeypatch.chdir(tmp_path)
+
+    def run(time_limit2, **options):
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = Optimizer().run_optimization({'dataframes': copy.deepcopy(small_instance), 'use_cache': True,
+                                                    'heuristic': False, 'time_limit2': time_limit2, **options})
+        return results['mip_results'], results['assignment_result']
+
+    built, df_built = run(30)
+    assert built.get('cache') is None and built['warm_start_rows'] > 0
+    # 제한 시간만 바뀌면 저장된 모델(MPS)을 다시 풀고, 1차 결과를 초기해로 다시 넣음
+    reused, df_reused = run(31)
+    assert reused['cache'] == 'model'
+    assert reused['warm_start_rows'] == built['warm_start_rows']
+    assert df_reused['Qty'].sum() == df_built['Qty'].sum()
+    assert run(31)[0]['cache'] == 'result'
+    # 직접 준 초기해는 결과 키에 들어가므로 같은 설정의 결과를 재사용하지 않음
+    assert run(31, warm_start=df_built)[0]['cache'] == 'model'
@@ -0,0 +1,17 @@
+import time
+
+from app.core.model.solver_progress import SolveProgressMonitor, progress_percent
+
+
+def test_progress_never_goes_backwards():
+    events = []
+    monitor = SolveProgressMonitor(events.append, time_limit=100)
+    monitor._start = time.time()
+    for phase in ['start', 'solving', 'presolve', 'root_lp', 'solving', 'incumbent', 'solving', 'search', 'solving', 'done']:
+        monitor.emit({'phase': phase, 'message': phase})
+
+    percents = [progress_percent(event, 20, 95) for event in events]
+    assert percents == sorted(percents)
+    assert percents[-1] == 95
+    # 정수해를 찾은 뒤의 경과 시간 알림은 정수해 단계의 진행률을 유지
+    assert percents[6] == percents[5]
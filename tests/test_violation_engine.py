@@ -0,0 +1,113 @@
+import contextlib
+import io
+
+import pandas as pd
+import pulp
+import pytest
+
+from app.core.model.synthetic_instance import generate_instance
+from app.core.input.pre_assign import (prepare_fixed_options, extract_error_records, validate_fixed_option_lines,
+                                       get_capacity_constraints, get_max_line_constraints, get_max_qty_constraints,
+                                       shift_columns)
+from app.core.input.violation_engine import ViolationEngine
+
+
+"""
+합성 입력을 run_allocation 과 같은 순서로 전처리한 검사 엔진
+"""
+def _engine(qty_scale=1, **params):
+    return _engine_for(generate_instance(items=40, lines_per_building=2, shifts=6, fixed_density=0.3, **params), qty_scale)
+
+
+def _engine_for(instance, qty_scale=1):
+    capa_qty = instance['master']['capa_qty'].set_index('Line')
+    line_available = instance['master']['line_available']
+    fx = prepare_fixed_options(instance['dynamic']['fixed_option'], instance['dynamic']['pre_assign'],
+                               instance['demand']['demand'], line_available, shift_columns(capa_qty))
+    fx, _ = extract_error_records(fx)
+    fx, _ = validate_fixed_option_lines(fx, line_available)
+    fx['Qty'] = pd.to_numeric(fx['Qty']) * qty_scale
+    return ViolationEngine(fx, get_capacity_constraints(capa_qty), get_max_line_constraints(capa_qty),
+                           get_max_qty_constraints(capa_qty), msg=False)
+
+
+"""
+요청을 (라인, 시프트) Capa 안에 나눠 담을 수 있는 최대 수량 (LP)
+"""
+def _assignable_by_lp(engine):
+    prob = pulp.LpProblem('CapacityCheck', pulp.LpMaximize)
+    x = {(r, cell): pulp.LpVariable(f'x_{r}_{cell[0]}_{cell[1]}', lowBound=0)
+         for r, cells in engine.cells.items() for cell in cells}
+    prob += pulp.lpSum(x.values())
+    for r, cells in engine.cells.items():
+        prob += pulp.lpSum(x[(r, cell)] for cell in cells) <= engine.fx.at[r, 'Qty']
+    for cell, capacity in engine.cap_dict.items():
+        terms = [var for (r, c), var in x.items() if c == cell]
+        if terms and pd.notna(capacity):
+            prob += pulp.lpSum(terms) <= capacity
+    prob.solve(pulp.PULP_CBC_CMD(msg=False))
+    return pulp.value(prob.objective)
+
+
+@pytest.mark.parametrize('qty_scale', [1, 50])
+def test_capacity_flow_shortfall_matches_lp(qty_scale):
+    engine = _engine(qty_scale, seed=0)
+    shortfall = engine.shortfalls.sum()
+    if qty_scale > 1:
+        assert shortfall > 0
+    assert shortfall == pytest.approx(engine.fx['Qty'].sum() - _assignable_by_lp(engine), abs=1e-6)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_prescreen_and_components_match_single_milp(seed):
+    engine = _engine(seed=seed)
+    assert engine.shortfalls.sum() == 0
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        combined = engine.combined()
+        # 사전 판정 / 묶음 분리 없이 모든 요청과 제약을 하나의 MILP 로
+        ml_dict = {key: limit for key, limit in engine.ml_dict.items() if pd.notna(limit)}
+        mq_dict = {key: limit for key, limit in engine.mq_dict.items() if pd.notna(limit)}
+        single = pd.DataFrame(engine._combined_component(list(engine.fx.index), ml_dict, mq_dict))
+
+    assert (~engine.bounds['Decided']).any()
+    assert combined['ViolationAmt'].sum() == pytest.approx(single['ViolationAmt'].sum(), rel=1e-6)
+
+
+def test_capacity_flow_shortfalls_on_small_instance(small_instance):
+    # 요청: AAAP103CWH0003 D_02 시프트 2,5 에 106 / AAAP100ASV0005 I_01 시프트 3 에 120 / pre_assign M_01 시프트 1 에 84
+    engine = _engine_for(small_instance)
+    assert engine.shortfalls.sum() == 0
+    assigned = engine.flow['assigned'].groupby('Request')['Qty'].sum()
+    assert assigned.to_dict() == engine.fx['Qty'].to_dict()
+
+    capa_qty = small_instance['master']['capa_qty']
+    capa_qty.loc[capa_qty['Line'] == 'D_02', [2, 5]] = 40
+    capa_qty.loc[capa_qty['Line'] == 'I_01', 3] = 100
+    engine = _engine_for(small_instance)
+    assert engine.shortfalls.tolist() == [26, 20, 0]
+    assert engine.flow['max_flow'] == engine.fx['Qty'].sum() - 46
+    # 부족한 요청은 자기 (라인, 시프트) Capa 를 꽉 채움
+    assigned = engine.flow['assigned'].groupby(['Line', 'Shift'])['Qty'].sum()
+    assert assigned[('D_02', 2)] == 40 and assigned[('D_02', 5)] == 40 and assigned[('I_01', 3)] == 100
+
+
+def test_prescreen_bounds_on_small_instance(small_instance):
+    engine = _engine_for(small_instance)
+    bounds = engine.bounds.set_index(['Constraint', 'Prefix', 'Shift'])
+    # 조합이 하나뿐인 요청의 MaxQty 위반은 사전 판정으로 확정 (I_01 시프트 3, M_01 시프트 1)
+    assert bounds.loc[('MaxQty', 'I', 3), 'Decided'] and bounds.loc[('MaxQty', 'I', 3), 'Lower'] == 120 * 120 - 1130
+    assert bounds.loc[('MaxQty', 'M', 1), 'Decided'] and bounds.loc[('MaxQty', 'M', 1), 'Lower'] == 84 * 84 - 750
+    # 시프트 2 / 5 중 하나를 고를 수 있는 요청은 판정하지 못함 (하한 0, 상한은 그 시프트에 모두 담았을 때)
+    assert not bounds.loc[('MaxQty', 'D', 2), 'Decided']
+    assert bounds.loc[('MaxQty', 'D', 2), ['Lower', 'Upper']].tolist() == [0, 106 * 106 - 980]
+
+    # 통합 검사 결과의 제약별 위반량은 하한 / 상한 안에 있음
+    with contextlib.redirect_stdout(io.StringIO()):
+        combined = engine.combined()
+    amounts = combined.groupby(['Constraint', 'Line(GroupPrefix)', 'Shift'])['ViolationAmt'].sum()
+    for key, row in bounds.iterrows():
+        amount = amounts.get(key, 0)
+        assert row['Lower'] - 1e-6 <= amount <= row['Upper'] + 1e-6, key
+    # 판정하지 못한 요청은 두 시프트에 나눠 담아서 두 한계치를 모두 쓰는 것이 최소
+    assert amounts.get(('MaxQty', 'D', 2), 0) + amounts.get(('MaxQty', 'D', 5), 0) == pytest.approx(106 * 106 - 980 - 1060)